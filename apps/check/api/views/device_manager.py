@@ -1,6 +1,7 @@
+import itertools
 import re
 
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils.decorators import method_decorator
 from rest_framework import generics, status
 from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
@@ -34,6 +35,7 @@ from ...services.device.commands import (
     get_available_command_for_device,
     get_available_commands_for_device,
     get_device_command_task_results,
+    iter_command_output,
     validate_command,
 )
 from ...services.device.interfaces import (
@@ -465,14 +467,24 @@ class DeviceCommandsListAPIView(DeviceAPIView):
 class ExecuteDeviceCommandAPIView(DeviceAPIView):
     @except_connection_errors
     @method_decorator(profile_permission(models.Profile.CMD_RUN))
-    def post(self, request, *args, **kwargs) -> Response:
+    def post(self, request, *args, **kwargs) -> Response | StreamingHttpResponse:
         """Execute a command on a single device."""
         device = self.get_object()
         command = get_available_command_for_device(self.current_user, device, int(self.kwargs["command_id"]))
         if command is None:
             raise NotFound("Command not found")
 
+        # Вывод без проверки выполнения можно передавать клиенту по мере чтения с оборудования.
+        stream = request.query_params.get("stream", "").lower() in {"1", "true"} and not command.valid_regexp
+
         try:
+            if stream:
+                chunks = iter_command_output(device, command, request.data)
+                # Ошибки подключения возникают на первой части вывода, до отправки ответа.
+                first_chunk = next(chunks, "")
+                return StreamingHttpResponse(
+                    itertools.chain([first_chunk], chunks), content_type="text/plain; charset=utf-8"
+                )
             output: str = execute_command(device, command, request.data)
         except InvalidMethod as exc:
             raise UnsupportedDeviceOperation(
@@ -21,6 +21,30 @@ def register_task(*args, **kwargs) -> None:
             "enabled": False,
         },
     )
+    PeriodicTask.objects.get_or_create(
+        task="sync_zabbix_hosts_task",
+        defaults={
+            "name": "Синхронизация узлов сети Zabbix",
+            "crontab": get_crontab_schedule(minute="*/10", hour="*"),
+            "enabled": False,
+        },
+    )
+    PeriodicTask.objects.get_or_create(
+        task="rebuild_zabbix_maps_index_task",
+        defaults={
+            "name": "Индекс карт Zabbix по узлам сети",
+            "crontab": get_crontab_schedule(minute="*/5", hour="*"),
+            "enabled": False,
+        },
+    )
+    PeriodicTask.objects.get_or_create(
+        task="refresh_devices_reachability_task",
+        defaults={
+            "name": "Проверка доступности оборудования",
+            "crontab": get_crontab_schedule(minute="*", hour="*"),
+            "enabled": False,
+        },
+    )
 
 
 class CheckConfig(AppConfig):
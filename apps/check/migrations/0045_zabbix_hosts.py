@@ -0,0 +1,65 @@
+# Generated by Django 6.0.9 on 2026-10-18 20:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("check", "0044_add_interface_change_desc_permission"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ZabbixHostGroup",
+            fields=[
+                (
+                    "groupid",
+                    models.PositiveBigIntegerField(
+                        primary_key=True, serialize=False, verbose_name="ID группы Zabbix"
+                    ),
+                ),
+                ("name", models.CharField(db_index=True, max_length=255, verbose_name="Название")),
+            ],
+            options={
+                "verbose_name": "Zabbix host group",
+                "verbose_name_plural": "Zabbix host groups",
+                "db_table": "zabbix_host_groups",
+            },
+        ),
+        migrations.CreateModel(
+            name="ZabbixHost",
+            fields=[
+                (
+                    "hostid",
+                    models.PositiveBigIntegerField(
+                        primary_key=True, serialize=False, verbose_name="ID узла сети Zabbix"
+                    ),
+                ),
+                ("host", models.CharField(db_index=True, max_length=255, verbose_name="Имя узла сети")),
+                ("name", models.CharField(db_index=True, max_length=255, verbose_name="Видимое имя")),
+                ("status", models.CharField(default="0", max_length=1, verbose_name="Статус мониторинга")),
+                ("description", models.TextField(blank=True, default="", verbose_name="Описание")),
+                ("interfaces", models.JSONField(default=list, verbose_name="IP адреса интерфейсов")),
+                ("inventory", models.JSONField(default=dict, verbose_name="Инвентарные данные")),
+                ("synced_at", models.DateTimeField(verbose_name="Синхронизирован")),
+                (
+                    "inventory_synced_at",
+                    models.DateTimeField(
+                        db_index=True, null=True, verbose_name="Инвентарные данные синхронизированы"
+                    ),
+                ),
+                (
+                    "groups",
+                    models.ManyToManyField(
+                        related_name="hosts", to="check.zabbixhostgroup", verbose_name="Группы"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Zabbix host",
+                "verbose_name_plural": "Zabbix hosts",
+                "db_table": "zabbix_hosts",
+            },
+        ),
+    ]
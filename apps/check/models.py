@@ -232,7 +232,11 @@ class Devices(models.Model):
 
     @property
     def available(self) -> bool:
-        return self.connect().ping_device()
+        """Доступность оборудования, проверенная не раньше, чем `DEVICE_REACHABILITY_TTL` секунд назад."""
+        # pylint: disable-next=import-outside-toplevel
+        from .services.device.reachability import is_device_available
+
+        return is_device_available(self.ip)
 
     def connect(self, make_session_global=True) -> RemoteDevice:
         """Удаленное подключение к оборудованию"""
@@ -790,3 +794,60 @@ class BulkDeviceCommandExecutionResult(models.Model):
 
     def __str__(self):
         return f"{self.execution_id} | {self.device_name} | {self.status}"
+
+
+class ZabbixHostGroup(models.Model):
+    """Группа узлов сети Zabbix в локальной копии Zabbix"""
+
+    groupid = models.PositiveBigIntegerField(primary_key=True, verbose_name="ID группы Zabbix")
+    name = models.CharField(max_length=255, db_index=True, verbose_name="Название")
+
+    class Meta:
+        db_table = "zabbix_host_groups"
+        verbose_name = "Zabbix host group"
+        verbose_name_plural = "Zabbix host groups"
+
+    def __str__(self):
+        return self.name
+
+
+class ZabbixHost(models.Model):
+    """
+    Локальная копия узла сети Zabbix: группы, IP адреса интерфейсов и инвентарные данные.
+
+    Обновляется задачей `sync_zabbix_hosts_task`, см. `apps.check.services.zabbix_hosts`.
+    """
+
+    hostid = models.PositiveBigIntegerField(primary_key=True, verbose_name="ID узла сети Zabbix")
+    host = models.CharField(max_length=255, db_index=True, verbose_name="Имя узла сети")
+    name = models.CharField(max_length=255, db_index=True, verbose_name="Видимое имя")
+    status = models.CharField(max_length=1, default="0", verbose_name="Статус мониторинга")
+    description = models.TextField(blank=True, default="", verbose_name="Описание")
+    interfaces = models.JSONField(default=list, verbose_name="IP адреса интерфейсов")
+    inventory = models.JSONField(default=dict, verbose_name="Инвентарные данные")
+    groups = models.ManyToManyField(ZabbixHostGroup, related_name="hosts", verbose_name="Группы")
+    synced_at = models.DateTimeField(verbose_name="Синхронизирован")
+    inventory_synced_at = models.DateTimeField(
+        null=True, db_index=True, verbose_name="Инвентарные данные синхронизированы"
+    )
+
+    class Meta:
+        db_table = "zabbix_hosts"
+        verbose_name = "Zabbix host"
+        verbose_name_plural = "Zabbix hosts"
+
+    def __str__(self):
+        return self.name
+
+    def to_zabbix_info(self) -> dict:
+        """Данные узла сети в формате ответа Zabbix `host.get`"""
+        return {
+            "hostid": str(self.hostid),
+            "host": self.host,
+            "name": self.name,
+            "status": self.status,
+            "description": self.description,
+            "groups": [{"groupid": str(group.groupid), "name": group.name} for group in self.groups.all()],
+            "interfaces": [{"ip": ip} for ip in self.interfaces],
+            "inventory": self.inventory,
+        }
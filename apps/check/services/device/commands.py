@@ -406,12 +406,19 @@ def validate_command(device: Devices, command: str, context: dict) -> list[Remot
     return validated_commands
 
 
-def execute_command(device: Devices, command: DeviceCommand, context: dict) -> str:
-    """Execute command on one device and return merged output."""
+def iter_command_output(device: Devices, command: DeviceCommand, context: dict) -> Iterator[str]:
+    """
+    Validate the command and return its output chunks as they are read from the device.
+
+    Validation errors are raised at once, device errors - while the chunks are consumed.
+    """
     validated_commands = validate_command(device, command.command, context)
+    return device.connect().execute_commands_stream(validated_commands)
+
 
-    outputs = device.connect().execute_commands_list(validated_commands)
-    return "\n\n".join(outputs)
+def execute_command(device: Devices, command: DeviceCommand, context: dict) -> str:
+    """Execute command on one device and return merged output."""
+    return "".join(iter_command_output(device, command, context))
 
 
 def get_command_text_for_audit(device: Devices, command: DeviceCommand, context: dict) -> str:
@@ -108,13 +108,17 @@ class DeviceDBSynchronizer(DeviceInterfacesGather):
         :return: Список сохраненных интерфейсов
         """
         device_info, _ = DevicesInfo.objects.get_or_create(dev=self.device)
-        if self.device_collector.interfaces and self.with_vlans:
+        if not self.device_collector.interfaces:
+            return
+
+        update_fields = ["interfaces", "interfaces_date"]
+        if self.with_vlans:
             device_info.update_interfaces_with_vlans_state(self.device_collector.interfaces)
-            device_info.save(update_fields=["vlans", "vlans_date"])
+            update_fields += ["vlans", "vlans_date"]
 
-        if self.device_collector.interfaces:
-            device_info.update_interfaces_state(self.device_collector.interfaces)
-            device_info.save(update_fields=["interfaces", "interfaces_date"])
+        device_info.update_interfaces_state(self.device_collector.interfaces)
+        # Одно сохранение - снимки интерфейсов (`InterfaceSnapshot`) пересобираются один раз.
+        device_info.save(update_fields=update_fields)
 
 
 @dataclass(frozen=True, kw_only=True, slots=True)
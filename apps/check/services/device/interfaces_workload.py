@@ -1,9 +1,9 @@
 import orjson
-from django.core.cache import cache
 from django.db.models import QuerySet
 from rest_framework.serializers import BaseSerializer
 
-from apps.net_tools.models import DevicesInfo
+from apps.net_tools.models import DeviceInterfacesWorkload, DevicesInfo
+from apps.net_tools.services.interfaces_workload import WORKLOAD_FIELDS
 from devicemanager.device.interfaces import Interfaces
 
 from ...api.serializers import DevicesSerializer
@@ -11,9 +11,6 @@ from ...models import Devices
 
 
 class DevicesInterfacesWorkloadCollector:
-    cache_key = "all_devices_interfaces_workload_api_view"
-    cache_seconds = 60 * 10
-
     def __init__(self, devices_qs: QuerySet[Devices]):
         self.devices_qs = devices_qs
 
@@ -49,45 +46,73 @@ class DevicesInterfacesWorkloadCollector:
             "abons_down_no_desc": abons_down.count - abons_down_with_desc.count,
         }
 
+    @staticmethod
+    def get_interfaces_loads(devices_qs: QuerySet[Devices]) -> dict[int, dict]:
+        """
+        ## Возвращает загрузку интерфейсов для каждого устройства.
+
+        Читается из `DeviceInterfacesWorkload`, который обновляется вместе со снимками интерфейсов
+        устройства, значения совпадают с `get_interfaces_load`.
+        :param devices_qs: Оборудование, для которого надо получить загрузку.
+        :return: Словарь: ID устройства -> загрузка интерфейсов.
+        """
+        rows = DeviceInterfacesWorkload.objects.filter(device__in=devices_qs).values_list(
+            "device_id", *WORKLOAD_FIELDS
+        )
+        loads = {}
+        for device_id, *counters in rows:
+            load = dict(zip(WORKLOAD_FIELDS, counters, strict=True))
+            load["abons_up_no_desc"] = load["abons_up"] - load["abons_up_with_desc"]
+            load["abons_down_no_desc"] = load["abons_down"] - load["abons_down_with_desc"]
+            loads[device_id] = load
+        return loads
+
+    @staticmethod
+    def empty_interfaces_load() -> dict:
+        return dict.fromkeys(
+            (
+                "count",
+                "abons",
+                "abons_up",
+                "abons_up_with_desc",
+                "abons_up_no_desc",
+                "abons_down",
+                "abons_down_with_desc",
+                "abons_down_no_desc",
+            ),
+            0,
+        )
+
     @staticmethod
     def get_serializer_class() -> type[BaseSerializer]:
         return DevicesSerializer
 
     def get_interfaces_workload(self) -> dict:
-        queryset = self._create_queryset(self.devices_qs).values_list("dev__name", flat=True).distinct()
-        devices_names: list[str] = list(queryset)
-        all_devices_data = self.get_all_device_interfaces_workload(from_cache=True)
+        return self._collect_workload(self.devices_qs)
+
+    def get_all_device_interfaces_workload(self) -> dict:
+        return self._collect_workload(Devices.objects.all())
 
+    def _collect_workload(self, devices_qs: QuerySet[Devices]) -> dict:
+        qs = self._create_queryset(devices_qs)
+        interfaces_loads = self.get_interfaces_loads(devices_qs)
         return {
-            "devices_count": len(devices_names),
+            "devices_count": len(qs),
             "devices": [
-                dev_info for dev_info in all_devices_data["devices"] if dev_info["name"] in devices_names
+                {
+                    "interfaces_count": interfaces_loads.get(
+                        dev_info["dev_id"], self.empty_interfaces_load()
+                    ),
+                    "ip": dev_info["dev__ip"],
+                    "name": dev_info["dev__name"],
+                    "vendor": dev_info["dev__vendor"],
+                    "group": dev_info["dev__group__name"],
+                    "model": dev_info["dev__model"],
+                }
+                for dev_info in qs
             ],
         }
 
-    def get_all_device_interfaces_workload(self, from_cache: bool = True):
-        cache_value = cache.get(self.cache_key)
-
-        if not cache_value or not from_cache:
-            qs = self._create_queryset(Devices.objects.all())
-            cache_value = {
-                "devices_count": len(qs),
-                "devices": [
-                    {
-                        "interfaces_count": self.get_interfaces_load(dev_info),
-                        "ip": dev_info["dev__ip"],
-                        "name": dev_info["dev__name"],
-                        "vendor": dev_info["dev__vendor"],
-                        "group": dev_info["dev__group__name"],
-                        "model": dev_info["dev__model"],
-                    }
-                    for dev_info in qs
-                ],
-            }
-            cache.set(self.cache_key, cache_value, timeout=self.cache_seconds)
-
-        return cache_value
-
     @staticmethod
     def _create_queryset(qs: QuerySet[Devices]) -> QuerySet:
         return (
@@ -95,7 +120,7 @@ class DevicesInterfacesWorkloadCollector:
             .select_related("dev", "dev__group")
             .order_by("dev__name")
             .values(
-                "interfaces",
+                "dev_id",
                 "dev__ip",
                 "dev__name",
                 "dev__vendor",
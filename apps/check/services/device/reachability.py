@@ -0,0 +1,62 @@
+"""
+# Доступность оборудования.
+
+Доступность проверяется пачкой для всего запрошенного оборудования (`pool_controller.ping_many`)
+и сохраняется в общий кеш на `DEVICE_REACHABILITY_TTL` секунд. Задачи сбора, кольца и API
+в пределах этого интервала используют одну проверку на устройство.
+"""
+
+import os
+from collections.abc import Iterable
+
+from django.core.cache import cache
+
+from devicemanager.remote.connector import pool_controller
+
+DEVICE_REACHABILITY_TTL = int(os.getenv("DEVICE_REACHABILITY_TTL", "20"))
+
+
+def _cache_key(ip: str) -> str:
+    return f"device_reachability:{ip}"
+
+
+def get_devices_reachability(ips: Iterable[str], fresh: bool = False) -> dict[str, bool]:
+    """
+    ## Доступность оборудования по IP.
+
+    Адреса, которых нет в кеше, проверяются одной пачкой, результат сохраняется в кеш.
+    :param ips: IP адреса оборудования.
+    :param fresh: Проверить все адреса заново, не используя кеш.
+    :return: Словарь: IP -> доступно ли оборудование.
+    """
+    ips = [ip for ip in dict.fromkeys(ips) if ip]
+    result: dict[str, bool] = {}
+    if not fresh:
+        cached = cache.get_many([_cache_key(ip) for ip in ips])
+        result = {ip: cached[_cache_key(ip)] for ip in ips if _cache_key(ip) in cached}
+
+    missing = [ip for ip in ips if ip not in result]
+    if missing:
+        probed = pool_controller.ping_many(missing)
+        cache.set_many(
+            {_cache_key(ip): available for ip, available in probed.items()}, DEVICE_REACHABILITY_TTL
+        )
+        result.update(probed)
+    return result
+
+
+def is_device_available(ip: str, fresh: bool = False) -> bool:
+    return get_devices_reachability([ip], fresh=fresh).get(ip, False)
+
+
+def refresh_devices_reachability() -> int:
+    """
+    ## Проверяет доступность всего активного оборудования одной пачкой и обновляет кеш.
+
+    :return: Кол-во проверенных устройств.
+    """
+    # pylint: disable-next=import-outside-toplevel
+    from apps.check.models import Devices
+
+    ips = Devices.objects.filter(active=True).values_list("ip", flat=True)
+    return len(get_devices_reachability(ips, fresh=True))
@@ -98,7 +98,6 @@ class DevicesVlanWorkloadCollector:
             .select_related("dev", "dev__group")
             .order_by("dev__name")
             .values(
-                "vlans",
                 "dev__id",
                 "dev__ip",
                 "dev__name",
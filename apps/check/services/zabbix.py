@@ -7,43 +7,7 @@ from urllib3.exceptions import MaxRetryError
 from devicemanager.device.zabbix_api import zabbix_api
 from ecstasy_project.decorators import cached
 
-
-@cached(60 * 10, key=lambda _, host_id: f"device_zabbix_maps_ids:{host_id}")
-def get_device_zabbix_maps_ids(zbx_session: ZabbixAPI, host_id: int | str) -> list[dict[str, str | int]]:
-    """
-    Возвращает список карт Zabbix, в которых находится узел сети Zabbix по его id.
-    """
-    hosts_map_ids: list[dict[str, str | int]] = []
-    passed_map_ids = set()
-    if not host_id:
-        return []
-
-    for map_ in get_all_zabbix_maps_list(zbx_session):
-        if not map_.get("sysmapid"):
-            continue
-
-        for element in map_.get("selements", []):
-            sysmap_id = map_["sysmapid"]
-            for host in element.get("elements", []):
-                if host.get("hostid") == str(host_id) and sysmap_id not in passed_map_ids:
-                    passed_map_ids.add(sysmap_id)  # Добавляем карту в список уже записанных.
-                    hosts_map_ids.append(
-                        {
-                            "sysmapid": int(sysmap_id),  # ID карты
-                            "name": map_.get("name", "Без названия"),  # Название карты
-                        },
-                    )
-    return hosts_map_ids
-
-
-@cached(60 * 10, key="zabbix_maps")
-def get_all_zabbix_maps_list(zbx_session: ZabbixAPI) -> list:
-    """
-    Возвращает список всех zabbix карт.
-    [{'name': 'Название карты', 'sysmapid': '94', 'elements': [ {'elements': [{'hostid': '11469'}]},... ]}]
-    :return: Список.
-    """
-    return zbx_session.map.get(selectSelements=["elements"], output=["sysmapid", "name"])
+from .zabbix_maps_index import get_host_zabbix_maps
 
 
 @cached(90, key=lambda _, host_id: f"device_uptime:{host_id}")
@@ -87,33 +51,27 @@ def get_zabbix_graphs(device_name: str) -> tuple[int, list]:
     return host_id, graphs
 
 
-@cached(60 * 10, key=lambda host_id: f"zabbix_map_and_uptime:{host_id}")
-def get_zabbix_host_map_and_uptime(host_id: int | str) -> tuple[list[dict[str, str | int]], int]:
+@cached(60 * 10, key=lambda host_id: f"zabbix_uptime:{host_id}")
+def get_zabbix_host_uptime(host_id: int | str) -> int:
     try:
         with zabbix_api.connect() as zbx:
-            devices_maps = get_device_zabbix_maps_ids(zbx, host_id)
-            uptime = get_device_uptime(zbx, host_id)
+            return get_device_uptime(zbx, host_id)
     except (Exception, RequestException):
-        return [], -1
-    return devices_maps, uptime
+        return -1
+
+
+def get_zabbix_host_map_and_uptime(host_id: int | str) -> tuple[list[dict[str, str | int]], int]:
+    """Карты Zabbix, на которых находится узел сети (из индекса карт), и время его работы."""
+    return get_host_zabbix_maps(host_id), get_zabbix_host_uptime(host_id)
 
 
 @cached(20, key=lambda device_name: f"zabbix_info:{device_name.encode().hex()}")
 def get_zabbix_host_info(device_name: str) -> dict:
-    try:
-        with zabbix_api.connect() as zbx:
-            info = zbx.host.get(
-                filter={"name": device_name},
-                output=["hostid", "host", "name", "status", "description"],
-                selectGroups=["groupid", "name"],
-                selectInterfaces=["ip"],
-                selectInventory="extend",
-            )
-            if len(info) > 0:
-                return info[0]
-    except (Exception, RequestException) as exc:
-        print(exc)
-    return {}
+    """Узел сети Zabbix из локальной копии, см. `get_zabbix_hosts_info`."""
+    # pylint: disable-next=import-outside-toplevel
+    from .zabbix_hosts import get_zabbix_hosts_info
+
+    return get_zabbix_hosts_info([device_name]).get(device_name, {})
 
 
 @dataclass(slots=True, kw_only=True)
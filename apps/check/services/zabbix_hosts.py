@@ -0,0 +1,245 @@
+"""
+# Локальная копия узлов сети Zabbix.
+
+`sync_zabbix_hosts` одним запросом `host.get` получает все узлы сети с группами и IP адресами
+интерфейсов и сохраняет только изменившиеся. Инвентарные данные тяжелее, поэтому запрашиваются
+пачками `host.get` по ID только для новых узлов сети и тех, чьи данные старше
+`ZABBIX_HOSTS_INVENTORY_MAX_AGE` секунд.
+
+Страницы оборудования и карты читают узлы сети из копии (`get_zabbix_hosts_info`,
+`get_zabbix_group_hosts_ids`), только если полная синхронизация прошла не раньше
+`ZABBIX_HOSTS_MIRROR_TTL` секунд назад. Иначе, а также за отсутствующими в копии узлами сети,
+они обращаются в Zabbix. Ответы таких запросов в копию не сохраняются: группы в них неполные.
+"""
+
+import os
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from pyzabbix.api import ZabbixAPI, ZabbixAPIException
+from requests import RequestException
+from urllib3.exceptions import MaxRetryError
+
+from devicemanager.device.zabbix_api import get_batched, zabbix_api
+
+from ..models import ZabbixHost, ZabbixHostGroup
+
+ZABBIX_HOSTS_INVENTORY_MAX_AGE = int(os.getenv("ZABBIX_HOSTS_INVENTORY_MAX_AGE", str(60 * 60 * 6)))
+ZABBIX_HOSTS_MIRROR_TTL = int(os.getenv("ZABBIX_HOSTS_MIRROR_TTL", str(60 * 15)))
+
+MIRROR_SYNCED_AT_CACHE_KEY = "zabbix_hosts:synced_at"
+
+HOST_FIELDS = ["hostid", "host", "name", "status", "description"]
+GROUP_FIELDS = ["groupid", "name"]
+
+
+def _host_values(host: dict) -> tuple[str, str, str, str, list[str]]:
+    return (
+        host.get("host") or "",
+        host.get("name") or "",
+        str(host.get("status", "0")),
+        host.get("description") or "",
+        sorted({interface["ip"] for interface in host.get("interfaces") or []}),
+    )
+
+
+def _host_groups(host: dict) -> dict[int, str]:
+    return {int(group["groupid"]): group["name"] for group in host.get("groups") or []}
+
+
+def save_zabbix_hosts(hosts: list[dict], only_changed: bool = False) -> int:
+    """
+    ## Сохраняет узлы сети из ответа `host.get` в локальную копию.
+
+    Группы узлов сети перезаписываются, поэтому передавать нужно ответ полной синхронизации.
+    Инвентарные данные обновляются, только если запрошены у всех переданных узлов сети.
+    :param hosts: Узлы сети с полями `HOST_FIELDS`, группами и интерфейсами.
+    :param only_changed: Сохранять только узлы сети, которые отличаются от копии.
+    :return: Кол-во сохраненных узлов сети.
+    """
+    current: dict[int, tuple] = {}
+    current_groups: dict[int, set[int]] = defaultdict(set)
+    if only_changed:
+        for hostid, *current_values in ZabbixHost.objects.values_list(
+            "hostid", "host", "name", "status", "description", "interfaces"
+        ):
+            current[hostid] = tuple(current_values)
+        for hostid, groupid in ZabbixHost.groups.through.objects.values_list(
+            "zabbixhost_id", "zabbixhostgroup_id"
+        ):
+            current_groups[hostid].add(groupid)
+
+    now = timezone.now()
+    with_inventory = bool(hosts) and all("inventory" in host for host in hosts)
+    groups: dict[int, str] = {}
+    rows: list[ZabbixHost] = []
+    rows_groups: dict[int, set[int]] = {}
+    for host in hosts:
+        hostid = int(host["hostid"])
+        values = _host_values(host)
+        host_groups = _host_groups(host)
+        groups.update(host_groups)
+        if only_changed and current.get(hostid) == values and current_groups[hostid] == set(host_groups):
+            continue
+
+        row = ZabbixHost(hostid=hostid, synced_at=now)
+        row.host, row.name, row.status, row.description, row.interfaces = values
+        if with_inventory:
+            row.inventory = host["inventory"] or {}
+            row.inventory_synced_at = now
+        rows.append(row)
+        rows_groups[hostid] = set(host_groups)
+
+    update_fields = ["host", "name", "status", "description", "interfaces", "synced_at"]
+    if with_inventory:
+        update_fields += ["inventory", "inventory_synced_at"]
+    through = ZabbixHost.groups.through
+
+    with transaction.atomic():
+        ZabbixHostGroup.objects.bulk_create(
+            [ZabbixHostGroup(groupid=groupid, name=name) for groupid, name in groups.items()],
+            update_conflicts=True,
+            unique_fields=["groupid"],
+            update_fields=["name"],
+            batch_size=1000,
+        )
+        ZabbixHost.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["hostid"],
+            update_fields=update_fields,
+            batch_size=1000,
+        )
+        changed_ids = list(rows_groups)
+        for start in range(0, len(changed_ids), 500):
+            through.objects.filter(zabbixhost_id__in=changed_ids[start : start + 500]).delete()
+        through.objects.bulk_create(
+            [
+                through(zabbixhost_id=hostid, zabbixhostgroup_id=groupid)
+                for hostid, host_groups in rows_groups.items()
+                for groupid in host_groups
+            ],
+            batch_size=1000,
+        )
+    return len(rows)
+
+
+def _save_inventories(hosts: list[dict]) -> None:
+    now = timezone.now()
+    ZabbixHost.objects.bulk_update(
+        [
+            ZabbixHost(
+                hostid=int(host["hostid"]), inventory=host.get("inventory") or {}, inventory_synced_at=now
+            )
+            for host in hosts
+        ],
+        ["inventory", "inventory_synced_at"],
+        batch_size=500,
+    )
+
+
+def sync_zabbix_hosts(full: bool = False) -> dict[str, int]:
+    """
+    ## Синхронизирует локальную копию узлов сети с Zabbix.
+
+    :param full: Запросить инвентарные данные всех узлов сети, а не только устаревшие.
+    :return: Кол-во узлов сети в Zabbix, сохраненных, удаленных и с обновленными инвентарными данными.
+    """
+    with zabbix_api.connect() as zbx:
+        hosts = zbx.host.get(output=HOST_FIELDS, selectGroups=GROUP_FIELDS, selectInterfaces=["ip"])
+        hosts_ids = {int(host["hostid"]) for host in hosts}
+
+        removed_ids = list(set(ZabbixHost.objects.values_list("hostid", flat=True)) - hosts_ids)
+        for start in range(0, len(removed_ids), 500):
+            ZabbixHost.objects.filter(hostid__in=removed_ids[start : start + 500]).delete()
+        saved = save_zabbix_hosts(hosts, only_changed=True)
+
+        stale = ZabbixHost.objects.all()
+        if not full:
+            outdated = timezone.now() - timedelta(seconds=ZABBIX_HOSTS_INVENTORY_MAX_AGE)
+            stale = stale.filter(Q(inventory_synced_at__isnull=True) | Q(inventory_synced_at__lt=outdated))
+        inventories = get_batched(
+            zbx.host.get,
+            stale.order_by("hostid").values_list("hostid", flat=True),
+            output=["hostid"],
+            selectInventory="extend",
+        )
+        _save_inventories(inventories)
+
+    cache.set(MIRROR_SYNCED_AT_CACHE_KEY, time.time(), timeout=ZABBIX_HOSTS_MIRROR_TTL)
+    return {
+        "hosts": len(hosts),
+        "saved": saved,
+        "removed": len(removed_ids),
+        "inventories": len(inventories),
+    }
+
+
+def is_zabbix_mirror_fresh() -> bool:
+    """Полная синхронизация локальной копии прошла не раньше `ZABBIX_HOSTS_MIRROR_TTL` секунд назад."""
+    synced_at = cache.get(MIRROR_SYNCED_AT_CACHE_KEY)
+    return synced_at is not None and time.time() - synced_at < ZABBIX_HOSTS_MIRROR_TTL
+
+
+def get_zabbix_hosts_info(names: Iterable[str]) -> dict[str, dict]:
+    """
+    ## Узлы сети Zabbix по видимым именам в формате ответа `host.get`.
+
+    Узлы сети берутся из локальной копии, если она синхронизирована и их инвентарные данные
+    не устарели. Остальные запрашиваются из Zabbix пачками.
+    :param names: Видимые имена узлов сети.
+    :return: Словарь: имя -> узел сети с группами, интерфейсами и инвентарными данными.
+    """
+    names = list(dict.fromkeys(names))
+    result: dict[str, dict] = {}
+    if is_zabbix_mirror_fresh():
+        outdated = timezone.now() - timedelta(seconds=ZABBIX_HOSTS_INVENTORY_MAX_AGE)
+        result = {
+            host.name: host.to_zabbix_info()
+            for host in ZabbixHost.objects.filter(
+                name__in=names, inventory_synced_at__gte=outdated
+            ).prefetch_related("groups")
+        }
+    missing = [name for name in names if name not in result]
+    if not missing:
+        return result
+
+    try:
+        with zabbix_api.connect() as zbx:
+            hosts = get_batched(
+                zbx.host.get,
+                missing,
+                param="filter.name",
+                output=HOST_FIELDS,
+                selectGroups=GROUP_FIELDS,
+                selectInterfaces=["ip"],
+                selectInventory="extend",
+            )
+    except (MaxRetryError, RequestException, ZabbixAPIException):
+        return result
+
+    result.update({host["name"]: host for host in hosts if host.get("name") in missing})
+    return result
+
+
+def get_zabbix_group_hosts_ids(zbx_session: ZabbixAPI, group_name: str) -> list[str]:
+    """
+    ## ID узлов сети на мониторинге в группе Zabbix.
+
+    Если локальная копия не синхронизирована или в ней нет группы, узлы сети запрашиваются из Zabbix.
+    """
+    group = ZabbixHostGroup.objects.filter(name=group_name).first() if is_zabbix_mirror_fresh() else None
+    if group is not None:
+        return [str(hostid) for hostid in group.hosts.filter(status="0").values_list("hostid", flat=True)]
+
+    groups = zbx_session.hostgroup.get(filter={"name": group_name}, output=["groupid"])
+    if not groups:  # Если такая группа НЕ существует.
+        return []
+    hosts = zbx_session.host.get(groupids=[groups[0]["groupid"]], output=["hostid"], filter={"status": "0"})
+    return [host["hostid"] for host in hosts]
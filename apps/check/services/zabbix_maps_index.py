@@ -0,0 +1,132 @@
+"""
+# Индекс карт Zabbix по узлам сети.
+
+Список карт Zabbix один раз раскладывается в индекс: узел сети -> карты, на которых он находится.
+Индекс хранится в общем кэше отдельной записью на каждый узел сети, поэтому страница оборудования
+получает его карты одним `cache.get`, без перебора всех карт и их элементов. Состояние индекса
+(отпечаток списка карт и время сборки) хранится в небольшой отдельной записи, а список узлов сети
+индекса, нужный только для удаления устаревших записей, читается лишь при пересборке.
+
+Индекс пересобирается фоновой задачей `rebuild_zabbix_maps_index_task`: периодически и по запросу
+страницы оборудования, если индексу больше `ZABBIX_MAPS_INDEX_TTL` секунд. Пока индекс пересобирается,
+запросы получают прежние записи. Если список карт не изменился, записи узлов сети не перезаписываются.
+"""
+
+import os
+import time
+from hashlib import sha256
+
+import orjson
+from django.core.cache import cache
+from kombu.exceptions import OperationalError
+from pyzabbix.api import ZabbixAPIException
+from requests import RequestException
+from urllib3.exceptions import MaxRetryError
+
+from devicemanager.device.zabbix_api import zabbix_api
+
+ZABBIX_MAPS_INDEX_TTL = int(os.getenv("ZABBIX_MAPS_INDEX_TTL", str(60 * 10)))
+
+INDEX_STATE_CACHE_KEY = "zabbix_maps_index:state"
+INDEX_HOSTS_CACHE_KEY = "zabbix_maps_index:hosts"
+REBUILD_LOCK_CACHE_KEY = "zabbix_maps_index:rebuild"
+
+
+def _host_cache_key(host_id: int | str) -> str:
+    return f"zabbix_maps_index:host:{host_id}"
+
+
+def build_zabbix_maps_index(maps: list[dict]) -> dict[str, list[dict[str, str | int]]]:
+    """
+    ## Раскладывает список карт Zabbix по узлам сети.
+
+    :param maps: Карты из `map.get` с элементами: `[{"sysmapid": "94", "name": "...", "selements": [...]}]`.
+    :return: Словарь: ID узла сети -> карты, на которых он находится, без повторов.
+    """
+    index: dict[str, list[dict[str, str | int]]] = {}
+    for map_ in maps:
+        if not map_.get("sysmapid"):
+            continue
+        map_info = {
+            "sysmapid": int(map_["sysmapid"]),  # ID карты
+            "name": map_.get("name", "Без названия"),  # Название карты
+        }
+        hosts_ids = {
+            host["hostid"]
+            for element in map_.get("selements", [])
+            for host in element.get("elements", [])
+            if host.get("hostid")
+        }
+        for host_id in hosts_ids:
+            index.setdefault(host_id, []).append(map_info)
+    return index
+
+
+def rebuild_zabbix_maps_index() -> int:
+    """
+    ## Пересобирает индекс карт Zabbix в кэше.
+
+    :return: Кол-во узлов сети в индексе или -1, если Zabbix недоступен.
+    """
+    try:
+        try:
+            with zabbix_api.connect() as zbx:
+                maps = zbx.map.get(selectSelements=["elements"], output=["sysmapid", "name"])
+        except (MaxRetryError, RequestException, ZabbixAPIException):
+            return -1
+
+        fingerprint = sha256(orjson.dumps(maps, option=orjson.OPT_SORT_KEYS)).hexdigest()
+        state = cache.get(INDEX_STATE_CACHE_KEY)
+        if state is not None and state["fingerprint"] == fingerprint:
+            cache.set(INDEX_STATE_CACHE_KEY, {**state, "built_at": time.time()}, timeout=None)
+            return state["hosts_count"]
+
+        index = build_zabbix_maps_index(maps)
+        cache.set_many(
+            {_host_cache_key(host_id): host_maps for host_id, host_maps in index.items()}, timeout=None
+        )
+        previous_hosts = cache.get(INDEX_HOSTS_CACHE_KEY) or []
+        cache.delete_many([_host_cache_key(host_id) for host_id in set(previous_hosts) - index.keys()])
+        cache.set(INDEX_HOSTS_CACHE_KEY, list(index), timeout=None)
+        cache.set(
+            INDEX_STATE_CACHE_KEY,
+            {"fingerprint": fingerprint, "built_at": time.time(), "hosts_count": len(index)},
+            timeout=None,
+        )
+        return len(index)
+    finally:
+        cache.delete(REBUILD_LOCK_CACHE_KEY)
+
+
+def schedule_zabbix_maps_index_rebuild() -> bool:
+    """Отправляет задачу пересборки индекса, если она еще не отправлена."""
+    if not cache.add(REBUILD_LOCK_CACHE_KEY, True, timeout=ZABBIX_MAPS_INDEX_TTL):
+        return False
+
+    # pylint: disable-next=import-outside-toplevel
+    from ..tasks import rebuild_zabbix_maps_index_task
+
+    try:
+        rebuild_zabbix_maps_index_task.delay()
+    except OperationalError:
+        cache.delete(REBUILD_LOCK_CACHE_KEY)
+        return False
+    return True
+
+
+def get_host_zabbix_maps(host_id: int | str) -> list[dict[str, str | int]]:
+    """
+    ## Карты Zabbix, на которых находится узел сети.
+
+    Не обращается к Zabbix: если индекс устарел или еще не собран, отправляет задачу пересборки
+    и возвращает текущие данные индекса.
+    """
+    if not host_id:
+        return []
+
+    state = cache.get(INDEX_STATE_CACHE_KEY)
+    if state is None or time.time() - state["built_at"] > ZABBIX_MAPS_INDEX_TTL:
+        schedule_zabbix_maps_index_rebuild()
+    if state is None:
+        return []
+    return cache.get(_host_cache_key(host_id)) or []
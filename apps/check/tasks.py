@@ -9,6 +9,8 @@ from django.db import close_old_connections, connection
 from django.db.utils import OperationalError
 from django.utils import timezone
 
+from apps.net_tools.services.interfaces_workload import rebuild_interfaces_workload
+
 from .models import (
     BulkDeviceCommandExecution,
     BulkDeviceCommandExecutionResult,
@@ -23,15 +25,21 @@ from .services.device.commands import (
     is_command_available_for_device,
     set_device_command_task_results,
 )
-from .services.device.interfaces_workload import DevicesInterfacesWorkloadCollector
+from .services.device.reachability import refresh_devices_reachability
 from .services.device_coordinates import sync_device_coordinates_with_zabbix
+from .services.zabbix_hosts import sync_zabbix_hosts
+from .services.zabbix_maps_index import rebuild_zabbix_maps_index
 
 
 @shared_task(ignore_result=True)
 def cache_all_devices_interfaces_workload_api_view():
-    """Warm up cache with interfaces workload for all devices."""
-    collector = DevicesInterfacesWorkloadCollector(Devices.objects.all())
-    collector.get_all_device_interfaces_workload(from_cache=False)
+    """
+    Rebuild interfaces workload counters for all devices from interface snapshots.
+
+    Counters are updated together with device snapshots, so this periodic task only
+    keeps them consistent. The name is kept for existing beat schedules.
+    """
+    rebuild_interfaces_workload()
 
 
 @shared_task(name="sync_device_coordinates_with_zabbix_task")
@@ -43,6 +51,24 @@ def sync_device_coordinates_with_zabbix_task(
     return sync_device_coordinates_with_zabbix(device_ids=device_ids, dry_run=dry_run)
 
 
+@shared_task(name="sync_zabbix_hosts_task")
+def sync_zabbix_hosts_task(full: bool = False) -> dict[str, int]:
+    """Synchronize the local mirror of Zabbix hosts, groups, interfaces and inventory."""
+    return sync_zabbix_hosts(full=full)
+
+
+@shared_task(ignore_result=True, name="rebuild_zabbix_maps_index_task")
+def rebuild_zabbix_maps_index_task() -> int:
+    """Rebuild the host-to-maps index of Zabbix maps in the shared cache."""
+    return rebuild_zabbix_maps_index()
+
+
+@shared_task(ignore_result=True, name="refresh_devices_reachability_task")
+def refresh_devices_reachability_task() -> int:
+    """Ping all active devices in one batch and refresh the shared reachability cache."""
+    return refresh_devices_reachability()
+
+
 def _build_bulk_command_result(device: Devices, status: str, output: str = "", detail: str = "") -> dict:
     """Build cached execution result for a single device."""
     return {
@@ -0,0 +1,76 @@
+import json
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from types import SimpleNamespace
+from typing import Any
+
+from devicemanager.device.zabbix_api import ZabbixAPIConnector
+
+
+class FakeZabbixServer:
+    """
+    Локальный JSON-RPC сервер Zabbix API для тестов.
+
+    Методы обрабатываются переданными функциями от параметров запроса, все вызовы записываются в `calls`.
+    """
+
+    def __init__(self, handlers: dict[str, Callable[[dict], Any]]):
+        self.handlers: dict[str, Callable[[dict], Any]] = {
+            "apiinfo.version": lambda params: "6.0.0",
+            "user.login": lambda params: "fake-token",
+            "user.logout": lambda params: True,
+            **handlers,
+        }
+        self.calls: list[tuple[str, dict]] = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+
+    def __enter__(self) -> "FakeZabbixServer":
+        Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def connector(self) -> ZabbixAPIConnector:
+        """Подключение к этому серверу."""
+        return ZabbixAPIConnector(config=SimpleNamespace(url=self.url, login="admin", password="secret"))
+
+    def methods(self, *excluded: str) -> list[str]:
+        """Вызванные методы, кроме авторизации и переданных."""
+        skip = {"apiinfo.version", "user.login", "user.logout", *excluded}
+        return [method for method, _ in self.calls if method not in skip]
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):  # noqa: N802
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                method, params = payload["method"], payload.get("params") or {}
+                server.calls.append((method, params))
+                if method in server.handlers:
+                    response = {
+                        "jsonrpc": "2.0",
+                        "result": server.handlers[method](params),
+                        "id": payload["id"],
+                    }
+                else:
+                    response = {
+                        "jsonrpc": "2.0",
+                        "error": {"code": -32601, "message": "Method not found.", "data": method},
+                        "id": payload["id"],
+                    }
+                body = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json-rpc")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
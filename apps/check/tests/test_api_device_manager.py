@@ -609,6 +609,21 @@ class BulkDeviceCommandAPIViewTestCase(APITestCase):
         user.groups.add(*self.user.groups.all())
         return user
 
+    @patch("apps.check.api.views.device_manager.iter_command_output")
+    def test_execute_command_streams_output(self, iter_command_output: Mock):
+        """Command output is sent to the client as it is read from the device."""
+        iter_command_output.return_value = iter(["page 1\n", "page 2\n"])
+
+        response = self.client.post(
+            f"/api/v1/devices/{self.device.name}/commands/{self.command.id}/execute?stream=1",
+            data={},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response.getvalue(), b"page 1\npage 2\n")
+
     @patch("apps.check.api.views.device_manager.dispatch_bulk_execute_command_task")
     def test_execute_bulk_command(self, dispatch_task: Mock):
         dispatch_task.return_value = {
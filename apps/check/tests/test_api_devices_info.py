@@ -300,10 +300,10 @@ class DeviceInterfacesAPIViewTestCase(APITestCase):
             make_session_global=True,
         )
 
-        # Проверяем, что полученные интерфейсы с VLAN были записаны в базу
+        # Проверяем, что полученные интерфейсы с VLAN были записаны в базу, VLAN - диапазонами
         self.assertListEqual(
             orjson.loads(device_info.vlans or "[]"),
-            interfaces,
+            [{**line, "vlans": vlans} for line, vlans in zip(interfaces, [["1-2"], ["3-4"]], strict=True)],
         )
 
         # А также записаны интерфейсы без VLAN
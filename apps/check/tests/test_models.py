@@ -4,12 +4,14 @@ from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
+from django.core.cache import cache
 from django.core.exceptions import FieldDoesNotExist, ValidationError
 from django.db import IntegrityError, transaction
 from django.test import TestCase
 
 from ..models import AuthGroup, Bras, DeviceGroup, Devices, Profile, UsersActions
 from ..new_permissions import create_groups_with_permissions, create_permission
+from ..services.device.reachability import get_devices_reachability, is_device_available
 
 User = get_user_model()
 
@@ -149,6 +151,31 @@ class DeviceModelTest(TestCase):
         self.assertEqual(kwargs["ssh_port"], 2222)
         self.assertEqual(kwargs["snmp_port"], 1161)
 
+    def test_available_uses_shared_reachability_cache(self):
+        dev = Devices.objects.all().first()
+        cache.clear()
+
+        with patch("apps.check.services.device.reachability.pool_controller.ping_many") as ping_many:
+            ping_many.return_value = {"192.168.123.123": True}
+            self.assertTrue(dev.available)
+            self.assertTrue(Devices.objects.get(pk=dev.pk).available)
+
+        ping_many.assert_called_once_with(["192.168.123.123"])
+
+    def test_fresh_reachability_check_updates_cache(self):
+        cache.clear()
+
+        with patch("apps.check.services.device.reachability.pool_controller.ping_many") as ping_many:
+            ping_many.return_value = {"192.168.123.123": False}
+            get_devices_reachability(["192.168.123.123"])
+            ping_many.return_value = {"192.168.123.123": True}
+            self.assertEqual(
+                get_devices_reachability(["192.168.123.123"], fresh=True), {"192.168.123.123": True}
+            )
+            self.assertTrue(is_device_available("192.168.123.123"))
+
+        self.assertEqual(ping_many.call_count, 2)
+
 
 class DeviceGroupTest(TestCase):
     @classmethod
@@ -0,0 +1,125 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from devicemanager.device import DeviceManager, DevicesCollection
+
+from ..models import ZabbixHost, ZabbixHostGroup
+from ..services.zabbix_hosts import MIRROR_SYNCED_AT_CACHE_KEY, get_zabbix_hosts_info, sync_zabbix_hosts
+from .fake_zabbix import FakeZabbixServer
+
+
+def make_host(hostid: str, name: str, ip: str, group: str = "Switches", model: str = "DES-3200") -> dict:
+    return {
+        "hostid": hostid,
+        "host": name,
+        "name": name,
+        "status": "0",
+        "description": "",
+        "groups": [{"groupid": "1" if group == "Switches" else "2", "name": group}],
+        "interfaces": [{"ip": ip}],
+        "inventory": {"model": model, "vendor": "D-Link"},
+    }
+
+
+class ZabbixHostsTests(TestCase):
+    """Локальная копия узлов сети Zabbix на локальном JSON-RPC сервере."""
+
+    def setUp(self):
+        cache.clear()
+        self.hosts = [make_host("10001", "sw1", "10.0.0.1"), make_host("10002", "sw2", "10.0.0.2")]
+        self.server = FakeZabbixServer({"host.get": self.host_get})
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+        connector = self.server.connector()
+        for target in (
+            "apps.check.services.zabbix_hosts.zabbix_api",
+            "devicemanager.device.device_collection.zabbix_api",
+        ):
+            patcher = patch(target, connector)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def host_get(self, params: dict) -> list[dict]:
+        hosts = self.hosts
+        if "hostids" in params:
+            hosts = [host for host in hosts if host["hostid"] in map(str, params["hostids"])]
+        if "name" in params.get("filter", {}):
+            hosts = [host for host in hosts if host["name"] in params["filter"]["name"]]
+        if "ip" in params.get("filter", {}):
+            hosts = [host for host in hosts if host["interfaces"][0]["ip"] in params["filter"]["ip"]]
+
+        selects = {"selectGroups": "groups", "selectInterfaces": "interfaces", "selectInventory": "inventory"}
+        return [
+            {
+                **{field: host[field] for field in params["output"]},
+                **{key: host[key] for param, key in selects.items() if param in params},
+            }
+            for host in hosts
+        ]
+
+    def test_sync_saves_hosts_and_requests_only_outdated_inventory(self):
+        self.assertEqual(sync_zabbix_hosts(), {"hosts": 2, "saved": 2, "removed": 0, "inventories": 2})
+        self.assertEqual(self.server.methods(), ["host.get", "host.get"])
+        self.assertEqual(self.server.calls[-1][1]["hostids"], [10001, 10002])
+
+        host = ZabbixHost.objects.get(hostid=10001)
+        self.assertEqual(host.interfaces, ["10.0.0.1"])
+        self.assertEqual(host.inventory, {"model": "DES-3200", "vendor": "D-Link"})
+        self.assertEqual(list(host.groups.values_list("name", flat=True)), ["Switches"])
+
+        self.hosts = [
+            make_host("10001", "sw1", "10.0.0.1", group="Core"),
+            make_host("10003", "sw3", "10.0.0.3"),
+        ]
+        self.server.calls.clear()
+
+        self.assertEqual(sync_zabbix_hosts(), {"hosts": 2, "saved": 2, "removed": 1, "inventories": 1})
+        self.assertEqual(self.server.calls[-1][1]["hostids"], [10003])
+        self.assertEqual(
+            list(ZabbixHost.objects.get(hostid=10001).groups.values_list("name", flat=True)), ["Core"]
+        )
+        self.assertFalse(ZabbixHost.objects.filter(hostid=10002).exists())
+
+    def test_hosts_info_is_read_from_mirror(self):
+        sync_zabbix_hosts()
+        self.server.calls.clear()
+
+        device = DeviceManager("sw1")
+
+        self.assertEqual(self.server.methods(), [])
+        self.assertEqual(device.ip, "10.0.0.1")
+        self.assertEqual(device.zabbix_info.hostid, "10001")
+        self.assertEqual(device.zabbix_info.inventory.model, "DES-3200")
+        self.assertEqual(device.zabbix_info.host_group_names, ["Switches"])
+
+    def test_hosts_info_is_requested_from_zabbix_without_recent_sync(self):
+        sync_zabbix_hosts()
+        self.hosts = [make_host("10001", "sw1", "10.0.0.10")]
+        self.server.calls.clear()
+        cache.delete(MIRROR_SYNCED_AT_CACHE_KEY)
+
+        hosts = get_zabbix_hosts_info(["sw1"])
+
+        self.assertEqual(self.server.methods(), ["host.get"])
+        self.assertEqual(hosts["sw1"]["interfaces"], [{"ip": "10.0.0.10"}])
+        # Частичный ответ не меняет локальную копию.
+        self.assertEqual(ZabbixHost.objects.get(hostid=10001).interfaces, ["10.0.0.1"])
+
+    def test_missing_hosts_are_requested_in_one_batch(self):
+        hosts = get_zabbix_hosts_info(["sw1", "sw2", "unknown"])
+
+        self.assertEqual(set(hosts), {"sw1", "sw2"})
+        self.assertEqual(self.server.methods(), ["host.get"])
+        self.assertEqual(self.server.calls[-1][1]["filter"], {"name": ["sw1", "sw2", "unknown"]})
+        self.assertEqual(hosts["sw1"]["groups"], [{"groupid": "1", "name": "Switches"}])
+        self.assertFalse(ZabbixHost.objects.exists())
+        self.assertFalse(ZabbixHostGroup.objects.exists())
+
+    def test_collection_is_created_with_zabbix_info_in_one_request(self):
+        collection = DevicesCollection.from_zabbix_ips(["10.0.0.1", "10.0.0.2"], zabbix_info=True)
+
+        self.assertEqual(self.server.methods(), ["host.get"])
+        self.assertEqual([device.ip for device in collection], ["10.0.0.1", "10.0.0.2"])
+        self.assertEqual(collection[1].zabbix_info.inventory.vendor, "D-Link")
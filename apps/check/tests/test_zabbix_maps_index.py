@@ -0,0 +1,75 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from ..services.zabbix_maps_index import (
+    INDEX_HOSTS_CACHE_KEY,
+    build_zabbix_maps_index,
+    get_host_zabbix_maps,
+    rebuild_zabbix_maps_index,
+)
+from .fake_zabbix import FakeZabbixServer
+
+
+def make_map(sysmapid: str, name: str, *hosts_ids: str) -> dict:
+    return {
+        "sysmapid": sysmapid,
+        "name": name,
+        "selements": [{"elements": [{"hostid": host_id}]} for host_id in hosts_ids],
+    }
+
+
+class ZabbixMapsIndexTests(SimpleTestCase):
+    """Индекс карт Zabbix по узлам сети в общем кэше."""
+
+    def setUp(self):
+        cache.clear()
+        self.maps = [make_map("1", "Центр", "10001", "10002", "10001"), make_map("2", "Север", "10002")]
+        self.server = FakeZabbixServer({"map.get": lambda params: self.maps})
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+        patcher = patch("apps.check.services.zabbix_maps_index.zabbix_api", self.server.connector())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_build_index_groups_maps_by_host(self):
+        index = build_zabbix_maps_index(self.maps)
+
+        self.assertEqual(index["10001"], [{"sysmapid": 1, "name": "Центр"}])
+        self.assertEqual(index["10002"], [{"sysmapid": 1, "name": "Центр"}, {"sysmapid": 2, "name": "Север"}])
+
+    def test_host_maps_are_read_from_index_without_zabbix(self):
+        self.assertEqual(rebuild_zabbix_maps_index(), 2)
+        self.server.calls.clear()
+
+        self.assertEqual(
+            get_host_zabbix_maps(10002), [{"sysmapid": 1, "name": "Центр"}, {"sysmapid": 2, "name": "Север"}]
+        )
+        self.assertEqual(get_host_zabbix_maps("10003"), [])
+        self.assertEqual(self.server.methods(), [])
+
+    def test_rebuild_removes_hosts_missing_from_maps(self):
+        rebuild_zabbix_maps_index()
+        self.maps = [make_map("2", "Север", "10002")]
+
+        self.assertEqual(rebuild_zabbix_maps_index(), 1)
+        self.assertEqual(get_host_zabbix_maps("10001"), [])
+        self.assertEqual(get_host_zabbix_maps("10002"), [{"sysmapid": 2, "name": "Север"}])
+
+    def test_lookup_does_not_read_index_hosts_list(self):
+        rebuild_zabbix_maps_index()
+        self.assertEqual(rebuild_zabbix_maps_index(), 2)
+
+        with patch("apps.check.services.zabbix_maps_index.cache.get", wraps=cache.get) as cache_get:
+            get_host_zabbix_maps("10001")
+
+        self.assertNotIn(INDEX_HOSTS_CACHE_KEY, [call.args[0] for call in cache_get.call_args_list])
+
+    @patch("apps.check.tasks.rebuild_zabbix_maps_index_task.delay")
+    def test_missing_index_is_rebuilt_in_background_once(self, delay):
+        self.assertEqual(get_host_zabbix_maps("10001"), [])
+        self.assertEqual(get_host_zabbix_maps("10001"), [])
+
+        delay.assert_called_once_with()
+        self.assertEqual(self.server.methods(), [])
@@ -1,3 +1,4 @@
+import asyncio
 from collections.abc import Iterable
 from time import monotonic
 
@@ -5,6 +6,7 @@ from apps.check.models import AuthGroup
 from devicemanager import snmp
 from devicemanager.dc import DeviceRemoteConnector
 from devicemanager.exceptions import BaseDeviceException
+from devicemanager.snmp_async import AsyncSnmpPoller
 
 from ..models import DiscoveryAttempt, DiscoveryCandidate, DiscoveryProfile
 from .dataclasses import DeviceFingerprint, DiscoveryAttemptData
@@ -70,11 +72,12 @@ def merge_fingerprints(base: DeviceFingerprint, extra: DeviceFingerprint) -> Dev
 class SnmpFingerprinter:
     """Получает identity оборудования через SNMP v2c."""
 
-    def __init__(self, communities: Iterable[str], timeout: int) -> None:
+    def __init__(self, communities: Iterable[str], timeout: int, snmp_port: int = 161) -> None:
         """Сохранить SNMP communities и таймаут."""
 
         self.communities = [str(community) for community in communities if str(community)]
         self.timeout = timeout
+        self.snmp_port = snmp_port
 
     def collect(self, ip: str) -> tuple[DeviceFingerprint, list[DiscoveryAttemptData]]:
         """Попробовать получить SNMP identity для IP."""
@@ -86,49 +89,91 @@ class SnmpFingerprinter:
         for community in self.communities:
             started = monotonic()
             try:
-                identity = snmp.get_system_identity(ip, community=community, timeout=self.timeout)
-            except Exception as exc:
-                attempts.append(
-                    DiscoveryAttemptData(
-                        ip=ip,
-                        method=DiscoveryAttempt.Method.SNMP,
-                        status=DiscoveryAttempt.Status.FAILED,
-                        duration_ms=int((monotonic() - started) * 1000),
-                        error=safe_error(exc),
-                    )
+                identity = snmp.get_system_identity(
+                    ip, community=community, snmp_port=self.snmp_port, timeout=self.timeout
                 )
+            except Exception as exc:
+                attempts.append(self._build_attempt(ip, False, int((monotonic() - started) * 1000), exc))
                 continue
 
-            attempts.append(
-                DiscoveryAttemptData(
-                    ip=ip,
-                    method=DiscoveryAttempt.Method.SNMP,
-                    status=DiscoveryAttempt.Status.SUCCESS if identity else DiscoveryAttempt.Status.FAILED,
-                    duration_ms=int((monotonic() - started) * 1000),
-                )
-            )
+            attempts.append(self._build_attempt(ip, bool(identity), int((monotonic() - started) * 1000)))
             if not identity:
                 continue
 
-            sys_descr = identity.get("sys_descr", "")
-            sys_name = identity.get("sys_name", "")
-            sys_object_id = identity.get("sys_object_id", "")
-            fingerprint = DeviceFingerprint(
-                ip=ip,
-                name=sys_name,
-                vendor=guess_vendor(sys_descr, sys_object_id),
-                sys_name=sys_name,
-                sys_descr=sys_descr,
-                sys_object_id=sys_object_id,
-                source=DiscoveryCandidate.Source.SNMP,
-                detected_protocols={"snmp": True},
-                selected_snmp_community=community,
-                raw={"snmp": identity},
-            )
-            return fingerprint, attempts
+            return self._build_fingerprint(ip, community, identity), attempts
 
         return DeviceFingerprint(ip=ip, detected_protocols={"snmp": False}), attempts
 
+    def collect_many(
+        self, ips: Iterable[str]
+    ) -> dict[str, tuple[DeviceFingerprint, list[DiscoveryAttemptData]]]:
+        """
+        Получить SNMP identity сразу для множества IP.
+
+        Все устройства опрашиваются на одном event loop, communities каждого
+        устройства проверяются одновременно.
+        """
+
+        ips = list(ips)
+        if not self.communities:
+            return {ip: (DeviceFingerprint(ip=ip), []) for ip in ips}
+        return asyncio.run(self._collect_many(ips))
+
+    async def _collect_many(
+        self, ips: list[str]
+    ) -> dict[str, tuple[DeviceFingerprint, list[DiscoveryAttemptData]]]:
+        async with AsyncSnmpPoller(timeout=self.timeout, retries=0) as poller:
+            results = await asyncio.gather(*(self._collect_async(poller, ip) for ip in ips))
+        return dict(zip(ips, results, strict=True))
+
+    async def _collect_async(
+        self, poller: AsyncSnmpPoller, ip: str
+    ) -> tuple[DeviceFingerprint, list[DiscoveryAttemptData]]:
+        community, identity, community_attempts = await poller.find_identity(
+            ip, self.communities, port=self.snmp_port
+        )
+        attempts = [
+            self._build_attempt(ip, attempt.success, attempt.duration_ms, attempt.error)
+            for attempt in community_attempts
+        ]
+        if not identity:
+            return DeviceFingerprint(ip=ip, detected_protocols={"snmp": False}), attempts
+        return self._build_fingerprint(ip, community, identity), attempts
+
+    @staticmethod
+    def _build_attempt(
+        ip: str, success: bool, duration_ms: int, error: Exception | str | None = None
+    ) -> DiscoveryAttemptData:
+        """Построить запись попытки SNMP."""
+
+        return DiscoveryAttemptData(
+            ip=ip,
+            method=DiscoveryAttempt.Method.SNMP,
+            status=DiscoveryAttempt.Status.SUCCESS if success else DiscoveryAttempt.Status.FAILED,
+            duration_ms=duration_ms,
+            error=safe_error(error) if error else "",
+        )
+
+    @staticmethod
+    def _build_fingerprint(ip: str, community: str, identity: dict[str, str]) -> DeviceFingerprint:
+        """Построить fingerprint по SNMP identity."""
+
+        sys_descr = identity.get("sys_descr", "")
+        sys_name = identity.get("sys_name", "")
+        sys_object_id = identity.get("sys_object_id", "")
+        return DeviceFingerprint(
+            ip=ip,
+            name=sys_name,
+            vendor=guess_vendor(sys_descr, sys_object_id),
+            sys_name=sys_name,
+            sys_descr=sys_descr,
+            sys_object_id=sys_object_id,
+            source=DiscoveryCandidate.Source.SNMP,
+            detected_protocols={"snmp": True},
+            selected_snmp_community=community,
+            raw={"snmp": identity},
+        )
+
 
 class CliFingerprinter:
     """Получает identity оборудования через SSH/Telnet и существующий devicemanager."""
@@ -258,6 +303,25 @@ class DeviceFingerprinter:
         self.profile = profile
         self.auth_groups = list(auth_groups)
         self.include_cli = include_cli
+        self._snmp_results: dict[str, tuple[DeviceFingerprint, list[DiscoveryAttemptData]]] = {}
+
+    def prefetch_snmp(self, ips: Iterable[str]) -> None:
+        """
+        Заранее опросить SNMP identity для всех IP одним асинхронным проходом.
+
+        `collect` затем использует готовый результат вместо блокирующего опроса.
+        """
+
+        try:
+            results = self._snmp_fingerprinter().collect_many(ips)
+        except OSError:
+            # Не удалось открыть UDP сокет, `collect` опросит IP этой пачки отдельно.
+            # Результаты предыдущих пачек, еще не использованные `collect`, сохраняются.
+            return
+        self._snmp_results.update(results)
+
+    def _snmp_fingerprinter(self) -> SnmpFingerprinter:
+        return SnmpFingerprinter(self.profile.snmp_communities, timeout=self.profile.timeout_seconds)
 
     def collect(
         self, ip: str, detected_protocols: dict[str, bool]
@@ -275,10 +339,10 @@ class DeviceFingerprinter:
         )
         attempts = []
 
-        snmp_fingerprint, snmp_attempts = SnmpFingerprinter(
-            self.profile.snmp_communities,
-            timeout=self.profile.timeout_seconds,
-        ).collect(ip)
+        snmp_result = self._snmp_results.pop(ip, None)
+        if snmp_result is None:
+            snmp_result = self._snmp_fingerprinter().collect(ip)
+        snmp_fingerprint, snmp_attempts = snmp_result
         attempts.extend(snmp_attempts)
         fingerprint = merge_fingerprints(fingerprint, snmp_fingerprint)
 
@@ -302,7 +366,7 @@ class DeviceFingerprinter:
         return fingerprint, attempts
 
 
-def safe_error(exc: Exception) -> str:
+def safe_error(exc: Exception | str) -> str:
     """Вернуть безопасный текст ошибки без секретов."""
 
     message = str(exc)
@@ -1,13 +1,8 @@
 import ipaddress
-import socket
 from collections.abc import Iterable
-from time import monotonic
 
-from ping3 import ping
-
-from .dataclasses import DiscoveryAttemptData
-
-MAX_DISCOVERY_PREFIXLEN = 24
+# Подсети проверяются асинхронным sweep (см. `sweep.SweepEngine`), поэтому допускаются сети до /16.
+MAX_DISCOVERY_PREFIXLEN = 16
 TCP_PORTS = {
     "ssh": 22,
     "telnet": 23,
@@ -23,7 +18,7 @@ def normalize_networks(networks: Iterable[str]) -> list[ipaddress.IPv4Network]:
         if not isinstance(network, ipaddress.IPv4Network):
             raise ValueError("Discovery поддерживает только IPv4 подсети")
         if network.prefixlen < MAX_DISCOVERY_PREFIXLEN:
-            raise ValueError("Максимальный размер подсети для discovery: /24")
+            raise ValueError(f"Максимальный размер подсети для discovery: /{MAX_DISCOVERY_PREFIXLEN}")
         if network.is_loopback or network.is_link_local or network.is_multicast or network.is_unspecified:
             raise ValueError(f"Недопустимая подсеть для discovery: {network}")
         result.append(network)
@@ -79,58 +74,3 @@ def build_scan_hosts(networks: Iterable[str], excludes: Iterable[str] | None = N
             hosts.append(str(address))
 
     return hosts
-
-
-def ping_host(ip: str, timeout: int) -> bool:
-    """Проверить доступность IP через ICMP."""
-
-    return isinstance(ping(ip, timeout=timeout), float)
-
-
-def tcp_is_open(ip: str, port: int, timeout: int) -> bool:
-    """Проверить доступность TCP-порта."""
-
-    try:
-        with socket.create_connection((ip, port), timeout=timeout):
-            return True
-    except OSError:
-        return False
-
-
-def preflight_address(
-    ip: str, protocols: Iterable[str], timeout: int
-) -> tuple[dict[str, bool], list[DiscoveryAttemptData]]:
-    """Выполнить быстрые проверки IP перед тяжелым fingerprint."""
-
-    attempts = []
-    detected = {}
-
-    started = monotonic()
-    ping_ok = ping_host(ip, timeout)
-    attempts.append(
-        DiscoveryAttemptData(
-            ip=ip,
-            method="PING",
-            status="SUCCESS" if ping_ok else "FAILED",
-            duration_ms=int((monotonic() - started) * 1000),
-        )
-    )
-    detected["ping"] = ping_ok
-
-    for protocol in protocols:
-        port = TCP_PORTS.get(protocol)
-        if port is None:
-            continue
-        started = monotonic()
-        is_open = tcp_is_open(ip, port, timeout)
-        detected[protocol] = is_open
-        attempts.append(
-            DiscoveryAttemptData(
-                ip=ip,
-                method=f"TCP_{port}",
-                status="SUCCESS" if is_open else "FAILED",
-                duration_ms=int((monotonic() - started) * 1000),
-            )
-        )
-
-    return detected, attempts
@@ -0,0 +1,205 @@
+"""
+Асинхронная проверка доступности диапазонов адресов для discovery.
+
+Для каждого IP одновременно выполняются ICMP echo и TCP connect на порты CLI протоколов.
+Все проверки идут на одном event loop с ограниченным окном одновременно проверяемых хостов,
+результаты отдаются по мере готовности каждого хоста.
+"""
+
+import asyncio
+import itertools
+import os
+import queue
+import socket
+import threading
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator
+from dataclasses import dataclass, field
+
+from devicemanager.reachability import AsyncPinger
+
+from .dataclasses import DiscoveryAttemptData
+from .scanner import TCP_PORTS
+
+DISCOVERY_SWEEP_CONCURRENCY = int(os.getenv("DISCOVERY_SWEEP_CONCURRENCY", "256"))
+DISCOVERY_SWEEP_MIN_TIMEOUT = float(os.getenv("DISCOVERY_SWEEP_MIN_TIMEOUT", "0.5"))
+
+
+@dataclass(slots=True)
+class SweepResult:
+    """Результат проверки доступности одного IP."""
+
+    ip: str
+    detected: dict[str, bool]
+    attempts: list[DiscoveryAttemptData] = field(default_factory=list)
+
+    @property
+    def is_alive(self) -> bool:
+        return any(self.detected.values())
+
+
+class AdaptiveTimeout:
+    """
+    Таймаут проверки по оценке RTT (RFC 6298).
+
+    Пока не накоплено `warmup` замеров, используется максимальный таймаут.
+    Дальше таймаут равен `SRTT + 4 * RTTVAR`, но не меньше `minimum` и не больше `maximum`.
+    """
+
+    def __init__(self, maximum: float, minimum: float = DISCOVERY_SWEEP_MIN_TIMEOUT, warmup: int = 10):
+        self.maximum = maximum
+        self.minimum = min(minimum, maximum)
+        self.warmup = warmup
+        self.samples = 0
+        self._srtt = 0.0
+        self._rttvar = 0.0
+
+    def observe(self, rtt: float) -> None:
+        if not self.samples:
+            self._srtt = rtt
+            self._rttvar = rtt / 2
+        else:
+            self._rttvar = 0.75 * self._rttvar + 0.25 * abs(self._srtt - rtt)
+            self._srtt = 0.875 * self._srtt + 0.125 * rtt
+        self.samples += 1
+
+    @property
+    def current(self) -> float:
+        if self.samples < self.warmup:
+            return self.maximum
+        return max(self.minimum, min(self.maximum, self._srtt + 4 * self._rttvar))
+
+
+async def tcp_probe(ip: str, port: int, timeout: float) -> tuple[bool, float | None]:
+    """
+    Неблокирующая проверка TCP-порта.
+
+    Возвращает (порт открыт, RTT). RTT известен и для закрытого порта, если хост ответил RST.
+    """
+
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    started = time.monotonic()
+    try:
+        await asyncio.wait_for(loop.sock_connect(sock, (ip, port)), timeout)
+        return True, time.monotonic() - started
+    except ConnectionRefusedError:
+        return False, time.monotonic() - started
+    except (TimeoutError, OSError):
+        return False, None
+    finally:
+        sock.close()
+
+
+class SweepEngine:
+    """Проверка ICMP и TCP портов CLI протоколов для диапазона адресов."""
+
+    def __init__(
+        self,
+        protocols: Iterable[str],
+        timeout: float,
+        concurrency: int = DISCOVERY_SWEEP_CONCURRENCY,
+        min_timeout: float = DISCOVERY_SWEEP_MIN_TIMEOUT,
+    ):
+        self.ports = {protocol: TCP_PORTS[protocol] for protocol in protocols if protocol in TCP_PORTS}
+        self.concurrency = max(concurrency, 1)
+        self.timeout = AdaptiveTimeout(maximum=timeout, minimum=min_timeout)
+        self.pinger = AsyncPinger(payload=b"ecstasy-discovery")
+
+    async def probe(self, ip: str) -> SweepResult:
+        """Проверить один IP: ping и все TCP порты одновременно."""
+
+        timeout = self.timeout.current
+        started = time.monotonic()
+
+        async def timed_ping() -> tuple[bool, int]:
+            rtt = await self.pinger.ping(ip, timeout)
+            if rtt is not None:
+                self.timeout.observe(rtt)
+            return rtt is not None, int((time.monotonic() - started) * 1000)
+
+        async def timed_tcp(port: int) -> tuple[bool, int]:
+            is_open, rtt = await tcp_probe(ip, port, timeout)
+            if rtt is not None:
+                self.timeout.observe(rtt)
+            return is_open, int((time.monotonic() - started) * 1000)
+
+        ping_result, *tcp_results = await asyncio.gather(
+            timed_ping(), *(timed_tcp(port) for port in self.ports.values())
+        )
+
+        result = SweepResult(ip=ip, detected={"ping": ping_result[0]})
+        result.attempts.append(
+            DiscoveryAttemptData(
+                ip=ip,
+                method="PING",
+                status="SUCCESS" if ping_result[0] else "FAILED",
+                duration_ms=ping_result[1],
+            )
+        )
+        for (protocol, port), (is_open, duration_ms) in zip(self.ports.items(), tcp_results, strict=True):
+            result.detected[protocol] = is_open
+            result.attempts.append(
+                DiscoveryAttemptData(
+                    ip=ip,
+                    method=f"TCP_{port}",
+                    status="SUCCESS" if is_open else "FAILED",
+                    duration_ms=duration_ms,
+                )
+            )
+        return result
+
+    async def sweep(self, ips: Iterable[str]) -> AsyncIterator[SweepResult]:
+        """Проверить адреса окном из `concurrency` хостов, отдавая результаты по готовности."""
+
+        ips_iter = iter(ips)
+        self.pinger.open()
+        try:
+            running = {
+                asyncio.create_task(self.probe(ip)) for ip in itertools.islice(ips_iter, self.concurrency)
+            }
+            while running:
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for ip in itertools.islice(ips_iter, len(done)):
+                    running.add(asyncio.create_task(self.probe(ip)))
+                for task in done:
+                    yield task.result()
+        finally:
+            self.pinger.close()
+
+    def iter_sweep(self, ips: Iterable[str]) -> Iterator[SweepResult]:
+        """
+        Синхронный генератор поверх `sweep` для кода без event loop.
+
+        Event loop работает в отдельном потоке, результаты передаются через очередь.
+        """
+
+        results: queue.Queue = queue.Queue()
+        stop = threading.Event()
+        finished = object()
+
+        async def produce() -> None:
+            async for result in self.sweep(ips):
+                results.put(result)
+                if stop.is_set():
+                    break
+
+        def run() -> None:
+            try:
+                asyncio.run(produce())
+            except BaseException as exc:
+                results.put(exc)
+            finally:
+                results.put(finished)
+
+        thread = threading.Thread(target=run, name="discovery-sweep", daemon=True)
+        thread.start()
+        try:
+            while (item := results.get()) is not finished:
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            thread.join()
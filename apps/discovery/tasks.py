@@ -1,4 +1,4 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import timedelta
 
@@ -11,9 +11,12 @@ from .services.dataclasses import DeviceFingerprint, DiscoveryAttemptData
 from .services.fingerprint import DeviceFingerprinter
 from .services.provisioning import accept_candidate
 from .services.reconcile import upsert_candidate
-from .services.scanner import build_scan_hosts, preflight_address
+from .services.scanner import build_scan_hosts
+from .services.sweep import SweepEngine, SweepResult
 
 DISCOVERY_PROGRESS_UPDATE_INTERVAL = 10
+# Сколько доступных IP накапливается перед общим SNMP опросом и передачей в CLI fingerprint.
+DISCOVERY_FINGERPRINT_BATCH_SIZE = 256
 FINISHED_DISCOVERY_STATUSES = (
     DiscoveryRun.Status.SUCCESS,
     DiscoveryRun.Status.FAILURE,
@@ -104,28 +107,16 @@ def discovery_run_task(self: Task, run_id: int, networks_override: list[str] | N
                 },
             )
 
-    def scan_ip(ip: str) -> DiscoveryScanResult:
-        """Выполнить только сетевой опрос IP без обращения к Django ORM."""
+    fingerprinter = DeviceFingerprinter(profile, auth_groups=auth_groups, include_cli=True)
 
-        attempts: list[DiscoveryAttemptData] = []
+    def fingerprint_host(sweep_result: SweepResult) -> DiscoveryScanResult:
+        """Собрать fingerprint доступного IP без обращения к Django ORM."""
+
+        ip = sweep_result.ip
+        detected_protocols = sweep_result.detected
+        attempts: list[DiscoveryAttemptData] = list(sweep_result.attempts)
         try:
-            detected_protocols, preflight_attempts = preflight_address(
-                ip,
-                protocols=profile.try_protocols or ["ssh", "telnet"],
-                timeout=profile.timeout_seconds,
-            )
-            attempts.extend(preflight_attempts)
-            if not any(detected_protocols.values()):
-                return DiscoveryScanResult(ip=ip, attempts=attempts, skipped=True)
-
-            fingerprint, fingerprint_attempts = DeviceFingerprinter(
-                profile,
-                auth_groups=auth_groups,  # noqa
-                include_cli=True,
-            ).collect(
-                ip,
-                detected_protocols,
-            )
+            fingerprint, fingerprint_attempts = fingerprinter.collect(ip, detected_protocols)
             attempts.extend(fingerprint_attempts)
             if not fingerprint.has_identity():
                 fingerprint = DeviceFingerprint(
@@ -194,16 +185,45 @@ def discovery_run_task(self: Task, run_id: int, networks_override: list[str] | N
         finally:
             register_progress()
 
+    sweep = SweepEngine(
+        protocols=profile.try_protocols or ["ssh", "telnet"],
+        timeout=profile.timeout_seconds,
+    )
     workers_count = max(1, min(profile.max_workers, len(hosts)))
-    if workers_count == 1:
-        for ip in hosts:
-            persist_result(scan_ip(ip))
-    else:
-        with ThreadPoolExecutor(max_workers=workers_count) as executor:
-            futures = [executor.submit(scan_ip, ip) for ip in hosts]
-            for future in as_completed(futures):
+
+    with ThreadPoolExecutor(max_workers=workers_count) as executor:
+        futures: set[Future[DiscoveryScanResult]] = set()
+        alive_batch: list[SweepResult] = []
+
+        def submit_alive_batch() -> None:
+            """Опросить SNMP пачки доступных IP одним проходом и отдать CLI fingerprint в потоки."""
+
+            fingerprinter.prefetch_snmp(result.ip for result in alive_batch)
+            futures.update(executor.submit(fingerprint_host, result) for result in alive_batch)
+            alive_batch.clear()
+
+        def persist_finished() -> None:
+            for future in [future for future in futures if future.done()]:
+                futures.discard(future)
                 persist_result(future.result())
 
+        # Результаты sweep приходят по мере проверки каждого IP.
+        for sweep_result in sweep.iter_sweep(hosts):
+            if sweep_result.is_alive:
+                alive_batch.append(sweep_result)
+                if len(alive_batch) >= DISCOVERY_FINGERPRINT_BATCH_SIZE:
+                    submit_alive_batch()
+            else:
+                persist_result(
+                    DiscoveryScanResult(ip=sweep_result.ip, attempts=sweep_result.attempts, skipped=True)
+                )
+            persist_finished()
+
+        if alive_batch:
+            submit_alive_batch()
+        for future in as_completed(futures):
+            persist_result(future.result())
+
     run.refresh_from_db()
     run.status = DiscoveryRun.Status.SUCCESS
     run.finished_at = timezone.now()
@@ -69,14 +69,14 @@ class DiscoveryAPITests(APITestCase):
         self.assertEqual(response.data["portScanProtocol"], "auto")
         self.assertEqual(response.data["cmdProtocol"], "auto")
 
-    def test_create_profile_rejects_network_larger_than_24(self):
-        """API отклоняет discovery profile с CIDR шире /24."""
+    def test_create_profile_rejects_network_larger_than_16(self):
+        """API отклоняет discovery profile с CIDR шире /16."""
 
         response = self.client.post(
             reverse("discovery-api:profiles-list"),
             {
                 "name": "too-big",
-                "networks": ["10.0.0.0/23"],
+                "networks": ["10.0.0.0/15"],
                 "deviceGroup": self.group.id,
                 "authGroups": [self.auth_group.id],
                 "tryProtocols": ["ssh"],
@@ -1,11 +1,14 @@
 import subprocess
+from types import SimpleNamespace
 from unittest.mock import patch
 
 from django.test import SimpleTestCase, TestCase
 
 from apps.check.models import AuthGroup
 from apps.discovery.models import DiscoveryAttempt
-from apps.discovery.services.fingerprint import CliFingerprinter, SnmpFingerprinter
+from apps.discovery.services.dataclasses import DeviceFingerprint
+from apps.discovery.services.fingerprint import CliFingerprinter, DeviceFingerprinter, SnmpFingerprinter
+from devicemanager.benchmarks.snmp_engine import FakeSnmpAgent
 from devicemanager.exceptions import SSHConnectionError
 
 
@@ -36,6 +39,62 @@ class SnmpFingerprinterTests(SimpleTestCase):
         self.assertEqual(attempts[0].method, DiscoveryAttempt.Method.SNMP)
         self.assertEqual(attempts[0].status, DiscoveryAttempt.Status.FAILED)
 
+    def test_collect_many_polls_communities_concurrently(self):
+        """Пакетный SNMP опрос выбирает рабочее community и сохраняет попытки."""
+
+        with FakeSnmpAgent.with_interfaces(1) as agent:
+            results = SnmpFingerprinter(["private", "public"], timeout=1, snmp_port=agent.port).collect_many(
+                [agent.host]
+            )
+
+        fingerprint, attempts = results[agent.host]
+        self.assertEqual(fingerprint.selected_snmp_community, "public")
+        self.assertEqual(fingerprint.sys_name, "fake")
+        self.assertEqual(fingerprint.detected_protocols, {"snmp": True})
+        self.assertEqual(
+            [attempt.status for attempt in attempts],
+            [DiscoveryAttempt.Status.FAILED, DiscoveryAttempt.Status.SUCCESS],
+        )
+
+    @patch("apps.discovery.services.fingerprint.snmp.get_system_identity")
+    @patch("apps.discovery.services.fingerprint.SnmpFingerprinter.collect_many")
+    def test_device_fingerprinter_uses_prefetched_snmp(self, mock_collect_many, mock_get_identity):
+        """После prefetch_snmp DeviceFingerprinter не делает блокирующий SNMP опрос."""
+
+        mock_collect_many.return_value = {
+            "192.0.2.10": (
+                DeviceFingerprint(ip="192.0.2.10", sys_name="sw-10", detected_protocols={"snmp": True}),
+                [],
+            )
+        }
+        profile = SimpleNamespace(snmp_communities=["public"], timeout_seconds=1, try_protocols=[])
+        fingerprinter = DeviceFingerprinter(profile, auth_groups=[], include_cli=False)  # type: ignore[arg-type]
+
+        fingerprinter.prefetch_snmp(["192.0.2.10"])
+        fingerprint, _ = fingerprinter.collect("192.0.2.10", {"ping": True})
+
+        self.assertEqual(fingerprint.name, "sw-10")
+        mock_get_identity.assert_not_called()
+
+    @patch("apps.discovery.services.fingerprint.snmp.get_system_identity")
+    @patch("apps.discovery.services.fingerprint.SnmpFingerprinter.collect_many")
+    def test_failed_prefetch_keeps_previous_batches(self, mock_collect_many, mock_get_identity):
+        """Ошибка опроса одной пачки не удаляет неиспользованные результаты предыдущих."""
+
+        mock_collect_many.side_effect = [
+            {"192.0.2.10": (DeviceFingerprint(ip="192.0.2.10", sys_name="sw-10"), [])},
+            OSError("Too many open files"),
+        ]
+        profile = SimpleNamespace(snmp_communities=["public"], timeout_seconds=1, try_protocols=[])
+        fingerprinter = DeviceFingerprinter(profile, auth_groups=[], include_cli=False)  # type: ignore[arg-type]
+
+        fingerprinter.prefetch_snmp(["192.0.2.10"])
+        fingerprinter.prefetch_snmp(["192.0.2.11"])
+        fingerprint, _ = fingerprinter.collect("192.0.2.10", {"ping": True})
+
+        self.assertEqual(fingerprint.name, "sw-10")
+        mock_get_identity.assert_not_called()
+
 
 class CliFingerprinterTests(TestCase):
     """Тесты CLI fingerprint без реального подключения к оборудованию."""
@@ -0,0 +1,87 @@
+import asyncio
+import socket
+from unittest.mock import AsyncMock, patch
+
+from django.test import SimpleTestCase
+
+from apps.discovery.services.sweep import AdaptiveTimeout, SweepEngine, tcp_probe
+
+
+class AdaptiveTimeoutTests(SimpleTestCase):
+    """Тесты адаптивного таймаута sweep."""
+
+    def test_uses_maximum_until_warmup(self):
+        """До накопления замеров используется таймаут профиля."""
+
+        timeout = AdaptiveTimeout(maximum=2, minimum=0.1, warmup=3)
+        timeout.observe(0.01)
+        timeout.observe(0.01)
+
+        self.assertEqual(timeout.current, 2)
+
+    def test_shrinks_to_observed_rtt(self):
+        """После замеров таймаут сокращается, но не ниже минимума."""
+
+        timeout = AdaptiveTimeout(maximum=2, minimum=0.1, warmup=3)
+        for _ in range(5):
+            timeout.observe(0.01)
+
+        self.assertEqual(timeout.current, 0.1)
+
+        for _ in range(20):
+            timeout.observe(0.5)
+        self.assertGreater(timeout.current, 0.5)
+        self.assertLessEqual(timeout.current, 2)
+
+
+class SweepEngineTests(SimpleTestCase):
+    """Тесты асинхронного sweep на локальных сокетах."""
+
+    def setUp(self) -> None:
+        """Открыть локальный TCP порт."""
+
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(16)
+        self.open_port = self.server.getsockname()[1]
+
+        closed = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        closed.bind(("127.0.0.1", 0))
+        self.closed_port = closed.getsockname()[1]
+        closed.close()
+
+    def tearDown(self) -> None:
+        """Закрыть локальный TCP порт."""
+
+        self.server.close()
+
+    def test_tcp_probe(self):
+        """Открытый порт определяется, для закрытого известен RTT по RST."""
+
+        is_open, rtt = asyncio.run(tcp_probe("127.0.0.1", self.open_port, timeout=1))
+        self.assertTrue(is_open)
+        self.assertIsNotNone(rtt)
+
+        is_open, rtt = asyncio.run(tcp_probe("127.0.0.1", self.closed_port, timeout=1))
+        self.assertFalse(is_open)
+        self.assertIsNotNone(rtt)
+
+    @patch("apps.discovery.services.sweep.AsyncPinger.ping", new_callable=AsyncMock)
+    def test_iter_sweep_streams_results(self, mock_ping):
+        """Sweep отдает результат по каждому IP с попытками ping и TCP."""
+
+        mock_ping.side_effect = lambda ip, timeout: 0.001 if ip == "127.0.0.1" else None
+        engine = SweepEngine(protocols=["ssh", "telnet"], timeout=1, concurrency=2)
+        engine.ports = {"ssh": self.open_port, "telnet": self.closed_port}
+
+        results = {result.ip: result for result in engine.iter_sweep(["127.0.0.1", "127.0.0.2", "127.0.0.3"])}
+
+        self.assertEqual(set(results), {"127.0.0.1", "127.0.0.2", "127.0.0.3"})
+        self.assertEqual(results["127.0.0.1"].detected, {"ping": True, "ssh": True, "telnet": False})
+        # Порт слушает только 127.0.0.1.
+        self.assertEqual(results["127.0.0.2"].detected, {"ping": False, "ssh": False, "telnet": False})
+        self.assertFalse(results["127.0.0.2"].is_alive)
+        self.assertEqual(
+            [attempt.method for attempt in results["127.0.0.1"].attempts],
+            ["PING", f"TCP_{self.open_port}", f"TCP_{self.closed_port}"],
+        )
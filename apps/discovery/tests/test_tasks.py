@@ -10,6 +10,7 @@ from apps.check.models import AuthGroup, DeviceGroup
 from apps.discovery.apps import register_task
 from apps.discovery.models import DiscoveryAttempt, DiscoveryCandidate, DiscoveryProfile, DiscoveryRun
 from apps.discovery.services.dataclasses import DeviceFingerprint
+from apps.discovery.services.sweep import SweepResult
 from apps.discovery.tasks import cleanup_discovery_runs_task, discovery_run_task, should_auto_create
 
 
@@ -107,11 +108,11 @@ class DiscoveryTaskTests(TransactionTestCase):
         self.profile.auth_groups.add(self.auth_group)
 
     @patch("apps.discovery.tasks.DeviceFingerprinter")
-    @patch("apps.discovery.tasks.preflight_address")
-    def test_discovery_run_task_creates_candidate(self, mock_preflight, mock_fingerprinter):
+    @patch("apps.discovery.tasks.SweepEngine")
+    def test_discovery_run_task_creates_candidate(self, mock_sweep, mock_fingerprinter):
         """Discovery task создает кандидата по fingerprint."""
 
-        mock_preflight.return_value = ({"ping": True, "ssh": True}, [])
+        mock_sweep.return_value.iter_sweep.side_effect = _alive_sweep
         mock_fingerprinter.return_value.collect.side_effect = lambda ip, detected: (
             DeviceFingerprint(
                 ip=ip,
@@ -159,8 +160,8 @@ class DiscoveryTaskTests(TransactionTestCase):
         self.assertFalse(should_auto_create(self.profile, candidate, dry_run=False))
 
     @patch("apps.discovery.tasks.DeviceFingerprinter")
-    @patch("apps.discovery.tasks.preflight_address")
-    def test_discovery_run_task_updates_existing_candidate_by_ip(self, mock_preflight, mock_fingerprinter):
+    @patch("apps.discovery.tasks.SweepEngine")
+    def test_discovery_run_task_updates_existing_candidate_by_ip(self, mock_sweep, mock_fingerprinter):
         """Повторный discovery по IP обновляет существующего кандидата без дубля."""
 
         candidate = DiscoveryCandidate.objects.create(
@@ -168,7 +169,7 @@ class DiscoveryTaskTests(TransactionTestCase):
             name="old-name",
             status=DiscoveryCandidate.Status.NEW,
         )
-        mock_preflight.return_value = ({"ping": True, "ssh": True}, [])
+        mock_sweep.return_value.iter_sweep.side_effect = _alive_sweep
         mock_fingerprinter.return_value.collect.return_value = (
             DeviceFingerprint(
                 ip=candidate.ip,
@@ -193,10 +194,10 @@ class DiscoveryTaskTests(TransactionTestCase):
     @patch("apps.discovery.tasks.save_attempts")
     @patch("apps.discovery.tasks.upsert_candidate")
     @patch("apps.discovery.tasks.DeviceFingerprinter")
-    @patch("apps.discovery.tasks.preflight_address")
+    @patch("apps.discovery.tasks.SweepEngine")
     def test_discovery_run_task_keeps_database_writes_in_task_thread(
         self,
-        mock_preflight,
+        mock_sweep,
         mock_fingerprinter,
         mock_upsert_candidate,
         mock_save_attempts,
@@ -209,11 +210,20 @@ class DiscoveryTaskTests(TransactionTestCase):
         network_thread_ids = []
         database_thread_ids = []
 
-        def preflight(ip, protocols, timeout):
+        def collect(ip, detected):
             """Зафиксировать поток сетевого опроса."""
 
             network_thread_ids.append(get_ident())
-            return {"ping": True, "ssh": True}, []
+            return (
+                DeviceFingerprint(
+                    ip=ip,
+                    vendor="Eltex",
+                    model="MES",
+                    detected_protocols=detected,
+                    selected_auth_group=self.auth_group,
+                ),
+                [],
+            )
 
         def save_attempts(run, candidate, attempts):
             """Зафиксировать поток сохранения попыток."""
@@ -226,17 +236,8 @@ class DiscoveryTaskTests(TransactionTestCase):
             confidence=80,
             selected_auth_group=self.auth_group,
         )
-        mock_preflight.side_effect = preflight
-        mock_fingerprinter.return_value.collect.side_effect = lambda ip, detected: (
-            DeviceFingerprint(
-                ip=ip,
-                vendor="Eltex",
-                model="MES",
-                detected_protocols=detected,
-                selected_auth_group=self.auth_group,
-            ),
-            [],
-        )
+        mock_sweep.return_value.iter_sweep.side_effect = _alive_sweep
+        mock_fingerprinter.return_value.collect.side_effect = collect
         mock_upsert_candidate.side_effect = (
             lambda fingerprint: database_thread_ids.append(get_ident()) or candidate
         )
@@ -249,3 +250,10 @@ class DiscoveryTaskTests(TransactionTestCase):
         self.assertTrue(all(thread_id != task_thread_id for thread_id in network_thread_ids))
         self.assertTrue(database_thread_ids)
         self.assertTrue(all(thread_id == task_thread_id for thread_id in database_thread_ids))
+
+
+def _alive_sweep(hosts):
+    """Имитировать sweep, в котором все IP доступны по ping и SSH."""
+
+    for ip in hosts:
+        yield SweepResult(ip=ip, detected={"ping": True, "ssh": True})
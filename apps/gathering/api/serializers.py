@@ -81,6 +81,26 @@ class MacAddressSerializer(serializers.ModelSerializer):
         ]
 
 
+class MacSightingSerializer(serializers.Serializer):
+    """Serialize one archived appearance of a MAC address on a device port."""
+
+    address = serializers.CharField(read_only=True)
+    vlan = serializers.IntegerField(read_only=True)
+    type = serializers.CharField(read_only=True)
+    device_id = serializers.IntegerField(read_only=True)
+    device_name = serializers.SerializerMethodField()
+    device_ip = serializers.SerializerMethodField()
+    port = serializers.CharField(read_only=True)
+    desc = serializers.CharField(read_only=True)
+    datetime = serializers.DateTimeField(read_only=True)
+
+    def get_device_name(self, obj) -> str:
+        return self.context["devices"][obj.device_id].name
+
+    def get_device_ip(self, obj) -> str:
+        return self.context["devices"][obj.device_id].ip
+
+
 class VlanPortSerializer(serializers.ModelSerializer):
     """Serialize one collected VLAN port row."""
 
@@ -5,6 +5,7 @@ from .views import (
     DeviceGatheringResultListAPIView,
     DeviceGatheringTimelineAPIView,
     MacAddressDetailAPIView,
+    MacAddressHistoryAPIView,
     MacAddressListAPIView,
     VlanDetailAPIView,
     VlanListAPIView,
@@ -21,6 +22,7 @@ urlpatterns = [
     path("task-results/timeline/", DeviceGatheringTimelineAPIView.as_view(), name="task-result-timeline"),
     path("task-results/lookups/", DeviceGatheringLookupsAPIView.as_view(), name="task-result-lookups"),
     path("mac-addresses/", MacAddressListAPIView.as_view(), name="mac-address-list"),
+    path("mac-addresses/history/", MacAddressHistoryAPIView.as_view(), name="mac-address-history"),
     path("mac-addresses/<int:pk>/", MacAddressDetailAPIView.as_view(), name="mac-address-detail"),
     path("vlans/", VlanListAPIView.as_view(), name="vlan-list"),
     path("vlans/<int:pk>/", VlanDetailAPIView.as_view(), name="vlan-detail"),
@@ -1,3 +1,5 @@
+import re
+
 from django.core.cache import cache
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.exceptions import ValidationError
@@ -11,6 +13,7 @@ from apps.check.services.filters import filter_devices_qs_by_user
 from apps.gathering.models import DeviceGatheringResult, MacAddress, Vlan, VlanPort
 from ecstasy_project.types.api import PageSizePageNumberPagination, UserAuthenticatedAPIView
 
+from ..services.mac import get_mac_history_storage
 from ..tasks import (
     get_mac_gather_status,
     get_vlan_gather_status,
@@ -22,6 +25,7 @@ from .permissions import GatheringResultsPermission
 from .serializers import (
     DeviceGatheringResultSerializer,
     MacAddressSerializer,
+    MacSightingSerializer,
     VlanPortSerializer,
     VlanSerializer,
 )
@@ -56,6 +60,32 @@ class MacAddressDetailAPIView(MacAddressQuerysetMixin, UserAuthenticatedAPIView,
     serializer_class = MacAddressSerializer
 
 
+class MacAddressHistoryAPIView(UserAuthenticatedAPIView, APIView):
+    """Return previous appearances of a MAC address on ports of devices available to the user."""
+
+    def get(self, request) -> Response:
+        """Read the archived sightings of the full MAC address from the `address` query param."""
+        mac = "".join(re.findall(r"[0-9a-fA-F]", request.query_params.get("address", "")))
+        if len(mac) != 12:
+            raise ValidationError({"address": "Укажите полный MAC адрес"})
+
+        storage = get_mac_history_storage()
+        sightings = sorted(
+            (sighting for address in {mac.lower(), mac.upper()} for sighting in storage.history(address)),
+            key=lambda sighting: sighting.datetime,
+        )
+        devices = filter_devices_qs_by_user(Devices.objects.all(), self.current_user).filter(
+            id__in={sighting.device_id for sighting in sightings}
+        )
+        devices_map = {device.id: device for device in devices.only("id", "name", "ip")}
+        serializer = MacSightingSerializer(
+            [sighting for sighting in sightings if sighting.device_id in devices_map],
+            many=True,
+            context={"devices": devices_map},
+        )
+        return Response(serializer.data)
+
+
 class VlanQuerysetMixin:
     def get_queryset(self):
         """Filter VLANs by user device access and optional query params."""
@@ -0,0 +1,61 @@
+from datetime import UTC, datetime, timedelta
+
+from django.db import migrations
+
+COLUMNS = (
+    ("address", "varchar(12)"),
+    ("vlan", "smallint"),
+    ("type", "varchar(1)"),
+    ("device_id", "integer"),
+    ("port", "varchar(50)"),
+    ("desc", "varchar(256)"),
+    ("datetime", "datetime(6)"),
+)
+
+
+def create_mac_address_history(apps, schema_editor):
+    """
+    Создать таблицу истории MAC адресов `mac_address_history`.
+
+    В MySQL таблица секционирована по дням (`PARTITION BY RANGE`) и создается с партицией
+    на текущий день, следующие партиции добавляются перед сбором MAC адресов.
+    В остальных базах данных это обычная таблица.
+    """
+
+    quote = schema_editor.connection.ops.quote_name
+    columns = ", ".join(f"{quote(column)} {type_} NOT NULL" for column, type_ in COLUMNS)
+
+    if schema_editor.connection.vendor == "mysql":
+        upper_bound = datetime.now(UTC).date() + timedelta(days=1)
+        schema_editor.execute(
+            f"CREATE TABLE IF NOT EXISTS `mac_address_history` ({columns}, "
+            "KEY `mac_address_history_address` (`address`)) "
+            "PARTITION BY RANGE (TO_DAYS(`datetime`)) "
+            f"(PARTITION p{upper_bound - timedelta(days=1):%Y%m%d} "
+            f"VALUES LESS THAN (TO_DAYS('{upper_bound:%Y-%m-%d}')))"
+        )
+        return
+
+    table = quote("mac_address_history")
+    schema_editor.execute(f"CREATE TABLE {table} ({columns})")
+    for column in ("address", "datetime"):
+        schema_editor.execute(
+            f"CREATE INDEX {quote('mac_address_history_' + column)} ON {table} ({quote(column)})"
+        )
+
+
+def drop_mac_address_history(apps, schema_editor):
+    schema_editor.execute(
+        f"DROP TABLE IF EXISTS {schema_editor.connection.ops.quote_name('mac_address_history')}"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gathering", "0006_alter_macaddress_desc_alter_vlan_desc"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_mac_address_history, drop_mac_address_history),
+    ]
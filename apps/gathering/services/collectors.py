@@ -1,19 +1,36 @@
 from abc import ABC, abstractmethod
 from collections.abc import Callable
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict
 from functools import cache
+from typing import Any
 
 import orjson
 from celery import Task
-from django.db import close_old_connections, connections
+from django.db import connections
 from django.db.models import QuerySet
 from django.utils import timezone
 
 from apps.check.models import Devices
+from apps.check.services.device.reachability import get_devices_reachability
 from devicemanager.device import Interfaces
+from devicemanager.remote.connector import RemoteCall, pool_controller
 from devicemanager.vendors import BaseDevice
 
 from ..models import DeviceGatheringResult, GatheringTask
+from .result_writer import GatheringResultWriter
+from .scheduler import AdaptiveDeviceScheduler, SweepReport, get_devices_durations
+
+
+def close_unusable_connections() -> None:
+    """
+    Закрывает соединения текущего потока с БД, которые перестали работать после ошибок.
+
+    В отличие от `close_old_connections` не закрывает исправные соединения по `CONN_MAX_AGE`,
+    поэтому поток пула использует одно соединение для всех опрашиваемых им устройств.
+    """
+    for connection in connections.all(initialized_only=True):
+        if connection.connection is not None and connection.errors_occurred and not connection.is_usable():
+            connection.close()
 
 
 class AbstractRealtimeCollector(ABC):
@@ -80,10 +97,27 @@ class AbstractRealtimeCollector(ABC):
 class ThreadUpdatedStatusDeviceTask(Task):
     """
     Создает пул потоков, а затем отправляет задачу в пул потоков для каждого оборудования в наборе запросов.
+
+    Порядок опроса и кол-во потоков определяет `AdaptiveDeviceScheduler`: `max_workers` - максимальное
+    кол-во потоков, `max_workers_per_group` и `max_workers_per_vendor` ограничивают одновременный опрос
+    оборудования одной группы и одного производителя.
+
+    Если `check_reachability` включен, то перед опросом доступность всего оборудования проверяется
+    одной пачкой, и `is_available` в потоках берет ее из результата этой проверки, а не из кеша,
+    время жизни которого может быть меньше длительности опроса.
+
+    Методы `prefetch_methods` перед опросом вызываются для всего доступного оборудования пакетными
+    запросами к device connector (`PoolController.perform_batch`), а потоки берут их результаты
+    через `get_prefetched` вместо отдельного вызова на каждое устройство.
     """
 
     queryset: QuerySet[Devices]
     max_workers: int
+    min_workers: int = 1
+    max_workers_per_group: int | None = None
+    max_workers_per_vendor: int | None = None
+    check_reachability: bool = False
+    prefetch_methods: tuple[str, ...] = ()
 
     def __init__(self):
         """
@@ -96,6 +130,9 @@ class ThreadUpdatedStatusDeviceTask(Task):
         self.objects_count = 1
         self.objects_scanned = 0
         self.task_id = None
+        self.sweep_report: SweepReport | None = None
+        self.reachability: dict[str, bool] = {}
+        self.prefetched: dict[tuple[int, str], Any] = {}
 
     def pre_run(self):
         """
@@ -142,42 +179,109 @@ class ThreadUpdatedStatusDeviceTask(Task):
 
     def create_threads(self, gathering_task: GatheringTask):
         """
-        Создает исполнителя пула потоков и отправляет ему задачу.
+        Опрашивает оборудование через планировщик, сохраняет результаты пачками и выводит итоги опроса.
         """
-        with ThreadPoolExecutor(max_workers=self.max_workers) as execute:
-            futures = [
-                execute.submit(self._run_thread_task, obj, gathering_task) for obj in self.queryset.all()
-            ]
-            for future in as_completed(futures):
-                future.result()
-                self.update_state()
-
-    def _run_thread_task(self, obj: Devices, gathering_task: GatheringTask):
-        """Run a worker task with a clean Django DB connection lifecycle."""
-        close_old_connections()
+        devices = list(self.queryset.all())
+        self.reachability = (
+            get_devices_reachability((device.ip for device in devices), fresh=True)
+            if self.check_reachability
+            else {}
+        )
+        self.prefetch(devices)
+        scheduler = AdaptiveDeviceScheduler(
+            devices,
+            max_workers=self.max_workers,
+            min_workers=self.min_workers,
+            max_per_group=self.max_workers_per_group,
+            max_per_vendor=self.max_workers_per_vendor,
+            durations=self.get_devices_durations(),
+        )
+        writer = GatheringResultWriter(on_flush=lambda count: self.update_state(scanned=count))
         try:
-            result = DeviceGatheringResult.objects.create(
-                task=gathering_task,
-                device=obj,
-                status=DeviceGatheringResult.Status.RUNNING,
+            self.sweep_report = scheduler.run(
+                lambda obj: self._run_thread_task(obj, gathering_task),
+                is_error=lambda result: result.status == DeviceGatheringResult.Status.FAILURE,
+                on_complete=writer.add,
+                on_tick=writer.flush_if_due,
             )
-            try:
-                status = self.thread_task(obj) or DeviceGatheringResult.Status.SUCCESS
-                result.status = status
-                if status == DeviceGatheringResult.Status.SKIPPED:
-                    result.error_type = "Unavailable"
-            except Exception as error:
-                result.status = DeviceGatheringResult.Status.FAILURE
-                result.error_type = type(error).__name__[:128]
-                result.error_message = self.error_message(error)
-                self.log_error(device=obj, message=result.error_message)
-            finally:
-                result.finished_at = timezone.now()
-                result.save(update_fields=["status", "error_type", "error_message", "finished_at"])
-
-            return result.status
         finally:
-            connections.close_all()
+            writer.flush()
+        self.log_sweep(self.sweep_report, results_written=writer.written, results_queries=writer.queries)
+
+    def get_devices_durations(self) -> dict[int, float]:
+        """Длительность опроса оборудования в прошлых запусках задачи для порядка опроса."""
+        return get_devices_durations(self.name)
+
+    def _run_thread_task(self, obj: Devices, gathering_task: GatheringTask) -> DeviceGatheringResult:
+        """
+        Опрашивает оборудование в потоке пула и возвращает несохраненный результат
+        для `GatheringResultWriter`.
+
+        Соединение потока с БД не закрывается после каждого устройства, а используется потоком
+        на протяжении всего опроса и закрывается вместе с потоком по его завершению.
+        """
+        close_unusable_connections()
+        result = DeviceGatheringResult(
+            task=gathering_task,
+            device_id=obj.id,
+            status=DeviceGatheringResult.Status.RUNNING,
+            started_at=timezone.now(),
+        )
+        try:
+            status = self.thread_task(obj) or DeviceGatheringResult.Status.SUCCESS
+            result.status = status
+            if status == DeviceGatheringResult.Status.SKIPPED:
+                result.error_type = "Unavailable"
+        except Exception as error:
+            result.status = DeviceGatheringResult.Status.FAILURE
+            result.error_type = type(error).__name__[:128]
+            result.error_message = self.error_message(error)
+            self.log_error(device=obj, message=result.error_message)
+        result.finished_at = timezone.now()
+        return result
+
+    def is_available(self, obj: Devices) -> bool:
+        """
+        Доступность оборудования по проверке перед опросом.
+
+        Если оборудование в нее не попало, то доступность проверяется через `Devices.available`.
+        """
+        available = self.reachability.get(obj.ip)
+        return obj.available if available is None else available
+
+    def should_prefetch(self, obj: Devices, method: str) -> bool:
+        """Вызывать ли метод `prefetch_methods` для оборудования пакетным запросом перед опросом."""
+        return True
+
+    def prefetch(self, devices: list[Devices]) -> int:
+        """
+        Вызывает `prefetch_methods` для доступного оборудования пакетными запросами к device connector.
+
+        Сохраняются только успешные результаты, остальные методы потоки вызывают как обычно.
+        :return: Кол-во сохраненных результатов.
+        """
+        self.prefetched = {}
+        if not self.prefetch_methods or not pool_controller.enabled:
+            return 0
+
+        calls: dict[int, tuple[int, RemoteCall]] = {}
+        for device in devices:
+            if not self.is_available(device):
+                continue
+            remote_device = device.connect()
+            for method in self.prefetch_methods:
+                if self.should_prefetch(device, method):
+                    call = RemoteCall(remote_device, method)
+                    calls[id(call)] = (device.id, call)
+
+        for call, result in pool_controller.perform_batch([call for _, call in calls.values()]):
+            if not isinstance(result, Exception):
+                self.prefetched[(calls[id(call)][0], call.method)] = result
+        return len(self.prefetched)
+
+    def get_prefetched(self, obj: Devices, method: str) -> Any:
+        """Результат метода оборудования из пакетного вызова перед опросом или `None`."""
+        return self.prefetched.pop((obj.id, method), None)
 
     def thread_task(self, obj: Devices, **kwargs):
         """
@@ -191,15 +295,16 @@ class ThreadUpdatedStatusDeviceTask(Task):
         """
         return self.objects_count
 
-    def update_state(self, task_id=None, state=None, meta=None, **kwargs):
+    def update_state(self, task_id=None, state=None, meta=None, scanned: int = 1, **kwargs):
         """
         Обновляет состояние задачи, а также обновляет ход выполнения задачи.
 
         :param task_id: Идентификатор задачи для обновления
         :param state: Состояние задачи
         :param meta: Это словарь, который содержит ход выполнения задачи
+        :param scanned: Кол-во оборудования, опрошенного с прошлого обновления
         """
-        self.objects_scanned += 1
+        self.objects_scanned += scanned
         super().update_state(
             task_id=task_id or self.task_id,
             state=state or "PROGRESS",
@@ -241,3 +346,15 @@ class ThreadUpdatedStatusDeviceTask(Task):
 
     def log_error(self, device: Devices, **kwargs):
         self.log(device, **kwargs, severity="ERROR")
+
+    def log_sweep(self, report: SweepReport, **kwargs):
+        """Выводит итоги опроса: общее время, кол-во ошибок и потоков."""
+        data = {
+            "task_id": self.task_id,
+            "task_name": self.name,
+            "severity": "INFO",
+            "message": "Sweep finished",
+            **asdict(report),
+            **kwargs,
+        }
+        print(orjson.dumps(data).decode("utf-8"), flush=True)
@@ -1,3 +1,4 @@
 from .collector import MacAddressTableGather
+from .history import MacSighting, expire_mac_addresses, get_mac_history_storage
 
-__all__ = ["MacAddressTableGather"]
+__all__ = ["MacAddressTableGather", "MacSighting", "expire_mac_addresses", "get_mac_history_storage"]
@@ -1,8 +1,10 @@
+import hashlib
 import re
+from dataclasses import dataclass
 from datetime import timedelta
-from itertools import islice
 
-from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
 from django.utils import timezone
 
 from apps.gathering.models import MacAddress
@@ -10,6 +12,31 @@ from devicemanager.remote.exceptions import InvalidMethod
 from devicemanager.vendors.base.types import MACTableType
 
 from ..collectors import AbstractRealtimeCollector
+from .history import MacSighting, get_mac_history_storage
+
+
+@dataclass(slots=True)
+class MacTableDelta:
+    """Изменения таблицы MAC адресов оборудования относительно прошлого сбора."""
+
+    collected: int = 0
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    touched: int = 0
+    archived: int = 0
+    fingerprint_matched: bool = False
+
+    @property
+    def saved_writes(self) -> int:
+        """Кол-во записей, которые не пришлось перезаписывать целиком (раньше перезаписывались все)."""
+        return self.collected - self.inserted - self.updated
+
+    def __str__(self) -> str:
+        return (
+            f"собрано {self.collected}, добавлено {self.inserted}, изменено {self.updated}, "
+            f"удалено {self.deleted}, без изменений {self.saved_writes}"
+        )
 
 
 class MacAddressTableGather(AbstractRealtimeCollector):
@@ -17,10 +44,17 @@ class MacAddressTableGather(AbstractRealtimeCollector):
     # Этот класс используется для сбора таблицы MAC-адресов с устройства
     """
 
+    # Кол-во объектов в одном запросе к базе данных.
+    batch_size = 999
+    # Время хранения отпечатка последней собранной таблицы (секунды).
+    fingerprint_timeout = 60 * 60 * 24
+
+    delta: MacTableDelta | None = None
+
     def collect(self) -> None:
         # Собираем таблицу MAC адресов с оборудования.
         table = self._get_mac_address_table()
-        self._bulk_create(table)
+        self.delta = self._save_mac_table(table)
 
     def _get_mac_address_table(self) -> MACTableType:
         """
@@ -42,40 +76,96 @@ class MacAddressTableGather(AbstractRealtimeCollector):
             pass
         return []
 
-    def _bulk_create(self, table: MACTableType) -> int:
+    def _save_mac_table(self, table: MACTableType) -> MacTableDelta:
         """
-        ## Список MAC адресов создается или обновляется в базе данных.
+        ## Сохраняет в базе данных только изменения таблицы MAC адресов.
+
+        Новые записи добавляются, изменившиеся (VLAN, тип, описание) обновляются,
+        исчезнувшие с оборудования удаляются, а время остальных обновляется одним запросом.
+        Прежние значения удаленных и измененных записей сохраняются в историю MAC адресов.
+        Если отпечаток таблицы совпадает с прошлым сбором, выполняется только обновление времени.
         """
-        objects = (
-            # Создание нового объекта MacAddress.
-            MacAddress(
-                address=self._format_mac(mac),
-                vlan=vid,
-                type=self._format_type(type_),
-                device=self.device,
-                port=port,
-                desc=self._get_desc(port),
+
+        rows: dict[tuple[str, str], tuple[int, str, str]] = {}
+        for vid, mac, type_, port in table:
+            if self.normalize_interface(port):
+                rows[(self._format_mac(mac), port)] = (vid, self._format_type(type_), self._get_desc(port))
+
+        delta = MacTableDelta(collected=len(rows))
+        if not rows:
+            # Пустая таблица чаще означает ошибку сбора, старые записи удалятся по истечении срока хранения.
+            return delta
+
+        fingerprint = hashlib.blake2b(repr(sorted(rows.items())).encode(), digest_size=16).hexdigest()
+        fingerprint_key = f"mac_table_fingerprint:{self.device.id}"
+        now = timezone.now()
+        device_macs = MacAddress.objects.filter(device_id=self.device.id)
+
+        with transaction.atomic():
+            if cache.get(fingerprint_key) == fingerprint:
+                delta.touched = device_macs.update(datetime=now)
+                if delta.touched == len(rows):
+                    delta.fingerprint_matched = True
+                    return delta
+
+            existing = {
+                (record.address, record.port): record
+                for record in device_macs.only("address", "port", "vlan", "type", "desc", "datetime")
+            }
+            removed = [record for key, record in existing.items() if key not in rows]
+            changed = [
+                record
+                for key, record in existing.items()
+                if key in rows and (record.vlan, record.type, record.desc) != rows[key]
+            ]
+            # Прежнее появление MAC адреса на порту (или в другом VLAN) переносится в историю.
+            delta.archived = get_mac_history_storage().add(
+                MacSighting.from_mac_address(record) for record in removed + changed
             )
-            # Цикл for, который перебирает список MAC-адресов.
-            for vid, mac, type_, port in table
-            if self.normalize_interface(port)
-        )
 
-        batch_size = self._bulk_options.get("batch_size", 999)
+            removed_ids = [record.pk for record in removed]
+            for i in range(0, len(removed_ids), self.batch_size):
+                deleted, _ = MacAddress.objects.filter(pk__in=removed_ids[i : i + self.batch_size]).delete()
+                delta.deleted += deleted
 
-        count = 0  # Это счетчик, который подсчитывает количество созданных объектов.
+            delta.touched = device_macs.update(datetime=now)
 
-        # Цикл while, который будет выполняться до тех пор, пока список объектов не станет пустым.
-        while objects:
-            # Взять первые 999 объектов из списка объектов и присвоить их переменной пакету.
-            batch = list(islice(objects, batch_size))
-            count += len(batch)
-            if not batch:
-                break
-            # Создание пакета объектов в базе данных.
-            MacAddress.objects.bulk_create(objs=batch, **self._bulk_options)
+            for record in changed:
+                record.vlan, record.type, record.desc = rows[(record.address, record.port)]
+            MacAddress.objects.bulk_update(
+                changed, fields=["vlan", "type", "desc"], batch_size=self.batch_size
+            )
+            delta.updated = len(changed)
+
+            created = MacAddress.objects.bulk_create(
+                [
+                    MacAddress(
+                        address=address, port=port, vlan=vid, type=type_, desc=desc, device=self.device
+                    )
+                    for (address, port), (vid, type_, desc) in rows.items()
+                    if (address, port) not in existing
+                ],
+                batch_size=self.batch_size,
+                **self._upsert_kwargs(),
+            )
+            delta.inserted = len(created)
+
+        cache.set(fingerprint_key, fingerprint, timeout=self.fingerprint_timeout)
+        return delta
+
+    @staticmethod
+    def _upsert_kwargs() -> dict:
+        """
+        ## Параметры `bulk_create` для новых записей MAC адресов.
 
-        return count
+        Запись с тем же (address, device, port) могла быть добавлена параллельной задачей
+        (например, сбором MAC и комплексным сбором одного оборудования), поэтому при конфликте
+        обновляется существующая запись, а не возникает `IntegrityError`.
+        """
+        kwargs: dict = {"update_conflicts": True, "update_fields": ["vlan", "type", "desc", "datetime"]}
+        if connection.features.supports_update_conflicts_with_target:
+            kwargs["unique_fields"] = ["address", "device", "port"]
+        return kwargs
 
     def _get_desc(self, interface_name: str) -> str:
         """
@@ -123,29 +213,3 @@ class MacAddressTableGather(AbstractRealtimeCollector):
             device_id=self.device.id,
             datetime__lt=timezone.now() - timedelta_,
         ).delete()
-
-    @property
-    def _bulk_options(self) -> dict:
-        """
-        # Эта функция возвращает словарь опций для bulk_create в зависимости от указанной в settings.py БД.
-        """
-
-        options = {
-            # В базах данных (все, кроме Oracle и SQLite < 3.24),
-            # установка параметра update_conflicts в значение `True`
-            # указывает базе данных обновить update_fields, когда вставка строки не удалась из-за конфликтов.
-            "update_conflicts": True,
-            "update_fields": ["vlan", "type", "datetime", "desc"],
-            # Параметр определяет, сколько объектов создается в одном запросе.
-            "batch_size": 999,
-        }
-
-        # Получение имени ядра базы данных из файла settings.py.
-        database_engine = str(settings.DATABASES["default"]["ENGINE"]).rsplit(".", 1)[1]
-
-        if database_engine in ["postgresql", "sqlite3"]:
-            # В PostgreSQL и SQLite, в дополнение к update_fields,
-            # необходимо предоставить список unique_fields, которые могут быть в конфликте.
-            options["unique_fields"] = ["address", "port", "device"]
-
-        return options
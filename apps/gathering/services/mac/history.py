@@ -0,0 +1,233 @@
+"""
+# История MAC адресов, разделенная на партиции по дням.
+
+Таблица `mac_addresses` (`MacAddress`) хранит последнее появление каждого MAC адреса на порту
+и используется поиском и трассировкой MAC. Когда MAC адрес пропадает с порта или меняет VLAN,
+прежняя запись переносится в историю: где и в каком VLAN MAC адрес был раньше, отдается
+при поиске MAC адреса через API (`/api/v1/gather/mac-addresses/history/`). Срок хранения истории
+ограничивается удалением партиций целиком, без построчного `DELETE`.
+
+Таблица `mac_address_history` создается миграцией. В MySQL она секционирована по дням
+(`PARTITION BY RANGE`), партиции создаются один раз перед сбором MAC адресов в `expire_mac_addresses`,
+а не при каждой записи. В остальных базах данных (SQLite для разработки и тестов) это обычная таблица,
+партиции в которой - дни записей.
+"""
+
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.gathering.models import MacAddress
+
+# Срок хранения MAC адресов оборудования, которое перестало опрашиваться, и истории MAC адресов.
+MAC_ADDRESSES_RETENTION = timedelta(hours=48)
+
+
+@dataclass(slots=True, frozen=True)
+class MacSighting:
+    """Появление MAC адреса на порту оборудования."""
+
+    address: str
+    vlan: int
+    type: str
+    device_id: int
+    port: str
+    desc: str
+    datetime: datetime
+
+    @classmethod
+    def from_mac_address(cls, mac: MacAddress) -> "MacSighting":
+        return cls(mac.address, mac.vlan, mac.type, mac.device_id, mac.port, mac.desc, mac.datetime)
+
+    @property
+    def day(self) -> date:
+        return self.datetime.astimezone(UTC).date()
+
+
+class MacHistoryStorage(ABC):
+    """Хранилище истории MAC адресов с партициями по дням (UTC)."""
+
+    table = "mac_address_history"
+    columns = ("address", "vlan", "type", "device_id", "port", "desc", "datetime")
+
+    def __init__(self, using: str = DEFAULT_DB_ALIAS) -> None:
+        self.using = using
+
+    @property
+    def connection(self) -> BaseDatabaseWrapper:
+        return connections[self.using]
+
+    @abstractmethod
+    def partitions(self) -> list[date]:
+        """Дни, для которых существуют партиции, по возрастанию."""
+
+    @abstractmethod
+    def ensure_partition(self, day: date) -> None:
+        """
+        Создать партицию для записей указанного дня, если ее нет.
+
+        Вызывается один раз перед сбором (`expire_mac_addresses`), а не при записи истории.
+        """
+
+    @abstractmethod
+    def drop_partition(self, day: date) -> None:
+        pass
+
+    def add(self, sightings: Iterable[MacSighting]) -> int:
+        """Записать появления MAC адресов в историю."""
+
+        quote = self.connection.ops.quote_name
+        adapt_datetime = self.connection.ops.adapt_datetimefield_value
+        columns = ", ".join(map(quote, self.columns))
+        placeholders = ", ".join(["%s"] * len(self.columns))
+        rows = [
+            (s.address, s.vlan, s.type, s.device_id, s.port, s.desc, adapt_datetime(s.datetime))
+            for s in sightings
+        ]
+        if rows:
+            with self.connection.cursor() as cursor:
+                cursor.executemany(
+                    f"INSERT INTO {quote(self.table)} ({columns}) VALUES ({placeholders})", rows
+                )
+        return len(rows)
+
+    def history(self, address: str) -> list[MacSighting]:
+        """Все сохраненные появления MAC адреса по времени."""
+
+        quote = self.connection.ops.quote_name
+        columns = ", ".join(map(quote, self.columns))
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {columns} FROM {quote(self.table)} WHERE {quote('address')} = %s "
+                f"ORDER BY {quote('datetime')}",
+                [address],
+            )
+            rows = cursor.fetchall()
+
+        return [
+            MacSighting(address, vlan, type_, device_id, port, desc, self._to_datetime(seen))
+            for address, vlan, type_, device_id, port, desc, seen in rows
+        ]
+
+    def drop_older_than(self, day: date) -> list[date]:
+        """Удалить партиции всех дней до указанного и вернуть их."""
+
+        dropped = [partition for partition in self.partitions() if partition < day]
+        for partition in dropped:
+            self.drop_partition(partition)
+        return dropped
+
+    @staticmethod
+    def _to_datetime(value: datetime | str) -> datetime:
+        if isinstance(value, str):
+            value = parse_datetime(value) or datetime.fromisoformat(value)
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value, UTC)
+        return value
+
+
+class DailyMacHistoryStorage(MacHistoryStorage):
+    """Обычная таблица: партиции - дни, за которые есть записи, удаляются построчно."""
+
+    def partitions(self) -> list[date]:
+        quote = self.connection.ops.quote_name
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"SELECT DISTINCT {quote('datetime')} FROM {quote(self.table)}")
+            return sorted({self._to_datetime(row[0]).astimezone(UTC).date() for row in cursor.fetchall()})
+
+    def ensure_partition(self, day: date) -> None:
+        pass
+
+    def drop_partition(self, day: date) -> None:
+        quote = self.connection.ops.quote_name
+        adapt_datetime = self.connection.ops.adapt_datetimefield_value
+        start = datetime(day.year, day.month, day.day, tzinfo=UTC)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {quote(self.table)} WHERE {quote('datetime')} >= %s AND {quote('datetime')} < %s",
+                [adapt_datetime(start), adapt_datetime(start + timedelta(days=1))],
+            )
+
+
+class MySQLMacHistoryStorage(MacHistoryStorage):
+    """
+    Секционированная таблица MySQL: `PARTITION BY RANGE (TO_DAYS(datetime))`.
+
+    Новые партиции добавляются только после последней, записи более ранних дней,
+    для которых нет своей партиции, попадают в ближайшую следующую. Изменение партиций
+    (`ALTER TABLE`) неявно завершает транзакцию, поэтому выполняется только вне сбора MAC адресов.
+    """
+
+    @staticmethod
+    def _partition_name(day: date) -> str:
+        return f"p{day:%Y%m%d}"
+
+    def _partition_sql(self, day: date) -> str:
+        upper_bound = day + timedelta(days=1)
+        return f"PARTITION {self._partition_name(day)} VALUES LESS THAN (TO_DAYS('{upper_bound:%Y-%m-%d}'))"
+
+    def partitions(self) -> list[date]:
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL",
+                [self.table],
+            )
+            names = [row[0] for row in cursor.fetchall()]
+        return sorted(datetime.strptime(name[1:], "%Y%m%d").date() for name in names)
+
+    def ensure_partition(self, day: date) -> None:
+        partitions = self.partitions()
+        if partitions and day <= partitions[-1]:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"ALTER TABLE {self.connection.ops.quote_name(self.table)} "
+                f"ADD PARTITION ({self._partition_sql(day)})"
+            )
+
+    def drop_partition(self, day: date) -> None:
+        if len(self.partitions()) <= 1:
+            # Последнюю партицию удалить нельзя, поэтому она очищается.
+            with self.connection.cursor() as cursor:
+                cursor.execute(f"TRUNCATE TABLE {self.connection.ops.quote_name(self.table)}")
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"ALTER TABLE {self.connection.ops.quote_name(self.table)} "
+                f"DROP PARTITION {self._partition_name(day)}"
+            )
+
+
+def get_mac_history_storage(using: str = DEFAULT_DB_ALIAS) -> MacHistoryStorage:
+    if connections[using].vendor == "mysql":
+        return MySQLMacHistoryStorage(using)
+    return DailyMacHistoryStorage(using)
+
+
+def expire_mac_addresses(retention: timedelta = MAC_ADDRESSES_RETENTION) -> dict:
+    """
+    Удалить устаревшие MAC адреса.
+
+    Партиции истории старше срока хранения удаляются целиком, партиции на сегодня и завтра
+    создаются один раз за запуск, до параллельного сбора. Время последних записей обновляется
+    при каждом сборе, поэтому построчно удаляются только записи оборудования, которое не опрашивалось.
+    """
+
+    now = timezone.now()
+    cutoff = now - retention
+    storage = get_mac_history_storage()
+
+    today = now.astimezone(UTC).date()
+    for day in (today, today + timedelta(days=1)):
+        storage.ensure_partition(day)
+    dropped = storage.drop_older_than(cutoff.astimezone(UTC).date())
+    deleted, _ = MacAddress.objects.filter(datetime__lt=cutoff).delete()
+
+    return {"droppedPartitions": [day.isoformat() for day in dropped], "staleDeleted": deleted}
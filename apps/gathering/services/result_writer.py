@@ -0,0 +1,60 @@
+"""
+# Сохранение результатов опроса оборудования пачками.
+
+Потоки опроса не пишут `DeviceGatheringResult` сами, а возвращают несохраненные результаты.
+`GatheringResultWriter` копит их в потоке задачи и сохраняет одним `bulk_create` на пачку,
+заодно сообщая о прогрессе задачи, вместо двух запросов к БД и обновления прогресса
+на каждое устройство.
+"""
+
+import time
+from collections.abc import Callable
+
+from ..models import DeviceGatheringResult
+
+
+class GatheringResultWriter:
+    """Копит результаты опроса и сохраняет их, когда набралась пачка или прошел `flush_interval`."""
+
+    def __init__(
+        self,
+        on_flush: Callable[[int], None] | None = None,
+        batch_size: int = 200,
+        flush_interval: float = 2.0,
+    ) -> None:
+        """
+        :param on_flush: Вызывается с кол-вом сохраненных результатов после каждого сохранения.
+        :param batch_size: Кол-во результатов, после которого они сохраняются сразу.
+        :param flush_interval: Максимальное время хранения результатов до сохранения, в секундах.
+        """
+        self.on_flush = on_flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.queries = 0
+        self._pending: list[DeviceGatheringResult] = []
+        self._flushed_at = time.monotonic()
+
+    def add(self, result: DeviceGatheringResult) -> None:
+        self._pending.append(result)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def flush_if_due(self) -> None:
+        if self._pending and time.monotonic() - self._flushed_at >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Сохраняет накопленные результаты."""
+        self._flushed_at = time.monotonic()
+        if not self._pending:
+            return
+
+        results, self._pending = self._pending, []
+        DeviceGatheringResult.objects.bulk_create(results, batch_size=self.batch_size)
+        self.queries += -(-len(results) // self.batch_size)
+        self.written += len(results)
+        if self.on_flush is not None:
+            self.on_flush(len(results))
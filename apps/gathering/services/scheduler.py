@@ -0,0 +1,187 @@
+"""
+# Планировщик опроса оборудования задачами сбора.
+
+Оборудование опрашивается от самого долгого к самому быстрому по длительности прошлых опросов
+(`DeviceGatheringResult`), чтобы долгие устройства не оставались в конце опроса одни.
+
+Кол-во одновременно опрашиваемых устройств ограничивается для каждой группы оборудования
+и производителя, а общее кол-во потоков подстраивается по результатам опроса: если
+в последних опросах много ошибок или устройства отвечают заметно дольше обычного, то кол-во
+потоков уменьшается вдвое, иначе постепенно увеличивается до максимального.
+"""
+
+import statistics
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any
+
+from apps.check.models import Devices
+
+from ..models import DeviceGatheringResult, GatheringTask
+
+
+@dataclass(slots=True)
+class SweepReport:
+    """Итоги опроса оборудования."""
+
+    devices: int = 0
+    errors: int = 0
+    wall_time: float = 0.0
+    peak_workers: int = 0
+    workers: int = 0
+
+
+def get_devices_durations(task_name: str, last_tasks: int = 3) -> dict[int, float]:
+    """
+    ## Средняя длительность опроса устройств в последних завершенных запусках задачи.
+
+    :param task_name: Название задачи сбора.
+    :param last_tasks: Сколько последних запусков учитывать.
+    :return: Словарь: ID устройства -> длительность опроса в секундах.
+    """
+    tasks_ids = list(
+        GatheringTask.objects.filter(name=task_name, finished_at__isnull=False)
+        .order_by("-started_at")
+        .values_list("id", flat=True)[:last_tasks]
+    )
+    rows = (
+        DeviceGatheringResult.objects.filter(task_id__in=tasks_ids)
+        .exclude(status=DeviceGatheringResult.Status.SKIPPED)
+        .values_list("device_id", "started_at", "finished_at")
+    )
+    durations: dict[int, list[float]] = defaultdict(list)
+    for device_id, started_at, finished_at in rows:
+        if finished_at is not None:
+            durations[device_id].append((finished_at - started_at).total_seconds())
+    return {device_id: statistics.fmean(values) for device_id, values in durations.items()}
+
+
+class AdaptiveDeviceScheduler:
+    """
+    Опрашивает оборудование в пуле потоков с ограничениями по группам, производителям
+    и подстраиваемым общим кол-вом потоков.
+    """
+
+    # Кол-во завершенных опросов, по которым пересматривается кол-во потоков.
+    window_size = 20
+    # Доля ошибок в окне, при которой кол-во потоков уменьшается.
+    max_error_rate = 0.2
+    # Во сколько раз медиана длительности опросов окна может превышать обычную.
+    max_slowdown = 2.0
+    # Как часто вызывается `on_tick`, если опросы долго не завершаются, в секундах.
+    tick_interval = 1.0
+
+    def __init__(
+        self,
+        devices: Iterable[Devices],
+        max_workers: int,
+        min_workers: int = 1,
+        max_per_group: int | None = None,
+        max_per_vendor: int | None = None,
+        durations: dict[int, float] | None = None,
+    ) -> None:
+        self.max_workers = max(max_workers, 1)
+        self.min_workers = min(max(min_workers, 1), self.max_workers)
+        self.max_per_group = max_per_group
+        self.max_per_vendor = max_per_vendor
+        self.durations = durations or {}
+        self.workers = self.max_workers
+        self.devices = self.order_devices(list(devices), self.durations)
+        self._window: list[tuple[float, float | None, bool]] = []
+
+    @staticmethod
+    def order_devices(devices: list[Devices], durations: dict[int, float]) -> list[Devices]:
+        """Сортирует оборудование от самого долгого опроса, для новых устройств берется медиана."""
+        default = statistics.median(durations.values()) if durations else 0.0
+        return sorted(devices, key=lambda device: durations.get(device.id, default), reverse=True)
+
+    @staticmethod
+    def _group_key(device: Devices) -> Any:
+        return device.group_id
+
+    @staticmethod
+    def _vendor_key(device: Devices) -> str:
+        return (device.vendor or "").strip().casefold()
+
+    def run(
+        self,
+        func: Callable[[Devices], Any],
+        is_error: Callable[[Any], bool] = lambda result: False,
+        on_complete: Callable[[Any], None] | None = None,
+        on_tick: Callable[[], None] | None = None,
+    ) -> SweepReport:
+        """
+        ## Выполняет `func` для каждого оборудования.
+
+        Исключение из `func` останавливает запуск новых опросов и передается вызывающему коду
+        после завершения уже запущенных.
+        :param func: Опрос одного устройства.
+        :param is_error: Является ли результат опроса ошибкой.
+        :param on_complete: Вызывается в текущем потоке с результатом каждого опроса.
+        :param on_tick: Вызывается в текущем потоке после каждой проверки завершенных опросов,
+         но не реже, чем раз в `tick_interval` секунд.
+        :return: Итоги опроса.
+        """
+        report = SweepReport(devices=len(self.devices))
+        pending = list(self.devices)
+        running: dict[Future, tuple[Devices, float]] = {}
+        by_group: dict[Any, int] = defaultdict(int)
+        by_vendor: dict[str, int] = defaultdict(int)
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                index = 0
+                while index < len(pending) and len(running) < self.workers:
+                    device = pending[index]
+                    group, vendor = self._group_key(device), self._vendor_key(device)
+                    if (self.max_per_group and by_group[group] >= self.max_per_group) or (
+                        self.max_per_vendor and vendor and by_vendor[vendor] >= self.max_per_vendor
+                    ):
+                        index += 1
+                        continue
+                    del pending[index]
+                    by_group[group] += 1
+                    by_vendor[vendor] += 1
+                    running[executor.submit(func, device)] = (device, time.monotonic())
+                report.peak_workers = max(report.peak_workers, len(running))
+
+                done, _ = wait(
+                    running,
+                    timeout=self.tick_interval if on_tick is not None else None,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    device, device_started = running.pop(future)
+                    by_group[self._group_key(device)] -= 1
+                    by_vendor[self._vendor_key(device)] -= 1
+                    result = future.result()
+                    error = is_error(result)
+                    report.errors += error
+                    self._observe(device, time.monotonic() - device_started, error)
+                    if on_complete is not None:
+                        on_complete(result)
+                if on_tick is not None:
+                    on_tick()
+
+        report.wall_time = round(time.monotonic() - started, 3)
+        report.workers = self.workers
+        return report
+
+    def _observe(self, device: Devices, elapsed: float, error: bool) -> None:
+        """Учитывает результат опроса и пересматривает кол-во потоков по заполненному окну."""
+        self._window.append((elapsed, self.durations.get(device.id), error))
+        if len(self._window) < self.window_size:
+            return
+
+        errors_rate = sum(error for _, _, error in self._window) / len(self._window)
+        slowdowns = [elapsed / expected for elapsed, expected, _ in self._window if expected]
+        slow = bool(slowdowns) and statistics.median(slowdowns) > self.max_slowdown
+        if errors_rate > self.max_error_rate or slow:
+            self.workers = max(self.min_workers, self.workers // 2)
+        else:
+            self.workers = min(self.max_workers, self.workers + max(1, self.max_workers // 10))
+        self._window.clear()
@@ -16,10 +16,10 @@ from devicemanager.device import DeviceManager, Interfaces
 from ecstasy_project.celery import app
 from ecstasy_project.celery_schedules import get_crontab_schedule
 
-from .models import DeviceGatheringResult, GatheringTask, MacAddress, Vlan
+from .models import DeviceGatheringResult, GatheringTask, Vlan
 from .services.collectors import ThreadUpdatedStatusDeviceTask
 from .services.configurations import ConfigurationGather, LocalConfigStorage
-from .services.mac import MacAddressTableGather
+from .services.mac import MacAddressTableGather, expire_mac_addresses
 from .services.vlan.collector import VlanTableGather
 
 task_logger = logging.getLogger(__name__)
@@ -55,6 +55,14 @@ class MacTablesGatherTask(ThreadUpdatedStatusDeviceTask):
     name = "mac_table_gather_task"
     queryset = Devices.objects.filter(active=True, collect_mac_addresses=True)
     max_workers = 80
+    max_workers_per_group = 40
+    max_workers_per_vendor = 60
+    check_reachability = True
+    # Интерфейсы оборудования собираются до опроса пакетными запросами к device connector.
+    prefetch_methods = ("get_interfaces",)
+
+    def should_prefetch(self, obj: Devices, method: str) -> bool:
+        return obj.port_scan_protocol != "snmp"
 
     def pre_run(self):
         """
@@ -65,13 +73,13 @@ class MacTablesGatherTask(ThreadUpdatedStatusDeviceTask):
         cache.set("mac_table_gather_task_id", self.request.id, timeout=None)
 
         # Удаляем старые MAC адреса.
-        res = MacAddress.objects.filter(datetime__lt=timezone.now() - timedelta(hours=48)).delete()
+        res = expire_mac_addresses()
         task_logger.info("Cleared outdated MAC entries: %s", res)
 
     def thread_task(self, obj: Devices, **kwargs) -> str:
         """Собрать MAC-адреса устройства и вернуть статус результата."""
 
-        if not obj.available:
+        if not self.is_available(obj):
             return DeviceGatheringResult.Status.SKIPPED
 
         with DeviceRemoteConnector(
@@ -86,12 +94,14 @@ class MacTablesGatherTask(ThreadUpdatedStatusDeviceTask):
             if obj.port_scan_protocol == "snmp":
                 interfaces = Interfaces(snmp.get_interfaces(obj.ip, obj.snmp_community, obj.snmp_port))
             else:
-                interfaces = Interfaces(session.get_interfaces())
+                interfaces = Interfaces(
+                    self.get_prefetched(obj, "get_interfaces") or session.get_interfaces()
+                )
 
             gather = MacAddressTableGather(obj, session=session, interfaces=interfaces)
             gather.run_gathering()
 
-        self.log(device=obj, message="MAC collected")
+        self.log(device=obj, message=f"MAC collected: {gather.delta}")
         return DeviceGatheringResult.Status.SUCCESS
 
     @classmethod
@@ -131,6 +141,14 @@ class VlanTablesGatherTask(ThreadUpdatedStatusDeviceTask):
     name = "vlan_table_gather_task"
     queryset = Devices.objects.filter(active=True, collect_vlan_info=True)
     max_workers = 80
+    max_workers_per_group = 40
+    max_workers_per_vendor = 60
+    check_reachability = True
+    # Интерфейсы оборудования собираются до опроса пакетными запросами к device connector.
+    prefetch_methods = ("get_interfaces",)
+
+    def should_prefetch(self, obj: Devices, method: str) -> bool:
+        return obj.port_scan_protocol != "snmp"
 
     def pre_run(self):
         """
@@ -147,7 +165,7 @@ class VlanTablesGatherTask(ThreadUpdatedStatusDeviceTask):
     def thread_task(self, obj: Devices, **kwargs) -> str:
         """Собрать VLAN устройства и вернуть статус результата."""
 
-        if not obj.available:
+        if not self.is_available(obj):
             return DeviceGatheringResult.Status.SKIPPED
 
         with DeviceRemoteConnector(
@@ -162,7 +180,9 @@ class VlanTablesGatherTask(ThreadUpdatedStatusDeviceTask):
             if obj.port_scan_protocol == "snmp":
                 interfaces = Interfaces(snmp.get_interfaces(obj.ip, obj.snmp_community, obj.snmp_port))
             else:
-                interfaces = Interfaces(session.get_interfaces())
+                interfaces = Interfaces(
+                    self.get_prefetched(obj, "get_interfaces") or session.get_interfaces()
+                )
 
             gather = VlanTableGather(obj, session=session, interfaces=interfaces)
             gather.run_gathering()
@@ -198,6 +218,8 @@ class ConfigurationGatherTask(ThreadUpdatedStatusDeviceTask):
     name = "configuration_gather_task"
     queryset = Devices.objects.filter(active=True, collect_configurations=True)
     max_workers = 40
+    max_workers_per_group = 20
+    max_workers_per_vendor = 30
 
     def thread_task(self, obj: Devices, **kwargs) -> str:
         """Собрать конфигурацию устройства и вернуть статус результата."""
@@ -238,6 +260,7 @@ class DevicesComplexGatherTask(ThreadUpdatedStatusDeviceTask):
     name = "devices_complex_gather_task"
     queryset = Devices.objects.filter(active=True)
     max_workers = 80
+    check_reachability = True
 
     def pre_run(self):
         """
@@ -248,13 +271,13 @@ class DevicesComplexGatherTask(ThreadUpdatedStatusDeviceTask):
         cache.set("devices_complex_gather_task_id", self.request.id, timeout=None)
 
         # Удаляем старые MAC адреса.
-        res = MacAddress.objects.filter(datetime__lt=timezone.now() - timedelta(hours=48)).delete()
+        res = expire_mac_addresses()
         task_logger.info("Cleared outdated MAC entries: %s", res)
 
     def thread_task(self, obj: Devices, **kwargs) -> str:
         """Выполнить комплексный сбор устройства и вернуть статус результата."""
 
-        if not obj.available:
+        if not self.is_available(obj):
             return DeviceGatheringResult.Status.SKIPPED
 
         with DeviceRemoteConnector(
@@ -289,7 +312,7 @@ class DevicesComplexGatherTask(ThreadUpdatedStatusDeviceTask):
         if device.collect_mac_addresses:
             mac_gather = MacAddressTableGather(device, session=session, interfaces=interfaces)
             mac_gather.run_gathering()
-            self.log(device=device, message="MAC адреса собраны")
+            self.log(device=device, message=f"MAC адреса собраны: {mac_gather.delta}")
             interfaces_desc = mac_gather.interfaces_desc
 
         # VLAN GATHERING
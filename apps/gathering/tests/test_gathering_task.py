@@ -1,3 +1,6 @@
+import threading
+import time
+from collections import defaultdict
 from types import SimpleNamespace
 from typing import cast
 from unittest.mock import MagicMock, patch
@@ -10,8 +13,9 @@ from rest_framework.exceptions import APIException, NotAcceptable, ValidationErr
 
 from apps.check.api.decorators import except_connection_errors
 from apps.check.models import Devices
-from apps.gathering.models import DeviceGatheringResult
+from apps.gathering.models import DeviceGatheringResult, GatheringTask
 from apps.gathering.services.collectors import ThreadUpdatedStatusDeviceTask
+from apps.gathering.services.scheduler import AdaptiveDeviceScheduler
 from ecstasy_project.error_handler import (
     PROBLEM_CONTENT_TYPE,
     PROBLEM_TYPES,
@@ -30,7 +34,7 @@ class FakeQuerySet:
 
     def all(self) -> list[object]:
         """Return fake objects for worker dispatch."""
-        return [object()]
+        return [SimpleNamespace(id=1, group_id=1, vendor="")]
 
 
 class SuccessfulThreadTask(ThreadUpdatedStatusDeviceTask):
@@ -56,45 +60,188 @@ class FailingThreadTask(ThreadUpdatedStatusDeviceTask):
 
 
 class ThreadUpdatedStatusTaskTests(SimpleTestCase):
-    """Tests for threaded Celery task database connection cleanup."""
+    """Tests for threaded Celery task workers."""
 
     @patch("apps.gathering.services.collectors.connections.close_all")
-    @patch("apps.gathering.services.collectors.close_old_connections")
-    @patch("apps.gathering.services.collectors.DeviceGatheringResult.objects.create")
-    def test_thread_task_closes_database_connections(
-        self, create_result, close_old_connections, close_all
-    ) -> None:
-        """Thread worker closes its Django DB connection after successful work."""
+    @patch("apps.gathering.services.collectors.close_unusable_connections")
+    def test_thread_task_returns_unsaved_result(self, close_unusable_connections, close_all) -> None:
+        """Thread worker keeps its DB connection and returns the result for the writer."""
         task = SuccessfulThreadTask()
-        device = SimpleNamespace(name="switch", ip="192.0.2.10")
+        device = SimpleNamespace(id=1, name="switch", ip="192.0.2.10")
 
-        result = task._run_thread_task(device, MagicMock())  # type: ignore[arg-type]
+        result = task._run_thread_task(device, GatheringTask(id=1))  # type: ignore[arg-type]
 
-        self.assertEqual(result, "ok")
-        create_result.return_value.save.assert_called_once_with(
-            update_fields=["status", "error_type", "error_message", "finished_at"]
-        )
-        close_old_connections.assert_called_once_with()
-        close_all.assert_called_once_with()
+        self.assertEqual((result.status, result.device_id, result.task_id), ("ok", 1, 1))
+        self.assertIsNone(result.pk)
+        self.assertIsNotNone(result.finished_at)
+        close_unusable_connections.assert_called_once_with()
+        close_all.assert_not_called()
 
-    @patch("apps.gathering.services.collectors.connections.close_all")
-    @patch("apps.gathering.services.collectors.close_old_connections")
-    @patch("apps.gathering.services.collectors.DeviceGatheringResult.objects.create")
-    def test_thread_task_closes_database_connections_after_error(
-        self, create_result, close_old_connections, close_all
-    ) -> None:
-        """Thread worker logs an error and closes its Django DB connection."""
+    @patch("apps.gathering.services.collectors.close_unusable_connections")
+    def test_thread_task_returns_failure_result(self, close_unusable_connections) -> None:
+        """Thread worker logs an error and returns a failed result."""
         task = FailingThreadTask()
-        device = SimpleNamespace(name="switch", ip="192.0.2.10")
+        device = SimpleNamespace(id=1, name="switch", ip="192.0.2.10")
 
         with patch.object(task, "log_error"):
-            result = task._run_thread_task(device, MagicMock())  # type: ignore[arg-type]
+            result = task._run_thread_task(device, GatheringTask(id=1))  # type: ignore[arg-type]
+
+        self.assertEqual(result.status, DeviceGatheringResult.Status.FAILURE)
+        self.assertEqual(result.error_type, "RuntimeError")
+        self.assertEqual(result.error_message, "boom")
+        close_unusable_connections.assert_called_once_with()
+
+
+def make_device(device_id: int, group_id: int = 1, vendor: str = "Huawei") -> SimpleNamespace:
+    """Return a device-like object for the scheduler."""
+    return SimpleNamespace(id=device_id, group_id=group_id, vendor=vendor, name=f"dev{device_id}")
+
+
+class AdaptiveDeviceSchedulerTests(SimpleTestCase):
+    """Tests for device ordering, per-group caps and worker count adjustment."""
+
+    def test_devices_are_ordered_by_history(self) -> None:
+        """Slow devices start first, devices without history get the median duration."""
+        devices = [make_device(1), make_device(2), make_device(3), make_device(4)]
+        scheduler = AdaptiveDeviceScheduler(
+            devices, max_workers=1, durations={1: 1.0, 2: 10.0, 3: 3.0}  # type: ignore[arg-type]
+        )
+        order: list[int] = []
+
+        report = scheduler.run(lambda device: order.append(device.id))
+
+        self.assertEqual(order, [2, 3, 4, 1])
+        self.assertEqual((report.devices, report.errors, report.peak_workers), (4, 0, 1))
+
+    def test_concurrency_is_capped_per_group_and_vendor(self) -> None:
+        """No more than the configured number of devices of one group and vendor run at once."""
+        devices = [make_device(i, group_id=i % 2, vendor="Eltex" if i < 10 else "") for i in range(20)]
+        lock = threading.Lock()
+        running: dict[object, int] = defaultdict(int)
+        peaks: dict[object, int] = defaultdict(int)
+
+        def poll(device) -> None:
+            keys = [("group", device.group_id), ("vendor", device.vendor)]
+            with lock:
+                for key in keys:
+                    running[key] += 1
+                    peaks[key] = max(peaks[key], running[key])
+            time.sleep(0.01)
+            with lock:
+                for key in keys:
+                    running[key] -= 1
+
+        scheduler = AdaptiveDeviceScheduler(
+            devices, max_workers=10, max_per_group=4, max_per_vendor=3  # type: ignore[arg-type]
+        )
+        report = scheduler.run(poll)
+
+        self.assertLessEqual(peaks[("group", 0)], 4)
+        self.assertLessEqual(peaks[("group", 1)], 4)
+        self.assertLessEqual(peaks[("vendor", "Eltex")], 3)
+        self.assertEqual(report.devices, 20)
+
+    def test_workers_are_reduced_on_errors_and_slowdown(self) -> None:
+        """Worker count halves on a window with errors or slow responses and then recovers."""
+        scheduler = AdaptiveDeviceScheduler([], max_workers=40, durations={1: 1.0})
+        scheduler.window_size = 2
+
+        scheduler._observe(make_device(2), 0.1, True)  # type: ignore[arg-type]
+        scheduler._observe(make_device(2), 0.1, False)  # type: ignore[arg-type]
+        self.assertEqual(scheduler.workers, 20)
+
+        scheduler._observe(make_device(1), 5.0, False)  # type: ignore[arg-type]
+        scheduler._observe(make_device(1), 5.0, False)  # type: ignore[arg-type]
+        self.assertEqual(scheduler.workers, 10)
+
+        scheduler._observe(make_device(1), 1.0, False)  # type: ignore[arg-type]
+        scheduler._observe(make_device(2), 1.0, False)  # type: ignore[arg-type]
+        self.assertEqual(scheduler.workers, 14)
+
+    def test_task_reports_sweep(self) -> None:
+        """Thread task runs devices through the scheduler and writes results in one batch."""
+        task = SuccessfulThreadTask()
+        result = DeviceGatheringResult(device_id=1, status=DeviceGatheringResult.Status.SUCCESS)
+
+        with (
+            patch.object(task, "get_devices_durations", return_value={}),
+            patch.object(task, "_run_thread_task", return_value=result),
+            patch.object(task, "update_state") as update_state,
+            patch.object(task, "log_sweep") as log_sweep,
+            patch.object(DeviceGatheringResult.objects, "bulk_create") as bulk_create,
+        ):
+            task.create_threads(MagicMock())
+
+        bulk_create.assert_called_once_with([result], batch_size=200)
+        update_state.assert_called_once_with(scanned=1)
+        log_sweep.assert_called_once_with(task.sweep_report, results_written=1, results_queries=1)
+        self.assertEqual(task.sweep_report.devices, 1)  # type: ignore[union-attr]
+
+    def test_sweep_reachability_is_used_by_thread_tasks(self) -> None:
+        """Devices are checked once before the sweep, threads do not ping them again."""
+        task = SuccessfulThreadTask()
+        task.check_reachability = True
+        device = SimpleNamespace(id=1, ip="192.0.2.1", group_id=1, vendor="", available=None)
+        task.queryset = MagicMock()
+        task.queryset.all.return_value = [device]
+        unknown = SimpleNamespace(id=2, ip="192.0.2.2", available=True)
+        seen: list[bool] = []
+
+        def run_thread_task(obj, gathering_task):
+            seen.append(task.is_available(obj))
+            return DeviceGatheringResult(device_id=obj.id, status=DeviceGatheringResult.Status.SUCCESS)
+
+        with (
+            patch(
+                "apps.gathering.services.collectors.get_devices_reachability",
+                return_value={"192.0.2.1": False},
+            ) as get_reachability,
+            patch.object(task, "get_devices_durations", return_value={}),
+            patch.object(task, "_run_thread_task", side_effect=run_thread_task),
+            patch.object(task, "update_state"),
+            patch.object(task, "log_sweep"),
+            patch.object(DeviceGatheringResult.objects, "bulk_create"),
+        ):
+            task.create_threads(MagicMock())
+
+        get_reachability.assert_called_once()
+        self.assertEqual(seen, [False])
+        # A device missing from the sweep check falls back to `Devices.available`.
+        self.assertTrue(task.is_available(unknown))  # type: ignore[arg-type]
+
+    def test_prefetch_methods_are_called_in_batches(self) -> None:
+        """Prefetched results are taken by threads once, errors and unavailable devices are skipped."""
+        task = SuccessfulThreadTask()
+        task.prefetch_methods = ("get_interfaces",)
+        devices = [
+            SimpleNamespace(id=i, ip=f"192.0.2.{i}", connect=lambda i=i: SimpleNamespace(ip=f"192.0.2.{i}"))
+            for i in range(1, 4)
+        ]
+        task.reachability = {"192.0.2.1": True, "192.0.2.2": True, "192.0.2.3": False}
+
+        def perform_batch(calls):
+            self.assertEqual([call.device.ip for call in calls], ["192.0.2.1", "192.0.2.2"])
+            yield calls[0], [["eth1", "up", ""]]
+            yield calls[1], ConnectionError("connector")
+
+        with patch("apps.gathering.services.collectors.pool_controller") as controller:
+            controller.perform_batch.side_effect = perform_batch
+            self.assertEqual(task.prefetch(devices), 1)  # type: ignore[arg-type]
+
+        self.assertEqual(task.get_prefetched(devices[0], "get_interfaces"), [["eth1", "up", ""]])  # type: ignore[arg-type]
+        self.assertIsNone(task.get_prefetched(devices[0], "get_interfaces"))  # type: ignore[arg-type]
+        self.assertIsNone(task.get_prefetched(devices[1], "get_interfaces"))  # type: ignore[arg-type]
+
+    def test_prefetch_is_skipped_without_device_connector(self) -> None:
+        """Without a device connector, threads call device methods as usual."""
+        task = SuccessfulThreadTask()
+        task.prefetch_methods = ("get_interfaces",)
+
+        with patch("apps.gathering.services.collectors.pool_controller") as controller:
+            controller.enabled = False
+            self.assertEqual(task.prefetch([SimpleNamespace(id=1, ip="192.0.2.1")]), 0)  # type: ignore[list-item]
 
-        self.assertEqual(result, DeviceGatheringResult.Status.FAILURE)
-        self.assertEqual(create_result.return_value.error_type, "RuntimeError")
-        self.assertEqual(create_result.return_value.error_message, "boom")
-        close_old_connections.assert_called_once_with()
-        close_all.assert_called_once_with()
+        controller.perform_batch.assert_not_called()
 
 
 class ErrorHandlerTests(SimpleTestCase):
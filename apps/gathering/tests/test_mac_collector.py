@@ -0,0 +1,129 @@
+from datetime import timedelta
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.check.models import AuthGroup, DeviceGroup, Devices
+from apps.gathering.models import MacAddress
+from apps.gathering.services.mac import MacAddressTableGather, get_mac_history_storage
+from devicemanager.device import Interfaces
+
+
+class MacAddressTableGatherTests(TestCase):
+    """Tests for storing only the changes of the collected MAC table."""
+
+    def setUp(self) -> None:
+        """Create a device used by MAC collector tests."""
+        cache.clear()
+        group = DeviceGroup.objects.create(name="ASW")
+        auth_group = AuthGroup.objects.create(name="auth", login="login", password="password")
+        self.device = Devices.objects.create(
+            ip="192.0.2.10",
+            name="sw1",
+            group=group,
+            auth_group=auth_group,
+        )
+
+    def collect(self, table: list) -> MacAddressTableGather:
+        session = Mock(spec=["get_mac_table"])
+        session.get_mac_table.return_value = table
+        gather = MacAddressTableGather(
+            self.device,
+            session=session,
+            interfaces=Interfaces(),
+            interfaces_desc={"1": "abon 1", "2": "abon 2"},
+            normalize_interface=lambda port: port if port != "CPU" else "",
+        )
+        gather.run_gathering()
+        return gather
+
+    def rows(self) -> list[tuple]:
+        return list(
+            MacAddress.objects.filter(device=self.device)
+            .order_by("address")
+            .values_list("address", "port", "vlan", "type", "desc")
+        )
+
+    def test_first_collect_inserts_table(self):
+        gather = self.collect(
+            [(10, "00-11-22-33-44-55", "dynamic", "1"), (10, "0011.2233.4466", "static", "CPU")]
+        )
+
+        self.assertEqual(self.rows(), [("001122334455", "1", 10, "D", "abon 1")])
+        self.assertEqual((gather.delta.inserted, gather.delta.saved_writes), (1, 0))
+
+    def test_unchanged_table_only_touches_rows(self):
+        table = [(10, "00-11-22-33-44-55", "dynamic", "1"), (20, "00-11-22-33-44-66", "dynamic", "2")]
+        self.collect(table)
+        MacAddress.objects.update(datetime=timezone.now() - timedelta(hours=2))
+
+        with self.assertNumQueries(3):  # Транзакция и одно обновление времени.
+            gather = self.collect(table)
+
+        self.assertTrue(gather.delta.fingerprint_matched)
+        self.assertEqual((gather.delta.touched, gather.delta.saved_writes), (2, 2))
+        self.assertFalse(MacAddress.objects.filter(datetime__lt=timezone.now() - timedelta(hours=1)).exists())
+
+    def test_changed_table_writes_only_delta(self):
+        self.collect([(10, "00-11-22-33-44-55", "dynamic", "1"), (20, "00-11-22-33-44-66", "dynamic", "2")])
+
+        gather = self.collect(
+            [
+                (10, "00-11-22-33-44-55", "dynamic", "1"),
+                (30, "00-11-22-33-44-66", "dynamic", "2"),
+                (10, "00-11-22-33-44-77", "dynamic", "2"),
+            ]
+        )
+
+        self.assertEqual(
+            self.rows(),
+            [
+                ("001122334455", "1", 10, "D", "abon 1"),
+                ("001122334466", "2", 30, "D", "abon 2"),
+                ("001122334477", "2", 10, "D", "abon 2"),
+            ],
+        )
+        delta = gather.delta
+        self.assertEqual((delta.inserted, delta.updated, delta.deleted, delta.saved_writes), (1, 1, 0, 1))
+
+        gather = self.collect([(10, "00-11-22-33-44-55", "dynamic", "1")])
+
+        self.assertEqual(self.rows(), [("001122334455", "1", 10, "D", "abon 1")])
+        self.assertEqual(gather.delta.deleted, 2)
+
+    def test_previous_sightings_are_archived(self):
+        self.collect([(10, "00-11-22-33-44-55", "dynamic", "1"), (20, "00-11-22-33-44-66", "dynamic", "2")])
+
+        gather = self.collect([(30, "00-11-22-33-44-55", "dynamic", "1")])
+
+        history = get_mac_history_storage()
+        self.assertEqual(gather.delta.archived, 2)
+        self.assertEqual([(s.port, s.vlan) for s in history.history("001122334455")], [("1", 10)])
+        self.assertEqual([(s.port, s.vlan) for s in history.history("001122334466")], [("2", 20)])
+
+    def test_empty_table_keeps_rows(self):
+        self.collect([(10, "00-11-22-33-44-55", "dynamic", "1")])
+
+        self.collect([])
+
+        self.assertEqual(len(self.rows()), 1)
+
+    def test_row_inserted_concurrently_is_updated(self):
+        """A row added by a parallel task after the table was read does not break the insert."""
+        storage = get_mac_history_storage()
+
+        def insert_concurrently(sightings):
+            MacAddress.objects.create(
+                address="001122334455", port="1", vlan=20, type="S", desc="", device=self.device
+            )
+            return storage.add(sightings)
+
+        with patch(
+            "apps.gathering.services.mac.collector.get_mac_history_storage",
+            return_value=Mock(add=Mock(side_effect=insert_concurrently)),
+        ):
+            self.collect([(10, "00-11-22-33-44-55", "dynamic", "1")])
+
+        self.assertEqual(self.rows(), [("001122334455", "1", 10, "D", "abon 1")])
@@ -0,0 +1,79 @@
+from datetime import UTC, datetime, timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.check.models import AuthGroup, DeviceGroup, Devices
+from apps.gathering.models import MacAddress
+from apps.gathering.services.mac import MacSighting, expire_mac_addresses, get_mac_history_storage
+
+
+class MacHistoryStorageTests(TestCase):
+    """Tests for the day-partitioned MAC history (days of a plain table on SQLite)."""
+
+    def setUp(self) -> None:
+        group = DeviceGroup.objects.create(name="ASW")
+        auth_group = AuthGroup.objects.create(name="auth", login="login", password="password")
+        self.device = Devices.objects.create(ip="192.0.2.10", name="sw1", group=group, auth_group=auth_group)
+        self.storage = get_mac_history_storage()
+
+    def sighting(self, port: str, seen: datetime) -> MacSighting:
+        return MacSighting("001122334455", 10, "D", self.device.id, port, "abon", seen)
+
+    def test_sightings_are_stored_by_day(self):
+        first = self.sighting("1", datetime(2026, 10, 1, 23, 59, tzinfo=UTC))
+        second = self.sighting("2", datetime(2026, 10, 2, 0, 1, tzinfo=UTC))
+
+        self.assertEqual(self.storage.add([second, first]), 2)
+
+        self.assertEqual([day.day for day in self.storage.partitions()], [1, 2])
+        self.assertEqual(self.storage.history("001122334455"), [first, second])
+        self.assertEqual(self.storage.history("001122334466"), [])
+
+    def test_retention_drops_whole_partitions(self):
+        self.storage.add(
+            [
+                self.sighting("1", datetime(2026, 10, 1, 12, tzinfo=UTC)),
+                self.sighting("2", datetime(2026, 10, 3, 12, tzinfo=UTC)),
+            ]
+        )
+
+        dropped = self.storage.drop_older_than(datetime(2026, 10, 2).date())
+
+        self.assertEqual([day.day for day in dropped], [1])
+        self.assertEqual([day.day for day in self.storage.partitions()], [3])
+        self.assertEqual([s.port for s in self.storage.history("001122334455")], ["2"])
+
+    def test_expire_mac_addresses(self):
+        now = timezone.now()
+        self.storage.add([self.sighting("1", now - timedelta(days=5))])
+        fresh = MacAddress.objects.create(
+            address="001122334455", vlan=10, type="D", device=self.device, port="1", desc=""
+        )
+        stale = MacAddress.objects.create(
+            address="001122334466", vlan=10, type="D", device=self.device, port="2", desc=""
+        )
+        MacAddress.objects.filter(pk=stale.pk).update(datetime=now - timedelta(hours=49))
+
+        result = expire_mac_addresses()
+
+        self.assertEqual(result["staleDeleted"], 1)
+        self.assertEqual(len(result["droppedPartitions"]), 1)
+        self.assertEqual(list(MacAddress.objects.values_list("pk", flat=True)), [fresh.pk])
+        self.assertEqual(self.storage.partitions(), [])
+
+    def test_add_does_not_create_partitions(self):
+        with mock.patch.object(type(self.storage), "ensure_partition") as ensure_partition:
+            self.storage.add([self.sighting("1", timezone.now())])
+            self.assertEqual(self.storage.add([]), 0)
+
+        ensure_partition.assert_not_called()
+
+    def test_expire_mac_addresses_creates_partitions_once(self):
+        today = timezone.now().astimezone(UTC).date()
+        with mock.patch.object(type(self.storage), "ensure_partition") as ensure_partition:
+            expire_mac_addresses()
+
+        ensure_partition.assert_has_calls([mock.call(today), mock.call(today + timedelta(days=1))])
+        self.assertEqual(ensure_partition.call_count, 2)
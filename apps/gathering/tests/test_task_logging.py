@@ -10,6 +10,7 @@ from apps.check.models import AuthGroup, DeviceGroup, Devices
 from apps.gathering.apps import register_tasks
 from apps.gathering.models import DeviceGatheringResult, GatheringTask
 from apps.gathering.services.collectors import ThreadUpdatedStatusDeviceTask
+from apps.gathering.services.result_writer import GatheringResultWriter
 from apps.gathering.tasks import cleanup_gathering_tasks_task
 from ecstasy_project.celery import app
 
@@ -160,6 +161,36 @@ class GatheringTaskLoggingTests(TransactionTestCase):
         self.assertFalse(DeviceGatheringResult.objects.filter(id=result.id).exists())
 
 
+class GatheringResultWriterTests(TestCase):
+    """Тесты сохранения результатов опроса пачками."""
+
+    def test_results_are_written_in_batches(self) -> None:
+        """Результаты сохраняются одним запросом на пачку, прогресс обновляется после сохранения."""
+
+        group = DeviceGroup.objects.create(name="Batch")
+        auth_group = AuthGroup.objects.create(name="batch", login="user", password="password")
+        devices = [
+            Devices.objects.create(group=group, auth_group=auth_group, ip=f"192.0.2.{i}", name=f"sw-{i}")
+            for i in range(1, 6)
+        ]
+        gathering_task = GatheringTask.objects.create(task_id=str(uuid4()), name="batch", total_devices=5)
+        flushed: list[int] = []
+        writer = GatheringResultWriter(on_flush=flushed.append, batch_size=2, flush_interval=3600)
+
+        with self.assertNumQueries(2):
+            for device in devices:
+                writer.add(
+                    DeviceGatheringResult(task=gathering_task, device=device, finished_at=timezone.now())
+                )
+        with self.assertNumQueries(1):
+            writer.flush()
+            writer.flush()
+
+        self.assertEqual(flushed, [2, 2, 1])
+        self.assertEqual((writer.written, writer.queries), (5, 3))
+        self.assertEqual(gathering_task.device_results.count(), 5)
+
+
 class GatheringCleanupTaskTests(TestCase):
     """Тесты очистки истории периодических опросов."""
 
@@ -3,11 +3,13 @@ from unittest.mock import MagicMock, patch
 
 from django.test import TestCase
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from apps.check.models import AuthGroup, DeviceGroup, Devices, User
 from apps.gathering.models import MacAddress, Vlan, VlanPort
+from apps.gathering.services.mac import MacSighting, get_mac_history_storage
 from apps.gathering.services.vlan.collector import VlanTableGather
 from devicemanager.vendors.dlink import Dlink
 
@@ -246,6 +248,36 @@ class VlanAPITests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
 
+    def test_mac_address_history_returns_only_allowed_devices(self):
+        """Return previous appearances of a MAC address only on devices available to the user."""
+        get_mac_history_storage().add(
+            [
+                MacSighting("001122334455", 30, "D", self.device.id, "2", "", timezone.now()),
+                MacSighting(
+                    "001122334455", 20, "D", self.forbidden_mac_address.device_id, "1", "", timezone.now()
+                ),
+            ]
+        )
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(
+            reverse("gathering-api:mac-address-history"), {"address": "00:11:22:33:44:55"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row["device_name"], row["port"], row["vlan"]) for row in response.data],
+            [("sw-allowed", "2", 30)],
+        )
+
+    def test_mac_address_history_requires_full_address(self):
+        """Reject partial MAC addresses for the history lookup."""
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse("gathering-api:mac-address-history"), {"address": "11-22-33"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_vlan_list_returns_only_allowed_devices(self):
         """Return VLANs only for devices available to the current user."""
         self.client.force_authenticate(user=self.user)
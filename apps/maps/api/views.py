@@ -1,10 +1,12 @@
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
 from rest_framework import generics
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from ..models import Maps, TileLayer
-from ..services.maps import get_map_layers_geo_data, get_zabbix_problems_on_map
+from ..services.maps import build_map_layers, get_map_layers_versions, get_zabbix_problems_on_map
 from .permissions import CanViewMapsPermission, MapPermission
 from .serializers import MapDetailSerializer, MapLayerSerializer, MapSerializer, TileLayerSerializer
 from .swagger.schemas import map_layers_render_api_doc, map_update_layers_api_doc
@@ -50,10 +52,22 @@ class InteractiveMapAPIView(generics.RetrieveAPIView):
     def get(self, request, *args, **kwargs) -> Response:
         """
         Эта функция извлекает данные из слоев объекта карты и возвращает их в формате списка.
+
+        Ответ содержит ETag версий слоев, если слои не изменились, то возвращается 304 без их сборки.
         """
         map_obj = self.get_object()
-        data = get_map_layers_geo_data(map_obj)
-        return Response(data)
+        layers_versions = get_map_layers_versions(map_obj)
+        etag = quote_etag(layers_versions.etag)
+
+        conditional_response = get_conditional_response(request, etag=etag)
+        if conditional_response is not None:
+            # 304 (или 412 для If-Match) без сборки слоев.
+            response = Response(status=conditional_response.status_code)
+        else:
+            response = Response(build_map_layers(layers_versions))
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
 
 class UpdateInteractiveMapAPIView(generics.RetrieveAPIView):
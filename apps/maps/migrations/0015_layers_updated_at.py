@@ -0,0 +1,18 @@
+# Generated by Django 6.0.9 on 2026-10-18 20:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("maps", "0014_tilelayer_url_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="layers",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="Дата обновления"),
+        ),
+    ]
@@ -140,6 +140,7 @@ class Layers(models.Model):
         default="circle-fill",
         verbose_name="Выберите иконку",
     )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата обновления")
 
     def __str__(self) -> str:
         return f"[{self.type}] Layer:({self.name})"
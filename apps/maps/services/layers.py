@@ -10,7 +10,9 @@ from apps.check.models import Devices
 from ..models import Layers
 
 
-def get_zabbix_layer_data(zbx_session: ZabbixAPI, layer: Layers) -> dict:
+def get_zabbix_layer_data(
+    zbx_session: ZabbixAPI, layer: Layers, zbx_settings: ZabbixConfig | None = None
+) -> dict:
     """
     Эта функция извлекает данные для слоя Zabbix и возвращает их в формате словаря
     со следующими ключами и значениями:
@@ -22,6 +24,7 @@ def get_zabbix_layer_data(zbx_session: ZabbixAPI, layer: Layers) -> dict:
 
     :param zbx_session: Объект ZabbixAPI.
     :param layer: Объект слоя Zabbix.
+    :param zbx_settings: Настройки Zabbix для описания узлов сети, по умолчанию загружаются из БД.
     :return: Словарь со следующими ключами и значениями: "name", "type", "features".
     """
 
@@ -36,6 +39,7 @@ def get_zabbix_layer_data(zbx_session: ZabbixAPI, layer: Layers) -> dict:
             group_id=int(group[0]["groupid"]),
             group_name=layer.zabbix_group_name,
             current_layer=layer,
+            zbx_settings=zbx_settings,
         )
 
     return {
@@ -153,7 +157,13 @@ def get_device_group_layer_data(layer: Layers) -> dict:
     return layer_data
 
 
-def get_zbx_group_data(zbx_session: ZabbixAPI, group_id: int, group_name: str, current_layer: Layers) -> dict:
+def get_zbx_group_data(
+    zbx_session: ZabbixAPI,
+    group_id: int,
+    group_name: str,
+    current_layer: Layers,
+    zbx_settings: ZabbixConfig | None = None,
+) -> dict:
     """
     Эта функция извлекает данные для указанной группы Zabbix, включая информацию
     о хосте и данные о местоположении, и возвращает их в формате GEOJSON.
@@ -164,11 +174,13 @@ def get_zbx_group_data(zbx_session: ZabbixAPI, group_id: int, group_name: str, c
     :param current_layer: Параметр current_layer — это переменная типа данных Layers,
      которая передается функции в качестве аргумента. Он используется для определения
      слоя карты, на котором будут отображаться данные.
+    :param zbx_settings: Настройки Zabbix для описания узлов сети, по умолчанию загружаются из БД.
     :return: Словарь, содержащий ключ "type" со значением "FeatureCollection"
      и ключ "features" со списком словарей в качестве значения. Каждый словарь в списке
      «features» представляет хост Zabbix и содержит информацию о его расположении и свойствах.
     """
     features: list[dict] = []
+    zbx_settings = zbx_settings or ZabbixConfig.load()
 
     hosts = zbx_session.host.get(
         groupids=group_id,
@@ -194,7 +206,7 @@ def get_zbx_group_data(zbx_session: ZabbixAPI, group_id: int, group_name: str, c
                 "type": "Feature",
                 "id": host["hostid"],
                 "geometry": _get_geometry_for_zbx_host(host),
-                "properties": _get_properties_for_zbx_host(host, group_name, current_layer),
+                "properties": _get_properties_for_zbx_host(host, group_name, current_layer, zbx_settings),
             }
         )
 
@@ -224,18 +236,21 @@ def _get_geometry_for_zbx_host(host: dict) -> dict:
     }
 
 
-def _get_properties_for_zbx_host(host: dict, group_name: str, current_layer: Layers) -> dict:
+def _get_properties_for_zbx_host(
+    host: dict, group_name: str, current_layer: Layers, zbx_settings: ZabbixConfig
+) -> dict:
     """
     Функция принимает хост Zabbix и возвращает словарь, содержащий информацию о свойствах хоста.
 
     :param host: Хост Zabbix.
     :param group_name: Название группы, в которой хост находится.
     :param current_layer: :class:`Layers`, содержит информацию об определенном слое на карте.
+    :param zbx_settings: Настройки Zabbix.
     :return: Словарь, содержащий информацию о свойствах хоста.
     """
     return {
         "name": host["name"],
-        "description": _get_description_for_zbx_host(host),
+        "description": _get_description_for_zbx_host(host, zbx_settings),
         "group": group_name,
         "figure": "circle",
         "iconName": current_layer.marker_icon_name,
@@ -250,11 +265,12 @@ def _get_properties_for_zbx_host(host: dict, group_name: str, current_layer: Lay
     }
 
 
-def _get_description_for_zbx_host(host: dict) -> str:
+def _get_description_for_zbx_host(host: dict, zbx_settings: ZabbixConfig) -> str:
     """
     Функция принимает хост Zabbix и возвращает описание хоста.
 
     :param host: Хост Zabbix.
+    :param zbx_settings: Настройки Zabbix.
     :return: Описание хоста.
     """
 
@@ -268,7 +284,7 @@ def _get_description_for_zbx_host(host: dict) -> str:
     return render_to_string(
         "maps/zbx_popup.html",
         {
-            "zbx_settings": ZabbixConfig.load(),
+            "zbx_settings": zbx_settings,
             "host": host,
         },
     )
@@ -1,8 +1,11 @@
 from datetime import datetime
+from hashlib import sha256
 
 from django.utils import timezone
 from pyzabbix.api import ZabbixAPI
 
+from apps.check.services.zabbix_hosts import get_zabbix_group_hosts_ids
+from devicemanager.device.zabbix_api import get_batched
 from ecstasy_project.decorators import cached
 
 
@@ -14,45 +17,72 @@ def get_group_problems(zbx_session: ZabbixAPI, zabbix_group_name: str) -> list[d
     :param zbx_session: Сессия Zabbix API.
     :param zabbix_group_name: Строка, представляющая имя группы Zabbix.
     """
-    group: list = zbx_session.hostgroup.get(filter={"name": zabbix_group_name})
-    if not group:  # Если такая группа НЕ существует.
-        return []
+    return get_groups_problems(zbx_session, [zabbix_group_name])
+
+
+@cached(
+    20,
+    key=lambda _, groups: "zabbix:groups_problems:" + sha256("\0".join(sorted(groups)).encode()).hexdigest(),
+)
+def get_groups_problems(zbx_session: ZabbixAPI, zabbix_groups_names: list[str]) -> list[dict]:
+    """
+    Эта функция возвращает список проблем для всех узлов сети данных групп Zabbix.
 
-    zabbix_group_id = group[0]["groupid"]
+    Узлы сети групп берутся из локальной копии Zabbix, проблемы всех групп запрашиваются вместе,
+    а узлы сети всех проблем - одним запросом по их триггерам.
 
-    hosts_id = [
-        host["hostid"]
-        # Получение всех хостов на мониторинге в группе с заданным идентификатором.
-        for host in zbx_session.host.get(
-            groupids=[zabbix_group_id], output=["hostid"], filter={"status": "0"}
+    :param zbx_session: Сессия Zabbix API.
+    :param zabbix_groups_names: Имена групп Zabbix.
+    """
+    hosts_id = list(
+        dict.fromkeys(
+            host_id
+            for group_name in zabbix_groups_names
+            for host_id in get_zabbix_group_hosts_ids(zbx_session, group_name)
         )
-    ]
+    )
+    if not hosts_id:
+        return []
 
     # Получение проблемы узла сети из Zabbix.
-    hosts_problems_list = zbx_session.problem.get(
-        hostids=hosts_id,
+    hosts_problems_list = get_batched(
+        zbx_session.problem.get,
+        hosts_id,
         selectAcknowledges="extend",
         output="extend",
         filter={"name": "Оборудование недоступно"},
     )
 
+    # ID узла сети, у которого проблема, по ID триггера проблемы.
+    triggers_hosts = {
+        trigger["triggerid"]: trigger["hosts"][0]["hostid"]
+        for trigger in get_batched(
+            zbx_session.trigger.get,
+            (problem["objectid"] for problem in hosts_problems_list),
+            param="triggerids",
+            output=["triggerid"],
+            selectHosts=["hostid"],
+        )
+        if trigger.get("hosts")
+    }
+
     # Перебор списка проблем.
-    return [get_host_acknowledges(zbx_session, problem) for problem in hosts_problems_list]
+    return [
+        get_host_acknowledges(problem, triggers_hosts[problem["objectid"]])
+        for problem in hosts_problems_list
+        if problem["objectid"] in triggers_hosts
+    ]
 
 
-def get_host_acknowledges(zbx_session: ZabbixAPI, problem: dict) -> dict:
+def get_host_acknowledges(problem: dict, host_id: str) -> dict:
     """
     Эта функция извлекает подтверждения для данного сетевого узла с проблемой.
 
-    :param zbx_session: Сессия Zabbix API.
     :param problem: Словарь, содержащий информацию о проблеме в сетевом узле
+    :param host_id: ID узла сети, у которого проблема.
     :return: Словарь, содержащий идентификатор сетевого узла с проблемой и
      список подтверждений (если есть) для этой проблемы.
     """
-    # ID узла сети, у которого проблема.
-
-    host = zbx_session.item.get(triggerids=[problem["objectid"]], output=["hostid", "name"])
-
     acknowledges = [
         [
             ack["message"],
@@ -63,4 +93,4 @@ def get_host_acknowledges(zbx_session: ZabbixAPI, problem: dict) -> dict:
         for ack in problem["acknowledges"]
     ]
 
-    return {"id": host[0]["hostid"], "acknowledges": acknowledges}
+    return {"id": host_id, "acknowledges": acknowledges}
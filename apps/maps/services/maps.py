@@ -1,58 +1,225 @@
+"""
+# Сборка слоев интерактивной карты.
+
+Сначала для каждого слоя определяется версия, не собирая сам слой: для файла - время изменения
+слоя и файла, для группы оборудования - хеш полей оборудования группы, для группы Zabbix - время
+изменения слоя, версия настроек Zabbix и интервал `MAP_ZABBIX_LAYER_CACHE_TIMEOUT` секунд
+(данные Zabbix не имеют ревизии, поэтому слой живет в кэше не дольше этого интервала).
+Из версий складывается ETag карты, так что на условный запрос ответ 304 дается без сборки слоев.
+
+Слои, которых нет в кэше под их версией, собираются: из файлов и групп Zabbix - одновременно
+в пуле потоков, групп оборудования - запросом к БД в текущем потоке.
+"""
+
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from hashlib import sha256
+
+import orjson
+from django.core.cache import cache
+from django.db import connection
 from django.db.models import QuerySet
 from requests import RequestException
 from rest_framework.exceptions import APIException
 
+from apps.app_settings.models import ZabbixConfig
+from apps.app_settings.zabbix_config_cache import build_zabbix_config_version
+from apps.check.models import Devices
 from devicemanager.device import zabbix_api
 
 from ..models import Layers, Maps
 from .layers import get_device_group_layer_data, get_file_layer_data, get_zabbix_layer_data
-from .map_alerts import get_group_problems
+from .map_alerts import get_groups_problems
 
+MAP_LAYERS_MAX_WORKERS = int(os.getenv("MAP_LAYERS_MAX_WORKERS", "8"))
+MAP_LAYER_CACHE_TIMEOUT = int(os.getenv("MAP_LAYER_CACHE_TIMEOUT", str(60 * 60 * 24)))
+MAP_ZABBIX_LAYER_CACHE_TIMEOUT = int(os.getenv("MAP_ZABBIX_LAYER_CACHE_TIMEOUT", "60"))
+
+# Поля оборудования, из которых состоит слой группы оборудования.
+DEVICE_GROUP_LAYER_FIELDS = (
+    "id",
+    "name",
+    "ip",
+    "group__name",
+    "latitude",
+    "longitude",
+    "vendor",
+    "model",
+    "serial_number",
+    "os_version",
+)
+
+
+@dataclass(slots=True)
+class MapLayersData:
+    """Данные слоев карты и их общий ETag."""
+
+    layers: list[dict]
+    etag: str
+
+
+@dataclass(slots=True)
+class MapLayersVersions:
+    """Слои карты, которые можно собрать, их версии и ETag карты."""
+
+    layers: list[Layers]
+    versions: dict[int, str]
+    etag: str
+    zbx_settings: ZabbixConfig
+
+
+def _file_layer_version(layer: Layers) -> str | None:
+    try:
+        stat = os.stat(layer.from_file.path)
+    except (FileNotFoundError, ValueError):
+        return None
+    return f"file:{layer.updated_at.isoformat()}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _device_group_layer_version(layer: Layers) -> str:
+    devices = Devices.objects.filter(
+        group=layer.device_group, latitude__isnull=False, longitude__isnull=False
+    ).order_by("id")
+    digest = sha256(orjson.dumps(list(devices.values_list(*DEVICE_GROUP_LAYER_FIELDS)), default=str))
+    return f"device_group:{layer.updated_at.isoformat()}:{layer.device_group_id}:{digest.hexdigest()}"
+
+
+def _zabbix_layer_version(layer: Layers, zbx_settings_version: str) -> str:
+    period = int(time.time() // max(MAP_ZABBIX_LAYER_CACHE_TIMEOUT, 1))
+    return f"zabbix:{layer.updated_at.isoformat()}:{zbx_settings_version}:{period}"
+
+
+def _run_in_thread(func: Callable[[], dict]) -> dict:
+    """Собирает слой в потоке пула и закрывает соединение потока с БД, если оно было открыто."""
+    try:
+        return func()
+    finally:
+        connection.close()
 
-def get_map_layers_geo_data(map_object: Maps) -> list[dict]:
-    """Возвращает список гео данных для каждого слоя карты."""
-    layers_data = []
-    zabbix_layers = []
 
-    for layer in map_object.layers.all():  # type: Layers # Проходимся по введенным именам групп
-        if layer.type == "zabbix":
-            zabbix_layers.append(layer)
+def _build_zabbix_layer(layer: Layers, zbx_settings: ZabbixConfig) -> dict:
+    try:
+        with zabbix_api.connect() as zbx_session:
+            return get_zabbix_layer_data(zbx_session, layer, zbx_settings)
+    except RequestException as exc:
+        raise APIException({"detail": "Не удалось подключиться к Zabbix API"}) from exc
+
+
+def _layer_cache_key(layer_id: int, version: str) -> str:
+    return f"map_layer:{layer_id}:{sha256(version.encode()).hexdigest()}"
 
-        elif layer.type == "file":
-            layer_data = get_file_layer_data(layer)
-            if layer_data:
-                layers_data.append(layer_data)
 
+def get_map_layers_versions(map_object: Maps) -> MapLayersVersions:
+    """
+    ## Версии слоев карты и ETag карты без сборки слоев.
+
+    Слои из отсутствующих файлов пропускаются.
+    """
+    zbx_settings = ZabbixConfig.load()
+    zbx_settings_version = build_zabbix_config_version(zbx_settings)
+
+    layers: list[Layers] = []
+    versions: dict[int, str] = {}
+    for layer in map_object.layers.all():
+        version: str | None = None
+        if layer.type == "file":
+            version = _file_layer_version(layer)
+        elif layer.type == "zabbix":
+            version = _zabbix_layer_version(layer, zbx_settings_version)
         elif layer.type == "device_group":
-            layers_data.append(get_device_group_layer_data(layer))
+            version = _device_group_layer_version(layer)
+        if version is not None:
+            layers.append(layer)
+            versions[layer.id] = version
+
+    # Слои групп Zabbix идут после остальных слоев.
+    layers.sort(key=lambda item: item.type == "zabbix")
+    etag = sha256()
+    for layer in layers:
+        etag.update(f"{layer.id}={versions[layer.id]};".encode())
+    return MapLayersVersions(
+        layers=layers, versions=versions, etag=etag.hexdigest(), zbx_settings=zbx_settings
+    )
 
-    if zabbix_layers:  # Если есть zabbix слои
-        try:
-            with zabbix_api.connect() as zbx_session:
-                for layer in zabbix_layers:
-                    layer_data = get_zabbix_layer_data(zbx_session, layer)
-                    if layer_data:
-                        layers_data.append(layer_data)
-        except RequestException as exc:
-            raise APIException({"detail": "Не удалось подключиться к Zabbix API"}) from exc
 
-    return layers_data
+def build_map_layers(layers_versions: MapLayersVersions) -> list[dict]:
+    """
+    ## Собирает слои карты.
+
+    Слои берутся из кэша под их версией, остальные собираются одновременно.
+    :return: Данные непустых слоев в порядке `layers_versions.layers`.
+    """
+    cache_keys = {
+        layer.id: _layer_cache_key(layer.id, layers_versions.versions[layer.id])
+        for layer in layers_versions.layers
+    }
+    cached_layers = cache.get_many(list(cache_keys.values()))
+    results: dict[int, dict] = {
+        layer_id: cached_layers[key] for layer_id, key in cache_keys.items() if key in cached_layers
+    }
+
+    builders: dict[int, Callable[[], dict]] = {}
+    built: dict[int, dict] = {}
+    for layer in layers_versions.layers:
+        if layer.id in results:
+            continue
+        if layer.type == "file":
+            builders[layer.id] = partial(get_file_layer_data, layer)
+        elif layer.type == "zabbix":
+            builders[layer.id] = partial(_build_zabbix_layer, layer, layers_versions.zbx_settings)
+        elif layer.type == "device_group":
+            built[layer.id] = get_device_group_layer_data(layer)
+
+    if builders:
+        with ThreadPoolExecutor(max_workers=min(MAP_LAYERS_MAX_WORKERS, len(builders))) as executor:
+            futures = {
+                layer_id: executor.submit(_run_in_thread, build) for layer_id, build in builders.items()
+            }
+            built.update({layer_id: future.result() for layer_id, future in futures.items()})
+
+    if built:
+        results.update(built)
+        zabbix_layers = {layer.id for layer in layers_versions.layers if layer.type == "zabbix"}
+        for timeout, layers_ids in (
+            (MAP_LAYER_CACHE_TIMEOUT, built.keys() - zabbix_layers),
+            (MAP_ZABBIX_LAYER_CACHE_TIMEOUT, built.keys() & zabbix_layers),
+        ):
+            if layers_ids:
+                cache.set_many({cache_keys[layer_id]: built[layer_id] for layer_id in layers_ids}, timeout)
+
+    return [results[layer.id] for layer in layers_versions.layers if results.get(layer.id)]
+
+
+def get_map_layers(map_object: Maps) -> MapLayersData:
+    """
+    ## Собирает слои карты.
+
+    :return: Данные слоев в порядке слоев карты и ETag карты.
+    """
+    layers_versions = get_map_layers_versions(map_object)
+    return MapLayersData(layers=build_map_layers(layers_versions), etag=layers_versions.etag)
+
+
+def get_map_layers_geo_data(map_object: Maps) -> list[dict]:
+    """Возвращает список гео данных для каждого слоя карты."""
+    return get_map_layers(map_object).layers
 
 
 def get_zabbix_problems_on_map(map_object: Maps) -> list[dict]:
-    """Возвращает список текущих проблем для каждой zabbix группы на карте по каждому слою."""
+    """Возвращает список текущих проблем для всех zabbix групп на карте одним запросом."""
 
     layers: QuerySet[Layers] = map_object.layers.all()
-    groups = layers.values_list("zabbix_group_name", flat=True)
-    problems: list[dict] = []
+    groups = [group for group in layers.values_list("zabbix_group_name", flat=True) if group is not None]
+    if not groups:
+        return []
 
     try:
         with zabbix_api.connect() as zbx_session:
-            for group_name in groups:
-                if group_name is not None:
-                    problems += get_group_problems(zbx_session, group_name)
+            return get_groups_problems(zbx_session, groups)
 
     except RequestException as exc:
         raise APIException({"detail": "Не удалось подключиться к Zabbix API"}) from exc
-
-    return problems
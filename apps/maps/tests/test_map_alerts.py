@@ -0,0 +1,65 @@
+import time
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.check.models import ZabbixHost, ZabbixHostGroup
+from apps.check.services.zabbix_hosts import MIRROR_SYNCED_AT_CACHE_KEY
+from apps.check.tests.fake_zabbix import FakeZabbixServer
+
+from ..services.map_alerts import get_group_problems
+
+
+class GroupProblemsTests(TestCase):
+    """Проблемы группы Zabbix запрашиваются пачкой по узлам сети из локальной копии."""
+
+    def setUp(self):
+        cache.clear()
+        group = ZabbixHostGroup.objects.create(groupid=1, name="Switches")
+        for hostid in (10001, 10002, 10003):
+            host = ZabbixHost.objects.create(
+                hostid=hostid, host=f"sw{hostid}", name=f"sw{hostid}", synced_at="2026-01-01T00:00Z"
+            )
+            host.groups.add(group)
+
+    @staticmethod
+    def problems_handlers(problem_host_ids: tuple[str, str]) -> dict:
+        problems: list[dict] = [
+            {"objectid": "501", "acknowledges": [{"message": "Выехали", "clock": "0"}]},
+            {"objectid": "502", "acknowledges": []},
+        ]
+        return {
+            "problem.get": lambda params: problems,
+            "trigger.get": lambda params: [
+                {"triggerid": problem["objectid"], "hosts": [{"hostid": host_id}]}
+                for problem, host_id in zip(problems, problem_host_ids, strict=True)
+            ],
+        }
+
+    def test_problems_hosts_are_requested_in_one_call(self):
+        cache.set(MIRROR_SYNCED_AT_CACHE_KEY, time.time())
+        handlers = self.problems_handlers(("10001", "10003"))
+
+        with FakeZabbixServer(handlers) as server, server.connector().connect() as zbx:
+            result = get_group_problems(zbx, "Switches")
+
+        self.assertEqual(server.methods(), ["problem.get", "trigger.get"])
+        self.assertEqual(server.calls[-2][1]["hostids"], ["10001", "10002", "10003"])
+        self.assertEqual(server.calls[-1][1]["triggerids"], ["501", "502"])
+        self.assertEqual([problem["id"] for problem in result], ["10001", "10003"])
+        self.assertEqual(result[0]["acknowledges"][0][0], "Выехали")
+
+    def test_group_hosts_are_requested_from_zabbix_without_recent_sync(self):
+        handlers = {
+            **self.problems_handlers(("10001", "10004")),
+            "hostgroup.get": lambda params: [{"groupid": "1"}],
+            "host.get": lambda params: [{"hostid": str(hostid)} for hostid in (10001, 10002, 10003, 10004)],
+        }
+
+        with FakeZabbixServer(handlers) as server, server.connector().connect() as zbx:
+            result = get_group_problems(zbx, "Switches")
+
+        self.assertEqual(server.methods(), ["hostgroup.get", "host.get", "problem.get", "trigger.get"])
+        self.assertEqual(server.calls[-2][1]["hostids"], ["10001", "10002", "10003", "10004"])
+        # Узел сети 10004 есть в группе Zabbix, но не в локальной копии.
+        self.assertEqual([problem["id"] for problem in result], ["10001", "10004"])
@@ -0,0 +1,144 @@
+import os
+import tempfile
+import threading
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.app_settings.models import ZabbixConfig
+from apps.check.models import AuthGroup, DeviceGroup, Devices
+from apps.maps.models import Layers, Maps
+from apps.maps.services import maps as maps_service
+from apps.maps.services.maps import get_map_layers
+
+
+class MapLayersTests(APITestCase):
+    """Слои карты собираются одновременно и берутся из кэша, пока не изменились."""
+
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.map = Maps.objects.create(name="Network map")
+
+    def add_zabbix_layer(self, group_name: str) -> Layers:
+        layer = Layers.objects.create(name=group_name, zabbix_group_name=group_name)
+        self.map.layers.add(layer)
+        return layer
+
+    def test_file_layer_is_parsed_again_only_after_file_change(self):
+        layer = Layers.objects.create(
+            name="Districts",
+            from_file=SimpleUploadedFile(
+                "districts.geojson", b'{"type": "FeatureCollection", "features": []}'
+            ),
+        )
+        self.map.layers.add(layer)
+
+        with patch.object(
+            maps_service, "get_file_layer_data", wraps=maps_service.get_file_layer_data
+        ) as parse:
+            first = get_map_layers(self.map)
+            second = get_map_layers(self.map)
+            self.assertEqual(parse.call_count, 1)
+            self.assertEqual(first, second)
+
+            with open(layer.from_file.path, "wb") as file:
+                file.write(b'{"type": "FeatureCollection", "features": [{"type": "Feature"}]}')
+            os.utime(layer.from_file.path, ns=(0, 0))
+            third = get_map_layers(self.map)
+
+        self.assertEqual(parse.call_count, 2)
+        self.assertNotEqual(third.etag, first.etag)
+        self.assertEqual(third.layers[0]["features"]["features"], [{"type": "Feature"}])
+
+    def test_zabbix_layers_are_built_concurrently_and_cached_for_short_time(self):
+        self.add_zabbix_layer("Core")
+        self.add_zabbix_layer("Access")
+        barrier = threading.Barrier(2, timeout=5)
+
+        def build(layer, zbx_settings):
+            barrier.wait()  # Оба слоя должны собираться одновременно.
+            return {"name": layer.zabbix_group_name, "type": "zabbix", "features": {}}
+
+        with (
+            patch.object(maps_service, "_build_zabbix_layer", side_effect=build) as build_layer,
+            patch.object(maps_service.time, "time", return_value=1_000_000) as now,
+        ):
+            first = get_map_layers(self.map)
+            second = get_map_layers(self.map)
+            self.assertEqual(build_layer.call_count, 2)
+            self.assertEqual(second, first)
+
+            # Интервал кэширования слоев Zabbix прошел - слои собираются заново.
+            now.return_value += maps_service.MAP_ZABBIX_LAYER_CACHE_TIMEOUT
+            barrier = threading.Barrier(2, timeout=5)
+            third = get_map_layers(self.map)
+            self.assertEqual(build_layer.call_count, 4)
+            self.assertNotEqual(third.etag, first.etag)
+
+            # Изменились настройки Zabbix - тоже.
+            zbx_settings = ZabbixConfig.load()
+            zbx_settings.url, zbx_settings.login, zbx_settings.password = "https://zabbix", "admin", "new"
+            zbx_settings.save()
+            barrier = threading.Barrier(2, timeout=5)
+            fourth = get_map_layers(self.map)
+
+        self.assertEqual(build_layer.call_count, 6)
+        self.assertEqual(build_layer.call_args.args[1].password, "new")
+        self.assertNotEqual(fourth.etag, third.etag)
+
+    def test_device_group_layer_version_follows_devices(self):
+        group = DeviceGroup.objects.create(name="ASW")
+        device = Devices.objects.create(
+            ip="192.0.2.1",
+            name="switch-1",
+            group=group,
+            auth_group=AuthGroup.objects.create(name="test", login="test", password="test"),
+            latitude=55.75,
+            longitude=37.61,
+        )
+        self.map.layers.add(Layers.objects.create(name="ASW", device_group=group))
+
+        first = get_map_layers(self.map)
+        Devices.objects.filter(id=device.id).update(latitude=55.76)
+        second = get_map_layers(self.map)
+
+        self.assertNotEqual(second.etag, first.etag)
+        self.assertEqual(
+            second.layers[0]["features"]["features"][0]["geometry"]["coordinates"], [37.61, 55.76]
+        )
+
+    def test_render_returns_not_modified_for_same_etag(self):
+        user = get_user_model().objects.create_user(username="operator", password="password")
+        self.map.users.add(user)
+        self.client.force_authenticate(user)
+        url = reverse("maps-api:interactive-map-render", args=[self.map.id])
+        self.map.layers.add(
+            Layers.objects.create(
+                name="Districts",
+                from_file=SimpleUploadedFile(
+                    "districts.geojson", b'{"type": "FeatureCollection", "features": []}'
+                ),
+            )
+        )
+
+        response = self.client.get(url)
+        cache.clear()
+        with patch.object(maps_service, "get_file_layer_data") as build_layer:
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        # Ответ 304 дается по версиям слоев, без их сборки.
+        build_layer.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["name"], "Districts")
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified["ETag"], response["ETag"])
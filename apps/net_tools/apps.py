@@ -8,7 +8,7 @@ class FindDescConfig(AppConfig):
 
     def ready(self):
         # pylint: disable-next=import-outside-toplevel
-        from .models import VlanName
+        from .models import DevicesInfo, VlanName
         from .new_permissions import create_groups_with_permissions, create_permission
         from .services.default_objects import ensure_default_node_kinds
         from .services.vlan_names import VlanNamesCache
@@ -43,6 +43,12 @@ class FindDescConfig(AppConfig):
             weak=False,
             dispatch_uid=f"net_tools.{VlanNamesCache.cache_key}.clear_cache",
         )
+        post_save.connect(
+            devices_info_post_save_signal,
+            sender=DevicesInfo,
+            weak=False,
+            dispatch_uid="net_tools.devices_info.interface_snapshots",
+        )
 
 
 def register_task(*args, **kwargs) -> None:
@@ -58,3 +64,14 @@ def vlans_name_post_save_signal(sender, instance, created, **kwargs):
     from .services.vlan_names import VlanNamesCache
 
     VlanNamesCache.clear_cache()
+
+
+def devices_info_post_save_signal(sender, instance, created, update_fields=None, **kwargs):
+    """Пересобирает снимки интерфейсов, если изменились интерфейсы или VLAN устройства."""
+    if update_fields is not None and not {"interfaces", "vlans"} & set(update_fields):
+        return
+
+    # pylint: disable-next=import-outside-toplevel
+    from .services.interface_snapshots import save_interface_snapshots
+
+    save_interface_snapshots(instance)
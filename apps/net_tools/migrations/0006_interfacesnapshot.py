@@ -0,0 +1,190 @@
+# Generated by Django 6.0.9 on 2026-10-18 19:42
+
+import os
+import re
+
+import django.db.models.deletion
+import orjson
+from django.db import migrations, models
+
+# Копии логики `Interfaces`, `VlanSet` и `build_snapshot_fields` на момент создания миграции,
+# чтобы изменения этого кода не меняли результат миграции.
+
+MAX_VLAN = 4095
+VLAN_RANGE_REGEXP = re.compile(r"(\d+)(?:\s*(?:-|to)\s*(\d+))?")
+NON_ABON_INTERFACES_PATTERN = re.compile(
+    os.getenv(
+        "NON_ABON_INTERFACES_PATTERN",
+        r"power_monitoring|[as]sw\d|dsl|co[pr]m|msan|core|cr\d|nat|mx-\d|dns|bras|voip|fttb|honet",
+    ),
+    re.IGNORECASE,
+)
+
+
+def range_bits(start: int, end: int) -> int:
+    start, end = max(start, 0), min(end, MAX_VLAN)
+    if start > end:
+        return 0
+    return ((1 << (end - start + 1)) - 1) << start
+
+
+def vlans_bits(vlans) -> int:
+    """Битовая маска VLAN из списка чисел и строк с диапазонами (`"10-20"`, `"10 to 20"`)."""
+    if not isinstance(vlans, list):
+        return 0
+    bits = 0
+    for vlan in vlans:
+        if isinstance(vlan, int):
+            if 0 <= vlan <= MAX_VLAN:
+                bits |= 1 << vlan
+        elif isinstance(vlan, str):
+            for match in VLAN_RANGE_REGEXP.finditer(vlan):
+                start = int(match.group(1))
+                end = int(match.group(2) or start)
+                bits |= range_bits(min(start, end), max(start, end))
+    return bits
+
+
+def parse_interfaces(data: str | None) -> list[tuple[str, str, str, int]]:
+    """Интерфейсы `DevicesInfo` в виде кортежей `(name, status, desc, vlans_bits)`."""
+    rows = []
+    for intf in orjson.loads(data or "[]"):
+        if isinstance(intf, dict):
+            if (
+                intf.get("Status") is None
+                and intf.get("status") is None
+                and intf.get("Admin Status")
+                and intf.get("Link")
+            ):
+                # Старый формат.
+                status = "admin down" if intf["Admin Status"] == "down" else intf["Link"]
+            else:
+                status = intf.get("Status") or intf.get("status") or ""
+            name = intf.get("Interface") or intf.get("name") or ""
+            desc = intf.get("Description") or intf.get("description") or ""
+            vlans = intf.get("VLAN's") or intf.get("vlans") or []
+            rows.append((name.strip(), status.strip(), desc.strip(), vlans_bits(vlans)))
+        elif isinstance(intf, list) and len(intf) == 3:
+            rows.append((intf[0].strip(), intf[1], intf[2].strip(), 0))
+        elif isinstance(intf, list) and len(intf) == 4:
+            rows.append((intf[0].strip(), intf[1], intf[2].strip(), vlans_bits(intf[3])))
+    return rows
+
+
+def is_up(status: str) -> bool:
+    status = status.lower()
+    return "down" not in status and "disable" not in status and "dormant" not in status
+
+
+def has_description(desc: str) -> bool:
+    if "HUAWEI, Quidway Series" in desc:
+        return False
+    return len(desc.strip()) > 1
+
+
+def build_snapshot_fields(interfaces: list, vlans: list) -> list[dict]:
+    """Поля строк `InterfaceSnapshot` для интерфейсов устройства."""
+    source = interfaces or vlans
+    vlans_by_name: dict[str, int] = {}
+    for name, _, _, bits in vlans:
+        vlans_by_name.setdefault(name, bits)
+
+    # Описания физических портов: у выбранного комбо-порта - описание (C), а если его нет, то (F).
+    descs = [desc for _, _, desc, _ in source]
+    physical = set()
+    position = 0
+    while position < len(source):
+        name, status, desc, _ = source[position]
+        if position + 1 < len(source) and "(C)" in name and "(F)" in source[position + 1][0]:
+            combo = position if is_up(status) else position + 1
+            descs[combo] = desc if has_description(desc) else source[position + 1][2]
+            physical.add(combo)
+            position += 2
+        else:
+            physical.add(position)
+            position += 1
+
+    fields = []
+    for position, (name, status, desc, bits) in enumerate(source):
+        bits = vlans_by_name.get(name, bits)
+        fields.append(
+            {
+                "position": position,
+                "name": name,
+                "status": status,
+                "desc": desc,
+                "vlans": bits.to_bytes((bits.bit_length() + 7) // 8, "little"),
+                "physical": position in physical,
+                "abon": not NON_ABON_INTERFACES_PATTERN.search(descs[position]),
+                "up": is_up(status),
+                "has_desc": has_description(descs[position]),
+            }
+        )
+    return fields
+
+
+def fill_interface_snapshots(apps, schema_editor):
+    """Заполнить снимки интерфейсов из уже сохраненных `DevicesInfo`."""
+    devices_info_model = apps.get_model("net_tools", "DevicesInfo")
+    snapshot_model = apps.get_model("net_tools", "InterfaceSnapshot")
+    db_alias = schema_editor.connection.alias
+
+    devices_info = devices_info_model.objects.using(db_alias).filter(
+        models.Q(interfaces__isnull=False) | models.Q(vlans__isnull=False)
+    )
+    for device_info in devices_info.iterator():
+        fields = build_snapshot_fields(
+            parse_interfaces(device_info.interfaces), parse_interfaces(device_info.vlans)
+        )
+        snapshot_model.objects.using(db_alias).bulk_create(
+            [snapshot_model(device_id=device_info.dev_id, **row) for row in fields], batch_size=500
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("check", "0044_add_interface_change_desc_permission"),
+        ("net_tools", "0005_alter_descnameformat_options_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InterfaceSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("position", models.PositiveIntegerField(verbose_name="Порядковый номер")),
+                ("name", models.CharField(max_length=255, verbose_name="Интерфейс")),
+                ("status", models.CharField(max_length=255, verbose_name="Состояние")),
+                ("desc", models.TextField(blank=True, default="", verbose_name="Описание")),
+                ("vlans", models.BinaryField(default=b"", verbose_name="VLAN")),
+                ("physical", models.BooleanField(default=True)),
+                ("abon", models.BooleanField(default=True)),
+                ("up", models.BooleanField(default=False)),
+                ("has_desc", models.BooleanField(default=False)),
+                (
+                    "device",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="interface_snapshots",
+                        to="check.devices",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "device_interface_snapshot",
+                "ordering": ["device", "position"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("device", "position"), name="device_interface_snapshot_position"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(fill_interface_snapshots, migrations.RunPython.noop),
+    ]
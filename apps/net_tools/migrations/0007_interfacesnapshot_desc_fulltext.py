@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def add_desc_fulltext_index(apps, schema_editor):
+    """Добавить FULLTEXT индекс по описанию интерфейсов для поиска по подстроке (только MySQL)."""
+
+    if schema_editor.connection.vendor != "mysql":
+        return
+    # Стоп-слова InnoDB (например, `on`) выпадают из n-грамм и ломают поиск по подстроке.
+    schema_editor.execute("SET SESSION innodb_ft_enable_stopword = OFF")
+    schema_editor.execute(
+        "ALTER TABLE `device_interface_snapshot` "
+        "ADD FULLTEXT INDEX `device_interface_snapshot_desc_ft` (`desc`) WITH PARSER ngram"
+    )
+
+
+def remove_desc_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+    schema_editor.execute(
+        "ALTER TABLE `device_interface_snapshot` DROP INDEX `device_interface_snapshot_desc_ft`"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("net_tools", "0006_interfacesnapshot"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_desc_fulltext_index, remove_desc_fulltext_index),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 6.0.9 on 2026-10-18 19:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def bitmap_to_int(bitmap: bytes | memoryview | None) -> int:
+    return int.from_bytes(bytes(bitmap or b""), "little")
+
+
+def bitmap_to_ranges(bitmap: bytes | memoryview | None) -> list[tuple[int, int]]:
+    """Непрерывные диапазоны VLAN битовой карты: `[(from, to), ...]`."""
+    bits = bitmap_to_int(bitmap)
+    ranges = []
+    while bits:
+        start = (bits & -bits).bit_length() - 1
+        shifted = bits >> start
+        length = (shifted ^ (shifted + 1)).bit_length() - 1
+        ranges.append((start, start + length - 1))
+        bits &= ~(((1 << length) - 1) << start)
+    return ranges
+
+
+def fill_vlan_port_ranges(apps, schema_editor):
+    """Заполнить индекс VLAN портов и кол-во VLAN устройств из снимков интерфейсов."""
+    devices_info_model = apps.get_model("net_tools", "DevicesInfo")
+    snapshot_model = apps.get_model("net_tools", "InterfaceSnapshot")
+    vlan_range_model = apps.get_model("net_tools", "VlanPortRange")
+    db_alias = schema_editor.connection.alias
+
+    devices_vlans = {}
+    ranges = []
+    snapshots = snapshot_model.objects.using(db_alias).values_list("id", "device_id", "vlans")
+    for snapshot_id, device_id, vlans in snapshots.iterator():
+        devices_vlans[device_id] = devices_vlans.get(device_id, 0) | bitmap_to_int(vlans)
+        ranges += [
+            vlan_range_model(
+                device_id=device_id, snapshot_id=snapshot_id, vlan_from=vlan_from, vlan_to=vlan_to
+            )
+            for vlan_from, vlan_to in bitmap_to_ranges(vlans)
+        ]
+        if len(ranges) >= 1000:
+            vlan_range_model.objects.using(db_alias).bulk_create(ranges)
+            ranges = []
+    vlan_range_model.objects.using(db_alias).bulk_create(ranges)
+
+    for device_id, vlans in devices_vlans.items():
+        devices_info_model.objects.using(db_alias).filter(dev_id=device_id).update(
+            vlans_count=vlans.bit_count()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("check", "0044_add_interface_change_desc_permission"),
+        ("net_tools", "0007_interfacesnapshot_desc_fulltext"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="devicesinfo",
+            name="vlans_count",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name="VlanPortRange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("vlan_from", models.PositiveSmallIntegerField()),
+                ("vlan_to", models.PositiveSmallIntegerField()),
+                (
+                    "device",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="vlan_port_ranges",
+                        to="check.devices",
+                    ),
+                ),
+                (
+                    "snapshot",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="vlan_ranges",
+                        to="net_tools.interfacesnapshot",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "vlan_port_range",
+                "indexes": [models.Index(fields=["vlan_from", "vlan_to"], name="vlan_port_range_vlans")],
+            },
+        ),
+        migrations.RunPython(fill_vlan_port_ranges, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 6.0.9 on 2026-10-18 20:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def interfaces_workload(physical: int, abon: int, up: int, has_desc: int) -> dict[str, int]:
+    """Счетчики загрузки по битовым столбцам флагов интерфейсов устройства."""
+    abons = physical & abon
+    abons_up = abons & up
+    abons_down = abons & ~up
+    return {
+        "count": physical.bit_count(),
+        "abons": abons.bit_count(),
+        "abons_up": abons_up.bit_count(),
+        "abons_up_with_desc": (abons_up & has_desc).bit_count(),
+        "abons_down": abons_down.bit_count(),
+        "abons_down_with_desc": (abons_down & has_desc).bit_count(),
+    }
+
+
+def fill_interfaces_workload(apps, schema_editor):
+    """Посчитать загрузку интерфейсов оборудования по снимкам интерфейсов."""
+    snapshot_model = apps.get_model("net_tools", "InterfaceSnapshot")
+    workload_model = apps.get_model("net_tools", "DeviceInterfacesWorkload")
+    db_alias = schema_editor.connection.alias
+
+    rows = (
+        snapshot_model.objects.using(db_alias)
+        .order_by()
+        .values_list("device_id", "position", "physical", "abon", "up", "has_desc")
+    )
+    # ID устройства -> битовые столбцы (physical, abon, up, has_desc), N-й бит - интерфейс с позицией N.
+    masks: dict[int, list[int]] = {}
+    for device_id, position, *flags in rows.iterator():
+        device_masks = masks.setdefault(device_id, [0, 0, 0, 0])
+        for index, flag in enumerate(flags):
+            if flag:
+                device_masks[index] |= 1 << position
+    workload_model.objects.using(db_alias).bulk_create(
+        [
+            workload_model(device_id=device_id, **interfaces_workload(*device_masks))
+            for device_id, device_masks in masks.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("check", "0044_add_interface_change_desc_permission"),
+        ("net_tools", "0008_vlanportrange"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeviceInterfacesWorkload",
+            fields=[
+                (
+                    "device",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="interfaces_workload",
+                        serialize=False,
+                        to="check.devices",
+                    ),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("abons", models.PositiveIntegerField(default=0)),
+                ("abons_up", models.PositiveIntegerField(default=0)),
+                ("abons_up_with_desc", models.PositiveIntegerField(default=0)),
+                ("abons_down", models.PositiveIntegerField(default=0)),
+                ("abons_down_with_desc", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "db_table": "device_interfaces_workload",
+            },
+        ),
+        migrations.RunPython(fill_interfaces_workload, migrations.RunPython.noop),
+    ]
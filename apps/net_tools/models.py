@@ -15,6 +15,8 @@ class DevicesInfo(models.Model):
     interfaces_date = models.DateTimeField(null=True)
     vlans = models.TextField(null=True)
     vlans_date = models.DateTimeField(null=True)
+    # Кол-во уникальных VLAN на портах, обновляется вместе со снимками интерфейсов.
+    vlans_count = models.PositiveSmallIntegerField(default=0)
 
     class Meta:
         db_table = "device_info"
@@ -41,13 +43,84 @@ class DevicesInfo(models.Model):
                 "description": interface.desc.strip(),
             }
             if with_vlans:
-                res["vlans"] = interface.vlan
+                # Диапазоны VLAN сохраняются строками `from-to`, а не списком всех VID.
+                res["vlans"] = interface.vlan.compact()
             return res
 
         interfaces_list = [get_intf_dict(line) for line in interfaces]
         return orjson.dumps(interfaces_list).decode()
 
 
+class InterfaceSnapshot(models.Model):
+    """
+    Интерфейс оборудования из последних сохраненных данных `DevicesInfo`.
+
+    Строки пересобираются при сохранении интерфейсов или VLAN устройства и позволяют искать
+    и считать интерфейсы SQL запросами, не разбирая JSON всего оборудования.
+    """
+
+    device = models.ForeignKey(Devices, on_delete=models.CASCADE, related_name="interface_snapshots")
+    position = models.PositiveIntegerField(verbose_name="Порядковый номер")
+    name = models.CharField(max_length=255, verbose_name="Интерфейс")
+    status = models.CharField(max_length=255, verbose_name="Состояние")
+    desc = models.TextField(blank=True, default="", verbose_name="Описание")
+    # Битовая карта VLAN: N-й бит (little-endian) установлен, если VLAN N есть на порту.
+    vlans = models.BinaryField(default=b"", verbose_name="VLAN")
+    # Флаги для подсчета загрузки, см. `Interfaces.physical()`, `non_system()`, `up()`, `with_description()`.
+    physical = models.BooleanField(default=True)
+    abon = models.BooleanField(default=True)
+    up = models.BooleanField(default=False)
+    has_desc = models.BooleanField(default=False)
+
+    class Meta:
+        db_table = "device_interface_snapshot"
+        ordering = ["device", "position"]
+        constraints = [
+            models.UniqueConstraint(fields=["device", "position"], name="device_interface_snapshot_position"),
+        ]
+
+
+class VlanPortRange(models.Model):
+    """
+    Непрерывный диапазон VLAN на порту оборудования.
+
+    Обратный индекс VLAN -> порты для трассировки VLAN: порты с искомым VLAN всего оборудования
+    находятся одним запросом, без разбора интерфейсов каждого устройства.
+    Пересобирается вместе со снимками интерфейсов.
+    """
+
+    device = models.ForeignKey(Devices, on_delete=models.CASCADE, related_name="vlan_port_ranges")
+    snapshot = models.ForeignKey(InterfaceSnapshot, on_delete=models.CASCADE, related_name="vlan_ranges")
+    vlan_from = models.PositiveSmallIntegerField()
+    vlan_to = models.PositiveSmallIntegerField()
+
+    class Meta:
+        db_table = "vlan_port_range"
+        indexes = [models.Index(fields=["vlan_from", "vlan_to"], name="vlan_port_range_vlans")]
+
+
+class DeviceInterfacesWorkload(models.Model):
+    """
+    Загрузка интерфейсов оборудования, посчитанная по его снимкам интерфейсов.
+
+    Обновляется вместе со снимками при сохранении `DevicesInfo`, поэтому загрузка всего
+    оборудования читается одним запросом без подсчета и кеширования.
+    """
+
+    device = models.OneToOneField(
+        Devices, primary_key=True, on_delete=models.CASCADE, related_name="interfaces_workload"
+    )
+    count = models.PositiveIntegerField(default=0)
+    abons = models.PositiveIntegerField(default=0)
+    abons_up = models.PositiveIntegerField(default=0)
+    abons_up_with_desc = models.PositiveIntegerField(default=0)
+    abons_down = models.PositiveIntegerField(default=0)
+    abons_down_with_desc = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "device_interfaces_workload"
+
+
 class DescNameFormat(models.Model):
     standard = models.CharField(max_length=255, unique=True, verbose_name="Необходимое имя оборудования")
     replacement = models.TextField(verbose_name="Возможные варианты (через запятую)")
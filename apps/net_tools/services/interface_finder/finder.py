@@ -2,14 +2,15 @@ import contextlib
 import re
 from datetime import datetime
 
-import orjson
 from django.contrib.humanize.templatetags.humanize import naturaltime
-from django.db.models import Q, QuerySet
+from django.db.models import Exists, OuterRef, Q, QuerySet
 from django.utils import timezone
 
 from apps.check.models import Devices, InterfacesComments
-from devicemanager.device import Interfaces
+from apps.net_tools.models import InterfaceSnapshot
+from apps.net_tools.services.interface_snapshots import bitmap_to_int, bitmap_to_vlans, vlans_mask
 
+from .search_index import get_description_search_index, required_substrings
 from .types import (
     Comments,
     DescriptionFinderResult,
@@ -35,40 +36,26 @@ class InterfacesFinder:
                 self._devices_qs = self._devices_qs.filter(name__iregex=self._filter.device_name.pattern)
 
         # Фильтруем по дате обнаружения интерфейсов
-        self._devices_qs = self._devices_qs.select_related("devicesinfo")
         if self._filter.discovered_datetime_gt:
             self._devices_qs = self._devices_qs.filter(
                 Q(devicesinfo__interfaces_date__gt=self._filter.discovered_datetime_gt)
                 | Q(devicesinfo__vlans_date__gt=self._filter.discovered_datetime_gt)
             )
 
-        device_info_values = self._devices_qs.values(
-            "devicesinfo__interfaces",
-            "devicesinfo__interfaces_date",
-            "devicesinfo__vlans",
-            "devicesinfo__vlans_date",
-            "name",
+        # Только оборудование, для которого сохранены интерфейсы
+        self._devices_qs = self._devices_qs.filter(
+            Exists(InterfaceSnapshot.objects.filter(device_id=OuterRef("pk")))
         )
 
-        self.devices: dict[str, DeviceInterfacesData] = {}
-        for dev_info in device_info_values:
-            interfaces = Interfaces(orjson.loads(dev_info["devicesinfo__interfaces"] or "[]"))
-            vlans = Interfaces(orjson.loads(dev_info["devicesinfo__vlans"] or "[]"))
-
-            if interfaces:
-                valid_interfaces = interfaces
-                for interface in interfaces:
-                    interface.vlan = vlans[interface.name].vlan
-            elif vlans:
-                valid_interfaces = vlans
-            else:
-                continue
-
-            self.devices[dev_info["name"]] = DeviceInterfacesData(
-                interfaces=valid_interfaces,
+        self.devices: dict[str, DeviceInterfacesData] = {
+            dev_info["name"]: DeviceInterfacesData(
                 interfaces_date=dev_info["devicesinfo__interfaces_date"],
                 vlans_date=dev_info["devicesinfo__vlans_date"],
             )
+            for dev_info in self._devices_qs.values(
+                "name", "devicesinfo__interfaces_date", "devicesinfo__vlans_date"
+            )
+        }
 
     def _build_interface_info(
         self,
@@ -115,75 +102,120 @@ class InterfacesFinder:
 
         return result
 
+    def _description_filter(self) -> Q | None:
+        """Условие поиска по описанию через индекс описаний интерфейсов."""
+        pattern = self._filter.description_pattern
+        substrings = [pattern] if isinstance(pattern, str) else required_substrings(pattern)
+        if not substrings:
+            # Регулярное выражение без обязательных подстрок проверяется для всех интерфейсов.
+            return None
+
+        index_filter = get_description_search_index().filter(substrings)
+        if index_filter is None and isinstance(pattern, str):
+            return Q(desc__icontains=pattern)
+        return index_filter
+
+    def _get_snapshots(self, comments: Comments) -> list[tuple]:
+        """
+        Интерфейсы, подходящие под фильтр по описанию и состоянию, а также интерфейсы с комментариями.
+
+        Найденные индексом описания и регулярное выражение проверяются уже при переборе интерфейсов.
+        """
+        snapshots = InterfaceSnapshot.objects.filter(device__in=self._devices_qs)
+
+        if self._filter.interface_status:
+            snapshots = snapshots.filter(status=self._filter.interface_status)
+
+        commented = Q(
+            device__name__in=list(comments.devices),
+            name__in={name for device in comments.devices.values() for name in device.interfaces},
+        )
+        description_filter = None if self._filter.has_comment else self._description_filter()
+        if self._filter.has_comment:
+            querysets = [snapshots.filter(commented)]
+        elif description_filter is None:
+            querysets = [snapshots]
+        else:
+            # Отдельные запросы, чтобы индекс описаний не терялся в условии OR.
+            querysets = [snapshots.filter(description_filter), snapshots.filter(commented)]
+
+        rows: dict[int, tuple] = {}
+        for queryset in querysets:
+            for row in queryset.values_list(
+                "id", "device_id", "position", "device__name", "name", "status", "desc", "vlans"
+            ):
+                rows[row[0]] = row
+        return [row[3:] for row in sorted(rows.values(), key=lambda row: (row[1], row[2]))]
+
     def _find_in_interfaces_history(self, comments: Comments, result: list[DescriptionFinderResult]) -> None:
+        vlans_superset = vlans_mask(self._filter.vlans_superset or ())
+        vlans = vlans_mask(self._filter.vlans or ())
+        vlans_exclude = vlans_mask(self._filter.vlans_exclude or ())
+
         # Производим поочередный поиск
-        for device_name, info in self.devices.items():
-            # Смотрим данные интерфейсов в `interfaces` либо `vlans`
-            for interface in info.interfaces:
-                find_on_desc = False
-
-                # Если имеется фильтр по состоянию интерфейса, то отбрасываем неподходящие
-                if self._filter.interface_status and interface.status != self._filter.interface_status:
-                    continue
-
-                # Если НЕ нашли совпадение в НАЗВАНИИ порта - пропускаем
-                if self._filter.interface_name and (
-                    isinstance(self._filter.interface_name, re.Pattern)
-                    and not self._filter.interface_name.search(interface.name)
-                    or isinstance(self._filter.interface_name, str)
-                    and self._filter.interface_name not in interface.desc
-                ):
-                    continue
-
-                if self._filter.vlans_superset and not self._filter.vlans_superset.issuperset(interface.vlan):
-                    continue
-
-                interface_vlans = set(interface.vlan)
-
-                # Если нет пересечения требуемых VLAN по фильтру и VLAN на интерфейсе
-                if self._filter.vlans and not self._filter.vlans & interface_vlans:
-                    continue
-
-                # Если есть пересечение VLAN по фильтру исключения и VLAN на интерфейсе
-                if self._filter.vlans_exclude and self._filter.vlans_exclude & interface_vlans:
-                    continue
-
-                # Если нашли совпадение в ОПИСАНИИ порта
-                if (
-                    isinstance(self._filter.description_pattern, re.Pattern)
-                    and self._filter.description_pattern.search(interface.desc)
-                    or isinstance(self._filter.description_pattern, str)
-                    and self._filter.description_pattern.lower() in interface.desc.lower()
-                ):
-                    find_on_desc = True
-
-                interface_comments = comments.get_interface(device_name, interface.name)
-
-                # Если указан параметр искать только интерфейсы с комментариями и есть комментарии
-                # Если такой параметр не указан, тогда, либо есть описание на порту, либо комментарий
-                if (
-                    self._filter.has_comment
-                    and interface_comments
-                    or not self._filter.has_comment
-                    and (find_on_desc or interface_comments)
-                ):
-                    with contextlib.suppress(KeyError):  # Игнорируем, если ошибка ключа
-                        result.append(
-                            self._build_description_result(
-                                device_name=device_name,
-                                comments=[comment.to_dict() for comment in interface_comments],
-                                interface_info=self._build_interface_info(
-                                    info=info,
-                                    interface_name=interface.name,
-                                    status=interface.status,
-                                    description=interface.desc,
-                                ),
-                            )
+        for device_name, name, status, desc, vlans_bitmap in self._get_snapshots(comments):
+            info = self.devices[device_name]
+            info.vlans[name] = ", ".join(map(str, bitmap_to_vlans(vlans_bitmap)))
+            find_on_desc = False
+
+            # Если НЕ нашли совпадение в НАЗВАНИИ порта - пропускаем
+            if self._filter.interface_name and (
+                isinstance(self._filter.interface_name, re.Pattern)
+                and not self._filter.interface_name.search(name)
+                or isinstance(self._filter.interface_name, str)
+                and self._filter.interface_name not in desc
+            ):
+                continue
+
+            interface_vlans = bitmap_to_int(vlans_bitmap)
+
+            if self._filter.vlans_superset and interface_vlans & ~vlans_superset:
+                continue
+
+            # Если нет пересечения требуемых VLAN по фильтру и VLAN на интерфейсе
+            if self._filter.vlans and not vlans & interface_vlans:
+                continue
+
+            # Если есть пересечение VLAN по фильтру исключения и VLAN на интерфейсе
+            if self._filter.vlans_exclude and vlans_exclude & interface_vlans:
+                continue
+
+            # Если нашли совпадение в ОПИСАНИИ порта
+            if (
+                isinstance(self._filter.description_pattern, re.Pattern)
+                and self._filter.description_pattern.search(desc)
+                or isinstance(self._filter.description_pattern, str)
+                and self._filter.description_pattern.lower() in desc.lower()
+            ):
+                find_on_desc = True
+
+            interface_comments = comments.get_interface(device_name, name)
+
+            # Если указан параметр искать только интерфейсы с комментариями и есть комментарии
+            # Если такой параметр не указан, тогда, либо есть описание на порту, либо комментарий
+            if (
+                self._filter.has_comment
+                and interface_comments
+                or not self._filter.has_comment
+                and (find_on_desc or interface_comments)
+            ):
+                with contextlib.suppress(KeyError):  # Игнорируем, если ошибка ключа
+                    result.append(
+                        self._build_description_result(
+                            device_name=device_name,
+                            comments=[comment.to_dict() for comment in interface_comments],
+                            interface_info=self._build_interface_info(
+                                info=info,
+                                interface_name=name,
+                                status=status,
+                                description=desc,
+                            ),
                         )
+                    )
 
-                    # Удаляем найденные комментарии
-                    if interface_comments:
-                        del comments.devices[device_name].interfaces[interface.name]
+                # Удаляем найденные комментарии
+                if interface_comments:
+                    del comments.devices[device_name].interfaces[name]
 
     def _add_comments_to_result(self, comments: Comments, result: list[DescriptionFinderResult]) -> None:
         for dev_name, dev_intf_comments in comments.devices.items():
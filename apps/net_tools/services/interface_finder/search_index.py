@@ -0,0 +1,310 @@
+"""
+# Индекс поиска по описаниям интерфейсов.
+
+Поиск по описанию сужается индексом до строк `InterfaceSnapshot`, в описании которых есть
+искомые подстроки. Для регулярного выражения используются подстроки, которые обязательно
+входят в любое его совпадение. Точная проверка совпадения остается за `InterfacesFinder`.
+
+В MySQL используется FULLTEXT индекс с парсером ngram, который обновляется вместе
+с таблицей. В остальных базах данных (SQLite для разработки и тестов) индекс n-грамм
+хранится в памяти процесса и дополняется снимками интерфейсов, сохраненными после
+последнего обращения.
+"""
+
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from collections.abc import Iterator
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+from apps.net_tools.models import InterfaceSnapshot
+
+NGRAM_SIZE = 3
+# Период полной пересборки индекса в памяти процесса, сек.
+INTERFACES_SEARCH_INDEX_REBUILD_INTERVAL = int(os.getenv("INTERFACES_SEARCH_INDEX_REBUILD_INTERVAL", "3600"))
+# Если кандидатов больше, то фильтр по ним не передается в базу данных.
+MAX_INDEX_CANDIDATES = 20_000
+
+
+def ngrams(text: str, size: int = NGRAM_SIZE) -> set[str]:
+    return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+
+def _class_end(text: str, start: int) -> int:
+    """Позиция после набора символов `[...]`, который начинается в `start`."""
+    position = start + 1
+    if text[position : position + 1] == "^":
+        position += 1
+    if text[position : position + 1] == "]":
+        position += 1
+    while position < len(text):
+        if text[position] == "\\":
+            position += 2
+        elif text[position] == "]":
+            return position + 1
+        else:
+            position += 1
+    return len(text)
+
+
+def _group_end(text: str, start: int) -> int:
+    """Позиция после группы `(...)`, которая начинается в `start`."""
+    depth = 0
+    position = start
+    while position < len(text):
+        char = text[position]
+        if char == "\\":
+            position += 2
+            continue
+        if char == "[":
+            position = _class_end(text, position)
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return position + 1
+        position += 1
+    return len(text)
+
+
+# Длина экранирования символа по коду без обратной косой черты: `\xhh`, `\uhhhh`, `\Uhhhhhhhh`.
+_CODE_ESCAPE_LENGTH = {"x": 3, "u": 5, "U": 9}
+
+
+def _escape_end(text: str, start: int) -> int:
+    """Позиция после экранирования, которое начинается в `start`, вместе с его аргументом."""
+    char = text[start + 1 : start + 2]
+    if char in _CODE_ESCAPE_LENGTH:
+        return start + 1 + _CODE_ESCAPE_LENGTH[char]
+    if char == "N":
+        # Символ по имени: `\N{LATIN SMALL LETTER A}`.
+        return text.index("}", start) + 1
+    if char.isdigit():
+        # Восьмеричный код `\0`, `\012`, `\123` или ссылка на группу `\1`, `\12`.
+        end = start + 1
+        while end < len(text) and end < start + 4 and text[end].isdigit():
+            end += 1
+        return end
+    return start + 2
+
+
+_QUANTIFIER_REGEXP = re.compile(r"[*+?]|\{\d*(?:,\d*)?\}")
+
+
+def _tokens(text: str) -> Iterator[tuple[str, bool]]:
+    """Элементы регулярного выражения верхнего уровня: `(элемент, есть ли у него квантификатор)`."""
+    position = 0
+    while position < len(text):
+        char = text[position]
+        if char == "\\":
+            end = _escape_end(text, position)
+        elif char == "[":
+            end = _class_end(text, position)
+        elif char == "(":
+            end = _group_end(text, position)
+        else:
+            end = position + 1
+        token = text[position:end]
+        quantifier = _QUANTIFIER_REGEXP.match(text, end)
+        if quantifier is not None:
+            end = quantifier.end()
+            # Ленивый или захватывающий квантификатор.
+            if text[end : end + 1] in ("?", "+"):
+                end += 1
+        yield token, quantifier is not None
+        position = end
+
+
+def required_substrings(pattern: re.Pattern[str]) -> list[str]:
+    """
+    ## Подстроки, которые есть в любом совпадении регулярного выражения.
+
+    Учитываются только последовательности символов вне альтернатив, повторений, наборов
+    символов и специальных групп. Если выражение не удается разобрать, то подстрок нет
+    и поиск выполняется без индекса:
+
+        >>> required_substrings(re.compile(r"^abon\\s+(lenina)\\d"))
+        ['abon', 'lenina']
+    """
+
+    if pattern.flags & re.VERBOSE:
+        # Пробелы и комментарии в выражении не являются его символами.
+        return []
+
+    substrings: list[str] = []
+    current: list[str] = []
+
+    def flush() -> None:
+        if current:
+            substrings.append("".join(current))
+            current.clear()
+
+    def walk(text: str) -> None:
+        tokens = list(_tokens(text))
+        if any(token == "|" for token, _ in tokens):
+            # Альтернатива: у вариантов нет общих обязательных подстрок.
+            flush()
+            return
+        for token, quantified in tokens:
+            if quantified or token in (".", "^", "$") or token.startswith("["):
+                flush()
+            elif token.startswith("\\"):
+                # Экранированные знаки - сами символы, а буквы и цифры - классы символов, ссылки
+                # и коды символов, совпадение которых с текстом индексом не проверяется.
+                if len(token) == 2 and not token[1].isalnum():
+                    current.append(token[1])
+                else:
+                    flush()
+            elif token.startswith("(?:"):
+                walk(token[3:-1])
+            elif token.startswith("(?P<"):
+                walk(token[token.index(">") + 1 : -1])
+            elif token.startswith("(?"):
+                # Проверки до и после, флаги, комментарии и условия.
+                flush()
+            elif token.startswith("("):
+                walk(token[1:-1])
+            else:
+                current.append(token)
+
+    try:
+        walk(pattern.pattern)
+    except ValueError:
+        return []
+    flush()
+    return substrings
+
+
+class DescriptionSearchIndex(ABC):
+    """Индекс описаний интерфейсов."""
+
+    @abstractmethod
+    def filter(self, substrings: list[str]) -> Q | None:
+        """
+        Условие для `InterfaceSnapshot`: описание содержит все подстроки без учета регистра.
+        Может отбирать и лишние строки. `None` - индекс не применим к этим подстрокам.
+        """
+
+
+class MySQLFulltextSearchIndex(DescriptionSearchIndex):
+    """FULLTEXT индекс MySQL с парсером ngram по `InterfaceSnapshot.desc`."""
+
+    def __init__(self, using: str = DEFAULT_DB_ALIAS) -> None:
+        self.using = using
+
+    def filter(self, substrings: list[str]) -> Q | None:
+        # Внутри фразы в BOOLEAN MODE кавычки недопустимы.
+        phrases = [substring.replace('"', " ").strip() for substring in substrings]
+        phrases = [phrase for phrase in phrases if len(phrase) >= NGRAM_SIZE]
+        if not phrases:
+            return None
+
+        quote = connections[self.using].ops.quote_name
+        column = f"{quote(InterfaceSnapshot._meta.db_table)}.{quote('desc')}"
+        query = " ".join(f'+"{phrase}"' for phrase in phrases)
+        return Q(
+            RawSQL(
+                f"MATCH ({column}) AGAINST (%s IN BOOLEAN MODE)",
+                [query],
+                output_field=BooleanField(),
+            )
+        )
+
+
+class NgramSearchIndex(DescriptionSearchIndex):
+    """
+    Индекс n-грамм описаний в памяти процесса.
+
+    Снимки интерфейсов устройства пересоздаются целиком, поэтому новые строки имеют
+    идентификаторы больше уже проиндексированных. Перед поиском в индекс добавляются
+    строки с идентификатором больше последнего, а прежние строки их устройств удаляются.
+    Строки удаленного оборудования убираются при периодической полной пересборке.
+    """
+
+    def __init__(self, rebuild_interval: float = INTERFACES_SEARCH_INDEX_REBUILD_INTERVAL) -> None:
+        self._rebuild_interval = rebuild_interval
+        self._lock = threading.Lock()
+        self._reset()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+
+    def _reset(self) -> None:
+        self._postings: dict[str, set[int]] = defaultdict(set)
+        self._descriptions: dict[int, str] = {}
+        self._device_rows: dict[int, list[int]] = defaultdict(list)
+        self._max_id = 0
+        self._built_at = time.monotonic()
+
+    def _remove_device(self, device_id: int) -> None:
+        for row_id in self._device_rows.pop(device_id, []):
+            desc = self._descriptions.pop(row_id)
+            for gram in ngrams(desc):
+                self._postings[gram].discard(row_id)
+
+    def refresh(self) -> int:
+        """Добавляет в индекс снимки интерфейсов, сохраненные после последнего обновления."""
+        with self._lock:
+            if time.monotonic() - self._built_at > self._rebuild_interval:
+                self._reset()
+
+            rows = (
+                InterfaceSnapshot.objects.filter(id__gt=self._max_id)
+                .order_by("id")
+                .values_list("id", "device_id", "desc")
+            )
+            new_rows: dict[int, list[tuple[int, str]]] = defaultdict(list)
+            for row_id, device_id, desc in rows:
+                new_rows[device_id].append((row_id, desc.lower()))
+                self._max_id = row_id
+
+            for device_id, device_rows in new_rows.items():
+                self._remove_device(device_id)
+                for row_id, desc in device_rows:
+                    self._descriptions[row_id] = desc
+                    self._device_rows[device_id].append(row_id)
+                    for gram in ngrams(desc):
+                        self._postings[gram].add(row_id)
+
+            return sum(len(device_rows) for device_rows in new_rows.values())
+
+    def search(self, substrings: list[str]) -> set[int] | None:
+        """Идентификаторы строк, описание которых содержит все подстроки."""
+        substrings = [substring.lower() for substring in substrings]
+        grams = set().union(*(ngrams(substring) for substring in substrings))
+        if not grams:
+            return None
+
+        self.refresh()
+        with self._lock:
+            postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+            return {
+                row_id
+                for row_id in candidates
+                if all(substring in self._descriptions[row_id] for substring in substrings)
+            }
+
+    def filter(self, substrings: list[str]) -> Q | None:
+        found = self.search(substrings)
+        if found is None or len(found) > MAX_INDEX_CANDIDATES:
+            return None
+        return Q(id__in=found)
+
+
+DESCRIPTION_SEARCH_INDEX = NgramSearchIndex()
+
+
+def get_description_search_index(using: str = DEFAULT_DB_ALIAS) -> DescriptionSearchIndex:
+    if connections[using].vendor == "mysql":
+        return MySQLFulltextSearchIndex(using)
+    return DESCRIPTION_SEARCH_INDEX
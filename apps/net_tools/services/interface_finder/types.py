@@ -3,8 +3,6 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import TypedDict
 
-from devicemanager.device import Interfaces
-
 
 @dataclass
 class InterfaceComment:
@@ -57,15 +55,13 @@ class DescriptionFinderResult(TypedDict):
 
 @dataclass
 class DeviceInterfacesData:
-    interfaces: Interfaces
     interfaces_date: datetime | None
     vlans_date: datetime | None
+    # VLAN просмотренных интерфейсов через запятую
+    vlans: dict[str, str] = field(default_factory=dict)
 
     def get_interface_vlans(self, interface_name: str) -> str:
-        for interface_with_vlans in self.interfaces:
-            if interface_with_vlans.name == interface_name:
-                return ", ".join(map(str, interface_with_vlans.vlan))
-        return ""
+        return self.vlans.get(interface_name, "")
 
 
 @dataclass(kw_only=True, slots=True)
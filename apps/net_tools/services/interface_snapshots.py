@@ -0,0 +1,133 @@
+"""
+# Снимки интерфейсов оборудования.
+
+`DevicesInfo` хранит интерфейсы и VLAN устройства JSON строками. Для поиска и подсчета
+по всему оборудованию они раскладываются в таблицу `InterfaceSnapshot` - строка на интерфейс
+с битовой картой VLAN и заранее вычисленными флагами для подсчета загрузки,
+а VLAN портов - в обратный индекс `VlanPortRange` для трассировки VLAN.
+Вместе со снимками обновляется загрузка интерфейсов устройства `DeviceInterfacesWorkload`.
+"""
+
+from collections.abc import Iterable
+from dataclasses import replace
+
+import orjson
+from django.db import transaction
+
+from devicemanager.device.interfaces import Interface, Interfaces
+from devicemanager.vlans import VlanSet
+from ecstasy_project.settings import NON_ABON_INTERFACES_PATTERN
+
+from ..models import DevicesInfo, InterfaceSnapshot, VlanPortRange
+from .interfaces_workload import save_device_interfaces_workload
+
+
+def vlans_mask(vlans: Iterable[int]) -> int:
+    """Целое число, в котором установлены биты переданных VLAN."""
+    bits = 0
+    for vlan in vlans:
+        if vlan >= 0:
+            bits |= 1 << vlan
+    return bits
+
+
+def vlans_to_bitmap(vlans: Iterable[int]) -> bytes:
+    """Битовая карта VLAN, обрезанная по старшему установленному биту."""
+    bits = vlans_mask(vlans)
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+
+def bitmap_to_int(bitmap: bytes | memoryview | None) -> int:
+    return int.from_bytes(bytes(bitmap or b""), "little")
+
+
+def bitmap_to_vlans(bitmap: bytes | memoryview | None) -> list[int]:
+    """Отсортированный список VLAN из битовой карты."""
+    return list(VlanSet.from_bytes(bitmap))
+
+
+def bitmap_to_ranges(bitmap: bytes | memoryview | None) -> list[tuple[int, int]]:
+    """Непрерывные диапазоны VLAN битовой карты: `[(from, to), ...]`."""
+    return VlanSet.from_bytes(bitmap).ranges()
+
+
+def build_snapshot_fields(interfaces: Interfaces, vlans: Interfaces) -> list[dict]:
+    """
+    ## Поля строк `InterfaceSnapshot` для интерфейсов устройства.
+
+    Состояние и описание берутся из `interfaces`, VLAN - из `vlans` по имени интерфейса.
+    Если интерфейсы без VLAN не сохранялись, то используются интерфейсы из `vlans`.
+    """
+    source = list(interfaces or vlans)
+    vlans_by_name: dict[str, VlanSet] = {}
+    for interface in vlans:
+        vlans_by_name.setdefault(interface.name, interface.vlan)
+
+    # Копии, так как `physical()` меняет описание выбранного комбо-порта.
+    copies: list[Interface] = [replace(interface) for interface in source]
+    physical = {id(interface) for interface in Interfaces(copies).physical()}
+
+    return [
+        {
+            "position": position,
+            "name": interface.name,
+            "status": interface.status,
+            "desc": interface.desc,
+            "vlans": vlans_by_name.get(interface.name, interface.vlan).to_bytes(),
+            "physical": id(copy) in physical,
+            "abon": not NON_ABON_INTERFACES_PATTERN.search(copy.desc),
+            "up": copy.is_up,
+            "has_desc": copy.has_desc,
+        }
+        for position, (interface, copy) in enumerate(zip(source, copies, strict=True))
+    ]
+
+
+def save_interface_snapshots(device_info: DevicesInfo) -> int:
+    """Пересобирает снимки интерфейсов устройства, индекс VLAN его портов и загрузку из `DevicesInfo`."""
+    device_id = device_info.dev_id
+    interfaces = Interfaces(orjson.loads(device_info.interfaces or "[]"))
+    vlans = Interfaces(orjson.loads(device_info.vlans or "[]"))
+    snapshots = [
+        InterfaceSnapshot(device_id=device_id, **fields)
+        for fields in build_snapshot_fields(interfaces, vlans)
+    ]
+    with transaction.atomic():
+        InterfaceSnapshot.objects.filter(device_id=device_id).delete()
+        InterfaceSnapshot.objects.bulk_create(snapshots, batch_size=500)
+        if snapshots and snapshots[0].pk is None:
+            # MySQL не возвращает идентификаторы созданных строк.
+            ids = dict(InterfaceSnapshot.objects.filter(device_id=device_id).values_list("position", "id"))
+            for snapshot in snapshots:
+                snapshot.pk = ids[snapshot.position]
+
+        VlanPortRange.objects.bulk_create(
+            [
+                VlanPortRange(device_id=device_id, snapshot=snapshot, vlan_from=vlan_from, vlan_to=vlan_to)
+                for snapshot in snapshots
+                for vlan_from, vlan_to in bitmap_to_ranges(snapshot.vlans)
+            ],
+            batch_size=1000,
+        )
+        device_vlans = 0
+        for snapshot in snapshots:
+            device_vlans |= bitmap_to_int(snapshot.vlans)
+        device_info.vlans_count = device_vlans.bit_count()
+        DevicesInfo.objects.filter(pk=device_info.pk).update(vlans_count=device_info.vlans_count)
+        save_device_interfaces_workload(device_id, snapshots)
+    return len(snapshots)
+
+
+def get_snapshot_interfaces(device_name: str) -> Interfaces:
+    """Интерфейсы устройства вместе с VLAN из снимков."""
+    rows = (
+        InterfaceSnapshot.objects.filter(device__name=device_name)
+        .order_by("position")
+        .values_list("name", "status", "desc", "vlans")
+    )
+    return Interfaces(
+        [
+            Interface(name=name, status=status, desc=desc, vlan=VlanSet.from_bytes(vlans))
+            for name, status, desc, vlans in rows
+        ]
+    )
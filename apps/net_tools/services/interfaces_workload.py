@@ -0,0 +1,137 @@
+"""
+# Загрузка интерфейсов оборудования.
+
+Флаги снимков интерфейсов (`InterfaceSnapshot`) раскладываются по столбцам: для каждого устройства
+и флага - целое число, в котором N-й бит - флаг интерфейса с позицией N. Счетчики загрузки тогда
+считаются несколькими побитовыми операциями и `int.bit_count()` на устройство, а не проходом
+по интерфейсам с фильтрами `Interfaces`.
+
+Счетчики хранятся в `DeviceInterfacesWorkload` и обновляются вместе со снимками устройства,
+`rebuild_interfaces_workload` пересчитывает их для всего оборудования за один проход по снимкам.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from django.db import connection, transaction
+from django.db.models import Max
+
+from ..models import DeviceInterfacesWorkload, InterfaceSnapshot
+
+WORKLOAD_FIELDS = (
+    "count",
+    "abons",
+    "abons_up",
+    "abons_up_with_desc",
+    "abons_down",
+    "abons_down_with_desc",
+)
+
+
+@dataclass(slots=True)
+class InterfacesMasks:
+    """Битовые столбцы флагов интерфейсов устройства, N-й бит - интерфейс с позицией N."""
+
+    physical: int = 0
+    abon: int = 0
+    up: int = 0
+    has_desc: int = 0
+
+    def add(self, position: int, physical: bool, abon: bool, up: bool, has_desc: bool) -> None:
+        bit = 1 << position
+        if physical:
+            self.physical |= bit
+        if abon:
+            self.abon |= bit
+        if up:
+            self.up |= bit
+        if has_desc:
+            self.has_desc |= bit
+
+    def workload(self) -> dict[str, int]:
+        """Счетчики загрузки, совпадают с `DevicesInterfacesWorkloadCollector.get_interfaces_load`."""
+        abons = self.physical & self.abon
+        abons_up = abons & self.up
+        abons_down = abons & ~self.up
+        return {
+            "count": self.physical.bit_count(),
+            "abons": abons.bit_count(),
+            "abons_up": abons_up.bit_count(),
+            "abons_up_with_desc": (abons_up & self.has_desc).bit_count(),
+            "abons_down": abons_down.bit_count(),
+            "abons_down_with_desc": (abons_down & self.has_desc).bit_count(),
+        }
+
+
+def collect_interfaces_masks(
+    rows: Iterable[tuple[int, int, bool, bool, bool, bool]],
+) -> dict[int, InterfacesMasks]:
+    """
+    ## Раскладывает строки снимков по битовым столбцам устройств.
+
+    :param rows: Кортежи `(device_id, position, physical, abon, up, has_desc)`.
+    :return: Словарь: ID устройства -> битовые столбцы его интерфейсов.
+    """
+    masks: dict[int, InterfacesMasks] = {}
+    for device_id, position, physical, abon, up, has_desc in rows:
+        device_masks = masks.get(device_id)
+        if device_masks is None:
+            device_masks = masks[device_id] = InterfacesMasks()
+        device_masks.add(position, physical, abon, up, has_desc)
+    return masks
+
+
+def save_device_interfaces_workload(device_id: int, snapshots: Iterable[InterfaceSnapshot]) -> dict[str, int]:
+    """Обновляет загрузку интерфейсов устройства по его только что сохраненным снимкам."""
+    masks = InterfacesMasks()
+    for snapshot in snapshots:
+        masks.add(snapshot.position, snapshot.physical, snapshot.abon, snapshot.up, snapshot.has_desc)
+    workload = masks.workload()
+    DeviceInterfacesWorkload.objects.update_or_create(device_id=device_id, defaults=workload)
+    return workload
+
+
+def _snapshots_versions() -> dict[int, int]:
+    """
+    Максимальный ID снимка каждого устройства. Снимки устройства пересоздаются целиком,
+    поэтому он меняется при каждом сохранении снимков.
+    """
+    return dict(
+        InterfaceSnapshot.objects.order_by()
+        .values("device_id")
+        .annotate(max_id=Max("id"))
+        .values_list("device_id", "max_id")
+    )
+
+
+def rebuild_interfaces_workload() -> int:
+    """
+    ## Пересчитывает загрузку интерфейсов всего оборудования по снимкам.
+
+    Снимки читаются одним запросом без блокировок, устройства без снимков удаляются из таблицы загрузки.
+    Загрузка устройства, снимки которого были сохранены во время пересчета (изменился максимальный ID
+    его снимков), не перезаписывается: она уже обновлена вместе с новыми снимками.
+    :return: Кол-во устройств с посчитанной загрузкой.
+    """
+    versions = _snapshots_versions()
+    rows = InterfaceSnapshot.objects.order_by().values_list(
+        "device_id", "position", "physical", "abon", "up", "has_desc"
+    )
+    masks = collect_interfaces_masks(rows.iterator(chunk_size=5000))
+
+    bulk_create_kwargs: dict = {"update_conflicts": True, "update_fields": list(WORKLOAD_FIELDS)}
+    if connection.features.supports_update_conflicts_with_target:
+        bulk_create_kwargs["unique_fields"] = ["device"]
+
+    with transaction.atomic():
+        current_versions = _snapshots_versions()
+        workloads = [
+            DeviceInterfacesWorkload(device_id=device_id, **device_masks.workload())
+            for device_id, device_masks in masks.items()
+            if versions.get(device_id) == current_versions.get(device_id)
+        ]
+        DeviceInterfacesWorkload.objects.exclude(
+            device_id__in=InterfaceSnapshot.objects.order_by().values("device_id")
+        ).delete()
+        DeviceInterfacesWorkload.objects.bulk_create(workloads, batch_size=1000, **bulk_create_kwargs)
+    return len(workloads)
@@ -2,13 +2,15 @@ import json
 import re
 from typing import Any
 
-import orjson
 from django.core.cache import cache
-from django.db.models import QuerySet
+from django.db.models import BooleanField, ExpressionWrapper, Q, QuerySet
 
 from apps.check.models import Devices
-from apps.net_tools.models import DescNameFormat, DevicesInfo
+from apps.net_tools.models import DescNameFormat, DevicesInfo, VlanPortRange
+from apps.net_tools.services.interface_snapshots import get_snapshot_interfaces
 from devicemanager.device import Interfaces
+from devicemanager.device.interfaces import Interface
+from devicemanager.vlans import VlanSet
 
 from .types import TracerouteResult, VlanPortMatch
 
@@ -34,9 +36,11 @@ class Traceroute:
         self._desc_name_patterns: list[tuple[re.Pattern[str], str]] = []
         self.passed_devices: set[str] = set()  # Множество уже пройденного оборудования
 
-        # Словарь содержащий информацию об VLAN для каждого оборудования
-        self._devices_vlans_info: dict[str, str | None] = {}
+        # Оборудование, для которого сохранены интерфейсы с VLAN
+        self._devices_with_vlans: set[str] = set()
         self._device_interfaces_cache: dict[str, Interfaces] = {}
+        # Порты с VLAN и кол-во VLAN оборудования из индекса VLAN: {vlan: {device: (ports, vlans count)}}
+        self._vlan_ports: dict[int, dict[str, tuple[Interfaces, int]]] = {}
         self._device_ip_names: dict[str, str] = {}  # Словарь соответствия IP-адресов и имен оборудования
         self._cache_timeout = cache_timeout  # Время кеширования
         self._get_devices_vlans()
@@ -102,35 +106,16 @@ class Traceroute:
         return vlan_to_find in interface.vlan
 
     @staticmethod
-    def _get_unique_vlans(interface) -> list[int]:
-        """Возвращает отсортированный список уникальных VLAN порта."""
-        return sorted({int(vlan) for vlan in (interface.vlan or []) if str(vlan).isdigit()})
-
-    @classmethod
-    def _get_vlan_ranges(cls, vlans: list[int]) -> list[tuple[int, int]]:
-        """Сворачивает список VLAN в непрерывные диапазоны."""
-        if not vlans:
-            return []
-
-        ranges = []
-        start = vlans[0]
-        previous = vlans[0]
-        for vlan in vlans[1:]:
-            if vlan == previous + 1:
-                previous = vlan
-                continue
-            ranges.append((start, previous))
-            start = vlan
-            previous = vlan
-        ranges.append((start, previous))
-        return ranges
+    def _get_unique_vlans(interface) -> VlanSet:
+        """Возвращает множество уникальных VLAN порта."""
+        return VlanSet(interface.vlan)
 
     @classmethod
     def _get_device_vlan_count(cls, interfaces: Interfaces) -> int:
         """Возвращает количество уникальных VLAN на устройстве."""
-        vlans = set()
+        vlans = VlanSet()
         for interface in interfaces:
-            vlans.update(cls._get_unique_vlans(interface))
+            vlans |= cls._get_unique_vlans(interface)
         return len(vlans)
 
     @classmethod
@@ -142,7 +127,7 @@ class Traceroute:
     ) -> VlanPortMatch:
         """Оценивает, насколько порт специфичен для искомого VLAN."""
         vlans = cls._get_unique_vlans(interface)
-        ranges = cls._get_vlan_ranges(vlans)
+        ranges = vlans.ranges()
         vlan_count = len(vlans)
         largest_range_size = max((end - start + 1 for start, end in ranges), default=0)
         matched_range = None
@@ -303,10 +288,14 @@ class Traceroute:
         self.passed_devices.add(device)  # Добавляем узел в список уже пройденных устройств
 
         # Получаем интерфейсы устройства, если они есть в базе данных.
-        interfaces: Interfaces = self._get_device_interfaces(device)
+        # При поиске VLAN нужны только порты с этим VLAN, они берутся из индекса VLAN.
+        if vlan_to_find is None:
+            interfaces: Interfaces = self._get_device_interfaces(device)
+            device_vlan_count = self._get_device_vlan_count(interfaces)
+        else:
+            interfaces, device_vlan_count = self._get_vlan_ports(device, vlan_to_find)
         if not interfaces:
             return
-        device_vlan_count = self._get_device_vlan_count(interfaces)
 
         for interface in interfaces:
             if not self._should_process_interface(interface, vlan_to_find, empty_ports, max_port_vlans):
@@ -335,8 +324,13 @@ class Traceroute:
             next_dev_interface_name = ""
             next_vlan_match = None
             if double_check and next_device:  # Если есть следующее оборудование
-                next_dev_interfaces: Interfaces = self._get_device_interfaces(next_device)
-                next_device_vlan_count = self._get_device_vlan_count(next_dev_interfaces)
+                if vlan_to_find is None:
+                    next_dev_interfaces: Interfaces = self._get_device_interfaces(next_device)
+                    next_device_vlan_count = self._get_device_vlan_count(next_dev_interfaces)
+                else:
+                    next_dev_interfaces, next_device_vlan_count = self._get_vlan_ports(
+                        next_device, vlan_to_find
+                    )
                 current_device_pattern = self._get_device_name_pattern(device)
 
                 for next_dev_interface in next_dev_interfaces:
@@ -579,19 +573,23 @@ class Traceroute:
         return next_device
 
     def _get_devices_info(self):
-        cache_key = f"net_tools:{self.__class__.__name__}:devices_info"
+        cache_key = f"net_tools:{self.__class__.__name__}:devices_with_vlans"
         data = cache.get(cache_key)
         if data is None:
-            data = list(DevicesInfo.objects.all().values("dev__name", "dev__ip", "vlans"))
+            data = list(
+                DevicesInfo.objects.annotate(
+                    has_vlans=ExpressionWrapper(Q(vlans__isnull=False), output_field=BooleanField())
+                ).values("dev__name", "dev__ip", "has_vlans")
+            )
             cache.set(cache_key, data, self._cache_timeout)
         return data
 
     def _get_devices_vlans(self):
-        """Получаем список всех устройств сети, содержащий информацию об VLAN для каждого"""
-        if not self._devices_vlans_info:
+        """Получаем список всех устройств сети, для которых сохранена информация об VLAN"""
+        if not self._devices_with_vlans:
             info = self._get_devices_info()
 
-            self._devices_vlans_info = {dev["dev__name"]: dev["vlans"] for dev in info}
+            self._devices_with_vlans = {dev["dev__name"] for dev in info if dev["has_vlans"]}
             self._device_ip_names = {dev["dev__ip"]: dev["dev__name"] for dev in info}
 
     def _get_device_interfaces(self, device_name: str) -> Interfaces:
@@ -600,15 +598,45 @@ class Traceroute:
         if cached_interfaces is not None:
             return cached_interfaces
 
-        device_info = self._devices_vlans_info.get(device_name, None)
-        if device_info is not None:
-            parsed_interfaces = Interfaces(orjson.loads(device_info or "[]"))
-            self._device_interfaces_cache[device_name] = parsed_interfaces
-            return parsed_interfaces
+        if device_name in self._devices_with_vlans:
+            interfaces = get_snapshot_interfaces(device_name)
+        else:
+            interfaces = Interfaces()
+        self._device_interfaces_cache[device_name] = interfaces
+        return interfaces
 
-        empty_interfaces = Interfaces()
-        self._device_interfaces_cache[device_name] = empty_interfaces
-        return empty_interfaces
+    def _get_vlan_ports(self, device_name: str, vlan: int) -> tuple[Interfaces, int]:
+        """Порты устройства, на которых есть VLAN, и кол-во уникальных VLAN устройства"""
+        if vlan not in self._vlan_ports:
+            self._vlan_ports[vlan] = self._load_vlan_ports(vlan)
+        return self._vlan_ports[vlan].get(device_name, (Interfaces(), 0))
+
+    @staticmethod
+    def _load_vlan_ports(vlan: int) -> dict[str, tuple[Interfaces, int]]:
+        """Все порты с VLAN одним запросом к индексу `VlanPortRange`"""
+        rows = (
+            VlanPortRange.objects.filter(vlan_from__lte=vlan, vlan_to__gte=vlan)
+            .order_by("device_id", "snapshot__position")
+            .values_list(
+                "device__name",
+                "snapshot__name",
+                "snapshot__status",
+                "snapshot__desc",
+                "snapshot__vlans",
+                "device__devicesinfo__vlans_count",
+            )
+        )
+        ports: dict[str, list[Interface]] = {}
+        vlans_count: dict[str, int] = {}
+        for device_name, name, status, desc, vlans, device_vlans_count in rows:
+            ports.setdefault(device_name, []).append(
+                Interface(name=name, status=status, desc=desc, vlan=VlanSet.from_bytes(vlans))
+            )
+            vlans_count[device_name] = device_vlans_count or 0
+        return {
+            device_name: (Interfaces(interfaces), vlans_count[device_name])
+            for device_name, interfaces in ports.items()
+        }
 
 
 class MultipleTraceroute:
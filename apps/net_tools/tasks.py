@@ -18,6 +18,7 @@ class InterfacesScanTask(ThreadUpdatedStatusDeviceTask):
     max_workers = 80
     name = "interfaces_scan"
     queryset = ModelDevices.objects.filter(active=True, collect_interfaces=True)
+    check_reachability = True
 
     def pre_run(self):
         super().pre_run()
@@ -27,7 +28,7 @@ class InterfacesScanTask(ThreadUpdatedStatusDeviceTask):
     def thread_task(self, obj: ModelDevices, **kwargs) -> str:
         """Собрать интерфейсы устройства и вернуть статус результата."""
 
-        if not obj.available:
+        if not self.is_available(obj):
             # Если оборудование недоступно, то пропускаем
             return DeviceGatheringResult.Status.SKIPPED
 
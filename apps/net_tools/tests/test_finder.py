@@ -9,6 +9,7 @@ from apps.net_tools.services.traceroute.graph import build_traceroute_map_data
 from apps.net_tools.services.traceroute.network import TracerouteNetwork
 from apps.net_tools.services.traceroute.types import TracerouteResult
 from devicemanager.device.interfaces import Interface, Interfaces
+from devicemanager.vlans import VlanSet
 
 
 class FakeDevicesQuerySet:
@@ -35,23 +36,29 @@ class StubTraceroute(Traceroute):
         self._desc_name_standards: set[str] = set()
         self._desc_name_patterns = []
         self.passed_devices: set[str] = set()
-        self._devices_vlans_info: dict[str, str | None] = {}
+        self._devices_with_vlans: set[str] = set()
         self._device_interfaces_cache: dict[str, Interfaces] = {}
+        self._vlan_ports = {}
         self._device_ip_names: dict[str, str] = {}
         self._cache_timeout = 0
         self._reformatting_cache: dict[str, str] = {}
         self._pattern_cache = {}
         self._device_name_pattern_cache = {}
         self._interfaces_by_device: dict[str, Interfaces] = {
-            "dev-a": Interfaces([Interface(name="eth1", status="up", desc="dev-b", vlan=[100])]),
-            "dev-b": Interfaces([Interface(name="eth2", status="up", desc="dev-c", vlan=[100])]),
-            "dev-c": Interfaces([Interface(name="eth3", status="up", desc="", vlan=[100])]),
+            "dev-a": Interfaces([Interface(name="eth1", status="up", desc="dev-b", vlan=VlanSet([100]))]),
+            "dev-b": Interfaces([Interface(name="eth2", status="up", desc="dev-c", vlan=VlanSet([100]))]),
+            "dev-c": Interfaces([Interface(name="eth3", status="up", desc="", vlan=VlanSet([100]))]),
         }
 
     def _get_device_interfaces(self, device_name: str) -> Interfaces:
         """Возвращает интерфейсы из тестового словаря."""
         return self._interfaces_by_device.get(device_name, Interfaces())
 
+    def _get_vlan_ports(self, device_name: str, vlan: int) -> tuple[Interfaces, int]:
+        """Возвращает порты с VLAN из тестового словаря."""
+        interfaces = self._get_device_interfaces(device_name)
+        return interfaces.with_vlans([vlan]), self._get_device_vlan_count(interfaces)
+
 
 class TracerouteTraversalTestCase(SimpleTestCase):
     def _make_finder(self) -> StubTraceroute:
@@ -102,8 +109,8 @@ class TracerouteTraversalTestCase(SimpleTestCase):
         finder = self._make_finder()
         finder._interfaces_by_device["dev-a"] = Interfaces(
             [
-                Interface(name="eth1", status="up", desc="dev-b", vlan=list(range(1, 3502))),
-                Interface(name="eth2", status="up", desc="dev-c", vlan=[100]),
+                Interface(name="eth1", status="up", desc="dev-b", vlan=VlanSet(range(1, 3502))),
+                Interface(name="eth2", status="up", desc="dev-c", vlan=VlanSet([100])),
             ]
         )
 
@@ -126,7 +133,7 @@ class TracerouteTraversalTestCase(SimpleTestCase):
         """VLAN трассировка помечает широкие trunk-порты как низкую уверенность."""
         finder = self._make_finder()
         finder._interfaces_by_device["dev-a"] = Interfaces(
-            [Interface(name="eth1", status="up", desc="dev-b", vlan=list(range(1, 711)))]
+            [Interface(name="eth1", status="up", desc="dev-b", vlan=VlanSet(range(1, 711)))]
         )
 
         finder.execute(
@@ -146,7 +153,7 @@ class TracerouteTraversalTestCase(SimpleTestCase):
         """VLAN трассировка помечает порт с малым набором VLAN как точное совпадение."""
         finder = self._make_finder()
         finder._interfaces_by_device["dev-a"] = Interfaces(
-            [Interface(name="eth1", status="up", desc="dev-b", vlan=[98, 99, 100, 101, 102])]
+            [Interface(name="eth1", status="up", desc="dev-b", vlan=VlanSet([98, 99, 100, 101, 102]))]
         )
 
         finder.execute(
@@ -169,7 +176,7 @@ class TracerouteTraversalTestCase(SimpleTestCase):
         """VLAN трассировка помечает одиночный VLAN на порту как точное совпадение."""
         finder = self._make_finder()
         finder._interfaces_by_device["dev-a"] = Interfaces(
-            [Interface(name="eth1", status="up", desc="dev-b", vlan=[100])]
+            [Interface(name="eth1", status="up", desc="dev-b", vlan=VlanSet([100]))]
         )
 
         finder.execute(
@@ -190,10 +197,10 @@ class TracerouteTraversalTestCase(SimpleTestCase):
         """При double-check связь точная только если обе стороны имеют малый набор VLAN."""
         finder = self._make_finder()
         finder._interfaces_by_device["dev-a"] = Interfaces(
-            [Interface(name="eth1", status="up", desc="dev-b", vlan=[100])]
+            [Interface(name="eth1", status="up", desc="dev-b", vlan=VlanSet([100]))]
         )
         finder._interfaces_by_device["dev-b"] = Interfaces(
-            [Interface(name="eth2", status="up", desc="dev-a", vlan=list(range(90, 111)))]
+            [Interface(name="eth2", status="up", desc="dev-a", vlan=VlanSet(range(90, 111)))]
         )
 
         finder.execute(
@@ -266,7 +273,7 @@ class TracerouteTraversalTestCase(SimpleTestCase):
             4025,
         ]
         finder._interfaces_by_device["dev-a"] = Interfaces(
-            [Interface(name="eth1", status="up", desc="dev-b", vlan=scattered_vlans)]
+            [Interface(name="eth1", status="up", desc="dev-b", vlan=VlanSet(scattered_vlans))]
         )
 
         finder.execute(
@@ -288,7 +295,7 @@ class TracerouteTraversalTestCase(SimpleTestCase):
         """VLAN трассировка может скрывать широкие trunk-порты."""
         finder = self._make_finder()
         finder._interfaces_by_device["dev-a"] = Interfaces(
-            [Interface(name="eth1", status="up", desc="dev-b", vlan=list(range(1, 711)))]
+            [Interface(name="eth1", status="up", desc="dev-b", vlan=VlanSet(range(1, 711)))]
         )
 
         finder.execute(
@@ -0,0 +1,195 @@
+import re
+from unittest.mock import patch
+
+import orjson
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.check.models import AuthGroup, DeviceGroup, Devices, InterfacesComments
+from apps.check.services.device.interfaces_workload import DevicesInterfacesWorkloadCollector
+from apps.net_tools.models import DeviceInterfacesWorkload, DevicesInfo, InterfaceSnapshot, VlanPortRange
+from apps.net_tools.services.interface_finder.finder import InterfacesFinder
+from apps.net_tools.services.interface_finder.search_index import DESCRIPTION_SEARCH_INDEX
+from apps.net_tools.services.interface_finder.types import InterfaceFinderFilter
+from apps.net_tools.services.interface_snapshots import bitmap_to_ranges, bitmap_to_vlans, vlans_to_bitmap
+from apps.net_tools.services.interfaces_workload import collect_interfaces_masks, rebuild_interfaces_workload
+from apps.net_tools.services.traceroute.base import Traceroute
+from devicemanager.device import Interfaces
+
+User = get_user_model()
+
+
+class InterfaceSnapshotTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        """Создает оборудование с сохраненными интерфейсами и VLAN."""
+        cls.group = DeviceGroup.objects.create(name="ASW")
+        cls.auth_group = AuthGroup.objects.create(name="test", login="test", password="test")
+        cls.device = Devices.objects.create(
+            name="asw-1", ip="192.0.2.1", group=cls.group, auth_group=cls.auth_group
+        )
+        cls.device_info = DevicesInfo.objects.create(
+            dev=cls.device,
+            interfaces=orjson.dumps(
+                [
+                    {"name": "1(C)", "status": "down", "description": ""},
+                    {"name": "1(F)", "status": "up", "description": "abon fiber"},
+                    {"name": "2", "status": "up", "description": "abon Lenina 1"},
+                    {"name": "3", "status": "admin down", "description": ""},
+                    {"name": "4", "status": "up", "description": "asw2 uplink"},
+                ]
+            ).decode(),
+            vlans=orjson.dumps(
+                [
+                    {"name": "2", "status": "up", "description": "abon Lenina 1", "vlans": [10, 20]},
+                    {"name": "4", "status": "up", "description": "asw2 uplink", "vlans": ["10 to 12", 4094]},
+                ]
+            ).decode(),
+        )
+
+    def setUp(self):
+        DESCRIPTION_SEARCH_INDEX.clear()
+
+    def test_vlans_bitmap(self):
+        self.assertEqual(vlans_to_bitmap([]), b"")
+        self.assertEqual(len(vlans_to_bitmap([4094])), 512)
+        self.assertEqual(bitmap_to_vlans(vlans_to_bitmap([4094, 1, 10, 10])), [1, 10, 4094])
+
+    def test_vlans_bitmap_ranges(self):
+        bitmap = vlans_to_bitmap([1, 2, 3, 10, *range(100, 4095)])
+
+        self.assertEqual(bitmap_to_ranges(bitmap), [(1, 3), (10, 10), (100, 4094)])
+        self.assertEqual(bitmap_to_ranges(b""), [])
+
+    def test_vlan_port_ranges_are_saved_with_devices_info(self):
+        ranges = VlanPortRange.objects.filter(device=self.device).order_by("snapshot__position", "vlan_from")
+
+        self.assertEqual(
+            [(r.snapshot.name, r.vlan_from, r.vlan_to) for r in ranges],
+            [("2", 10, 10), ("2", 20, 20), ("4", 10, 12), ("4", 4094, 4094)],
+        )
+        self.assertEqual(DevicesInfo.objects.get(dev=self.device).vlans_count, 5)
+
+    def test_snapshots_are_saved_with_devices_info(self):
+        rows = list(
+            InterfaceSnapshot.objects.filter(device=self.device).values_list(
+                "name", "vlans", "physical", "abon"
+            )
+        )
+
+        self.assertEqual(
+            [(name, bitmap_to_vlans(vlans), physical, abon) for name, vlans, physical, abon in rows],
+            [
+                ("1(C)", [], False, True),
+                ("1(F)", [], True, True),
+                ("2", [10, 20], True, True),
+                ("3", [], True, True),
+                ("4", [10, 11, 12, 4094], True, False),
+            ],
+        )
+
+        self.device_info.interfaces = orjson.dumps(
+            [{"name": "2", "status": "down", "description": ""}]
+        ).decode()
+        self.device_info.save(update_fields=["interfaces"])
+
+        snapshot = InterfaceSnapshot.objects.get(device=self.device)
+        self.assertEqual(
+            (snapshot.name, snapshot.up, bitmap_to_vlans(snapshot.vlans)), ("2", False, [10, 20])
+        )
+
+    def test_workload_counts_match_interfaces_load(self):
+        loads = DevicesInterfacesWorkloadCollector.get_interfaces_loads(Devices.objects.all())
+
+        self.assertEqual(
+            loads[self.device.id], DevicesInterfacesWorkloadCollector.get_interfaces_load(self.device_info)
+        )
+
+    def test_workload_is_updated_with_snapshots(self):
+        self.device_info.interfaces = orjson.dumps(
+            [
+                {"name": "1", "status": "up", "description": "abon"},
+                {"name": "2", "status": "down", "description": ""},
+            ]
+        ).decode()
+        self.device_info.save(update_fields=["interfaces"])
+
+        loads = DevicesInterfacesWorkloadCollector.get_interfaces_loads(Devices.objects.all())
+        self.assertEqual(
+            loads[self.device.id], DevicesInterfacesWorkloadCollector.get_interfaces_load(self.device_info)
+        )
+        self.assertEqual(
+            (loads[self.device.id]["abons_up"], loads[self.device.id]["abons_down_no_desc"]), (1, 1)
+        )
+
+        DeviceInterfacesWorkload.objects.all().delete()
+        self.assertEqual(rebuild_interfaces_workload(), 1)
+        self.assertEqual(
+            DevicesInterfacesWorkloadCollector.get_interfaces_loads(Devices.objects.all()), loads
+        )
+
+    def test_rebuild_keeps_workload_of_snapshots_saved_meanwhile(self):
+        def save_snapshots_meanwhile(rows):
+            masks = collect_interfaces_masks(rows)
+            self.device_info.interfaces = orjson.dumps(
+                [{"name": "1", "status": "up", "description": "abon"}]
+            ).decode()
+            self.device_info.save(update_fields=["interfaces"])
+            return masks
+
+        with patch(
+            "apps.net_tools.services.interfaces_workload.collect_interfaces_masks",
+            side_effect=save_snapshots_meanwhile,
+        ):
+            self.assertEqual(rebuild_interfaces_workload(), 0)
+
+        workload = DeviceInterfacesWorkload.objects.get(device=self.device)
+        self.assertEqual((workload.count, workload.abons_up), (1, 1))
+
+    def test_find_description(self):
+        user = User.objects.create_user(username="user", password="password")
+        InterfacesComments.objects.create(device=self.device, interface="3", comment="abon moved", user=user)
+
+        finder = InterfacesFinder(Devices.objects.all(), InterfaceFinderFilter(description_pattern="ABON"))
+        result = finder.find_description()
+
+        self.assertEqual(
+            [
+                (item["interface"]["name"], item["interface"]["vlans"], len(item["comments"]))
+                for item in result
+            ],
+            [("1(F)", "", 0), ("2", "10, 20", 0), ("3", "", 1)],
+        )
+
+        finder = InterfacesFinder(
+            Devices.objects.all(),
+            InterfaceFinderFilter(description_pattern=re.compile("lenina|fiber", re.IGNORECASE), vlans={20}),
+        )
+        self.assertEqual([item["interface"]["name"] for item in finder.find_description()], ["2"])
+
+    def test_traceroute_reads_vlan_ports_from_index(self):
+        Devices.objects.create(name="asw2", ip="192.0.2.2", group=self.group, auth_group=self.auth_group)
+        traceroute = Traceroute(cache_timeout=0)
+
+        ports, vlans_count = traceroute._get_vlan_ports("asw-1", 11)
+        self.assertEqual(([port.name for port in ports], vlans_count), (["4"], 5))
+        self.assertEqual(traceroute._get_vlan_ports("asw-1", 30), (Interfaces(), 0))
+
+        with self.assertNumQueries(2):  # Индекс VLAN и форматы имен оборудования.
+            traceroute.execute(
+                device="asw-1",
+                vlan_to_find=20,
+                empty_ports=False,
+                only_admin_up=False,
+                find_device_pattern=r"asw\d",
+            )
+        self.assertEqual(
+            [(edge.node, edge.next_node) for edge in traceroute.result],
+            [("asw-1", "asw-1 d:(abon Lenina 1)")],
+        )
+
+    def test_traceroute_reads_snapshots(self):
+        interfaces = Traceroute(cache_timeout=0)._get_device_interfaces("asw-1")
+
+        self.assertEqual(interfaces["4"].vlan, [10, 11, 12, 4094])
+        self.assertEqual(interfaces["4"].desc, "asw2 uplink")
@@ -0,0 +1,90 @@
+import re
+
+import orjson
+from django.test import TestCase
+
+from apps.check.models import AuthGroup, DeviceGroup, Devices
+from apps.net_tools.models import DevicesInfo, InterfaceSnapshot
+from apps.net_tools.services.interface_finder.finder import InterfacesFinder
+from apps.net_tools.services.interface_finder.search_index import (
+    DESCRIPTION_SEARCH_INDEX,
+    NgramSearchIndex,
+    required_substrings,
+)
+from apps.net_tools.services.interface_finder.types import InterfaceFinderFilter
+
+
+def interfaces_json(*descriptions: str) -> str:
+    return orjson.dumps(
+        [{"name": f"eth{i}", "status": "up", "description": desc} for i, desc in enumerate(descriptions)]
+    ).decode()
+
+
+class DescriptionSearchIndexTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        """Создает оборудование с сохраненными описаниями интерфейсов."""
+        group = DeviceGroup.objects.create(name="ASW")
+        auth_group = AuthGroup.objects.create(name="test", login="test", password="test")
+        cls.devices_info = [
+            DevicesInfo.objects.create(
+                dev=Devices.objects.create(name=name, ip=ip, group=group, auth_group=auth_group),
+                interfaces=interfaces_json(*descriptions),
+            )
+            for name, ip, descriptions in [
+                ("asw-1", "192.0.2.1", ["Abon Lenina 12", "abon Mira 3", ""]),
+                ("asw-2", "192.0.2.2", ["ABON lenina 7", "Камера Ленина"]),
+            ]
+        ]
+
+    def setUp(self):
+        DESCRIPTION_SEARCH_INDEX.clear()
+
+    def _descriptions(self, ids: set[int] | None) -> list[str]:
+        return sorted(InterfaceSnapshot.objects.filter(id__in=ids or set()).values_list("desc", flat=True))
+
+    def test_search_substrings(self):
+        index = NgramSearchIndex()
+
+        self.assertEqual(self._descriptions(index.search(["LENINA"])), ["ABON lenina 7", "Abon Lenina 12"])
+        self.assertEqual(self._descriptions(index.search(["abon", "mira"])), ["abon Mira 3"])
+        self.assertEqual(self._descriptions(index.search(["камера"])), ["Камера Ленина"])
+        self.assertEqual(index.search(["ab"]), None)
+
+    def test_resynced_device_replaces_its_rows(self):
+        index = NgramSearchIndex()
+        self.assertEqual(len(index.search(["lenina"]) or ()), 2)
+
+        device_info = self.devices_info[0]
+        device_info.interfaces = interfaces_json("abon Pushkina 1")
+        device_info.save(update_fields=["interfaces"])
+
+        self.assertEqual(self._descriptions(index.search(["lenina"])), ["ABON lenina 7"])
+        self.assertEqual(self._descriptions(index.search(["pushkina"])), ["abon Pushkina 1"])
+
+    def test_required_substrings(self):
+        self.assertEqual(required_substrings(re.compile(r"^abon\s+(lenina)\d")), ["abon", "lenina"])
+        self.assertEqual(required_substrings(re.compile(r"lenina|mira")), [])
+        self.assertEqual(required_substrings(re.compile(r"(?:abon)[ _]lenina\.(12)+")), ["abon", "lenina."])
+        self.assertEqual(required_substrings(re.compile(r"ab+c{2}(?=mira)d|e")), [])
+        self.assertEqual(required_substrings(re.compile(r"ab+c{2}(?=mira)d")), ["a", "d"])
+        self.assertEqual(required_substrings(re.compile(r"abon lenina", re.VERBOSE)), [])
+
+    def test_required_substrings_skip_character_codes(self):
+        self.assertEqual(required_substrings(re.compile(r"\x41bc")), ["bc"])
+        self.assertEqual(required_substrings(re.compile(r"abc\N{LATIN SMALL LETTER A}d")), ["abc", "d"])
+        self.assertEqual(required_substrings(re.compile(r"ab\u0063de\U00000066g")), ["ab", "de", "g"])
+        self.assertEqual(required_substrings(re.compile(r"ab\0cd\101ef")), ["ab", "cd", "ef"])
+        self.assertEqual(required_substrings(re.compile(r"(ab)x\1yz")), ["abx", "yz"])
+        self.assertEqual(required_substrings(re.compile(r"\x41\x62c\.d")), ["c.d"])
+
+    def test_finder_uses_index(self):
+        def find(pattern) -> list[str]:
+            finder = InterfacesFinder(
+                Devices.objects.all(), InterfaceFinderFilter(description_pattern=pattern)
+            )
+            return [item["interface"]["description"] for item in finder.find_description()]
+
+        self.assertEqual(find("lenina"), ["Abon Lenina 12", "ABON lenina 7"])
+        self.assertEqual(find(re.compile(r"abon\s+lenina\s+\d{2}", re.IGNORECASE)), ["Abon Lenina 12"])
+        self.assertEqual(find(re.compile(r"mira|камера", re.IGNORECASE)), ["abon Mira 3", "Камера Ленина"])
@@ -1,29 +1,20 @@
 from concurrent.futures import ThreadPoolExecutor
 
+from apps.check.services.device.reachability import get_devices_reachability
 from devicemanager.device import DeviceManager, Interfaces
 
 from .types import BaseRingPoint
 
 
-def _ping_point(point: BaseRingPoint):
-    # Дважды
-    return point.device.available and point.device.available
-
-
 def thread_ping(devices: list[BaseRingPoint]):
     """
     Эта функция проверяет наличие устройств в списке и обновляет их статус ping.
-    :return: Список объектов RingPoint, где каждый объект RingPoint имеет логическое значение,
-     указывающее доступность устройства, которое он представляет.
-    """
-    with ThreadPoolExecutor() as ex:
-        futures = []
-        for point in devices:
-            # Проверяем пинг
-            futures.append(ex.submit(_ping_point, point=point))
 
-        for i, f in enumerate(futures):
-            devices[i].ping = f.result()
+    Все оборудование кольца проверяется заново одной пачкой, результат публикуется в кеш доступности.
+    """
+    reachability = get_devices_reachability((point.device.ip for point in devices), fresh=True)
+    for point in devices:
+        point.ping = reachability.get(point.device.ip, False)
 
 
 def _get_device_interfaces(point: BaseRingPoint, device_manager: type[DeviceManager]) -> Interfaces:
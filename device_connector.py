@@ -1,24 +1,55 @@
+import inspect
 import io
+import json
 import logging
 import os
 import pathlib
+from collections.abc import Callable, Iterable, Iterator
+from functools import partial
 from ipaddress import IPv4Address
-from typing import NotRequired, TypedDict, cast
+from typing import Any, NotRequired, TypedDict, cast
 
-from flask import Flask, Response, after_this_request, jsonify, request, send_file
+import requests
+from flask import Flask, Response, after_this_request, jsonify, request, send_file, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from ping3 import ping
 
 from devicemanager.dc import SimpleAuthObject
+from devicemanager.device_connector.batch import DEVICE_BATCHES, DEVICE_CONNECTOR_MAX_BATCH_SIZE
 from devicemanager.device_connector.connection_status import CONNECTION_STATUSES
 from devicemanager.device_connector.exceptions import MethodError
 from devicemanager.device_connector.factory import DeviceSessionFactory
+from devicemanager.device_connector.jobs import DEVICE_JOBS
+from devicemanager.device_connector.sharding import SHARD_ROUTER
 from devicemanager.exceptions import BaseDeviceException
+from devicemanager.reachability import ping_hosts
 from devicemanager.session_control import DEVICE_SESSIONS
+from devicemanager.vlans import VlanSet
+
+
+class DeviceConnectorJSONProvider(DefaultJSONProvider):
+    """Ответы device connector: VLAN портов передаются диапазонами, см. `VlanSet.compact()`."""
+
+    @staticmethod
+    def default(o: Any) -> Any:
+        if isinstance(o, VlanSet):
+            return o.compact()
+        return DefaultJSONProvider.default(o)
+
 
 app = Flask(__name__)
+app.json = DeviceConnectorJSONProvider(app)
 TOKEN = os.getenv("DEVICE_CONNECTOR_TOKEN", "ASDIH!hausd17391")
 app.logger.setLevel(os.getenv("DEVICE_CONNECTOR_LOG_LEVEL", logging.INFO))
 
+# Запрос уже перенаправлен другим шардом и должен быть обработан здесь.
+FORWARDED_HEADER = "X-Device-Connector-Forwarded"
+FORWARDED_RESPONSE_HEADERS = ("Content-Type", "Content-Disposition", "Location")
+# Максимальное время ожидания результата задачи одним запросом.
+MAX_JOB_WAIT_SECONDS = float(os.getenv("DEVICE_CONNECTOR_MAX_JOB_WAIT", "30"))
+# Максимальное кол-во адресов в одном запросе `POST /ping`.
+DEVICE_CONNECTOR_MAX_PING_SIZE = int(os.getenv("DEVICE_CONNECTOR_MAX_PING_SIZE", "5000"))
+
 
 class ConnectionType(TypedDict):
     cmd_protocol: str
@@ -48,9 +79,31 @@ def handle_method_data(data):
     if isinstance(data, io.BytesIO):
         return send_file(data, download_name="file")
 
+    if inspect.isgenerator(data):
+        return Response(stream_with_context(stream_method_chunks(data)), mimetype="application/x-ndjson")
+
     return jsonify({"data": data})
 
 
+def stream_method_chunks(chunks: Iterator[str]) -> Iterator[str]:
+    """
+    Потоковый вывод метода в формате NDJSON (chunked HTTP).
+
+    Каждая строка - `{"chunk": "..."}`, последняя строка - `{"done": true}`
+    либо ошибка `{"type": "...", "message": "..."}`, если вывод прервался.
+    """
+
+    try:
+        for chunk in chunks:
+            if chunk:
+                yield json.dumps({"chunk": chunk}, ensure_ascii=False) + "\n"
+    except Exception as err:
+        app.logger.error(err.__class__.__name__, exc_info=err)
+        yield json.dumps({"type": err.__class__.__name__, "message": str(err)}, ensure_ascii=False) + "\n"
+        return
+    yield json.dumps({"done": True}) + "\n"
+
+
 def check_token() -> Response | None:
     request_token = request.headers.get("Token")
     if not request_token or request_token != TOKEN:
@@ -65,27 +118,75 @@ def check_token() -> Response | None:
     return None
 
 
-@app.route("/connector/<ip>/<method>", methods=["POST"])
-def connector(ip: str, method: str):
-    token_error = check_token()
-    if token_error is not None:
-        return token_error
-
+def validate_ip(ip: str) -> str | None:
     try:
-        valid_ip = IPv4Address(ip).compressed
+        return IPv4Address(ip).compressed
     except ValueError:
-        resp = jsonify({"error": "invalid ip"})
-        resp.status_code = 400
-        return resp
+        return None
 
-    data = request.get_json(force=True)
-    connection = cast(ConnectionType, data.get("connection") or {})
 
+def invalid_ip_response() -> Response:
+    resp = jsonify({"error": "invalid ip"})
+    resp.status_code = 400
+    return resp
+
+
+@app.before_request
+def forward_to_shard_owner() -> Response | None:
+    """
+    Перенаправить запрос по оборудованию шарду, который владеет его пулом сессий.
+
+    Если владелец недоступен, запрос обрабатывается текущим процессом:
+    сессии недоступного процесса все равно потеряны.
+    """
+
+    ip = (request.view_args or {}).get("ip")
+    if not ip or not SHARD_ROUTER.enabled or request.headers.get(FORWARDED_HEADER):
+        return None
+    valid_ip = validate_ip(ip)
+    if valid_ip is None or SHARD_ROUTER.is_local(valid_ip):
+        return None
+
+    owner = SHARD_ROUTER.address(valid_ip)
+    headers = {name: value for name, value in request.headers.items() if name in ("Token", "Content-Type")}
+    headers[FORWARDED_HEADER] = SHARD_ROUTER.self_address or "1"
+    try:
+        owner_response = requests.request(
+            request.method,
+            f"{owner}{request.full_path.rstrip('?')}",
+            headers=headers,
+            data=request.get_data(),
+            timeout=(3, None),
+            stream=True,
+        )
+    except requests.exceptions.ConnectionError as exc:
+        app.logger.warning("Device: %s | Шард %s недоступен: %s", valid_ip, owner, exc)
+        return None
+
+    # Ответ владельца передается по мере получения, потоковый вывод не собирается в памяти.
+    response = Response(
+        owner_response.iter_content(chunk_size=None),
+        status=owner_response.status_code,
+        headers={
+            name: owner_response.headers[name]
+            for name in FORWARDED_RESPONSE_HEADERS
+            if name in owner_response.headers
+        },
+    )
+    response.call_on_close(owner_response.close)
+    return response
+
+
+def perform_device_method(valid_ip: str, method: str, data: dict) -> Any:
+    """Выполнить метод оборудования и записать результат подключения в диагностику."""
+
+    connection = cast(ConnectionType, data.get("connection") or {})
+    factory: DeviceSessionFactory | None = None
     try:
         factory = DeviceSessionFactory(
             ip=valid_ip,
             protocol=connection.get("cmd_protocol", "ssh"),
-            auth_obj=SimpleAuthObject(**data.get("auth")),
+            auth_obj=SimpleAuthObject(**data["auth"]),
             make_session_global=connection.get("make_session_global", True),
             pool_size=connection.get("pool_size", None),
             pool_expired_seconds=connection.get("pool_expired_seconds", 2),
@@ -95,35 +196,226 @@ def connector(ip: str, method: str):
             ssh_port=connection.get("ssh_port"),
             snmp_port=connection.get("snmp_port"),
         )
-        params = data.get("params", {})
-
-        try:
-            data = factory.perform_method(method, **params)
-            if not (method == "get_interfaces" and factory.port_scan_protocol == "snmp"):
-                CONNECTION_STATUSES.record_success(valid_ip)
-            return handle_method_data(data)
+        result = factory.perform_method(method, **data.get("params", {}))
 
-        except MethodError:
-            resp = jsonify({"error": "no attr"})
-            resp.status_code = 400
-            return resp
+    except MethodError:
+        raise
 
     except (BaseDeviceException, Exception) as err:
         CONNECTION_STATUSES.record_error(
             valid_ip,
             err,
-            ssh_port=factory.ssh_port if "factory" in locals() else 22,
+            ssh_port=factory.ssh_port if factory is not None else 22,
         )
         app.logger.error(err.__class__.__name__, exc_info=err)
-        resp = jsonify(
-            {
-                "type": err.__class__.__name__,
-                "message": str(err),
-            }
-        )
-        resp.status_code = 500
+        raise
+
+    if not (method == "get_interfaces" and factory.port_scan_protocol == "snmp"):
+        CONNECTION_STATUSES.record_success(valid_ip)
+    return result
+
+
+def method_error_response(err: Exception) -> Response:
+    if isinstance(err, MethodError):
+        resp = jsonify({"error": "no attr"})
+        resp.status_code = 400
+        return resp
+
+    resp = jsonify(
+        {
+            "type": err.__class__.__name__,
+            "message": str(err),
+        }
+    )
+    resp.status_code = 500
+    return resp
+
+
+@app.route("/connector/<ip>/<method>", methods=["POST"])
+def connector(ip: str, method: str):
+    token_error = check_token()
+    if token_error is not None:
+        return token_error
+
+    valid_ip = validate_ip(ip)
+    if valid_ip is None:
+        return invalid_ip_response()
+
+    try:
+        data = perform_device_method(valid_ip, method, request.get_json(force=True))
+    except Exception as err:
+        return method_error_response(err)
+    return handle_method_data(data)
+
+
+def perform_batch_item(item: dict) -> dict:
+    """Выполнить один элемент пакетного запроса и вернуть строку результата с его `id`."""
+
+    result: dict = {"id": item.get("id")}
+    valid_ip = validate_ip(str(item.get("ip", "")))
+    if valid_ip is None:
+        return {**result, "error": "invalid ip"}
+
+    try:
+        data = perform_device_method(valid_ip, str(item.get("method", "")), item)
+        if inspect.isgenerator(data):
+            data = "".join(str(chunk) for chunk in data)
+        if isinstance(data, pathlib.Path | io.BytesIO):
+            raise TypeError("Файлы не передаются пакетным запросом")
+    except MethodError:
+        return {**result, "error": "no attr"}
+    except Exception as err:
+        return {**result, "type": err.__class__.__name__, "message": str(err)}
+    return {**result, "data": data}
+
+
+def perform_batch_items(items: list[dict]) -> Iterator[dict]:
+    for item in items:
+        yield perform_batch_item(item)
+
+
+def forward_batch_items(owner: str, items: list[dict]) -> Iterator[dict]:
+    """
+    Выполнить элементы пакета на шарде, владеющем пулами их оборудования.
+
+    Строки результатов владельца передаются по мере получения. Элементы, результат которых
+    не получен (владелец недоступен или прервал ответ), выполняются текущим процессом.
+    """
+
+    headers = {"Token": TOKEN, FORWARDED_HEADER: SHARD_ROUTER.self_address or "1"}
+    answered = set()
+    try:
+        with requests.post(
+            f"{owner}/batch", json={"items": items}, headers=headers, timeout=(3, None), stream=True
+        ) as owner_response:
+            owner_response.raise_for_status()
+            for raw_line in owner_response.iter_lines():
+                line = json.loads(raw_line) if raw_line else {}
+                if "id" in line:
+                    answered.add(line["id"])
+                    yield line
+    except requests.exceptions.RequestException as exc:
+        app.logger.warning("Шард %s недоступен для пакетного запроса: %s", owner, exc)
+
+    yield from perform_batch_items([item for item in items if item.get("id") not in answered])
+
+
+def batch_tasks(items: list[dict], forwarded: bool) -> Iterator[Callable[[], Iterable[dict]]]:
+    foreign: dict[str, list[dict]] = {}
+    for item in items:
+        valid_ip = validate_ip(str(item.get("ip", "")))
+        if valid_ip is not None and not forwarded and not SHARD_ROUTER.is_local(valid_ip):
+            foreign.setdefault(cast(str, SHARD_ROUTER.address(valid_ip)), []).append(item)
+        else:
+            yield partial(perform_batch_items, [item])
+    for owner, owner_items in foreign.items():
+        yield partial(forward_batch_items, owner, owner_items)
+
+
+def stream_batch_results(items: list[dict], forwarded: bool) -> Iterator[str]:
+    try:
+        for line in DEVICE_BATCHES.run(batch_tasks(items, forwarded)):
+            yield app.json.dumps(line, ensure_ascii=False) + "\n"
+    except Exception as err:
+        app.logger.error(err.__class__.__name__, exc_info=err)
+        yield json.dumps({"type": err.__class__.__name__, "message": str(err)}, ensure_ascii=False) + "\n"
+        return
+    yield json.dumps({"done": True}) + "\n"
+
+
+@app.post("/batch")
+def batch():
+    """
+    Выполнить методы на множестве оборудования одним запросом.
+
+    Тело: `{"items": [{"id", "ip", "method", "connection", "auth", "params"}, ...]}`.
+    Элементы выполняются параллельно, результаты передаются в формате NDJSON
+    по мере готовности: `{"id", "data"}` либо ошибка `{"id", "type", "message"}`
+    (`{"id", "error"}` для неверного IP или метода), последняя строка - `{"done": true}`.
+    """
+
+    token_error = check_token()
+    if token_error is not None:
+        return token_error
+
+    data = request.get_json(force=True, silent=True)
+    items = data.get("items") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        resp = jsonify({"error": "invalid batch"})
+        resp.status_code = 400
+        return resp
+    if len(items) > DEVICE_CONNECTOR_MAX_BATCH_SIZE:
+        resp = jsonify({"error": f"batch size exceeds {DEVICE_CONNECTOR_MAX_BATCH_SIZE} items"})
+        resp.status_code = 413
+        return resp
+
+    forwarded = bool(request.headers.get(FORWARDED_HEADER))
+    return Response(
+        stream_with_context(stream_batch_results(items, forwarded)), mimetype="application/x-ndjson"
+    )
+
+
+@app.post("/jobs/<ip>/<method>")
+def submit_job(ip: str, method: str):
+    """
+    Запустить метод оборудования в фоне и вернуть идентификатор задачи.
+
+    Результат получается через `GET /jobs/<ip>/<job_id>?wait=<секунды>`.
+    """
+
+    token_error = check_token()
+    if token_error is not None:
+        return token_error
+
+    valid_ip = validate_ip(ip)
+    if valid_ip is None:
+        return invalid_ip_response()
+
+    data = request.get_json(force=True)
+    job = DEVICE_JOBS.submit(valid_ip, method, lambda: perform_device_method(valid_ip, method, data))
+    resp = jsonify({"job": job.id, "status": job.status})
+    resp.status_code = 202
+    resp.headers["Location"] = f"/jobs/{valid_ip}/{job.id}"
+    return resp
+
+
+@app.get("/jobs/<ip>/<job_id>")
+def get_job_result(ip: str, job_id: str):
+    """
+    Long-poll результата задачи.
+
+    Пока задача выполняется, через `wait` секунд (не более `MAX_JOB_WAIT_SECONDS`)
+    возвращается статус 202. Результат завершенной задачи отдается один раз
+    в том же формате, что и у `/connector/<ip>/<method>`.
+    """
+
+    token_error = check_token()
+    if token_error is not None:
+        return token_error
+
+    valid_ip = validate_ip(ip)
+    if valid_ip is None:
+        return invalid_ip_response()
+
+    job = DEVICE_JOBS.get(valid_ip, job_id)
+    if job is None:
+        resp = jsonify({"error": "job not found"})
+        resp.status_code = 404
         return resp
 
+    try:
+        wait = min(max(float(request.args.get("wait", 0)), 0), MAX_JOB_WAIT_SECONDS)
+    except ValueError:
+        wait = 0
+    if not DEVICE_JOBS.wait(job, timeout=wait):
+        resp = jsonify({"job": job.id, "status": job.status})
+        resp.status_code = 202
+        return resp
+
+    if job.error is not None:
+        return method_error_response(job.error)
+    return handle_method_data(job.result)
+
 
 @app.route("/pool/<ip>", methods=["GET", "DELETE"])
 def delete_connection_pool(ip: str):
@@ -132,12 +424,9 @@ def delete_connection_pool(ip: str):
     if token_error:
         return token_error
 
-    try:
-        valid_ip = IPv4Address(ip).compressed
-    except ValueError:
-        resp = jsonify({"error": "invalid ip"})
-        resp.status_code = 400
-        return resp
+    valid_ip = validate_ip(ip)
+    if valid_ip is None:
+        return invalid_ip_response()
 
     if request.method == "DELETE":
         DEVICE_SESSIONS.delete_pool(valid_ip)
@@ -163,12 +452,9 @@ def confirm_ssh_host_key(ip: str):
     if token_error:
         return token_error
 
-    try:
-        valid_ip = IPv4Address(ip).compressed
-    except ValueError:
-        resp = jsonify({"error": "invalid ip"})
-        resp.status_code = 400
-        return resp
+    valid_ip = validate_ip(ip)
+    if valid_ip is None:
+        return invalid_ip_response()
 
     try:
         confirmed = CONNECTION_STATUSES.confirm_ssh_host_key(valid_ip)
@@ -201,6 +487,46 @@ def ping_pong_device(ip: str):
     return jsonify({"available": has_connection})
 
 
+@app.post("/ping")
+def ping_devices():
+    """
+    Проверить доступность множества оборудования одним запросом.
+
+    Тело: `{"ips": [...], "timeout": 2}`. Оборудование с открытой сессией считается доступным,
+    остальное проверяется ICMP echo одновременно. Ответ: `{"available": {"<ip>": true, ...}}`.
+    """
+
+    token_error = check_token()
+    if token_error:
+        return token_error
+
+    data = request.get_json(force=True, silent=True)
+    ips = data.get("ips") if isinstance(data, dict) else None
+    if not isinstance(ips, list) or not all(isinstance(ip, str) for ip in ips):
+        resp = jsonify({"error": "invalid ping batch"})
+        resp.status_code = 400
+        return resp
+    if len(ips) > DEVICE_CONNECTOR_MAX_PING_SIZE:
+        resp = jsonify({"error": f"ping batch size exceeds {DEVICE_CONNECTOR_MAX_PING_SIZE} items"})
+        resp.status_code = 413
+        return resp
+
+    valid_ips: dict[str, str] = {}
+    for ip in ips:
+        valid_ip = validate_ip(ip)
+        if valid_ip is None:
+            return invalid_ip_response()
+        valid_ips[ip] = valid_ip
+    try:
+        timeout = min(max(float(data.get("timeout", 2)), 0.1), 10)
+    except (TypeError, ValueError):
+        timeout = 2
+
+    available = {ip: True for ip in set(valid_ips.values()) if DEVICE_SESSIONS.has_connection(ip)}
+    available.update(ping_hosts([ip for ip in valid_ips.values() if ip not in available], timeout=timeout))
+    return jsonify({"available": {ip: available.get(valid_ip, False) for ip, valid_ip in valid_ips.items()}})
+
+
 if __name__ == "__main__":
     app.run(
         host=os.getenv("DEVICE_CONNECTOR_BIND_HOST", "0.0.0.0"),
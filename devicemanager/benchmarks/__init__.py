@@ -0,0 +1,7 @@
+"""
+Бенчмарки модуля devicemanager.
+
+Каждый модуль запускается отдельно, например:
+
+    python -m devicemanager.benchmarks.snmp_engine --help
+"""
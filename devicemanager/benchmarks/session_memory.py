@@ -0,0 +1,166 @@
+"""
+Память сессии из пула при многократном чтении постраничного вывода.
+
+Эмулируется сессия Cisco, которая живет в пуле `--hours` часов и каждые `--interval` секунд
+выполняет `get_interfaces` (вывод из `--ports` строк, по `--page-lines` строк на страницу).
+Сравнивается прежняя обработка вывода (склейка строк и удаление ANSI последовательностей
+на каждой странице, неограниченная `before_history`) и текущая:
+
+    python -m devicemanager.benchmarks.session_memory --hours 2 --interval 60 --ports 500
+"""
+
+import argparse
+import contextlib
+import time
+import tracemalloc
+from unittest.mock import patch
+
+import pexpect
+from tabulate import tabulate
+
+from devicemanager.session_spawner import BeforeHistory
+from devicemanager.vendors.base.device import BaseDevice
+from devicemanager.vendors.base.helpers import remove_ansi_escape_codes
+from devicemanager.vendors.cisco.basic import Cisco
+
+
+def _interfaces_pages(ports: int, page_lines: int) -> list[bytes]:
+    lines = ["Interface                      Status         Protocol Description"]
+    for port in range(1, ports + 1):
+        status = "up             up      " if port % 3 else "admin down     down    "
+        lines.append(f"Gi{port // 48 + 1}/0/{port % 48 + 1:<24} {status} client-{port}")
+    pages = []
+    for start in range(0, len(lines), page_lines):
+        # После `--More--` Cisco стирает приглашение управляющей последовательностью.
+        prefix = "\x1b[42D" if start else "show interface description\r\n"
+        pages.append((prefix + "\r\n".join(lines[start : start + page_lines])).encode())
+    return pages
+
+
+class PagedCLISession:
+    """Сессия, отдающая вывод `show interface description` по страницам."""
+
+    def __init__(self, pages: list[bytes], history: "BeforeHistory | LegacyBeforeHistory"):
+        self.pages = pages
+        self.before: bytes = b""
+        self._queue: list[bytes] = []
+        self._history = history
+
+    def send(self, data: str) -> None:
+        if data.strip() == "show interface description":
+            self._queue = list(self.pages)
+
+    def sendline(self, data: str) -> None:
+        self.send(data)
+
+    def expect(self, pattern, timeout=None) -> int:
+        if not self._queue:
+            self.before = b""
+            return 0
+        self.before = self._queue.pop(0)
+        # Вывод каждой команды попадает в историю сессии.
+        self.save_before()
+        return 1 if self._queue else 0
+
+    def save_before(self) -> None:
+        self._history.append(self.before)
+
+    @property
+    def before_history(self) -> str:
+        return self._history.getvalue()
+
+
+class LegacyBeforeHistory:
+    """Прежняя история сессии: строка, к которой дописывается весь вывод."""
+
+    def __init__(self) -> None:
+        self._value = ""
+
+    def append(self, chunk: bytes) -> None:
+        self._value += "\n" + remove_ansi_escape_codes(chunk)
+
+    def __len__(self) -> int:
+        return len(self._value)
+
+    def getvalue(self) -> str:
+        return self._value
+
+
+def _legacy_send_command(self: BaseDevice, command: str, *args, **kwargs) -> str:
+    """Прежний `send_command`: очистка каждой страницы и склейка через `+=`."""
+
+    self.session.send(command + "\n")
+    output = ""
+    while True:
+        match = self.session.expect([self.prompt, self.space_prompt, pexpect.TIMEOUT])
+        output += remove_ansi_escape_codes(self.session.before)
+        if match != 1:
+            return output
+        self.session.send(" ")
+        if output and output[-1] != "\n":
+            output += "\n"
+
+
+def run(mode: str, iterations: int, pages: list[bytes]) -> list:
+    history = LegacyBeforeHistory() if mode == "legacy" else BeforeHistory()
+    device = Cisco.__new__(Cisco)
+    device.ip = "192.0.2.10"
+    device.session = PagedCLISession(pages, history)  # type: ignore[assignment]
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    peak_command_kb = 0
+    started = time.perf_counter()
+    legacy = patch.object(Cisco, "send_command", _legacy_send_command)
+    with legacy if mode == "legacy" else contextlib.nullcontext():
+        for _ in range(iterations):
+            tracemalloc.reset_peak()
+            before_command = tracemalloc.get_traced_memory()[0]
+            interfaces = device.get_interfaces()
+            peak_command_kb = max(
+                peak_command_kb, (tracemalloc.get_traced_memory()[1] - before_command) // 1024
+            )
+    duration = time.perf_counter() - started
+    retained_kb = (tracemalloc.get_traced_memory()[0] - baseline) // 1024
+    tracemalloc.stop()
+
+    return [
+        mode,
+        iterations,
+        len(interfaces),
+        round(duration / iterations * 1000, 2),
+        peak_command_kb,
+        retained_kb,
+        len(history) // 1024,
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--hours", type=float, default=2, help="Время жизни сессии в пуле")
+    parser.add_argument("--interval", type=float, default=60, help="Период вызова get_interfaces, сек")
+    parser.add_argument("--ports", type=int, default=500)
+    parser.add_argument("--page-lines", type=int, default=24)
+    args = parser.parse_args()
+
+    iterations = max(int(args.hours * 3600 / args.interval), 1)
+    pages = _interfaces_pages(args.ports, args.page_lines)
+    print(f"{iterations} вызовов get_interfaces, {len(pages)} страниц по {args.page_lines} строк")
+
+    headers = [
+        "mode",
+        "calls",
+        "interfaces",
+        "mean, ms",
+        "peak per call, KiB",
+        "retained, KiB",
+        "before_history, KiB",
+    ]
+    rows = [run(mode, iterations, pages) for mode in ("legacy", "current")]
+    print(tabulate(rows, headers=headers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Сравнение встроенного SNMP клиента и `snmpbulkwalk` при сборе интерфейсов.
+
+Без `--ip` поднимается локальный SNMP агент с синтетической таблицей IF-MIB:
+
+    python -m devicemanager.benchmarks.snmp_engine --interfaces 500 --rounds 20
+
+С реальным оборудованием:
+
+    python -m devicemanager.benchmarks.snmp_engine --ip 10.0.0.1 --community public
+"""
+
+import argparse
+import bisect
+import shutil
+import socket
+import statistics
+import threading
+import time
+from collections.abc import Callable
+from unittest.mock import patch
+
+from tabulate import tabulate
+
+from devicemanager import snmp
+from devicemanager.snmp_engine import (
+    END_OF_MIB_VIEW,
+    NO_SUCH_INSTANCE,
+    OID,
+    PDU_GET_BULK_REQUEST,
+    PDU_GET_NEXT_REQUEST,
+    PDU_RESPONSE,
+    SnmpProtocolError,
+    SnmpValue,
+    decode_message,
+    encode_message,
+    parse_oid,
+)
+
+
+class FakeSnmpAgent:
+    """Минимальный SNMPv2c агент (GET/GETNEXT/GETBULK) поверх UDP для тестов и бенчмарков."""
+
+    def __init__(self, table: dict[str, SnmpValue], community: str = "public", host: str = "127.0.0.1"):
+        self.community = community.encode()
+        self._oids: list[OID] = sorted(parse_oid(oid) for oid in table)
+        self._values = {parse_oid(oid): value for oid, value in table.items()}
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind((host, 0))
+        self._sock.settimeout(0.2)
+        self.host, self.port = self._sock.getsockname()
+        self.requests_count = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    @classmethod
+    def with_interfaces(cls, count: int, community: str = "public") -> "FakeSnmpAgent":
+        """Агент с таблицей IF-MIB из `count` интерфейсов."""
+
+        table: dict[str, SnmpValue] = {"1.3.6.1.2.1.1.1.0": b"Fake switch", "1.3.6.1.2.1.1.5.0": b"fake"}
+        table["1.3.6.1.2.1.1.2.0"] = "1.3.6.1.4.1.2011.2.23.95"
+        for index in range(1, count + 1):
+            table[f"1.3.6.1.2.1.2.2.1.1.{index}"] = index
+            table[f"1.3.6.1.2.1.2.2.1.2.{index}"] = f"GigabitEthernet0/0/{index}".encode()
+            table[f"1.3.6.1.2.1.2.2.1.7.{index}"] = 2 if index % 10 == 0 else 1
+            table[f"1.3.6.1.2.1.2.2.1.8.{index}"] = 1 if index % 3 else 2
+            table[f"1.3.6.1.2.1.31.1.1.1.1.{index}"] = f"Gi0/0/{index}".encode()
+            table[f"1.3.6.1.2.1.31.1.1.1.18.{index}"] = f"client-{index}".encode()
+        return cls(table, community=community)
+
+    def __enter__(self) -> "FakeSnmpAgent":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sock.close()
+
+    def _next(self, oid: OID) -> tuple[OID, SnmpValue]:
+        position = bisect.bisect_right(self._oids, oid)
+        if position >= len(self._oids):
+            return oid, END_OF_MIB_VIEW
+        next_oid = self._oids[position]
+        return next_oid, self._values[next_oid]
+
+    def _serve(self) -> None:
+        while not self._stop.is_set():
+            try:
+                data, address = self._sock.recvfrom(65535)
+            except TimeoutError:
+                continue
+            try:
+                message = decode_message(data)
+            except SnmpProtocolError:
+                continue
+            if message.community != self.community:
+                continue
+            self.requests_count += 1
+
+            pdu = message.pdu
+            var_binds: list[tuple[OID, SnmpValue]] = []
+            if pdu.pdu_type == PDU_GET_BULK_REQUEST:
+                # error_index в GETBULK запросе означает max-repetitions.
+                for oid, _ in pdu.var_binds:
+                    for _ in range(max(pdu.error_index, 1)):
+                        oid, value = self._next(oid)
+                        var_binds.append((oid, value))
+                        if value is END_OF_MIB_VIEW:
+                            break
+            elif pdu.pdu_type == PDU_GET_NEXT_REQUEST:
+                var_binds = [self._next(oid) for oid, _ in pdu.var_binds]
+            else:
+                var_binds = [(oid, self._values.get(oid, NO_SUCH_INSTANCE)) for oid, _ in pdu.var_binds]
+
+            self._sock.sendto(
+                encode_message(self.community, PDU_RESPONSE, pdu.request_id, var_binds), address
+            )
+
+
+def _measure(func: Callable[[], list], rounds: int) -> tuple[list[float], int]:
+    timings = []
+    result: list = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return timings, len(result)
+
+
+def run(ip: str, community: str, port: int, rounds: int) -> list[list]:
+    """Замерить оба способа сбора интерфейсов и вернуть строки таблицы."""
+
+    engines = ["native"]
+    if shutil.which("snmpbulkwalk"):
+        engines.append("subprocess")
+
+    rows = []
+    for engine in engines:
+        with patch.object(snmp, "SNMP_ENGINE", engine):
+            timings, count = _measure(lambda: snmp.get_interfaces(ip, community, port), rounds)
+        rows.append(
+            [
+                engine,
+                count,
+                round(statistics.mean(timings) * 1000, 2),
+                round(statistics.median(timings) * 1000, 2),
+                round(max(timings) * 1000, 2),
+            ]
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--ip", help="IP адрес оборудования. Без него используется локальный агент")
+    parser.add_argument("--community", default="public")
+    parser.add_argument("--port", type=int, default=161)
+    parser.add_argument("--interfaces", type=int, default=200, help="Кол-во интерфейсов локального агента")
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    headers = ["engine", "interfaces", "mean, ms", "median, ms", "max, ms"]
+    if args.ip:
+        rows = run(args.ip, args.community, args.port, args.rounds)
+    else:
+        with FakeSnmpAgent.with_interfaces(args.interfaces, community=args.community) as agent:
+            rows = run(agent.host, args.community, agent.port, args.rounds)
+
+    print(tabulate(rows, headers=headers))
+    if not shutil.which("snmpbulkwalk"):
+        print("\nsnmpbulkwalk не найден, замер через subprocess пропущен")
+
+
+if __name__ == "__main__":
+    main()
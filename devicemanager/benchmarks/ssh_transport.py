@@ -0,0 +1,269 @@
+"""
+Сравнение создания пула SSH сессий через процесс `ssh` и встроенным клиентом paramiko.
+
+Без `--ip` поднимается локальный SSH сервер, эмулирующий CLI коммутатора:
+
+    python -m devicemanager.benchmarks.ssh_transport --pool-size 3 --rounds 5
+
+С реальным оборудованием:
+
+    python -m devicemanager.benchmarks.ssh_transport --ip 10.0.0.1 --login admin --password secret
+"""
+
+import argparse
+import logging
+import shutil
+import socket
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+import paramiko
+from tabulate import tabulate
+
+from devicemanager import dc
+from devicemanager.dc import DeviceRemoteConnector, SimpleAuthObject, SSHSpawn
+from devicemanager.device_connector.ssh_algorithms import SSHAlgorithmsStore
+from devicemanager.device_connector.ssh_host_keys import SSHKnownHostsStore
+from devicemanager.session_spawner import SessionSpawner
+from devicemanager.ssh_transport import SSH_ALGORITHMS_CACHE
+
+
+class _FakeServerInterface(paramiko.ServerInterface):
+    def __init__(self, server: "FakeSSHServer"):
+        self.server = server
+        self.shell_requested = threading.Event()
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_auth_password(self, username, password):
+        if (username, password) == (self.server.login, self.server.password):
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        self.shell_requested.set()
+        return True
+
+
+class FakeSSHServer:
+    """SSH сервер с CLI коммутатора (эхо команды, вывод, приглашение) для тестов и бенчмарков."""
+
+    def __init__(
+        self,
+        commands: Mapping[str, str] | None = None,
+        login: str = "admin",
+        password: str = "password",
+        prompt: str = "fake#",
+        host_key: paramiko.PKey | None = None,
+    ):
+        self.commands = dict(commands or {})
+        self.login = login
+        self.password = password
+        self.prompt = prompt
+        self.host_key = host_key or paramiko.ECDSAKey.generate()
+        self.connections_count = 0
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(64)
+        self._sock.settimeout(0.2)
+        self.host, self.port = self._sock.getsockname()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._transports: list[paramiko.Transport] = []
+
+    def __enter__(self) -> "FakeSSHServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sock.close()
+        for transport in self._transports:
+            transport.close()
+
+    def _serve(self) -> None:
+        while not self._stop.is_set():
+            try:
+                client, _ = self._sock.accept()
+            except TimeoutError:
+                continue
+            self.connections_count += 1
+            threading.Thread(target=self._handle, args=(client,), daemon=True).start()
+
+    def _handle(self, client: socket.socket) -> None:
+        transport = paramiko.Transport(client)
+        self._transports.append(transport)
+        transport.add_server_key(self.host_key)
+        interface = _FakeServerInterface(self)
+        try:
+            transport.start_server(server=interface)
+        except (paramiko.SSHException, EOFError, OSError):
+            return
+        channel = transport.accept(10)
+        if channel is None or not interface.shell_requested.wait(10):
+            return
+
+        try:
+            channel.sendall(f"\r\nWelcome\r\n{self.prompt}".encode())
+            line = b""
+            while not self._stop.is_set():
+                data = channel.recv(1024)
+                if not data:
+                    return
+                line += data
+                while b"\r" in line or b"\n" in line:
+                    position = min(index for index in (line.find(b"\r"), line.find(b"\n")) if index >= 0)
+                    command, line = line[:position].decode(), line[position + 1 :]
+                    if not command and line[:1] == b"\n":
+                        continue
+                    output = self.commands.get(command, "")
+                    reply = f"{command}\r\n" + (f"{output}\r\n" if output else "") + self.prompt
+                    channel.sendall(reply.encode())
+        except OSError:
+            return
+        finally:
+            channel.close()
+
+
+def _child_rss_kb(session: SessionSpawner) -> int:
+    """RSS процесса `ssh` сессии в KiB (0 для встроенного клиента)."""
+
+    if not getattr(session, "pid", None):
+        return 0
+    try:
+        status = Path(f"/proc/{session.pid}/status").read_text()
+    except OSError:
+        return 0
+    for line in status.splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1])
+    return 0
+
+
+@contextmanager
+def _isolated_ssh_files(directory: Path) -> Iterator[None]:
+    """Ключ и алгоритмы локального сервера не попадают в файлы пользователя в ~/.ssh."""
+
+    known_hosts = directory / "known_hosts"
+    get_spawn_string = SSHSpawn.get_spawn_string
+    with (
+        patch.object(
+            SSHSpawn,
+            "get_spawn_string",
+            lambda spawn: f"{get_spawn_string(spawn)} -oUserKnownHostsFile={known_hosts}",
+        ),
+        patch("devicemanager.ssh_transport.SSHKnownHostsStore", lambda: SSHKnownHostsStore(known_hosts)),
+        patch.object(dc, "SSH_ALGORITHMS_STORE", SSHAlgorithmsStore(directory / "ssh_algorithms.json")),
+    ):
+        yield
+
+
+def _build_pool(ip: str, port: int, login: str, password: str, pool_size: int) -> list[SessionSpawner]:
+    connector = DeviceRemoteConnector(
+        ip=ip,
+        protocol="ssh",
+        snmp_community="",
+        auth_obj=SimpleAuthObject(login=login, password=password),
+        ssh_port=port,
+    )
+    with ThreadPoolExecutor(max_workers=pool_size) as executor:
+        return list(executor.map(lambda _: connector._connect_by_ssh(), range(pool_size)))
+
+
+def run(ip: str, port: int, login: str, password: str, pool_size: int, rounds: int) -> list[list]:
+    """Замерить создание пула сессий каждым способом и вернуть строки таблицы."""
+
+    transports = ["paramiko"]
+    if shutil.which("ssh"):
+        transports.append("openssh")
+
+    rows = []
+    for transport in transports:
+        timings = []
+        processes = rss_kb = python_kb = 0
+        for _ in range(rounds):
+            SSH_ALGORITHMS_CACHE.invalidate(ip, port)
+            tracemalloc.start()
+            started = time.perf_counter()
+            with patch.object(dc, "SSH_TRANSPORT", transport):
+                sessions = _build_pool(ip, port, login, password, pool_size)
+            timings.append(time.perf_counter() - started)
+            python_kb = tracemalloc.get_traced_memory()[0] // 1024
+            tracemalloc.stop()
+
+            processes = sum(1 for session in sessions if getattr(session, "pid", None))
+            rss_kb = sum(_child_rss_kb(session) for session in sessions)
+            for session in sessions:
+                session.close()
+
+        rows.append(
+            [
+                transport,
+                pool_size,
+                processes,
+                round(statistics.mean(timings) * 1000, 2),
+                round(max(timings) * 1000, 2),
+                rss_kb // pool_size,
+                python_kb // pool_size,
+            ]
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--ip", help="IP адрес оборудования. Без него используется локальный сервер")
+    parser.add_argument("--port", type=int, default=22)
+    parser.add_argument("--login", default="admin")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--pool-size", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    headers = [
+        "transport",
+        "sessions",
+        "processes",
+        "mean, ms",
+        "max, ms",
+        "ssh RSS/session, KiB",
+        "python heap/session, KiB",
+    ]
+    if args.ip:
+        rows = run(args.ip, args.port, args.login, args.password, args.pool_size, args.rounds)
+    else:
+        # Закрытие процессов `ssh` локальный сервер логирует как ошибки сокета.
+        logging.getLogger("paramiko").setLevel(logging.CRITICAL)
+        with (
+            tempfile.TemporaryDirectory() as directory,
+            _isolated_ssh_files(Path(directory)),
+            FakeSSHServer(login=args.login, password=args.password) as server,
+        ):
+            rows = run(server.host, server.port, args.login, args.password, args.pool_size, args.rounds)
+
+    print(tabulate(rows, headers=headers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Разбор вывода оборудования шаблонами TextFSM: компиляция шаблона на каждый вызов и `TextFSMTemplates`.
+
+Используются записанные выводы команд оборудования Cisco, D-Link, Juniper и Huawei CX600.
+`--scale` повторяет строки вывода, чтобы сравнить разбор небольших и больших выводов:
+
+    python -m devicemanager.benchmarks.textfsm_templates --repeat 2000 --scale 1
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+
+import textfsm
+from tabulate import tabulate
+
+from devicemanager.textfsm_templates import TEMPLATES_FOLDER, TextFSMTemplates
+
+# Записанные выводы команд оборудования: шаблон -> вывод.
+RECORDED_OUTPUTS = {
+    "arp_format/cisco.template": """
+Internet  10.100.10.100             27   0000.aaaa.0000  ARPA   Vlan25
+""",
+    "arp_format/juniper-mx480.template": """
+MAC Address       Address         Name                      Interface               Flags
+00:04:02:5e:00:03 10.100.10.100   10.100.10.100             ae0.4013                none
+""",
+    "arp_format/huawei-cx600-x8.template": """
+  ------------------------------------------------------------------------------
+  Basic:
+  User access index             : 12345
+  User name                     : 0004025e0003
+  User access PeVlan/CeVlan     : 4013/101
+  User MAC                      : 0004-025e-0003
+  User IP address               : 10.100.10.100
+  Agent-Circuit-Id              : 0/0/0/0/0/0 eth 1/1/1:101
+  Agent-Remote-Id               : 0004025e0003
+  ------------------------------------------------------------------------------
+""",
+    "interfaces/cisco.template": """
+Interface                      Status         Protocol Description
+Fa1                            down           down
+Te1/1                          admin down     down     Desc1
+Te1/2                          admin down     down
+Te1/3                          up             up       Desc3
+Te1/4                          up             up       Desc4
+Te1/5                          admin down     down
+Te1/6                          admin down     down     Desc6
+Te1/12                         up             up
+Te1/14                         admin down     down     Desc14
+Te1/15                         up             up       Some description
+Vl1                            admin down     down
+""",
+    "interfaces/d-link.template": """
+ Port   State/          Settings             Connection           Address
+        MDI       Speed/Duplex/FlowCtrl  Speed/Duplex/FlowCtrl    Learning
+ -----  --------  ---------------------  ---------------------    --------
+ 1      Disabled  Auto/Disabled          LinkDown                 Enabled
+        Auto
+ Desc:
+ 2      Enabled   Auto/Disabled          100M/Full/None           Enabled
+        Auto
+ Desc: desc2
+ 3      Enabled   Auto/Disabled          LinkDown                 Enabled
+        Auto
+ Desc:
+ 4      Enabled   Auto/Disabled          100M/Full/None           Enabled
+        Auto
+ Desc: desc4
+""",
+    "vlans_templates/d-link.template": """
+VID             : 1           VLAN Name       : default
+VLAN Type       : Static      Advertisement   : Enabled
+Member Ports    : 27
+Static Ports    : 27
+Current Tagged Ports   :
+Current Untagged Ports : 27
+
+VID             : 701         VLAN Name       : 701
+VLAN Type       : Static      Advertisement   : Disabled
+Member Ports    : 25-26
+Static Ports    : 25-26
+Current Tagged Ports   : 25-26
+Current Untagged Ports :
+
+VID             : 1051        VLAN Name       : 1051
+VLAN Type       : Static      Advertisement   : Disabled
+Member Ports    : 1-26
+Static Ports    : 1-26
+Current Tagged Ports   : 25-26
+Current Untagged Ports : 1-24
+""",
+}
+
+
+def _scale_output(output: str, scale: int) -> str:
+    return output if scale <= 1 else output * scale
+
+
+def _parse_with_compile(name: str, text: str) -> list:
+    """Прежний разбор: файл шаблона открывается и компилируется на каждый вызов."""
+    with open(TEMPLATES_FOLDER / name, encoding="utf-8") as template_file:
+        return textfsm.TextFSM(template_file).ParseText(text)
+
+
+def _measure(func: Callable, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return round((time.perf_counter() - started) / repeat * 1_000_000, 1)
+
+
+def run(templates: TextFSMTemplates, name: str, output: str, repeat: int) -> list:
+    records = templates.parse(name, output)
+    if records != _parse_with_compile(name, output):
+        raise AssertionError(f"Результаты разбора шаблоном {name} различаются")
+
+    compile_us = _measure(lambda: _parse_with_compile(name, output), repeat)
+    registry_us = _measure(lambda: templates.parse(name, output), repeat)
+    return [
+        name,
+        len(output.splitlines()),
+        len(records),
+        compile_us,
+        registry_us,
+        round(compile_us / registry_us, 1) if registry_us else "-",
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=1000, help="Кол-во разборов каждого вывода")
+    parser.add_argument("--scale", type=int, default=1, help="Во сколько раз увеличить выводы")
+    parser.add_argument(
+        "--check-interval", type=float, default=5, help="Интервал проверки изменения файлов шаблонов"
+    )
+    args = parser.parse_args()
+
+    templates = TextFSMTemplates(check_interval=args.check_interval)
+    started = time.perf_counter()
+    compiled = templates.load_all()
+    print(f"Скомпилировано шаблонов: {compiled} за {(time.perf_counter() - started) * 1000:.1f} ms\n")
+
+    headers = ["template", "lines", "records", "compile, µs", "registry, µs", "speedup"]
+    rows = [
+        run(templates, name, _scale_output(output, args.scale), args.repeat)
+        for name, output in RECORDED_OUTPUTS.items()
+    ]
+    print(tabulate(rows, headers=headers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+VLAN портов списками чисел и `VlanSet`.
+
+Эмулируется коммутатор ядра: `--trunks` транковых портов с диапазоном `--trunk-range`
+и `--access` портов с одним VLAN. Для прежнего представления (список всех VID, как после
+`range_to_numbers`) и `VlanSet` сравниваются память интерфейсов, размер JSON для `DevicesInfo.vlans`
+и время разбора, объединения VLAN устройства, поиска портов с VLAN и пересечения портов:
+
+    python -m devicemanager.benchmarks.vlan_set --trunks 48 --access 400 --repeat 200
+"""
+
+import argparse
+import time
+import tracemalloc
+from collections.abc import Callable
+
+import orjson
+from tabulate import tabulate
+
+from devicemanager.vendors.base.helpers import range_to_numbers
+from devicemanager.vlans import VlanSet
+
+
+def _ports_vlans(trunks: int, access: int, trunk_range: str) -> list[list]:
+    """VLAN портов в том виде, в котором их возвращают парсеры `get_vlans`."""
+    ports: list[list] = [[trunk_range, 4000 + port % 90] for port in range(trunks)]
+    ports += [[100 + port % 3000] for port in range(access)]
+    return ports
+
+
+def _parse_list(vlans: list) -> list[int]:
+    result: list[int] = []
+    for vlan in vlans:
+        if isinstance(vlan, str):
+            result += range_to_numbers(vlan)
+        else:
+            result.append(vlan)
+    return result
+
+
+def _measure(func: Callable, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return round((time.perf_counter() - started) / repeat * 1000, 3)
+
+
+def run(mode: str, raw_ports: list[list], repeat: int) -> list:
+    parse: Callable[[list], list[int] | VlanSet] = _parse_list if mode == "list" else VlanSet
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    ports = [parse(vlans) for vlans in raw_ports]
+    memory_kb = (tracemalloc.get_traced_memory()[0] - before) // 1024
+    tracemalloc.stop()
+
+    if mode == "list":
+        serialized = orjson.dumps(ports)
+        wanted = {150, 4010}
+
+        def union():
+            vlans: set[int] = set()
+            for port in ports:
+                vlans.update(port)
+            return vlans
+
+        def find():
+            return [port for port in ports if wanted & set(port)]
+
+        def intersect():
+            return [set(ports[0]) & set(port) for port in ports]
+
+    else:
+        serialized = orjson.dumps([port.compact() for port in ports])  # type: ignore[union-attr]
+        wanted_set = VlanSet([150, 4010])
+
+        def union():
+            vlans = VlanSet()
+            for port in ports:
+                vlans |= port
+            return vlans
+
+        def find():
+            return [port for port in ports if not wanted_set.isdisjoint(port)]
+
+        def intersect():
+            return [ports[0] & port for port in ports]
+
+    return [
+        mode,
+        len(ports),
+        len(union()),
+        memory_kb,
+        len(serialized) // 1024,
+        _measure(lambda: [parse(vlans) for vlans in raw_ports], repeat),
+        _measure(union, repeat),
+        _measure(find, repeat),
+        _measure(intersect, repeat),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--trunks", type=int, default=48, help="Кол-во транковых портов")
+    parser.add_argument("--access", type=int, default=400, help="Кол-во портов доступа")
+    parser.add_argument("--trunk-range", default="1-4094", help="VLAN транковых портов")
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    raw_ports = _ports_vlans(args.trunks, args.access, args.trunk_range)
+    headers = [
+        "mode",
+        "ports",
+        "device vlans",
+        "memory, KiB",
+        "json, KiB",
+        "parse, ms",
+        "union, ms",
+        "with_vlans, ms",
+        "intersect, ms",
+    ]
+    rows = [run(mode, raw_ports, args.repeat) for mode in ("list", "vlan_set")]
+    print(tabulate(rows, headers=headers))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,16 @@
 
 import os
 import re
+import shutil
 import subprocess
 from dataclasses import dataclass
 from datetime import datetime
+from threading import Lock
 
 import pexpect
 
 from .connection_ports import normalize_connection_ports
+from .device_connector.ssh_algorithms import SSH_ALGORITHMS_STORE, SSHAlgorithmOptions
 from .device_connector.ssh_host_keys import SSHKnownHostsStore
 from .exceptions import (
     DeviceException,
@@ -20,11 +23,15 @@ from .exceptions import (
 )
 from .multifactory import DeviceMultiFactory
 from .session_spawner import SessionSpawner
+from .ssh_transport import SSH_ALGORITHMS_CACHE, SSHTransportNotSupported, open_ssh_session
 from .vendors.base.device import BaseDevice
 from .vendors.base.types import SimpleAuthObjectProtocol
 
 TRUE_VALUES = {"1", "true", "yes", "on"}
 
+# `openssh` - процесс `ssh` под pexpect, `paramiko` - SSH клиент внутри процесса.
+SSH_TRANSPORT = os.getenv("DEVICE_CONNECTOR_SSH_TRANSPORT", "openssh")
+
 
 @dataclass
 class SimpleAuthObject:
@@ -34,6 +41,11 @@ class SimpleAuthObject:
 
 
 class SSHSpawn:
+    # Результаты `ssh -Q` по типам алгоритмов, сбрасываются при замене бинарника `ssh`.
+    _local_algorithms: dict[str, set[str]] = {}
+    _local_ssh_binary: tuple[str, int] | None = None
+    _local_algorithms_lock = Lock()
+
     def __init__(self, ip, login, port: int = 22):
         self.ip = ip
         self.login = login
@@ -43,6 +55,57 @@ class SSHSpawn:
         self.ciphers = ""
         self.macs = ""
 
+    @property
+    def algorithm_options(self) -> SSHAlgorithmOptions:
+        return SSHAlgorithmOptions(
+            kex=self.kex_algorithms,
+            host_key=self.host_key_algorithms,
+            cipher=self.ciphers,
+            mac=self.macs,
+        )
+
+    def use_algorithm_options(self, options: SSHAlgorithmOptions) -> None:
+        """Сразу включить алгоритмы, которые подошли устройству при прошлом подключении."""
+
+        self.kex_algorithms = options.kex
+        self.host_key_algorithms = options.host_key
+        self.ciphers = options.cipher
+        self.macs = options.mac
+
+    @staticmethod
+    def _get_ssh_binary() -> tuple[str, int] | None:
+        path = shutil.which("ssh")
+        if path is None:
+            return None
+        try:
+            return path, os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    @classmethod
+    def clear_local_algorithms(cls) -> None:
+        with cls._local_algorithms_lock:
+            cls._local_algorithms = {}
+            cls._local_ssh_binary = None
+
+    @classmethod
+    def _get_local_algorithms(cls, query: str) -> set[str] | None:
+        """Алгоритмы локального OpenSSH из кэша, `ssh -Q` запускается один раз на тип."""
+
+        ssh_binary = cls._get_ssh_binary()
+        with cls._local_algorithms_lock:
+            if ssh_binary != cls._local_ssh_binary:
+                cls._local_algorithms = {}
+                cls._local_ssh_binary = ssh_binary
+            if query in cls._local_algorithms:
+                return cls._local_algorithms[query]
+
+        supported_algorithms = cls._get_supported_algorithms(query)
+        if supported_algorithms is not None:
+            with cls._local_algorithms_lock:
+                cls._local_algorithms[query] = supported_algorithms
+        return supported_algorithms
+
     @staticmethod
     def _get_supported_algorithms(query: str) -> set[str] | None:
         """Вернуть алгоритмы указанного типа, поддерживаемые локальным OpenSSH."""
@@ -69,7 +132,7 @@ class SSHSpawn:
             return ""
 
         offered_algorithms = algorithms[0].split(",")
-        supported_algorithms = cls._get_supported_algorithms(query)
+        supported_algorithms = cls._get_local_algorithms(query)
         if supported_algorithms is None:
             return offered_algorithms[0]
         for algorithm in offered_algorithms:
@@ -228,6 +291,66 @@ class DeviceRemoteConnector:
         return device
 
     def _connect_by_ssh(self) -> SessionSpawner:
+        try:
+            if SSH_TRANSPORT == "paramiko" and SSH_ALGORITHMS_CACHE.is_supported(self.ip, self.ssh_port):
+                try:
+                    return self._connect_by_ssh_in_process()
+                except SSHTransportNotSupported:
+                    pass
+            return self._connect_by_openssh()
+        except DeviceLoginError:
+            # По адресу может отвечать другое оборудование, алгоритмы будут согласованы заново.
+            SSH_ALGORITHMS_CACHE.invalidate(self.ip, self.ssh_port)
+            SSH_ALGORITHMS_STORE.invalidate(self.ip, self.ssh_port)
+            raise
+
+    def _connect_by_ssh_in_process(self) -> SessionSpawner:
+        """Подключение встроенным SSH клиентом, без запуска процесса `ssh`."""
+
+        session = None
+        try:
+            session = open_ssh_session(self.ip, self.ssh_port, self.login, self.password)
+
+            while True:
+                expect_index = session.expect(
+                    [
+                        self.password_input_expect,  # 0
+                        self.prompt_expect,  # 1
+                        self.send_N_key,  # 2
+                        r"Connection closed",  # 3
+                        r"Incorrect login",  # 4
+                        pexpect.EOF,  # 5
+                        self.login_input_expect,  # 6
+                    ],
+                    timeout=30,
+                )
+                session.save_before()
+
+                if expect_index == 0:
+                    session.send(self.password + "\r")
+                elif expect_index == 1:
+                    break
+                elif expect_index == 2:
+                    session.send("N\r")
+                elif expect_index == 4:
+                    raise DeviceLoginError("Неверный Логин/Пароль (подключение SSH)", ip=self.ip)
+                elif expect_index in (3, 5):
+                    raise SSHConnectionError(
+                        "SSH недоступен" + (session.before or b"").decode("utf-8", errors="ignore"),
+                        ip=self.ip,
+                    )
+                elif expect_index == 6:
+                    session.send(self.login + "\r")
+
+        except Exception:
+            if session is not None:
+                session.close()
+            raise
+
+        session.save_before()
+        return session
+
+    def _connect_by_openssh(self) -> SessionSpawner:
         connected = False
         session = None
         negotiation_restarts = 0
@@ -236,6 +359,9 @@ class DeviceRemoteConnector:
 
         try:
             ssh_spawn = SSHSpawn(ip=self.ip, login=self.login, port=self.ssh_port)
+            known_options = SSH_ALGORITHMS_STORE.get(self.ip, self.ssh_port)
+            if known_options is not None:
+                ssh_spawn.use_algorithm_options(known_options)
             session = ssh_spawn.get_session()
 
             while not connected:
@@ -370,6 +496,7 @@ class DeviceRemoteConnector:
                 session.close()
             raise
 
+        SSH_ALGORITHMS_STORE.remember(self.ip, self.ssh_port, ssh_spawn.algorithm_options)
         session.save_before()
         return session
 
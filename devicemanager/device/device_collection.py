@@ -2,14 +2,28 @@ import re
 from concurrent.futures import ThreadPoolExecutor
 
 from alive_progress import alive_bar
+from pyzabbix.api import ZabbixAPIException
 from requests import RequestException
 
 from ..exceptions import AuthException
+from ..reachability import ping_hosts
 from ..zabbix_info_dataclasses import ZabbixInventory
 from .device_manager import DeviceManager
 from .zabbix_api import zabbix_api
 
 
+def _host_get_params(zabbix_info: bool) -> dict:
+    """Параметры `host.get` для создания коллекции с информацией из Zabbix или без нее"""
+    if not zabbix_info:
+        return {"output": ["name"]}
+    return {
+        "output": ["hostid", "host", "name", "status", "description"],
+        "selectGroups": ["groupid", "name"],
+        "selectInterfaces": ["ip"],
+        "selectInventory": "extend",
+    }
+
+
 class DevicesCollection:
     """Создает коллекцию из узлов сети, для комплексной работы с ними"""
 
@@ -43,67 +57,65 @@ class DevicesCollection:
         Создаем коллекцию оборудований по IP адресу
         Коллекция, потому что по данному IP могут быть несколько записей в Zabbix
         """
-        try:
-            with zabbix_api.connect() as zbx:
-                hosts = zbx.host.get(filter={"ip": ip}, output=["name"])
-        except RequestException:
-            return DevicesCollection([])
-        return DevicesCollection([DeviceManager(d["name"]) for d in hosts])
+        return cls.from_zabbix_ips([ip], zabbix_info=True)
+
+    @classmethod
+    def from_zabbix_hosts(cls, hosts: list[dict], zabbix_info: bool) -> "DevicesCollection":
+        """
+        Создаем коллекцию из узлов сети Zabbix
+
+        :param hosts: Узлы сети из ответа `host.get`, с группами, интерфейсами и инвентарными данными,
+         если требуется информация из Zabbix
+        :param zabbix_info: Заполнить информацию оборудования из переданных узлов сети?
+        """
+        devs = []
+        for host in hosts:
+            dev = DeviceManager(host["name"], zabbix_info=False)
+            if zabbix_info:
+                dev.set_zabbix_info(host)
+            devs.append(dev)
+        return DevicesCollection(devs, zbx_coll=zabbix_info)
 
     @classmethod
     def from_zabbix_groups(cls, groups_name: str | list, zabbix_info: bool) -> "DevicesCollection":
         """
         Создаем коллекцию из групп узлов сети Zabbix
 
+        Узлы сети вместе с информацией по ним запрашиваются одним запросом.
+
         :param groups_name: Имя группы или список имен групп Zabbix
         :param zabbix_info: Собрать информацию оборудования из Zabbix в момент создания коллекции?
         """
         try:
             with zabbix_api.connect() as zbx:
                 groups = zbx.hostgroup.get(filter={"name": groups_name}, output=["groupid"])
-                if groups:
-                    hosts = zbx.host.get(
-                        groupids=[g["groupid"] for g in groups],
-                        output=["name"],
-                        sortfield=["name"],
-                    )
-                else:
+                if not groups:
                     return DevicesCollection([])
-        except RequestException:
+                hosts = zbx.host.get(
+                    groupids=[g["groupid"] for g in groups],
+                    sortfield=["name"],
+                    **_host_get_params(zabbix_info),
+                )
+        except (RequestException, ZabbixAPIException):
             return DevicesCollection([])
-
-        with alive_bar(len(hosts), title="Создаем коллекцию") as bar:
-            devs = []
-            for host in hosts:
-                bar.text = f"-> Собираем данные с {host['name']}"
-                devs.append(DeviceManager(host["name"], zabbix_info=zabbix_info))
-                bar()
-        return DevicesCollection(devs)
+        return cls.from_zabbix_hosts(hosts, zabbix_info=zabbix_info)
 
     @classmethod
     def from_zabbix_ips(cls, ips: list[str], zabbix_info: bool) -> "DevicesCollection":
         """
         Создаем коллекцию из переданных IP адресов
 
+        Узлы сети вместе с информацией по ним запрашиваются одним запросом.
+
         :param ips: IP адрес или список IP адресов
         :param zabbix_info: Собрать информацию оборудования из Zabbix в момент создания коллекции?
         """
         try:
             with zabbix_api.connect() as zbx:
-                hosts = zbx.host.get(filter={"ip": ips}, output=["name"], sortfield=["name"])
-        except RequestException:
+                hosts = zbx.host.get(filter={"ip": ips}, sortfield=["name"], **_host_get_params(zabbix_info))
+        except (RequestException, ZabbixAPIException):
             return DevicesCollection([])
-
-        if hosts:
-            with alive_bar(len(hosts), title="Создаем коллекцию") as bar:
-                devs = []
-                for h in hosts:
-                    bar.text = f"-> Собираем данные с {h['name']}"
-                    devs.append(DeviceManager(h["name"], zabbix_info=zabbix_info))
-                    bar()
-            return DevicesCollection(devs)
-
-        return DevicesCollection([])
+        return cls.from_zabbix_hosts(hosts, zabbix_info=zabbix_info)
 
     def __str__(self):
         string = "DevicesCollection:\n"
@@ -186,11 +198,14 @@ class DevicesCollection:
         return self
 
     def collect_zabbix_info(self) -> "DevicesCollection":
-        """Конкурентно собираем информацию об устройствах в коллекции из Zabbix"""
-
-        with ThreadPoolExecutor() as ex:
-            for device in self.collection:
-                ex.submit(device.collect_zabbix_info)
+        """Собираем информацию об устройствах в коллекции из Zabbix одной пачкой"""
+        # pylint: disable-next=import-outside-toplevel
+        from apps.check.services.zabbix_hosts import get_zabbix_hosts_info
+
+        hosts = get_zabbix_hosts_info(device.name for device in self.collection)
+        for device in self.collection:
+            if device.name in hosts:
+                device.set_zabbix_info(hosts[device.name])
         self.zabbix_collected = True
         return self
 
@@ -241,28 +256,17 @@ class DevicesCollection:
 
     def ping_devs(self, unavailable=False) -> "DevicesCollection":
         """
-        Конкурентно пингуем оборудования из коллекции и возвращаем новую коллекцию
+        Пингуем оборудования из коллекции одной пачкой и возвращаем новую коллекцию
          из доступных или недоступных узлов сети в зависимости от параметра unavailable
 
         :param unavailable: Возвращать недоступные?
         """
 
-        available_devices, unavailable_devices = [], []
-
-        def __ping_device(dev):
-            """Пингуем оборудование и записываем его в нужный список"""
-            if dev.ping() and not unavailable:
-                available_devices.append(dev)
-
-            elif unavailable:
-                unavailable_devices.append(dev)
-
-        # Запускаем пинг
-        with ThreadPoolExecutor() as executor:
-            for device in self.collection:
-                executor.submit(__ping_device, device)
-
-        if unavailable:
-            return DevicesCollection(unavailable_devices)
+        # IP адреса оборудования без них берутся из Zabbix.
+        if any(not device.ip for device in self.collection):
+            self.collect_zabbix_info()
 
-        return DevicesCollection(available_devices)
+        reachability = ping_hosts(device.ip for device in self.collection if device.ip)
+        return DevicesCollection(
+            [device for device in self.collection if reachability.get(device.ip, False) is not unavailable]
+        )
@@ -1,3 +1,4 @@
+from dataclasses import fields
 from typing import Any, Optional
 
 import orjson
@@ -16,6 +17,8 @@ from ..vendors.base.types import SimpleAuthObjectProtocol
 from .interfaces import Interfaces
 from .zabbix_api import zabbix_api
 
+INVENTORY_FIELDS = frozenset(field.name for field in fields(ZabbixInventory))
+
 
 class DeviceManager:
     """
@@ -46,35 +49,37 @@ class DeviceManager:
     def collect_zabbix_info(self):
         """Собирает информацию по данному оборудованию из Zabbix"""
         zabbix_info = get_zabbix_host_info(self.name)
-        if not zabbix_info:
-            return
-
-        # Форматируем вывод активировано/деактивировано для узла сети
-        zabbix_info["status"] = 1 if zabbix_info["status"] == "0" else 0
-        # Создаем уникальный кортеж ip адресов
-        zabbix_info["interfaces"] = tuple(sorted({i["ip"] for i in zabbix_info["interfaces"]}))
-
-        # Инвентарные данные
-        inventory = zabbix_info["inventory"].values() if zabbix_info["inventory"] else {}
-        del zabbix_info["inventory"]
-
-        # Группы
-        groups = zabbix_info["groups"] if zabbix_info["groups"] else {}
-        del zabbix_info["groups"]
+        if zabbix_info:
+            self.set_zabbix_info(zabbix_info)
 
+    def set_zabbix_info(self, zabbix_info: dict) -> None:
+        """
+        Заполняет информацию по оборудованию из узла сети Zabbix в формате ответа `host.get`
+        с группами, интерфейсами и инвентарными данными
+        """
+        inventory = zabbix_info.get("inventory") or {}
         self._zabbix_info = ZabbixHostInfo(
-            *zabbix_info.values(),
-            inventory=ZabbixInventory(*inventory),
-            hostgroups=[ZabbixHostGroup(*group.values()) for group in groups],
+            hostid=str(zabbix_info.get("hostid", "")),
+            host=zabbix_info.get("host", ""),
+            name=zabbix_info.get("name", ""),
+            # Форматируем вывод активировано/деактивировано для узла сети
+            status=1 if str(zabbix_info.get("status")) == "0" else 0,
+            description=zabbix_info.get("description", ""),
+            # Создаем уникальный кортеж ip адресов
+            ip=tuple(sorted({i["ip"] for i in zabbix_info.get("interfaces") or []})),
+            inventory=ZabbixInventory(
+                **{key: value for key, value in inventory.items() if key in INVENTORY_FIELDS}
+            ),
+            hostgroups=[
+                ZabbixHostGroup(groupid=group["groupid"], name=group["name"])
+                for group in zabbix_info.get("groups") or []
+            ],
         )
         self._zabbix_info_collected = True
 
-        if not self.ip:
-            self.ip = [
-                i
-                for i in self.zabbix_info.ip
-                if len(self.zabbix_info.ip) > 1 and i != "127.0.0.1" or len(self.zabbix_info.ip) == 1
-            ][0]
+        ips = self.zabbix_info.ip
+        if not self.ip and ips:
+            self.ip = [i for i in ips if len(ips) > 1 and i != "127.0.0.1" or len(ips) == 1][0]
 
     def push_zabbix_inventory(self):
         """Обновляем инвентарные данные узла сети в Zabbix"""
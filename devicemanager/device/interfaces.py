@@ -1,40 +1,130 @@
 import re
-from collections.abc import Sequence
+from array import array
+from collections.abc import Callable, Iterator, Sequence
 from dataclasses import dataclass, field
+from enum import IntFlag
+from functools import lru_cache
 
 import tabulate
 
-from devicemanager.vendors.base.helpers import range_to_numbers
+from devicemanager.vlans import VlanSet
 from ecstasy_project.settings import NON_ABON_INTERFACES_PATTERN
 
 
-@dataclass
+class InterfaceState(IntFlag):
+    """Состояние порта по строке статуса: `UP` и/или `ADMIN_DOWN`, иначе `DOWN`."""
+
+    DOWN = 0
+    UP = 1
+    ADMIN_DOWN = 2
+
+
+@lru_cache(maxsize=1024)
+def interface_state(status: str) -> InterfaceState:
+    """
+    Состояние порта по строке статуса.
+
+    Различных строк статуса у оборудования немного, поэтому разбор кешируется
+    и выполняется один раз на строку, а не при каждой проверке порта.
+    """
+    status = status.lower()
+    state = InterfaceState.DOWN
+    if "down" not in status and "disable" not in status and "dormant" not in status:
+        state |= InterfaceState.UP
+    if "admin" in status or "disable" in status:
+        state |= InterfaceState.ADMIN_DOWN
+    return state
+
+
+# Биты состояния для столбца таблицы, операции над `IntFlag` заметно медленнее.
+_UP = int(InterfaceState.UP)
+# Ключи словаря интерфейса в `DevicesInfo` и `Interfaces.json()`.
+_STORED_KEYS = frozenset(("name", "status", "description", "vlans"))
+
+
+def has_description(desc: str) -> bool:
+    if "HUAWEI, Quidway Series" in desc:
+        return False
+    return len(desc.strip()) > 1
+
+
+@dataclass(slots=True)
 class Interface:
     name: str = ""
     status: str = ""
     desc: str = ""
-    vlan: list = field(default_factory=list)
+    vlan: VlanSet = field(default_factory=VlanSet)
+
+    def __post_init__(self):
+        if not isinstance(self.vlan, VlanSet):
+            self.vlan = VlanSet(self.vlan)
 
     @property
-    def has_desc(self):
-        if "HUAWEI, Quidway Series" in self.desc:
-            return False
+    def state(self) -> InterfaceState:
+        return interface_state(self.status)
 
-        return len(self.desc.strip()) > 1
+    @property
+    def has_desc(self):
+        return has_description(self.desc)
 
     @property
     def is_up(self) -> bool:
-        status = self.status.lower()
-        return "down" not in status and "disable" not in status and "dormant" not in status
+        return InterfaceState.UP in self.state
 
     @property
     def is_admin_down(self) -> bool:
-        status = self.status.lower()
-        return "admin" in status or "disable" in status
+        return InterfaceState.ADMIN_DOWN in self.state
 
     @property
     def is_down(self) -> bool:
-        return not self.is_up and not self.is_admin_down
+        return not self.state
+
+
+class _InterfacesTable:
+    """
+    Таблица интерфейсов: столбцы значений по порядковому номеру порта.
+
+    Состояние и наличие описания вычисляются при создании таблицы. VLAN разбираются,
+    а объекты `Interface` создаются только при обращении к ним.
+    """
+
+    __slots__ = ("names", "statuses", "descs", "raw_vlans", "states", "has_desc", "items")
+
+    def __init__(self, rows: list[tuple[str, str, str, object]], items: dict[int, Interface]) -> None:
+        """
+        :param rows: Строки таблицы: `(name, status, desc, vlans)`, VLAN в любом виде `_parse_vlans_line`.
+        :param items: Уже созданные объекты `Interface` по номеру строки.
+        """
+        self.names: list[str] = [row[0] for row in rows]
+        self.statuses: list[str] = [row[1] for row in rows]
+        self.descs: list[str] = [row[2] for row in rows]
+        self.raw_vlans: list = [row[3] for row in rows]
+        self.states = array("B", map(interface_state, self.statuses))
+        self.has_desc = bytearray(map(has_description, self.descs))
+        self.items = items
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def vlan(self, position: int) -> VlanSet:
+        vlans = self.raw_vlans[position]
+        if not isinstance(vlans, VlanSet):
+            vlans = self.raw_vlans[position] = Interfaces._parse_vlans_line(vlans)
+        return vlans
+
+    def item(self, position: int) -> Interface:
+        interface = self.items.get(position)
+        if interface is None:
+            interface = self.items[position] = Interface(
+                self.names[position], self.statuses[position], self.descs[position], self.vlan(position)
+            )
+        return interface
+
+    def set_desc(self, position: int, desc: str) -> None:
+        self.descs[position] = desc
+        self.has_desc[position] = has_description(desc)
+        if (interface := self.items.get(position)) is not None:
+            interface.desc = desc
 
 
 class Interfaces:
@@ -50,16 +140,30 @@ class Interfaces:
     >>> Interfaces([{'Interface': '1', 'Admin Status': 'up', 'Link': 'up', 'Description': 'desc', "VLAN's": [1, 2]}])
 
     >>> Interfaces([Interface()])
+
+    Интерфейсы хранятся в общей таблице, а фильтры (`physical()`, `up()`, `non_system()` и т.д.)
+    возвращают представления - списки номеров строк этой таблицы, без копирования интерфейсов.
     """
 
-    def __init__(self, data: Sequence | None = None):
-        self.__interfaces: list[Interface] = []
-        if not data:  # Если не были переданы интерфейсы
-            return
+    __slots__ = ("_table", "_index")
 
-        for intf in data:
+    def __init__(self, data: Sequence | None = None):
+        rows: list[tuple[str, str, str, object]] = []
+        items: dict[int, Interface] = {}
+        for intf in data or ():  # Если не были переданы интерфейсы, то таблица пустая
             # Если был передан словарь
             if isinstance(intf, dict):
+                if intf.keys() <= _STORED_KEYS:
+                    # Формат сохраненных в `DevicesInfo` интерфейсов, разбирается без проверки старых ключей.
+                    rows.append(
+                        (
+                            (intf.get("name") or "").strip(),
+                            (intf.get("status") or "").strip(),
+                            (intf.get("description") or "").strip(),
+                            intf.get("vlans") or [],
+                        )
+                    )
+                    continue
                 if (
                     intf.get("Status") is None
                     and intf.get("status") is None
@@ -75,45 +179,52 @@ class Interfaces:
                 interface_desc: str = intf.get("Description", "") or intf.get("description", "")
                 vlans: list = intf.get("VLAN's", []) or intf.get("vlans", [])
 
-                self.__interfaces.append(
-                    Interface(
-                        name=interface_name.strip(),
-                        status=status.strip(),
-                        desc=interface_desc.strip(),
-                        vlan=self._parse_vlans_line(vlans),
-                    )
-                )
+                rows.append((interface_name.strip(), status.strip(), interface_desc.strip(), vlans))
 
             # Если был передан список, кортеж
             elif isinstance(intf, (list, tuple)):
                 if len(intf) == 3:  # Без VLAN
-                    self.__interfaces.append(Interface(intf[0].strip(), intf[1], intf[2].strip(), []))
+                    rows.append((intf[0].strip(), intf[1], intf[2].strip(), VlanSet()))
                 elif len(intf) == 4:  # + VLAN
-                    self.__interfaces.append(
-                        Interface(
-                            intf[0].strip(),
-                            intf[1],
-                            intf[2].strip(),
-                            self._parse_vlans_line(intf[3]),
-                        )
-                    )
+                    rows.append((intf[0].strip(), intf[1], intf[2].strip(), intf[3]))
 
             # Если был передан объект Interface
             elif isinstance(intf, Interface):
-                self.__interfaces.append(intf)
+                items[len(rows)] = intf
+                rows.append((intf.name, intf.status, intf.desc, intf.vlan))
+
+        self._table = _InterfacesTable(rows, items)
+        self._index: Sequence[int] = range(len(rows))
+
+    @classmethod
+    def _view(cls, table: _InterfacesTable, index: Sequence[int]) -> "Interfaces":
+        view = cls.__new__(cls)
+        view._table = table
+        view._index = index
+        return view
+
+    def _select(self, predicate: Callable[[int], object], only_count: bool):
+        """Представление строк, для которых `predicate(номер строки)` истинно, или их кол-во."""
+        return self._select_index([i for i in self._index if predicate(i)], only_count)
+
+    def _select_index(self, index: list[int], only_count: bool):
+        if only_count:
+            return len(index)
+        return self._view(self._table, array("I", index))
 
     def __str__(self):
-        if not self.__interfaces:
+        if not self._index:
             return "None"
+        table = self._table
         return tabulate.tabulate(
             [
                 [
-                    i.name,
-                    i.status,
-                    i.desc.strip(),
-                    ", ".join(map(str, i.vlan)) or " " if i.vlan else " ",
+                    table.names[i],
+                    table.statuses[i],
+                    table.descs[i].strip(),
+                    str(table.vlan(i)) or " ",
                 ]
-                for i in self.__interfaces
+                for i in self._index
             ],
             headers=["Interface", "Status", "Description", "VLAN"],
             maxcolwidths=[None, None, None, 40],
@@ -125,73 +236,77 @@ class Interfaces:
 
     def __eq__(self, other):
         if isinstance(other, Interfaces):
-            return self.__interfaces == other.__interfaces
+            return list(self) == list(other)
         raise TypeError(f"Нельзя сравнивать интерфейсы с типом `{type(other)}`")
 
     def __getitem__(self, item):
         """Обращение к интерфейсам"""
-        if not self.__interfaces:
+        if not self._index:
             # Если не существует интерфейсов, то возвращаем пустой, чтобы не было ошибки
             return Interface()
         if isinstance(item, int):
-            return self.__interfaces[item]
+            return self._table.item(self._index[item])
         if isinstance(item, str):
-            for i in self.__interfaces:
-                if i.name == item:
-                    return i
+            for i in self._index:
+                if self._table.names[i] == item:
+                    return self._table.item(i)
         return Interface()
 
     def __enter__(self):
-        return self.__interfaces
+        return list(self)
 
-    def __iter__(self):
-        return iter(self.__interfaces)
+    def __iter__(self) -> Iterator[Interface]:
+        return map(self._table.item, self._index)
 
     def __bool__(self):
-        return bool(self.__interfaces)
+        return bool(self._index)
 
     @property
     def count(self) -> int:
         """Количество интерфейсов"""
-        return len(self.__interfaces)
+        return len(self._index)
 
     def json(self):
+        table = self._table
         return [
             {
-                "name": line.name,
-                "status": line.status,
-                "description": line.desc,
-                "vlans": line.vlan,
+                "name": table.names[i],
+                "status": table.statuses[i],
+                "description": table.descs[i],
+                "vlans": list(table.vlan(i)),
             }
-            for line in self.__interfaces
+            for i in self._index
         ]
 
     def physical(self):
-        res = []
-        i = 0
-        intf = self.__interfaces
+        table = self._table
+        index = self._index
+        res = array("I")
+        position = 0
 
-        while i < len(intf):
+        while position < len(index):
+            i = index[position]
             # Комбо-порт. Надо выбрать один.
             if (
-                "(C)" in intf[i].name
-                and "(F)" in intf[i + 1].name
-                and re.findall(r"^\d+", intf[i].name) == re.findall(r"^\d+", intf[i].name)
+                position + 1 < len(index)
+                and "(C)" in table.names[i]
+                and "(F)" in table.names[index[position + 1]]
             ):
+                fiber = index[position + 1]
                 # Выбираем, какой комбо порт добавить.
                 # Смотрим состояние и добавляем активный.
-                combo_interface = intf[i] if intf[i].is_up else intf[i + 1]
+                combo = i if table.states[i] & _UP else fiber
                 # Выбираем описание комбо порта, если нет на (C), то берем с (F).
-                combo_interface.desc = intf[i].desc if intf[i].has_desc else intf[i + 1].desc
-                res.append(combo_interface)
-                i += 2  # Пропускаем 2 комбо-порта.
+                table.set_desc(combo, table.descs[i] if table.has_desc[i] else table.descs[fiber])
+                res.append(combo)
+                position += 2  # Пропускаем 2 комбо-порта.
 
             else:
                 # Добавляем обычные порты.
-                res.append(intf[i])
-                i += 1
+                res.append(i)
+                position += 1
 
-        return Interfaces(res)
+        return self._view(table, res)
 
     def up(self, only_count=False):
         """
@@ -199,56 +314,32 @@ class Interfaces:
 
         :param only_count: bool Только кол-во?
         """
-        count = 0
-        intf = []
-        for i in self.__interfaces:
-            if i.is_up:
-                count += 1
-                if not only_count:
-                    intf.append(i)
-        return count if only_count else Interfaces(intf)
+        states = self._table.states
+        return self._select_index([i for i in self._index if states[i] & _UP], only_count)
 
     def with_description(self, only_count=False):
         """
         Интерфейсы, на которых есть описание
         :param only_count: bool Только кол-во?
         """
-        count = 0
-        intf = []
-        for i in self.__interfaces:
-            if i.has_desc:
-                count += 1
-                if not only_count:
-                    intf.append(i)
-        return count if only_count else Interfaces(intf)
+        has_desc = self._table.has_desc
+        return self._select_index([i for i in self._index if has_desc[i]], only_count)
 
     def down(self, only_count=False):
         """Интерфейсы, состояние которых DOWN
 
         :param only_count: bool Только кол-во?
         """
-        count = 0
-        intf = []
-        for i in self.__interfaces:
-            if not i.is_up:
-                count += 1
-                if not only_count:
-                    intf.append(i)
-        return count if only_count else Interfaces(intf)
+        states = self._table.states
+        return self._select_index([i for i in self._index if not states[i] & _UP], only_count)
 
     def admin_down(self, only_count=False):
         """Интерфейсы, состояние которых ADMIN DOWN
 
         :param only_count: bool Только кол-во?
         """
-        count = 0
-        intf = []
-        for i in self.__interfaces:
-            if i.status == "admin down":
-                count += 1
-                if not only_count:
-                    intf.append(i)
-        return count if only_count else Interfaces(intf)
+        statuses = self._table.statuses
+        return self._select_index([i for i in self._index if statuses[i] == "admin down"], only_count)
 
     def free(self, only_count=False):
         """
@@ -256,14 +347,11 @@ class Interfaces:
 
         :param only_count: bool Только кол-во?
         """
-        count = 0
-        intf = []
-        for i in self.__interfaces:
-            if not i.is_up and not i.has_desc:
-                count += 1
-                if not only_count:
-                    intf.append(i)
-        return count if only_count else Interfaces(intf)
+        states = self._table.states
+        has_desc = self._table.has_desc
+        return self._select_index(
+            [i for i in self._index if not states[i] & _UP and not has_desc[i]], only_count
+        )
 
     def non_system(self, only_count=False):
         """
@@ -271,66 +359,62 @@ class Interfaces:
 
         :param only_count: bool Только кол-во?
         """
-        count = 0
-        intf = []
-        for i in self.__interfaces:
-            if NON_ABON_INTERFACES_PATTERN.findall(i.desc):
-                continue
-            if not only_count:
-                intf.append(i)
-        return count if only_count else Interfaces(intf)
+        search = NON_ABON_INTERFACES_PATTERN.search
+        descs = self._table.descs
+        return self._select_index([i for i in self._index if not search(descs[i])], only_count)
 
     @property
     def unique_vlans(self) -> list:
         """Возвращает отсортированный список VLAN'ов, которые имеются на портах"""
-        vlans: set = set()
-        for i in self.__interfaces:
-            vlans = vlans.union({v for v in i.vlan if v.isdigit()})
-        return sorted([int(v) for v in vlans])
+        return list(self.vlan_set)
 
-    def with_vlans(self, vlans: list):
+    @property
+    def vlan_set(self) -> VlanSet:
+        """Объединение VLAN всех портов"""
+        vlans = VlanSet()
+        for i in self._index:
+            vlans |= self._table.vlan(i)
+        return vlans
+
+    def with_vlans(self, vlans: list | VlanSet):
         """
         Интерфейсы, которые имеют переданные vlans
 
-        :param vlans: Список vlan'ов
+        :param vlans: Список vlan'ов или `VlanSet`
         :return: Interfaces
         """
-        if isinstance(vlans, list):
-            vlans = list(map(int, vlans))
-            return Interfaces([i for i in self.__interfaces if set(vlans) & set(i.vlan)])
+        if isinstance(vlans, (list, VlanSet)):
+            vlan_set = VlanSet(vlans)
+            return self._select(lambda i: not vlan_set.isdisjoint(self._table.vlan(i)), only_count=False)
         return Interfaces()
 
     def filter_by_desc(self, pattern: str):
         """Интерфейсы, описание которых совпадает с шаблоном"""
-        return Interfaces([i for i in self.__interfaces if re.match(pattern, i.desc)])
+        regexp = re.compile(pattern)
+        descs = self._table.descs
+        return self._select(lambda i: bool(regexp.match(descs[i])), only_count=False)
 
     def filter_by_name(self, pattern: str):
         """Интерфейсы, имя которых совпадает с шаблоном"""
-        return Interfaces([i for i in self.__interfaces if re.match(pattern, i.name)])
+        regexp = re.compile(pattern)
+        names = self._table.names
+        return self._select(lambda i: bool(regexp.match(names[i])), only_count=False)
 
     @staticmethod
-    def _parse_vlans_line(vlans: list) -> list[int]:
+    def _parse_vlans_line(vlans: list | VlanSet) -> VlanSet:
         """
-        Эта функция принимает список VLAN, преобразует любые диапазоны VLAN, указанные в виде строк, в список
-        целых чисел и возвращает список всех VLAN в виде целых чисел.
+        Эта функция принимает список VLAN и возвращает их множество `VlanSet`.
 
-        Сначала функция проверяет, является ли каждый элемент во входном списке строкой или целым числом.
-        Если это строка, она использует функцию `range_to_numbers()`, чтобы преобразовать ее в список целых чисел
-        и добавить ее в `vlans_list`.
+        Элементы списка могут быть целыми числами или строками с диапазонами VLAN (`"10-20"`, `"10 to 20"`,
+        `"10,11,15-20"`). Диапазоны не разворачиваются в списки чисел.
 
-        :param vlans: Ожидается, что параметр "vlans" будет списком VLAN, который может быть либо целым числом, либо
-        строкой, представляющей диапазон VLAN.
+        :param vlans: Список VLAN или уже готовый `VlanSet`.
 
-        :return: Список целых чисел, представляющих VLAN. Если ввод не является списком, возвращается пустой список.
+        :return: Множество VLAN. Если ввод не является списком, возвращается пустое множество.
         """
 
+        if isinstance(vlans, VlanSet):
+            return vlans
         if not isinstance(vlans, list):
-            return []
-
-        vlans_list = []
-        for vlan in vlans:
-            if isinstance(vlan, str):
-                vlans_list += range_to_numbers(vlan)
-            if isinstance(vlan, int):
-                vlans_list.append(vlan)
-        return vlans_list
+            return VlanSet()
+        return VlanSet(vlans)
@@ -1,4 +1,5 @@
-from collections.abc import Callable
+import os
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from threading import local
@@ -16,6 +17,41 @@ from apps.app_settings.zabbix_config_cache import (
     build_zabbix_config_version,
 )
 
+# Максимальное кол-во ID или имен в одном запросе к Zabbix API.
+ZABBIX_API_BATCH_SIZE = int(os.getenv("ZABBIX_API_BATCH_SIZE", "500"))
+
+
+def get_batched(
+    method: Callable[..., list],
+    values: Iterable,
+    *,
+    param: str = "hostids",
+    batch_size: int = ZABBIX_API_BATCH_SIZE,
+    **params,
+) -> list:
+    """
+    ## Вызывает метод `*.get` Zabbix API для множества ID одним запросом на пачку.
+
+        >>> get_batched(zbx.host.get, ["10084", "10085"], output=["name"])
+        >>> get_batched(zbx.host.get, ["sw1", "sw2"], param="filter.name", output=["hostid"])
+
+    :param method: Метод Zabbix API, например `zbx.host.get`.
+    :param values: ID (или значения фильтра), повторы отбрасываются.
+    :param param: Параметр метода для значений, `filter.<поле>` - поле фильтра.
+    :param batch_size: Максимальное кол-во значений в одном запросе.
+    :return: Объединенный результат всех запросов.
+    """
+    values = list(dict.fromkeys(values))
+    result: list = []
+    for start in range(0, len(values), max(batch_size, 1)):
+        chunk = values[start : start + batch_size]
+        if param.startswith("filter."):
+            call_params = {**params, "filter": {**params.get("filter", {}), param[len("filter.") :]: chunk}}
+        else:
+            call_params = {**params, param: chunk}
+        result.extend(method(**call_params))
+    return result
+
 
 @dataclass(frozen=True)
 class ZabbixConnectionSettings:
@@ -0,0 +1,75 @@
+import logging
+import os
+import queue
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Threads executing items of all batch requests.
+DEVICE_CONNECTOR_BATCH_WORKERS = int(os.getenv("DEVICE_CONNECTOR_BATCH_WORKERS", "64"))
+# Maximum number of items in one batch request.
+DEVICE_CONNECTOR_MAX_BATCH_SIZE = int(os.getenv("DEVICE_CONNECTOR_MAX_BATCH_SIZE", "1000"))
+
+BatchTask = Callable[[], Iterable[dict]]
+
+
+class DeviceBatchRunner:
+    """
+    Concurrent execution of batch request items.
+
+    Every task produces one or more result lines. Lines are yielded as soon as
+    their task produces them, so a slow device does not delay the results of the others
+    and a forwarded part of the batch is not buffered until the owner shard finishes it.
+    All batch requests share a bounded number of worker threads.
+    """
+
+    def __init__(self, max_workers: int = DEVICE_CONNECTOR_BATCH_WORKERS) -> None:
+        self._max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self._max_workers, thread_name_prefix="device-batch")
+            return self._executor
+
+    @staticmethod
+    def _collect(task: BatchTask, lines: queue.Queue, stopped: threading.Event) -> None:
+        try:
+            for line in task():
+                if stopped.is_set():
+                    return
+                lines.put(line)
+        except Exception as exc:
+            lines.put(exc)
+        finally:
+            # The end of the task.
+            lines.put(None)
+
+    def run(self, tasks: Iterable[BatchTask]) -> Iterator[dict]:
+        executor = self._get_executor()
+        lines: queue.Queue[dict | Exception | None] = queue.Queue()
+        stopped = threading.Event()
+        futures: list[Future[None]] = [executor.submit(self._collect, task, lines, stopped) for task in tasks]
+        try:
+            finished = 0
+            while finished < len(futures):
+                line = lines.get()
+                if line is None:
+                    finished += 1
+                elif isinstance(line, Exception):
+                    raise line
+                else:
+                    yield line
+        finally:
+            # The client has gone away: items which have not started yet are not executed
+            # and running tasks stop producing lines.
+            stopped.set()
+            for future in futures:
+                future.cancel()
+
+
+DEVICE_BATCHES = DeviceBatchRunner()
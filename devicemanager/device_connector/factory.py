@@ -1,6 +1,8 @@
+import inspect
 import logging
 import os
 import time
+from collections.abc import Iterator
 from queue import Empty, Queue
 from threading import Event, Lock, Thread
 from typing import Any
@@ -98,12 +100,17 @@ class DeviceSessionFactory:
             "Device: %s | Method=%s DeviceVendor=%s", self.ip, method, device_connection.__class__.__name__
         )
 
+        streaming = False
         try:
             if not hasattr(device_connection, method):
                 raise MethodError
 
             session_method = getattr(device_connection, method)
             data = session_method(**params)
+            if inspect.isgenerator(data):
+                # Сессия освобождается после того, как вывод будет прочитан.
+                streaming = True
+                return self._iter_and_release(device_connection, data)
         except MethodError:
             raise
         except Exception:
@@ -111,10 +118,8 @@ class DeviceSessionFactory:
                 device_connection.session.close()
             raise
         finally:
-            if self.make_session_global:
-                device_connection.release_session()
-            else:
-                device_connection.session.close()
+            if not streaming:
+                self._release_connection(device_connection)
 
         logger.debug(
             "Device: %s | Method=%s DeviceVendor=%s",
@@ -124,6 +129,30 @@ class DeviceSessionFactory:
         )
         return data
 
+    def _release_connection(self, device_connection: BaseDevice) -> None:
+        if self.make_session_global:
+            device_connection.release_session()
+        else:
+            device_connection.session.close()
+
+    def _iter_and_release(self, device_connection: BaseDevice, chunks: Iterator[Any]) -> Iterator[Any]:
+        """
+        Отдать вывод метода-генератора и затем освободить сессию.
+
+        Генератор должен читаться в том же потоке, который вызвал `perform_method`.
+        Если чтение прервано (например, клиент закрыл соединение), сессия закрывается:
+        в терминале остался непрочитанный вывод.
+        """
+
+        completed = False
+        try:
+            yield from chunks
+            completed = True
+        finally:
+            if not completed and self.make_session_global:
+                device_connection.session.close()
+            self._release_connection(device_connection)
+
     def _get_connection_to_perform(self) -> BaseDevice:
         if self.make_session_global:
             return self._make_and_get_connection()
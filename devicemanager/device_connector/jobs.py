@@ -0,0 +1,132 @@
+import inspect
+import logging
+import os
+import pathlib
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Threads executing device methods of all submitted jobs.
+DEVICE_CONNECTOR_JOB_WORKERS = int(os.getenv("DEVICE_CONNECTOR_JOB_WORKERS", "32"))
+# Seconds a finished job result waits for the client before it is dropped.
+DEVICE_CONNECTOR_JOB_RESULT_TTL = int(os.getenv("DEVICE_CONNECTOR_JOB_RESULT_TTL", "300"))
+
+
+@dataclass(slots=True)
+class DeviceJob:
+    """One device method call executed in the background."""
+
+    id: str
+    ip: str
+    method: str
+    status: str = "pending"
+    result: Any = None
+    error: Exception | None = None
+    finished_at: float | None = None
+    done: threading.Event = field(default_factory=threading.Event)
+
+    @property
+    def finished(self) -> bool:
+        return self.done.is_set()
+
+
+class DeviceJobManager:
+    """
+    Background execution of device methods with job handles.
+
+    HTTP request threads only submit a job and wait for it with a bounded timeout,
+    so slow device calls occupy a fixed number of worker threads instead of the
+    web server threads. Finished jobs are delivered once and expire after `result_ttl`.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEVICE_CONNECTOR_JOB_WORKERS,
+        result_ttl: float = DEVICE_CONNECTOR_JOB_RESULT_TTL,
+    ) -> None:
+        self._max_workers = max_workers
+        self._result_ttl = result_ttl
+        self._executor: ThreadPoolExecutor | None = None
+        self._jobs: dict[str, DeviceJob] = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self._max_workers, thread_name_prefix="device-job")
+        return self._executor
+
+    def submit(self, ip: str, method: str, function: Callable[[], Any]) -> DeviceJob:
+        """Queue the device method call and return its job handle."""
+
+        job = DeviceJob(id=uuid.uuid4().hex, ip=ip, method=method)
+        with self._lock:
+            self._remove_expired()
+            self._jobs[job.id] = job
+            self._get_executor().submit(self._run, job, function)
+        return job
+
+    @staticmethod
+    def _run(job: DeviceJob, function: Callable[[], Any]) -> None:
+        job.status = "running"
+        try:
+            result = function()
+            if inspect.isgenerator(result):
+                # Consume streamed output here: the session is released by the thread that reserved it.
+                result = "".join(str(chunk) for chunk in result)
+            job.result = result
+            job.status = "done"
+        except Exception as exc:
+            job.error = exc
+            job.status = "failed"
+        finally:
+            job.finished_at = time.monotonic()
+            job.done.set()
+
+    def get(self, ip: str, job_id: str) -> DeviceJob | None:
+        """Return the job of the device or None if it is unknown or expired."""
+
+        with self._lock:
+            self._remove_expired()
+            job = self._jobs.get(job_id)
+        if job is None or job.ip != ip:
+            return None
+        return job
+
+    def wait(self, job: DeviceJob, timeout: float) -> bool:
+        """
+        Wait until the job finishes.
+
+        A finished job is removed from the manager: its result is delivered only once.
+        """
+
+        if not job.done.wait(timeout):
+            return False
+        with self._lock:
+            self._jobs.pop(job.id, None)
+        return True
+
+    def _remove_expired(self) -> None:
+        """Drop results which were not fetched in time. Called under the lock."""
+
+        deadline = time.monotonic() - self._result_ttl
+        expired = [
+            job for job in self._jobs.values() if job.finished_at is not None and job.finished_at < deadline
+        ]
+        for job in expired:
+            del self._jobs[job.id]
+            logger.warning("Device: %s | Результат задачи %s не был получен", job.ip, job.method)
+            if isinstance(job.result, pathlib.Path):
+                job.result.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+
+DEVICE_JOBS = DeviceJobManager()
@@ -0,0 +1,76 @@
+"""
+# Распределение оборудования между процессами device connector.
+
+Каждый процесс (шард) держит пулы сессий только для своей части оборудования.
+Владелец IP определяется консистентным хешированием, поэтому все процессы и клиенты
+с одинаковым списком шардов выбирают один и тот же процесс, а при добавлении шарда
+переезжает только примерно `1/N` оборудования.
+"""
+
+import bisect
+import hashlib
+import os
+from collections.abc import Iterable
+
+# Адреса всех шардов через запятую, например: `http://connector-0:8000,http://connector-1:8000`.
+DEVICE_CONNECTOR_SHARDS = os.getenv("DEVICE_CONNECTOR_SHARDS", "")
+# Адрес текущего процесса из списка шардов (задается только для самого device connector).
+DEVICE_CONNECTOR_SHARD_ADDRESS = os.getenv("DEVICE_CONNECTOR_SHARD_ADDRESS", "")
+DEVICE_CONNECTOR_SHARD_REPLICAS = int(os.getenv("DEVICE_CONNECTOR_SHARD_REPLICAS", "160"))
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode(), usedforsecurity=False).digest()[:8], "big")
+
+
+class ConsistentHashRing:
+    """Кольцо консистентного хеширования с виртуальными узлами."""
+
+    def __init__(self, nodes: Iterable[str], replicas: int = DEVICE_CONNECTOR_SHARD_REPLICAS):
+        self.nodes = tuple(dict.fromkeys(nodes))
+        points = sorted(
+            (_hash(f"{node}#{replica}"), node) for node in self.nodes for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def get(self, key: str) -> str:
+        if not self._nodes:
+            raise LookupError("Кольцо шардов пустое")
+        position = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._nodes[position]
+
+
+class ShardRouter:
+    """
+    Выбор процесса device connector, владеющего пулом сессий оборудования.
+
+    Без списка шардов все оборудование обслуживается одним процессом.
+    """
+
+    def __init__(self, shards: Iterable[str], self_address: str = ""):
+        self.ring = ConsistentHashRing(shard.strip().rstrip("/") for shard in shards if shard.strip())
+        self.self_address = self_address.strip().rstrip("/")
+
+    @classmethod
+    def from_env(cls) -> "ShardRouter":
+        return cls(DEVICE_CONNECTOR_SHARDS.split(","), self_address=DEVICE_CONNECTOR_SHARD_ADDRESS)
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.ring.nodes) > 1
+
+    def address(self, ip: str, default: str | None = None) -> str | None:
+        """Адрес device connector, к которому надо отправлять запросы по оборудованию."""
+
+        if not self.ring.nodes:
+            return default
+        return self.ring.get(ip)
+
+    def is_local(self, ip: str) -> bool:
+        """Обслуживает ли оборудование текущий процесс."""
+
+        return not self.enabled or self.ring.get(ip) == self.self_address
+
+
+SHARD_ROUTER = ShardRouter.from_env()
@@ -0,0 +1,156 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from ipaddress import IPv4Address
+from pathlib import Path
+
+from devicemanager.device_connector.ssh_host_keys import fcntl_module
+
+logger = logging.getLogger(__name__)
+
+SSH_ALGORITHMS_FILE = os.getenv("DEVICE_CONNECTOR_SSH_ALGORITHMS_FILE", "")
+
+
+@dataclass(frozen=True, slots=True)
+class SSHAlgorithmOptions:
+    """Legacy OpenSSH algorithms that had to be enabled for one device."""
+
+    kex: str = ""
+    host_key: str = ""
+    cipher: str = ""
+    mac: str = ""
+
+    def is_empty(self) -> bool:
+        """Return True when the device works with the OpenSSH defaults."""
+
+        return not (self.kex or self.host_key or self.cipher or self.mac)
+
+
+class SSHAlgorithmsStore:
+    """
+    Persistent per-device record of SSH algorithm options that worked.
+
+    The JSON file lives next to known_hosts, so it survives service restarts and is
+    shared by the device connector and Celery workers. The file is re-read only when
+    its modification time changes.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        """Use the service user's `~/.ssh/ssh_algorithms.json` by default."""
+
+        if path is None:
+            path = (
+                Path(SSH_ALGORITHMS_FILE)
+                if SSH_ALGORITHMS_FILE
+                else Path.home() / ".ssh" / "ssh_algorithms.json"
+            )
+        self.path = path
+        self._lock = threading.RLock()
+        self._records: dict[str, SSHAlgorithmOptions] = {}
+        self._loaded_mtime: int | None = None
+
+    @staticmethod
+    def _key(ip: str, port: int) -> str:
+        """Return the record key for a device SSH endpoint."""
+
+        return f"{IPv4Address(ip).compressed}:{port}"
+
+    def _read(self) -> dict[str, SSHAlgorithmOptions]:
+        """Read records from disk, ignoring a missing or corrupted file."""
+
+        try:
+            raw_records = json.loads(self.path.read_text(encoding="utf-8"))
+            return {key: SSHAlgorithmOptions(**value) for key, value in raw_records.items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, TypeError) as exc:
+            logger.warning("Не удалось прочитать %s: %s", self.path, exc)
+            return {}
+
+    def _refresh(self) -> None:
+        """Reload records when another process has rewritten the file."""
+
+        try:
+            mtime: int | None = self.path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self._loaded_mtime:
+            self._records = self._read() if mtime is not None else {}
+            self._loaded_mtime = mtime
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Serialize read-modify-write cycles across threads and processes."""
+
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        lock_path = self.path.with_name(f"{self.path.name}.lock")
+        with self._lock, lock_path.open("a", encoding="utf-8") as lock_file:
+            if fcntl_module is not None:
+                fcntl_module.flock(lock_file.fileno(), fcntl_module.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl_module is not None:
+                    fcntl_module.flock(lock_file.fileno(), fcntl_module.LOCK_UN)
+
+    def _write(self) -> None:
+        """Atomically replace the file with the current records."""
+
+        descriptor, temporary_name = tempfile.mkstemp(prefix=f".{self.path.name}.", dir=self.path.parent)
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+                json.dump(
+                    {key: asdict(value) for key, value in sorted(self._records.items())}, file, indent=1
+                )
+            os.replace(temporary_name, self.path)
+        finally:
+            Path(temporary_name).unlink(missing_ok=True)
+        self._loaded_mtime = self.path.stat().st_mtime_ns
+
+    def get(self, ip: str, port: int) -> SSHAlgorithmOptions | None:
+        """Return the options that worked for the device last time."""
+
+        with self._lock:
+            self._refresh()
+            return self._records.get(self._key(ip, port))
+
+    def _update(self, key: str, options: SSHAlgorithmOptions | None) -> None:
+        """Store or drop one record, writing the file only if it changes."""
+
+        with self._lock:
+            self._refresh()
+            if self._records.get(key) == options:
+                return
+            try:
+                with self._locked():
+                    self._refresh()
+                    if options is None:
+                        self._records.pop(key, None)
+                    else:
+                        self._records[key] = options
+                    self._write()
+            except OSError as exc:
+                # Keep the record in this process when the file cannot be written.
+                logger.warning("Не удалось сохранить %s: %s", self.path, exc)
+                if options is None:
+                    self._records.pop(key, None)
+                else:
+                    self._records[key] = options
+
+    def remember(self, ip: str, port: int, options: SSHAlgorithmOptions) -> None:
+        """Save the options a successful connection used."""
+
+        self._update(self._key(ip, port), None if options.is_empty() else options)
+
+    def invalidate(self, ip: str, port: int) -> None:
+        """Forget the device record, e.g. after a login failure."""
+
+        self._update(self._key(ip, port), None)
+
+
+SSH_ALGORITHMS_STORE = SSHAlgorithmsStore()
@@ -12,6 +12,8 @@ from ipaddress import IPv4Address
 from pathlib import Path
 from typing import Protocol, cast
 
+import paramiko
+
 
 class FcntlModule(Protocol):
     """Subset of fcntl used for the Linux known_hosts file lock."""
@@ -269,6 +271,36 @@ class SSHKnownHostsStore:
             self._confirm(change)
         return change
 
+    def _load_host_keys(self) -> paramiko.HostKeys:
+        """Parse known_hosts, including hashed entries, for in-process SSH clients."""
+
+        host_keys = paramiko.HostKeys()
+        if self.known_hosts_path.exists():
+            host_keys.load(os.fspath(self.known_hosts_path))
+        return host_keys
+
+    def verify_or_remember(self, ip: str, port: int, key: paramiko.PKey) -> bool:
+        """
+        Check a host key presented to an in-process SSH client.
+
+        A first-seen host is trusted and appended to known_hosts, like OpenSSH does after
+        answering `yes`. Returns False when the host is known with other keys.
+        """
+
+        host = self._host(ip, port)
+        known_keys = self._load_host_keys().lookup(host)
+        if known_keys is None:
+            with self._locked():
+                known_keys = self._load_host_keys().lookup(host)
+                if known_keys is None:
+                    with self.known_hosts_path.open("a", encoding="utf-8", newline="\n") as known_hosts_file:
+                        known_hosts_file.write(f"{host} {key.get_name()} {key.get_base64()}\n")
+                    self.known_hosts_path.chmod(0o600)
+                    return True
+
+        known_key = known_keys.get(key.get_name())
+        return known_key is not None and known_key == key
+
     def accept_changed(
         self,
         ip: str,
@@ -0,0 +1,171 @@
+"""
+# Проверка доступности оборудования ICMP echo.
+
+`AsyncPinger` отправляет ICMP echo множеству адресов через один сокет на event loop,
+`ping_hosts` проверяет этим список адресов пачкой из синхронного кода:
+
+    >>> ping_hosts(["192.0.2.1", "192.0.2.2"], timeout=2)
+    {'192.0.2.1': True, '192.0.2.2': False}
+"""
+
+import asyncio
+import errno
+import itertools
+import os
+import socket
+import struct
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+from ping3 import ping
+
+REACHABILITY_PING_CONCURRENCY = int(os.getenv("REACHABILITY_PING_CONCURRENCY", "512"))
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+
+def _icmp_checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+class AsyncPinger:
+    """
+    ICMP echo для множества адресов через один сокет.
+
+    Использует raw сокет, а без прав на него - ICMP datagram сокет Linux.
+    Если не доступен ни один, каждый ping выполняется `ping3` в отдельном потоке.
+    """
+
+    def __init__(self, payload: bytes = b"ecstasy"):
+        self._identifier = os.getpid() & 0xFFFF
+        self._sequence = itertools.cycle(range(1, 0x10000))
+        self._payload = payload
+        self._waiters: dict[tuple[str, int], asyncio.Future] = {}
+        self._sock: socket.socket | None = None
+        self._raw = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def open(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        for sock_type in (socket.SOCK_RAW, socket.SOCK_DGRAM):
+            try:
+                self._sock = socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP)
+            except OSError as exc:
+                if exc.errno not in (errno.EPERM, errno.EACCES):
+                    raise
+                continue
+            self._raw = sock_type == socket.SOCK_RAW
+            self._sock.setblocking(False)
+            self._loop.add_reader(self._sock.fileno(), self._on_readable)
+            return
+
+    def close(self) -> None:
+        if self._sock is not None and self._loop is not None:
+            self._loop.remove_reader(self._sock.fileno())
+            self._sock.close()
+            self._sock = None
+        for waiter in self._waiters.values():
+            waiter.cancel()
+        self._waiters.clear()
+
+    def _on_readable(self) -> None:
+        if self._sock is None:
+            return
+        while True:
+            try:
+                data, address = self._sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+
+            if self._raw:
+                data = data[(data[0] & 0x0F) * 4 :]  # Пропускаем IP заголовок.
+            if len(data) < 8:
+                continue
+            icmp_type, _, _, identifier, sequence = struct.unpack("!BBHHH", data[:8])
+            if icmp_type != ICMP_ECHO_REPLY:
+                continue
+            # В datagram сокете идентификатор подменяет ядро и само фильтрует ответы.
+            if self._raw and identifier != self._identifier:
+                continue
+            waiter = self._waiters.pop((address[0], sequence), None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(time.monotonic())
+
+    async def ping(self, ip: str, timeout: float) -> float | None:
+        """Вернуть RTT в секундах или None, если ответа нет."""
+
+        if self._sock is None or self._loop is None:
+            delay = await asyncio.to_thread(ping, ip, timeout=timeout)
+            return delay if isinstance(delay, float) else None
+
+        sequence = next(self._sequence)
+        header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, self._identifier, sequence)
+        checksum = _icmp_checksum(header + self._payload)
+        packet = (
+            struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, checksum, self._identifier, sequence) + self._payload
+        )
+
+        waiter = self._loop.create_future()
+        self._waiters[(ip, sequence)] = waiter
+        started = time.monotonic()
+        try:
+            self._sock.sendto(packet, (ip, 0))
+            received = await asyncio.wait_for(waiter, timeout)
+        except (TimeoutError, OSError):
+            return None
+        finally:
+            self._waiters.pop((ip, sequence), None)
+        return received - started
+
+
+async def ping_hosts_async(
+    ips: Iterable[str], timeout: float = 2, concurrency: int = REACHABILITY_PING_CONCURRENCY
+) -> dict[str, bool]:
+    """Проверить доступность адресов, одновременно ожидая ответа не более чем от `concurrency`."""
+
+    pinger = AsyncPinger()
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def check(ip: str) -> tuple[str, bool]:
+        async with semaphore:
+            return ip, await pinger.ping(ip, timeout) is not None
+
+    pinger.open()
+    try:
+        return dict(await asyncio.gather(*(check(ip) for ip in dict.fromkeys(ips))))
+    finally:
+        pinger.close()
+
+
+def ping_hosts(
+    ips: Iterable[str], timeout: float = 2, concurrency: int = REACHABILITY_PING_CONCURRENCY
+) -> dict[str, bool]:
+    """
+    ## Проверить доступность адресов пачкой из синхронного кода.
+
+    :param ips: IP адреса, повторы проверяются один раз.
+    :param timeout: Время ожидания ответа от каждого адреса, в секундах.
+    :param concurrency: Сколько адресов проверяется одновременно.
+    :return: Словарь: IP -> доступен ли адрес.
+    """
+    ips = list(ips)
+    if not ips:
+        return {}
+    coroutine = ping_hosts_async(ips, timeout=timeout, concurrency=concurrency)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    # В потоке уже работает event loop, поэтому проверка выполняется на своем loop в другом потоке.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
@@ -1,6 +1,11 @@
+import json
 import os
+import queue
 import re
-from collections.abc import Sequence
+import time
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from threading import local
 from typing import Any, Literal, Never
 
@@ -10,6 +15,7 @@ from ping3 import ping
 from devicemanager import exceptions
 from devicemanager.connection_ports import normalize_connection_ports
 from devicemanager.device_connector.types import RemoteCommand
+from devicemanager.reachability import ping_hosts
 from devicemanager.vendors.base.device import (
     AbstractCableTestDevice,
     AbstractDevice,
@@ -32,8 +38,29 @@ from devicemanager.vendors.base.types import (
 )
 
 from ..device_connector.factory import DEFAULT_POOL_SIZE, DEVICE_POOL_EXPIRED_SECONDS
+from ..device_connector.sharding import SHARD_ROUTER
 from .exceptions import InvalidMethod, RemoteAuthenticationFailed
 
+# Выполнять методы оборудования через фоновые задачи device connector (`/jobs/<ip>/<method>`).
+DEVICE_CONNECTOR_USE_JOBS = os.getenv("DEVICE_CONNECTOR_USE_JOBS", "0").lower() in {"1", "true", "yes", "on"}
+# Общее время ожидания результата фоновой задачи.
+DEVICE_CONNECTOR_JOB_TIMEOUT = int(os.getenv("DEVICE_CONNECTOR_JOB_TIMEOUT", "600"))
+# Время ожидания результата одним long-poll запросом.
+JOB_POLL_SECONDS = 25
+# Максимальное кол-во вызовов оборудования (или адресов для проверки доступности) в одном пакетном запросе.
+DEVICE_CONNECTOR_BATCH_SIZE = int(os.getenv("DEVICE_CONNECTOR_BATCH_SIZE", "200"))
+# Максимальное время ожидания очередного результата пакетного запроса.
+BATCH_READ_TIMEOUT = 300
+
+
+@dataclass(slots=True)
+class RemoteCall:
+    """Вызов метода оборудования в пакетном запросе."""
+
+    device: "RemoteDevice"
+    method: str
+    params: dict = field(default_factory=dict)
+
 
 class PoolController:
 
@@ -41,6 +68,12 @@ class PoolController:
         self._remote_connector_address = os.getenv("DEVICE_CONNECTOR_ADDRESS")
         self._local = local()
 
+    @property
+    def enabled(self) -> bool:
+        """Настроен ли device connector (один или несколько шардов)."""
+
+        return bool(self._remote_connector_address or SHARD_ROUTER.ring.nodes)
+
     def _get_session(self) -> requests.Session:
         """Вернуть отдельную HTTP-сессию для текущего потока."""
 
@@ -51,12 +84,17 @@ class PoolController:
             self._local.session = session
         return session
 
+    def _address(self, ip: str) -> str | None:
+        """Адрес шарда device connector, владеющего пулом оборудования."""
+
+        return SHARD_ROUTER.address(ip, default=self._remote_connector_address)
+
     def clear_pool(self, ip: str) -> bool:
-        resp = self._get_session().delete(f"{self._remote_connector_address}/pool/{ip}", timeout=3)
+        resp = self._get_session().delete(f"{self._address(ip)}/pool/{ip}", timeout=3)
         return resp.status_code == 204
 
     def get_pool_status(self, ip: str) -> list[bool]:
-        resp = self._get_session().get(f"{self._remote_connector_address}/pool/{ip}", timeout=3)
+        resp = self._get_session().get(f"{self._address(ip)}/pool/{ip}", timeout=3)
         if resp.status_code != 200:
             return []
         return resp.json().get("statuses", [])
@@ -64,7 +102,7 @@ class PoolController:
     def get_connection_status(self, ip: str) -> dict:
         """Return pool state and the latest device connection diagnostics."""
 
-        resp = self._get_session().get(f"{self._remote_connector_address}/pool/{ip}", timeout=3)
+        resp = self._get_session().get(f"{self._address(ip)}/pool/{ip}", timeout=3)
         if resp.status_code != 200:
             return {
                 "statuses": [],
@@ -85,9 +123,145 @@ class PoolController:
     def confirm_ssh_host_key(self, ip: str) -> int:
         """Confirm a pending SSH host key and return the connector status code."""
 
-        resp = self._get_session().post(f"{self._remote_connector_address}/ssh-host-key/{ip}", timeout=10)
+        resp = self._get_session().post(f"{self._address(ip)}/ssh-host-key/{ip}", timeout=10)
         return resp.status_code
 
+    def ping_many(self, ips: Iterable[str], timeout: float = 2) -> dict[str, bool]:
+        """
+        Проверить доступность множества оборудования.
+
+        Адреса группируются по шардам device connector, каждому шарду отправляются запросы
+        `POST /ping` по `DEVICE_CONNECTOR_BATCH_SIZE` адресов. Без device connector адреса
+        проверяются ICMP echo из текущего процесса. Адреса шарда, который не ответил, считаются
+        недоступными.
+        """
+
+        groups: dict[str | None, list[str]] = {}
+        for ip in dict.fromkeys(ips):
+            groups.setdefault(self._address(ip), []).append(ip)
+        result = ping_hosts(groups.pop(None, []), timeout=timeout)
+
+        batches = [
+            (address, group[i : i + DEVICE_CONNECTOR_BATCH_SIZE])
+            for address, group in groups.items()
+            for i in range(0, len(group), DEVICE_CONNECTOR_BATCH_SIZE)
+        ]
+
+        def send(address: str, batch: list[str]) -> dict[str, bool]:
+            available: dict = {}
+            try:
+                resp = self._get_session().post(
+                    f"{address}/ping", json={"ips": batch, "timeout": timeout}, timeout=timeout + 5
+                )
+                if resp.status_code == 200:
+                    available = resp.json().get("available", {})
+            except requests.exceptions.RequestException as exc:
+                print(f"Remote device | ping_many {address} | {exc}")
+            return {ip: bool(available.get(ip, False)) for ip in batch}
+
+        if batches:
+            with ThreadPoolExecutor(max_workers=min(len(batches), 8), thread_name_prefix="remote-ping") as ex:
+                for batch_result in ex.map(lambda item: send(*item), batches):
+                    result.update(batch_result)
+        return result
+
+    def perform_batch(
+        self, calls: Sequence[RemoteCall], batch_size: int = DEVICE_CONNECTOR_BATCH_SIZE
+    ) -> Iterator[tuple[RemoteCall, Any]]:
+        """
+        Выполнить вызовы на множестве оборудования пакетными запросами (`POST /batch`).
+
+        Вызовы группируются по шардам device connector и делятся на пакеты по `batch_size`,
+        пакеты отправляются параллельно. Пары `(вызов, результат)` отдаются по мере готовности
+        в произвольном порядке. Результат - данные метода без преобразования в типы `RemoteDevice`
+        либо экземпляр исключения, которое было бы вызвано методом.
+        """
+
+        batches: list[tuple[str | None, list[RemoteCall]]] = []
+        groups: dict[str | None, list[RemoteCall]] = {}
+        for call in calls:
+            groups.setdefault(call.device._remote_connector_address, []).append(call)
+        for address, group in groups.items():
+            batches.extend((address, group[i : i + batch_size]) for i in range(0, len(group), batch_size))
+        if not batches:
+            return
+
+        results: queue.Queue[tuple[RemoteCall, Any] | None] = queue.Queue()
+
+        def send(address: str | None, batch: list[RemoteCall]) -> None:
+            try:
+                for index, result in self._iter_batch(address, batch):
+                    results.put((batch[index], result))
+            finally:
+                results.put(None)
+
+        with ThreadPoolExecutor(
+            max_workers=min(len(batches), 8), thread_name_prefix="remote-batch"
+        ) as executor:
+            for address, batch in batches:
+                executor.submit(send, address, batch)
+            finished = 0
+            while finished < len(batches):
+                item = results.get()
+                if item is None:
+                    finished += 1
+                else:
+                    yield item
+
+    def _iter_batch(self, address: str | None, batch: list[RemoteCall]) -> Iterator[tuple[int, Any]]:
+        """Отправить один пакет и отдавать пары `(индекс вызова, результат)`."""
+
+        unanswered = set(range(len(batch)))
+        payload = {
+            "items": [
+                {
+                    "id": index,
+                    "ip": call.device.ip,
+                    "method": call.method,
+                    **call.device._payload(call.params),
+                }
+                for index, call in enumerate(batch)
+            ]
+        }
+        error: Exception
+        try:
+            with self._get_session().post(
+                f"{address}/batch", json=payload, timeout=(3, BATCH_READ_TIMEOUT), stream=True
+            ) as resp:
+                if resp.status_code == 401:
+                    error = RemoteAuthenticationFailed(resp.json().get("message"), ip=str(address))
+                elif resp.status_code != 200:
+                    error = exceptions.DeviceException(
+                        f"Пакетный запрос отклонен: {resp.text}", ip=str(address)
+                    )
+                else:
+                    for line in resp.iter_lines():
+                        if not line:
+                            continue
+                        message = json.loads(line)
+                        index = message.get("id")
+                        if index in unanswered:
+                            unanswered.discard(index)
+                            yield index, self._batch_result(batch[index], message)
+                    error = requests.exceptions.ConnectionError(
+                        "Вывод от DeviceConnector получен не полностью"
+                    )
+        except requests.exceptions.RequestException as exc:
+            error = requests.exceptions.ConnectionError("Не удалось подключиться к DeviceConnector")
+            error.__cause__ = exc
+
+        for index in sorted(unanswered):
+            yield index, error
+
+    def _batch_result(self, call: RemoteCall, message: dict) -> Any:
+        if "data" in message:
+            return message["data"]
+        if "error" in message:
+            return InvalidMethod(f'Метод "{call.method}" отсутствует', ip=call.device.ip)
+        # Пул соединений удаляется, чтобы он создался заново, как и при одиночном вызове.
+        call.device._delete_pool()
+        return call.device._make_error(message)
+
 
 pool_controller = PoolController()
 
@@ -132,22 +306,28 @@ class RemoteDevice(
         self._ssh_port = ports.ssh_port
         self._snmp_port = ports.snmp_port
         self._make_session_global = make_session_global
-        self._remote_connector_address = os.getenv("DEVICE_CONNECTOR_ADDRESS")
+        self._remote_connector_address = SHARD_ROUTER.address(
+            ip, default=os.getenv("DEVICE_CONNECTOR_ADDRESS")
+        )
 
         self._pool_size = pool_size
         self._pool_expired_seconds = pool_expired_seconds
 
         self._timeout = 60
+        self._use_jobs = DEVICE_CONNECTOR_USE_JOBS
         self._session = requests.Session()
         self._session.headers.update({"Token": os.getenv("DEVICE_CONNECTOR_TOKEN", "")})
 
     def _handle_error(self, error: dict) -> Never:
         self._delete_pool()  # Удаляем пул соединений, чтобы он создался заново
+        raise self._make_error(error)
+
+    def _make_error(self, error: dict) -> exceptions.BaseDeviceException:
         if hasattr(exceptions, error["type"]):
             some_exception: type[exceptions.BaseDeviceException] = getattr(exceptions, error["type"])
-            raise some_exception(error["message"], ip=self.ip)
+            return some_exception(error["message"], ip=self.ip)
 
-        raise exceptions.DeviceException(error["message"], ip=self.ip)
+        return exceptions.DeviceException(error["message"], ip=self.ip)
 
     def ping_device(self) -> bool:
         if not self._remote_connector_address:
@@ -166,28 +346,88 @@ class RemoteDevice(
     def _delete_pool(self):
         self._session.delete(f"{self._remote_connector_address}/pool/{self.ip}", timeout=3)
 
+    def _payload(self, params: dict) -> dict:
+        return {
+            "connection": {
+                "cmd_protocol": self._cmd_protocol,
+                "port_scan_protocol": self._port_scan_protocol,
+                "snmp_community": self._snmp_community,
+                "telnet_port": self._telnet_port,
+                "ssh_port": self._ssh_port,
+                "snmp_port": self._snmp_port,
+                "make_session_global": self._make_session_global,
+                "pool_size": self._pool_size,
+                "pool_expired_seconds": self._pool_expired_seconds,
+            },
+            "auth": self._remote_auth,
+            "params": params,
+        }
+
     def _remote_call(self, method: str, **params) -> Any:
-        url = f"{self._remote_connector_address}/connector/{self.ip}/{method}"
-        try:
-            resp = self._session.post(
-                url=url,
-                json={
-                    "connection": {
-                        "cmd_protocol": self._cmd_protocol,
-                        "port_scan_protocol": self._port_scan_protocol,
-                        "snmp_community": self._snmp_community,
-                        "telnet_port": self._telnet_port,
-                        "ssh_port": self._ssh_port,
-                        "snmp_port": self._snmp_port,
-                        "make_session_global": self._make_session_global,
-                        "pool_size": self._pool_size,
-                        "pool_expired_seconds": self._pool_expired_seconds,
-                    },
-                    "auth": self._remote_auth,
-                    "params": params,
-                },
-                timeout=self._timeout,
+        payload = self._payload(params)
+        if self._use_jobs:
+            resp = self._call_job(method, payload)
+        else:
+            resp = self._request(
+                "post", f"{self._remote_connector_address}/connector/{self.ip}/{method}", payload
             )
+
+        if 200 <= resp.status_code <= 299:
+            return self._handle_response(resp)
+        return self._raise_for_response(method, resp)
+
+    def _iter_remote_call(self, method: str, **params) -> Iterator[str]:
+        """
+        Вызвать метод-генератор и отдавать его вывод по мере получения.
+
+        Device connector передает вывод в формате NDJSON через chunked HTTP.
+        """
+
+        resp = self._request(
+            "post",
+            f"{self._remote_connector_address}/connector/{self.ip}/{method}",
+            self._payload(params),
+            stream=True,
+        )
+        try:
+            if not 200 <= resp.status_code <= 299:
+                self._raise_for_response(method, resp)
+
+            for line in resp.iter_lines():
+                if not line:
+                    continue
+                message = json.loads(line)
+                if "chunk" in message:
+                    yield message["chunk"]
+                elif message.get("done"):
+                    return
+                else:
+                    self._handle_error(message)
+        except requests.exceptions.RequestException as exc:
+            raise requests.exceptions.ConnectionError("Не удалось подключиться к DeviceConnector") from exc
+        finally:
+            resp.close()
+
+        raise requests.exceptions.ConnectionError("Вывод от DeviceConnector получен не полностью")
+
+    def _raise_for_response(self, method: str, resp: requests.Response) -> Never:
+        if resp.status_code == 401:
+            raise RemoteAuthenticationFailed(resp.json().get("message"), ip=self.ip)
+        if 400 <= resp.status_code <= 499:
+            raise InvalidMethod(f'Метод "{method}" отсутствует', ip=self.ip)
+        self._handle_error(resp.json())
+
+    def _request(
+        self,
+        http_method: Literal["post", "get"],
+        url: str,
+        payload: dict | None = None,
+        timeout: float | None = None,
+        stream: bool = False,
+    ) -> requests.Response:
+        try:
+            send = self._session.post if http_method == "post" else self._session.get
+            return send(url=url, json=payload, timeout=timeout or self._timeout, stream=stream)
         except requests.exceptions.ConnectionError as exc:
             raise requests.exceptions.ConnectionError("Не удалось подключиться к DeviceConnector") from exc
         except requests.exceptions.Timeout as exc:
@@ -197,13 +437,25 @@ class RemoteDevice(
                 "Неверный формат URL для подключения DeviceConnector"
             ) from exc
 
-        if 200 <= resp.status_code <= 299:
-            return self._handle_response(resp)
-        if resp.status_code == 401:
-            raise RemoteAuthenticationFailed(resp.json().get("message"), ip=self.ip)
-        if 400 <= resp.status_code <= 499:
-            raise InvalidMethod(f'Метод "{method}" отсутствует', ip=self.ip)
-        return self._handle_error(resp.json())
+    def _call_job(self, method: str, payload: dict) -> requests.Response:
+        """
+        Запустить метод фоновой задачей device connector и дождаться результата long-poll запросами.
+
+        Ни один HTTP запрос не держит поток device connector дольше `JOB_POLL_SECONDS`.
+        """
+
+        resp = self._request("post", f"{self._remote_connector_address}/jobs/{self.ip}/{method}", payload)
+        if resp.status_code != 202:
+            return resp
+
+        job_url = f"{self._remote_connector_address}/jobs/{self.ip}/{resp.json()['job']}"
+        deadline = time.monotonic() + DEVICE_CONNECTOR_JOB_TIMEOUT
+        while time.monotonic() < deadline:
+            wait = max(min(JOB_POLL_SECONDS, deadline - time.monotonic()), 0)
+            resp = self._request("get", f"{job_url}?wait={wait:.0f}", timeout=wait + 10)
+            if resp.status_code != 202:
+                return resp
+        raise requests.exceptions.ConnectTimeout("Время ожидания ответа от DeviceConnector")
 
     @staticmethod
     def _handle_response(resp: requests.Response):
@@ -297,6 +549,9 @@ class RemoteDevice(
     def execute_commands_list(self, command_list: list[RemoteCommand]) -> list[str]:
         return self._remote_call("execute_commands_list", commands=command_list)
 
+    def execute_commands_stream(self, command_list: list[RemoteCommand]) -> Iterator[str]:
+        return self._iter_remote_call("execute_commands_stream", commands=command_list)
+
     def normalize_interface_name_realtime(self, intf: str) -> str:
         return self._remote_call("normalize_interface_name_realtime", intf=intf)
 
@@ -1,6 +1,7 @@
 import logging
 import os
 import sys
+from collections import deque
 from collections.abc import Callable, Mapping
 from typing import TYPE_CHECKING
 
@@ -18,6 +19,41 @@ logger = logging.getLogger(__name__)
 logger.setLevel(str(os.getenv("DEVICE_CONNECTOR_LOG_LEVEL", "INFO")))
 logger.addHandler(logging.StreamHandler(sys.stdout))
 
+# Сколько последнего вывода сессии (в символах) хранится в `before_history`.
+BEFORE_HISTORY_LIMIT = int(os.getenv("DEVICE_SESSION_BEFORE_HISTORY_LIMIT", str(64 * 1024)))
+
+
+class BeforeHistory:
+    """
+    Кольцевой буфер вывода сессии.
+
+    Хранит сырые части вывода и отбрасывает самые старые, когда их общий размер
+    превышает `limit`, поэтому сессия из пула не накапливает вывод бесконечно.
+    """
+
+    __slots__ = ("_chunks", "_size", "limit")
+
+    def __init__(self, limit: int = BEFORE_HISTORY_LIMIT) -> None:
+        self._chunks: deque[bytes | str] = deque()
+        self._size = 0
+        self.limit = limit
+
+    def append(self, chunk: bytes | str) -> None:
+        if len(chunk) > self.limit:
+            chunk = chunk[-self.limit :] if self.limit else chunk[:0]
+        self._chunks.append(chunk)
+        self._size += len(chunk)
+        while self._size > self.limit:
+            self._size -= len(self._chunks.popleft())
+
+    def __len__(self) -> int:
+        return self._size
+
+    def getvalue(self) -> str:
+        from devicemanager.vendors.base.helpers import remove_ansi_escape_codes
+
+        return "".join("\n" + remove_ansi_escape_codes(chunk) for chunk in self._chunks)
+
 
 class SessionSpawner(Spawn):
     def __init__(
@@ -60,7 +96,7 @@ class SessionSpawner(Spawn):
             use_poll,
         )
         self.ip = ip
-        self._before_history = ""
+        self._before_history = BeforeHistory()
         self._cmd_history: list[str | bytes] = []
 
     def clear_cmd_history(self) -> None:
@@ -68,13 +104,11 @@ class SessionSpawner(Spawn):
 
     @property
     def before_history(self) -> str:
-        return self._before_history
+        return self._before_history.getvalue()
 
     def save_before(self) -> None:
-        from devicemanager.vendors.base.helpers import remove_ansi_escape_codes
-
         if self.before is not None:
-            self._before_history += "\n" + remove_ansi_escape_codes(self.before)
+            self._before_history.append(self.before)
 
     def sendline(self, s: str | bytes = "") -> int:
         logger.debug("Device: %s | sendline: %s", self.ip, s)
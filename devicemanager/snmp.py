@@ -1,14 +1,50 @@
+import logging
+import os
 import subprocess
 from re import IGNORECASE, findall
+from typing import cast
 
+from .snmp_engine import SnmpError, SnmpTimeoutError, SnmpV2cClient, SnmpValue
 from .vendors.base.types import InterfaceListType, InterfaceType
 
+logger = logging.getLogger(__name__)
+
+# `native` - встроенный SNMP клиент, `subprocess` - утилиты net-snmp (snmpwalk/snmpbulkwalk).
+SNMP_ENGINE = os.getenv("SNMP_ENGINE", "native")
+
 SNMP_IDENTITY_MIBS = {
     "sys_descr": "SNMPv2-MIB::sysDescr.0",
     "sys_name": "SNMPv2-MIB::sysName.0",
     "sys_object_id": "SNMPv2-MIB::sysObjectID.0",
 }
 
+# Числовые OID для встроенного SNMP клиента.
+SNMP_IDENTITY_OIDS = {
+    "sys_descr": "1.3.6.1.2.1.1.1.0",
+    "sys_name": "1.3.6.1.2.1.1.5.0",
+    "sys_object_id": "1.3.6.1.2.1.1.2.0",
+}
+
+IF_MIB_COLUMNS = {
+    "IF-MIB::ifAlias": "1.3.6.1.2.1.31.1.1.1.18",
+    "IF-MIB::ifIndex": "1.3.6.1.2.1.2.2.1.1",
+    "IF-MIB::ifName": "1.3.6.1.2.1.31.1.1.1.1",
+    "IF-MIB::ifAdminStatus": "1.3.6.1.2.1.2.2.1.7",
+    "IF-MIB::ifOperStatus": "1.3.6.1.2.1.2.2.1.8",
+    "IF-MIB::ifDescr": "1.3.6.1.2.1.2.2.1.2",
+}
+
+# Текстовые значения перечислений IF-MIB, как их выводит net-snmp.
+IF_STATUS_NAMES = {
+    1: "up",
+    2: "down",
+    3: "testing",
+    4: "unknown",
+    5: "dormant",
+    6: "notPresent",
+    7: "lowerLayerDown",
+}
+
 
 def physical_interface(name: str) -> bool:
     """
@@ -39,6 +75,14 @@ def get_system_identity(
     без полного сбора интерфейсов.
     """
 
+    if SNMP_ENGINE == "native":
+        try:
+            return _get_system_identity_native(device_ip, community, snmp_port, timeout)
+        except SnmpTimeoutError:
+            return {}
+        except (SnmpError, OSError) as exc:
+            logger.warning("%s | Встроенный SNMP клиент: %s, используем snmpwalk", device_ip, exc)
+
     result: dict[str, str] = {}
     for key, mib in SNMP_IDENTITY_MIBS.items():
         value = _snmpwalk_single_value(
@@ -53,6 +97,36 @@ def get_system_identity(
     return result
 
 
+def _get_system_identity_native(
+    device_ip: str, community: str, snmp_port: int, timeout: int
+) -> dict[str, str]:
+    """Получает SNMP identity одним GET запросом встроенного клиента."""
+
+    client = SnmpV2cClient(device_ip, community, port=snmp_port, timeout=timeout, retries=0)
+    return identity_from_values(client.get(SNMP_IDENTITY_OIDS.values()))
+
+
+def identity_from_values(values: dict[str, SnmpValue]) -> dict[str, str]:
+    """Собирает SNMP identity из ответа встроенного клиента на GET `SNMP_IDENTITY_OIDS`."""
+
+    result: dict[str, str] = {}
+    for key, oid in SNMP_IDENTITY_OIDS.items():
+        value = _value_to_str(values.get(oid))
+        if value:
+            result[key] = value
+    return result
+
+
+def _value_to_str(value: SnmpValue) -> str:
+    """Преобразует значение встроенного SNMP клиента в строку, как в выводе net-snmp."""
+
+    if value is None or not isinstance(value, int | str | bytes):
+        return ""
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="ignore").strip()
+    return str(value)
+
+
 def _snmpwalk_single_value(community: str, ip: str, port: int, mib: str, timeout: int) -> str:
     """Выполняет `snmpwalk` для одного OID и возвращает первое значение."""
 
@@ -99,14 +173,47 @@ def get_interfaces(device_ip, community, snmp_port=161) -> InterfaceListType:
     :return: [('name', 'admin status', 'oper status', 'desc'), ...]
     """
 
-    snmp_result: dict = {
-        "IF-MIB::ifAlias": {},
-        "IF-MIB::ifIndex": {},
-        "IF-MIB::ifName": {},
-        "IF-MIB::ifAdminStatus": {},
-        "IF-MIB::ifOperStatus": {},
-        "IF-MIB::ifDescr": {},
-    }
+    snmp_result: dict[str, dict[str, str]] | None = None
+    if SNMP_ENGINE == "native":
+        try:
+            snmp_result = _walk_interfaces_native(device_ip, community, snmp_port)
+        except SnmpTimeoutError:
+            return []
+        except (SnmpError, OSError) as exc:
+            logger.warning("%s | Встроенный SNMP клиент: %s, используем snmpbulkwalk", device_ip, exc)
+
+    if snmp_result is None:
+        snmp_result = _walk_interfaces_subprocess(device_ip, community, snmp_port)
+
+    return _build_interfaces(snmp_result)
+
+
+def _walk_interfaces_native(device_ip: str, community: str, snmp_port: int) -> dict[str, dict[str, str]]:
+    """
+    Обходит колонки IF-MIB встроенным SNMP клиентом.
+
+    Все шесть колонок запрашиваются конвейером GETBULK через один UDP сокет.
+    Результат имеет тот же вид, что и разобранный вывод `snmpbulkwalk -Oq`.
+    """
+
+    columns = SnmpV2cClient(device_ip, community, port=snmp_port).bulk_walk(IF_MIB_COLUMNS)
+
+    snmp_result: dict[str, dict[str, str]] = {}
+    for mib, values in columns.items():
+        if mib in {"IF-MIB::ifAdminStatus", "IF-MIB::ifOperStatus"}:
+            snmp_result[mib] = {
+                index: IF_STATUS_NAMES.get(value, str(value)) if isinstance(value, int) else ""
+                for index, value in values.items()
+            }
+        else:
+            snmp_result[mib] = {index: _value_to_str(value) for index, value in values.items()}
+    return snmp_result
+
+
+def _walk_interfaces_subprocess(device_ip: str, community: str, snmp_port: int) -> dict[str, dict[str, str]]:
+    """Обходит колонки IF-MIB через `snmpbulkwalk`, по одному процессу на колонку."""
+
+    snmp_result: dict[str, dict[str, str]] = {mib: {} for mib in IF_MIB_COLUMNS}
 
     def snmpget(community, ip, port, mib) -> None:
         # Выполнение команды `snmpbulkwalk -Oq -v2c -Cr10 -c <community> <ip>:<port> <mib>` и возврат результата.
@@ -128,6 +235,12 @@ def get_interfaces(device_ip, community, snmp_port=161) -> InterfaceListType:
     for key in snmp_result:
         snmpget(community, device_ip, snmp_port, key)
 
+    return snmp_result
+
+
+def _build_interfaces(snmp_result: dict[str, dict[str, str]]) -> InterfaceListType:
+    """Собирает список интерфейсов из результатов обхода колонок IF-MIB."""
+
     # Убираем возможное переполнение в отрицательных индексах
     for k, v in snmp_result["IF-MIB::ifIndex"].items():
         try:
@@ -155,7 +268,7 @@ def get_interfaces(device_ip, community, snmp_port=161) -> InterfaceListType:
         if admin_status == "down":
             status = "admin down"
         elif oper_status in {"up", "down", "dormant"}:
-            status = snmp_result["IF-MIB::ifOperStatus"][snmp_index]
+            status = cast(InterfaceType, oper_status)
 
         result.append(
             (
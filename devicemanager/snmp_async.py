@@ -0,0 +1,245 @@
+"""
+Асинхронный SNMPv2c опрос множества устройств на одном event loop.
+
+Все запросы идут через один UDP сокет, ответы сопоставляются с ожидающими
+запросами по `request-id`. Количество одновременных запросов ограничивается
+глобально и для каждого устройства отдельно.
+"""
+
+import asyncio
+import itertools
+import os
+import random
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from .snmp import SNMP_IDENTITY_OIDS, identity_from_values
+from .snmp_engine import (
+    PDU_GET_REQUEST,
+    PDU_RESPONSE,
+    SnmpError,
+    SnmpProtocolError,
+    SnmpResponseError,
+    SnmpTimeoutError,
+    SnmpValue,
+    decode_message,
+    encode_message,
+    format_oid,
+    parse_oid,
+)
+
+SNMP_POLLER_MAX_IN_FLIGHT = int(os.getenv("SNMP_POLLER_MAX_IN_FLIGHT", "2000"))
+SNMP_POLLER_PER_HOST_LIMIT = int(os.getenv("SNMP_POLLER_PER_HOST_LIMIT", "4"))
+SNMP_POLLER_PER_HOST_INTERVAL = float(os.getenv("SNMP_POLLER_PER_HOST_INTERVAL", "0"))
+
+
+@dataclass(slots=True)
+class SnmpCommunityAttempt:
+    """Результат проверки одного SNMP community."""
+
+    community: str
+    success: bool
+    duration_ms: int
+    error: str = ""
+
+
+@dataclass(slots=True)
+class _PendingRequest:
+    ip: str
+    community: bytes
+    future: asyncio.Future
+
+
+class _PollerProtocol(asyncio.DatagramProtocol):
+    def __init__(self, poller: "AsyncSnmpPoller"):
+        self.poller = poller
+
+    def datagram_received(self, data: bytes, addr: tuple) -> None:
+        self.poller._on_datagram(data, addr)
+
+    def error_received(self, exc: Exception) -> None:
+        # ICMP ошибки на общем сокете не относятся к конкретному запросу,
+        # такие запросы завершатся по таймауту.
+        pass
+
+
+class AsyncSnmpPoller:
+    """
+    Асинхронный SNMPv2c клиент для опроса тысяч устройств одновременно.
+
+    Пример:
+
+        async with AsyncSnmpPoller(timeout=2) as poller:
+            identity = await poller.get_system_identity("10.0.0.1", "public")
+    """
+
+    def __init__(
+        self,
+        timeout: float = 2.0,
+        retries: int = 1,
+        max_in_flight: int = SNMP_POLLER_MAX_IN_FLIGHT,
+        per_host_limit: int = SNMP_POLLER_PER_HOST_LIMIT,
+        per_host_interval: float = SNMP_POLLER_PER_HOST_INTERVAL,
+    ):
+        self.timeout = timeout
+        self.retries = retries
+        self.per_host_limit = max(per_host_limit, 1)
+        self.per_host_interval = per_host_interval
+        self._in_flight = asyncio.Semaphore(max(max_in_flight, 1))
+        self._host_slots: dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self.per_host_limit)
+        )
+        self._host_last_send: dict[str, float] = {}
+        self._pending: dict[int, _PendingRequest] = {}
+        self._request_ids = itertools.count(random.randint(1, 2**30))
+        self._transport: asyncio.DatagramTransport | None = None
+
+    async def __aenter__(self) -> "AsyncSnmpPoller":
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _PollerProtocol(self), local_addr=("0.0.0.0", 0)
+        )
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        for request in self._pending.values():
+            request.future.cancel()
+        self._pending.clear()
+
+    def _on_datagram(self, data: bytes, addr: tuple) -> None:
+        try:
+            message = decode_message(data)
+        except SnmpProtocolError:
+            return
+        if message.pdu.pdu_type != PDU_RESPONSE:
+            return
+
+        request = self._pending.get(message.pdu.request_id)
+        if request is None or request.ip != addr[0] or request.community != message.community:
+            return
+        del self._pending[message.pdu.request_id]
+        if not request.future.done():
+            request.future.set_result(message.pdu)
+
+    async def _wait_host_interval(self, ip: str) -> None:
+        if not self.per_host_interval:
+            return
+        last = self._host_last_send.get(ip)
+        if last is not None and (delay := last + self.per_host_interval - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+        self._host_last_send[ip] = time.monotonic()
+
+    async def get(
+        self, ip: str, community: str, oids: Iterable[str], port: int = 161
+    ) -> dict[str, SnmpValue]:
+        """Выполнить GET запрос для нескольких OID. Возвращает {OID: значение}."""
+
+        if self._transport is None:
+            raise RuntimeError("AsyncSnmpPoller должен использоваться как async context manager")
+
+        var_binds = [(parse_oid(oid), None) for oid in oids]
+        encoded_community = community.encode()
+        loop = asyncio.get_running_loop()
+
+        async with self._host_slots[ip], self._in_flight:
+            for _ in range(self.retries + 1):
+                await self._wait_host_interval(ip)
+                request_id = next(self._request_ids) & 0x7FFFFFFF
+                future = loop.create_future()
+                self._pending[request_id] = _PendingRequest(ip=ip, community=encoded_community, future=future)
+                self._transport.sendto(
+                    encode_message(encoded_community, PDU_GET_REQUEST, request_id, var_binds), (ip, port)
+                )
+                try:
+                    pdu = await asyncio.wait_for(future, self.timeout)
+                except TimeoutError:
+                    continue
+                finally:
+                    self._pending.pop(request_id, None)
+
+                if pdu.error_status:
+                    raise SnmpResponseError(pdu.error_status, pdu.error_index)
+                return {format_oid(oid): value for oid, value in pdu.var_binds}
+
+        raise SnmpTimeoutError(f"{ip}:{port} не ответил на SNMP GET")
+
+    async def get_system_identity(self, ip: str, community: str, port: int = 161) -> dict[str, str]:
+        """Получить `sysDescr`, `sysName` и `sysObjectID` одним GET запросом."""
+
+        return identity_from_values(await self.get(ip, community, SNMP_IDENTITY_OIDS.values(), port=port))
+
+    async def find_identity(
+        self, ip: str, communities: Iterable[str], port: int = 161
+    ) -> tuple[str, dict[str, str], list[SnmpCommunityAttempt]]:
+        """
+        Проверить все communities для устройства одновременно.
+
+        Возвращает первое по порядку `communities` подошедшее community, его identity
+        и попытки. Оставшиеся запросы отменяются, как только найдено подходящее community.
+        """
+
+        communities = list(communities)
+        tasks = {
+            asyncio.create_task(self._try_community(ip, community, port)): community
+            for community in communities
+        }
+        attempts: list[SnmpCommunityAttempt] = []
+        found: dict[str, dict[str, str]] = {}
+        pending = set(tasks)
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    attempt, identity = task.result()
+                    attempts.append(attempt)
+                    if identity:
+                        found[attempt.community] = identity
+
+                # Ждем только communities, стоящие в списке раньше уже найденного.
+                best = next((community for community in communities if community in found), None)
+                if best is not None:
+                    preferred = set(communities[: communities.index(best)])
+                    for task in list(pending):
+                        if tasks[task] not in preferred:
+                            task.cancel()
+                            pending.discard(task)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        best = next((community for community in communities if community in found), "")
+        attempts.sort(key=lambda item: communities.index(item.community))
+        return best, found.get(best, {}), attempts
+
+    async def _try_community(
+        self, ip: str, community: str, port: int
+    ) -> tuple[SnmpCommunityAttempt, dict[str, str]]:
+        started = time.monotonic()
+        try:
+            identity = await self.get_system_identity(ip, community, port=port)
+        except SnmpTimeoutError:
+            identity = {}
+        except (SnmpError, OSError) as exc:
+            return (
+                SnmpCommunityAttempt(
+                    community=community,
+                    success=False,
+                    duration_ms=int((time.monotonic() - started) * 1000),
+                    error=str(exc),
+                ),
+                {},
+            )
+        return (
+            SnmpCommunityAttempt(
+                community=community,
+                success=bool(identity),
+                duration_ms=int((time.monotonic() - started) * 1000),
+            ),
+            identity,
+        )
@@ -0,0 +1,276 @@
+"""
+# SSH подключение к оборудованию внутри процесса через paramiko.
+
+Сессия предоставляет тот же интерфейс expect/send, что и `SessionSpawner` поверх процесса `ssh`,
+но не создает дочерний процесс и псевдотерминал: данные читаются напрямую из SSH канала.
+
+Согласованные с устройством алгоритмы запоминаются и при следующих подключениях предлагаются первыми.
+Устройства, с которыми paramiko не может согласовать алгоритмы (например, только
+`diffie-hellman-group1-sha1` или `ssh-dss`), запоминаются, и для них сразу используется OpenSSH.
+"""
+
+import socket
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from threading import Lock
+
+import paramiko
+import pexpect
+from paramiko.ssh_exception import IncompatiblePeer
+from pexpect.spawnbase import SpawnBase
+
+from .device_connector.ssh_host_keys import SSHKnownHostsStore
+from .exceptions import DeviceLoginError, SSHConnectionError
+from .session_spawner import BeforeHistory, SessionSpawner
+
+# Управляющие символы, которые нельзя получить как `буква - 96`.
+CONTROL_CHARACTERS = {"@": 0, "`": 0, "[": 27, "{": 27, "\\": 28, "|": 28, "]": 29, "}": 29}
+CONTROL_CHARACTERS.update({"^": 30, "~": 30, "_": 31, "?": 127})
+
+
+class SSHTransportNotSupported(Exception):
+    """Устройство нельзя обслужить встроенным SSH клиентом, нужно подключаться через OpenSSH."""
+
+
+@dataclass(slots=True, frozen=True)
+class NegotiatedAlgorithms:
+    """Алгоритмы, согласованные с устройством при последнем успешном подключении."""
+
+    kex: str
+    host_key: str
+    cipher: str
+    mac: str
+
+
+class SSHAlgorithmsCache:
+    """
+    Согласованные SSH алгоритмы по устройствам.
+
+    Для устройства хранится либо `NegotiatedAlgorithms`, либо `None`, если встроенный
+    клиент не поддерживает предложенные устройством алгоритмы.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._devices: dict[tuple[str, int], NegotiatedAlgorithms | None] = {}
+
+    def get(self, ip: str, port: int) -> NegotiatedAlgorithms | None:
+        with self._lock:
+            return self._devices.get((ip, port))
+
+    def is_supported(self, ip: str, port: int) -> bool:
+        """Можно ли подключаться к устройству встроенным клиентом (неизвестные устройства - можно)."""
+
+        with self._lock:
+            return (ip, port) not in self._devices or self._devices[(ip, port)] is not None
+
+    def remember(self, ip: str, port: int, algorithms: NegotiatedAlgorithms) -> None:
+        with self._lock:
+            self._devices[(ip, port)] = algorithms
+
+    def mark_unsupported(self, ip: str, port: int) -> None:
+        with self._lock:
+            self._devices[(ip, port)] = None
+
+    def invalidate(self, ip: str, port: int) -> None:
+        with self._lock:
+            self._devices.pop((ip, port), None)
+
+
+SSH_ALGORITHMS_CACHE = SSHAlgorithmsCache()
+
+
+class _RecordingTransport(paramiko.Transport):
+    """Transport, запоминающий название согласованного алгоритма обмена ключами."""
+
+    agreed_kex = ""
+
+    def _parse_kex_init(self, m):
+        super()._parse_kex_init(m)
+        self.agreed_kex = next(
+            (name for name, engine in self._kex_info.items() if type(self.kex_engine) is engine), ""
+        )
+
+
+class _ChannelSpawn(pexpect.spawn):
+    """Низкоуровневые операции `pexpect.spawn`, выполняемые через SSH канал вместо pty."""
+
+    def __init__(self, channel: paramiko.Channel, timeout: float | None = 30, maxread: int = 2000) -> None:
+        SpawnBase.__init__(self, timeout=timeout, maxread=maxread)
+        self.channel = channel
+        self.command = None  # type: ignore[assignment]
+        self.args = None  # type: ignore[assignment]
+        self.name = f"<ssh channel {channel.getpeername()}>"
+        self.closed = False
+        self.use_poll = False
+        self._flag_eof = False
+
+    @property
+    def flag_eof(self):
+        return self._flag_eof
+
+    @flag_eof.setter
+    def flag_eof(self, value):
+        self._flag_eof = value
+
+    def read_nonblocking(self, size=1, timeout=-1):
+        if timeout == -1:
+            timeout = self.timeout
+        self.channel.settimeout(timeout)
+        try:
+            data = self.channel.recv(size)
+        except TimeoutError as exc:
+            raise pexpect.TIMEOUT("Timeout exceeded.") from exc
+        if not data:
+            self.flag_eof = True
+            raise pexpect.EOF("SSH канал закрыт")
+
+        s = self._decoder.decode(data, final=False)
+        self._log(s, "read")
+        return s
+
+    def send(self, s):
+        if self.delaybeforesend is not None:
+            time.sleep(self.delaybeforesend)
+
+        s = self._coerce_send_string(s)
+        self._log(s, "send")
+        data = self._encoder.encode(s, final=False)
+        self.channel.sendall(data)
+        return len(data)
+
+    def sendcontrol(self, char):
+        char = char.lower()
+        code = ord(char) - 96 if "a" <= char <= "z" else CONTROL_CHARACTERS.get(char, 0)
+        self._log_control(bytes([code]))
+        return self.channel.send(bytes([code]))
+
+    def isalive(self):
+        return not self.closed and not self.channel.closed and self.channel.get_transport().is_active()
+
+    def close(self, force=True):
+        if self.closed:
+            return
+        transport = self.channel.get_transport()
+        self.channel.close()
+        if transport is not None:
+            transport.close()
+        self.closed = True
+
+
+class SSHChannelSpawner(SessionSpawner, _ChannelSpawn):
+    """
+    `SessionSpawner` поверх SSH канала paramiko.
+
+    Для кода оборудования ничем не отличается от сессии процесса `ssh`.
+    """
+
+    def __init__(self, channel: paramiko.Channel, ip: str, timeout: float | None = 30) -> None:
+        _ChannelSpawn.__init__(self, channel, timeout=timeout)
+        self.ip = ip
+        self._before_history = BeforeHistory()
+        self._cmd_history = []
+
+
+def _prefer(preferred: Sequence[str], algorithm: str) -> tuple[str, ...]:
+    if algorithm not in preferred:
+        return tuple(preferred)
+    return (algorithm,) + tuple(item for item in preferred if item != algorithm)
+
+
+def open_ssh_session(
+    ip: str,
+    port: int,
+    login: str,
+    password: str,
+    timeout: float = 15,
+    known_hosts: SSHKnownHostsStore | None = None,
+    algorithms_cache: SSHAlgorithmsCache = SSH_ALGORITHMS_CACHE,
+) -> SSHChannelSpawner:
+    """
+    Подключиться к устройству встроенным SSH клиентом и открыть интерактивную сессию.
+
+    Вызывает `SSHTransportNotSupported`, если подключение нужно выполнить через OpenSSH:
+    устройство предлагает неподдерживаемые алгоритмы или его ключ отличается от known_hosts.
+    """
+
+    try:
+        sock = socket.create_connection((ip, port), timeout=timeout)
+    except OSError as exc:
+        raise SSHConnectionError(f"SSH недоступен: {exc}", ip=ip) from exc
+
+    transport = _RecordingTransport(sock)
+    try:
+        cached = algorithms_cache.get(ip, port)
+        if cached is not None:
+            options = transport.get_security_options()
+            options.kex = _prefer(options.kex, cached.kex)
+            options.key_types = _prefer(options.key_types, cached.host_key)
+            options.ciphers = _prefer(options.ciphers, cached.cipher)
+            options.digests = _prefer(options.digests, cached.mac)
+
+        try:
+            transport.start_client(timeout=timeout)
+        except IncompatiblePeer as exc:
+            algorithms_cache.mark_unsupported(ip, port)
+            raise SSHTransportNotSupported(str(exc)) from exc
+        except (paramiko.SSHException, EOFError, OSError) as exc:
+            raise SSHConnectionError(f"SSH недоступен: {exc}", ip=ip) from exc
+
+        store = known_hosts or SSHKnownHostsStore()
+        if not store.verify_or_remember(ip, port, transport.get_remote_server_key()):
+            # Смена ключа обрабатывается через OpenSSH, который выводит подробное предупреждение.
+            raise SSHTransportNotSupported("SSH HOST IDENTIFICATION HAS CHANGED")
+
+        _authenticate(transport, ip, login, password)
+
+        channel = transport.open_session(timeout=timeout)
+        channel.get_pty()
+        channel.invoke_shell()
+    except paramiko.SSHException as exc:
+        transport.close()
+        raise SSHConnectionError(f"SSH недоступен: {exc}", ip=ip) from exc
+    except Exception:
+        transport.close()
+        raise
+
+    algorithms_cache.remember(
+        ip,
+        port,
+        NegotiatedAlgorithms(
+            kex=transport.agreed_kex,
+            host_key=transport.host_key_type or "",
+            cipher=transport.local_cipher,
+            mac=transport.local_mac or "",
+        ),
+    )
+    return SSHChannelSpawner(channel, ip=ip, timeout=timeout)
+
+
+def _authenticate(transport: paramiko.Transport, ip: str, login: str, password: str) -> None:
+    """
+    Аутентификация в том же порядке, что и у OpenSSH: none, password, keyboard-interactive.
+
+    Если устройство пускает без аутентификации, логин и пароль будут запрошены уже в терминале.
+    """
+
+    try:
+        transport.auth_none(login)
+        return
+    except paramiko.BadAuthenticationType as exc:
+        allowed_types = exc.allowed_types
+    except paramiko.AuthenticationException:
+        allowed_types = ["password", "keyboard-interactive"]
+
+    try:
+        if "password" in allowed_types:
+            transport.auth_password(login, password)
+        elif "keyboard-interactive" in allowed_types:
+            transport.auth_interactive(
+                login, lambda title, instructions, prompts: [password for _ in prompts]
+            )
+        else:
+            raise DeviceLoginError(f"Не поддерживаемые методы аутентификации SSH: {allowed_types}", ip=ip)
+    except paramiko.AuthenticationException as exc:
+        raise DeviceLoginError("Неверный Логин/Пароль (подключение SSH)", ip=ip) from exc
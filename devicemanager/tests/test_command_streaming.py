@@ -0,0 +1,193 @@
+import json
+from threading import Thread
+from unittest.mock import Mock, patch
+
+import requests
+from django.test import SimpleTestCase
+
+import device_connector
+from devicemanager.dc import SimpleAuthObject
+from devicemanager.device_connector.factory import DeviceSessionFactory
+from devicemanager.exceptions import DeviceException
+from devicemanager.remote.connector import RemoteDevice
+from devicemanager.vendors.cisco.basic import Cisco
+
+
+class PagedSession:
+    """Terminal session double returning prepared pages for each `expect` call."""
+
+    def __init__(self, responses: list[tuple[int, bytes]]):
+        self.responses = list(responses)
+        self.before = b""
+        self.sent: list[str] = []
+
+    def expect(self, pattern, timeout=None) -> int:
+        if not isinstance(pattern, list) or len(pattern) != 3 or not isinstance(pattern[1], str):
+            return 0  # Очистка буфера перед командой.
+        match, self.before = self.responses.pop(0)
+        return match
+
+    def send(self, data: str) -> None:
+        self.sent.append(data)
+
+    def sendline(self, data: str) -> None:
+        self.sent.append(data + "\n")
+
+
+def make_device(session) -> Cisco:
+    device = Cisco.__new__(Cisco)
+    device.session = session
+    device.ip = "192.0.2.10"
+    return device
+
+
+class SendCommandStreamingTests(SimpleTestCase):
+    """Tests for reading paged command output chunk by chunk."""
+
+    pages = [(1, b"line 1\r\nline 2"), (1, b"\x1b[42Dline 3\n"), (0, b"line 4\n")]
+
+    def test_pages_are_yielded_while_reading(self):
+        session = PagedSession(self.pages)
+        chunks = make_device(session).iter_command("show run", expect_command=False)
+
+        first_page = next(chunks)
+
+        self.assertEqual(first_page, "line 1\r\nline 2\n")
+        # Следующая страница уже запрошена у оборудования.
+        self.assertEqual(session.sent, ["show run\n", " "])
+        self.assertEqual(list(chunks), ["line 3\n", "line 4\n"])
+
+    def test_send_command_joins_pages(self):
+        output = make_device(PagedSession(self.pages)).send_command("show run", expect_command=False)
+
+        self.assertEqual(output, "line 1\r\nline 2\nline 3\nline 4\n")
+
+    def test_commands_stream_holds_session_lock(self):
+        """Another thread can use the session only after the output is consumed."""
+
+        device = make_device(PagedSession([(0, b"first"), (0, b"second")]))
+        commands = [
+            {"command": "show version", "conditions": []},
+            {"command": "show clock", "conditions": []},
+        ]
+        chunks = device.execute_commands_stream(commands)
+        self.assertEqual(next(chunks), "first")
+
+        acquired = []
+        thread = Thread(target=lambda: acquired.append(device.acquire_session(blocking=False)))
+        thread.start()
+        thread.join()
+        self.assertEqual(acquired, [False])
+
+        self.assertEqual(list(chunks), ["\n\n", "second"])
+        self.assertTrue(device.acquire_session(blocking=False))
+        device.release_session()
+
+
+class FactoryStreamingTests(SimpleTestCase):
+    """Tests for releasing a pool session after streamed output."""
+
+    def setUp(self):
+        self.connection = Mock()
+        patcher = patch.object(
+            DeviceSessionFactory, "_get_connection_to_perform", return_value=self.connection
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.factory = DeviceSessionFactory(
+            ip="192.0.2.10",
+            protocol="ssh",
+            auth_obj=SimpleAuthObject(login="user", password="password"),
+            make_session_global=True,
+            pool_size=1,
+            pool_expired_seconds=2,
+            snmp_community="public",
+            port_scan_protocol="ssh",
+        )
+
+    def test_session_is_released_after_output_is_read(self):
+        self.connection.execute_commands_stream.return_value = (chunk for chunk in ["a", "b"])
+
+        chunks = self.factory.perform_method("execute_commands_stream", commands=[])
+        self.connection.release_session.assert_not_called()
+
+        self.assertEqual(list(chunks), ["a", "b"])
+        self.connection.release_session.assert_called_once_with()
+        self.connection.session.close.assert_not_called()
+
+    def test_abandoned_stream_closes_session(self):
+        """Unread output is left in the terminal, so the session is not reused."""
+
+        self.connection.execute_commands_stream.return_value = (chunk for chunk in ["a", "b"])
+
+        chunks = self.factory.perform_method("execute_commands_stream", commands=[])
+        next(chunks)
+        chunks.close()
+
+        self.connection.session.close.assert_called_once_with()
+        self.connection.release_session.assert_called_once_with()
+
+
+class ConnectorStreamingTests(SimpleTestCase):
+    """Tests for NDJSON streaming between device connector and RemoteDevice."""
+
+    @patch("device_connector.CONNECTION_STATUSES")
+    @patch("device_connector.DeviceSessionFactory.perform_method")
+    def test_connector_streams_chunks(self, perform_method, _):
+        def chunks():
+            yield "page 1\n"
+            yield "страница 2\n"
+            raise DeviceException("Сессия закрыта", ip="192.0.2.10")
+
+        perform_method.return_value = chunks()
+
+        response = device_connector.app.test_client().post(
+            "/connector/192.0.2.10/execute_commands_stream",
+            headers={"Token": device_connector.TOKEN},
+            json={"connection": {}, "auth": {"login": "user", "password": "password"}, "params": {}},
+        )
+
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        self.assertEqual(
+            [json.loads(line) for line in response.get_data(as_text=True).splitlines()],
+            [
+                {"chunk": "page 1\n"},
+                {"chunk": "страница 2\n"},
+                {"type": "DeviceException", "message": "Сессия закрыта"},
+            ],
+        )
+
+    @staticmethod
+    def _remote_device(lines: list[bytes]) -> RemoteDevice:
+        device = RemoteDevice(
+            ip="192.0.2.10",
+            auth_obj=SimpleAuthObject(login="user", password="password"),
+            cmd_protocol="ssh",
+            port_scan_protocol="ssh",
+            snmp_community="public",
+            make_session_global=True,
+        )
+        device._remote_connector_address = "http://connector"
+        device._session = Mock()
+        device._session.post.return_value = Mock(status_code=200)
+        device._session.post.return_value.iter_lines.return_value = lines
+        return device
+
+    def test_remote_device_yields_chunks(self):
+        device = self._remote_device([b'{"chunk": "a"}', b"", b'{"chunk": "b"}', b'{"done": true}'])
+
+        self.assertEqual(list(device.execute_commands_stream([])), ["a", "b"])
+        self.assertTrue(device._session.post.call_args.kwargs["stream"])
+
+    def test_remote_device_raises_stream_errors(self):
+        device = self._remote_device([b'{"chunk": "a"}', b'{"type": "DeviceException", "message": "error"}'])
+
+        with self.assertRaises(DeviceException):
+            list(device.execute_commands_stream([]))
+
+    def test_truncated_stream_is_an_error(self):
+        device = self._remote_device([b'{"chunk": "a"}'])
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            list(device.execute_commands_stream([]))
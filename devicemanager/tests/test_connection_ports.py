@@ -1,10 +1,13 @@
 import os
+import tempfile
+from pathlib import Path
 from unittest.mock import Mock, patch
 
 from django.test import SimpleTestCase
 
 from devicemanager.dc import DeviceRemoteConnector, SimpleAuthObject, SSHSpawn
 from devicemanager.device_connector.factory import DeviceSessionFactory
+from devicemanager.device_connector.ssh_algorithms import SSHAlgorithmsStore
 from devicemanager.exceptions import SSHConnectionError
 from devicemanager.remote.connector import RemoteDevice
 
@@ -12,6 +15,18 @@ from devicemanager.remote.connector import RemoteDevice
 class DeviceConnectionPortsTests(SimpleTestCase):
     """Tests for custom device connection ports."""
 
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        store_patcher = patch(
+            "devicemanager.dc.SSH_ALGORITHMS_STORE",
+            SSHAlgorithmsStore(Path(temp_dir.name) / "algorithms.json"),
+        )
+        store_patcher.start()
+        self.addCleanup(store_patcher.stop)
+        SSHSpawn.clear_local_algorithms()
+        self.addCleanup(SSHSpawn.clear_local_algorithms)
+
     def test_remote_device_sends_connection_ports_to_device_connector(self):
         """RemoteDevice includes custom protocol ports in connector payload."""
 
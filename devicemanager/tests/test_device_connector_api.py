@@ -4,6 +4,7 @@ from django.test import SimpleTestCase
 
 import device_connector
 from devicemanager.exceptions import SSHConnectionError
+from devicemanager.vlans import VlanSet
 
 
 class DeviceConnectorAPITests(SimpleTestCase):
@@ -43,6 +44,31 @@ class DeviceConnectorAPITests(SimpleTestCase):
         self.assertEqual(response.status_code, 500)
         record_error.assert_called_once_with("192.0.2.10", error, ssh_port=2222)
 
+    @patch("device_connector.DeviceSessionFactory.perform_method")
+    def test_connector_returns_vlan_ranges(self, perform_method):
+        """VLAN sets of ports are sent as compact ranges."""
+
+        perform_method.return_value = [("Gi1/0/1", "up", "uplink", VlanSet("1-4094"))]
+
+        response = self.client.post(
+            "/connector/192.0.2.10/get_vlans",
+            headers=self.headers,
+            json={
+                "connection": {
+                    "cmd_protocol": "ssh",
+                    "port_scan_protocol": "ssh",
+                    "snmp_community": "public",
+                    "pool_size": 1,
+                    "make_session_global": True,
+                },
+                "auth": {"login": "user", "password": "password", "secret": ""},
+                "params": {},
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["data"], [["Gi1/0/1", "up", "uplink", ["1-4094"]]])
+
     @patch("device_connector.CONNECTION_STATUSES.get_status")
     @patch("device_connector.DEVICE_SESSIONS.get_pool_connections")
     def test_pool_endpoint_returns_connection_diagnostics(self, get_pool_connections, get_status):
@@ -79,3 +105,33 @@ class DeviceConnectorAPITests(SimpleTestCase):
 
         self.assertEqual(response.status_code, 401)
         confirm_ssh_host_key.assert_not_called()
+
+    @patch("device_connector.ping_hosts")
+    @patch("device_connector.DEVICE_SESSIONS.has_connection")
+    def test_ping_endpoint_checks_devices_in_one_batch(self, has_connection, ping_hosts):
+        """Devices with an open session are available, the rest are pinged in one batch."""
+
+        has_connection.side_effect = lambda ip: ip == "192.0.2.10"
+        ping_hosts.return_value = {"192.0.2.11": True, "192.0.2.12": False}
+
+        response = self.client.post(
+            "/ping",
+            headers=self.headers,
+            json={"ips": ["192.0.2.10", "192.0.2.11", "192.0.2.12"], "timeout": 60},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.get_json(),
+            {"available": {"192.0.2.10": True, "192.0.2.11": True, "192.0.2.12": False}},
+        )
+        ping_hosts.assert_called_once()
+        self.assertEqual(sorted(ping_hosts.call_args.args[0]), ["192.0.2.11", "192.0.2.12"])
+        self.assertEqual(ping_hosts.call_args.kwargs, {"timeout": 10})
+
+    def test_ping_endpoint_rejects_invalid_batch(self):
+        """The ping batch must be a list of IP addresses."""
+
+        response = self.client.post("/ping", headers=self.headers, json={"ips": "192.0.2.10"})
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,241 @@
+import json
+import threading
+from unittest.mock import MagicMock, Mock, patch
+
+import requests
+from django.test import SimpleTestCase
+
+import device_connector
+from devicemanager.dc import SimpleAuthObject
+from devicemanager.device_connector.batch import DeviceBatchRunner
+from devicemanager.device_connector.exceptions import MethodError
+from devicemanager.device_connector.sharding import ShardRouter
+from devicemanager.exceptions import DeviceLoginError
+from devicemanager.remote.connector import PoolController, RemoteCall, RemoteDevice
+from devicemanager.remote.exceptions import InvalidMethod
+from devicemanager.vlans import VlanSet
+
+AUTH = {"login": "user", "password": "password", "secret": ""}
+SHARDS = ["http://connector-0:8000", "http://connector-1:8000"]
+
+
+def batch_item(item_id, ip="192.0.2.10", method="get_interfaces"):
+    return {"id": item_id, "ip": ip, "method": method, "connection": {}, "auth": AUTH, "params": {}}
+
+
+class DeviceBatchRunnerTests(SimpleTestCase):
+    """Tests for concurrent execution of batch items."""
+
+    def test_results_are_yielded_as_tasks_finish(self):
+        release = threading.Event()
+        runner = DeviceBatchRunner(max_workers=2)
+
+        lines = runner.run([lambda: [{"id": 0}] if release.wait(5) else [], lambda: [{"id": 1}]])
+
+        self.assertEqual(next(lines), {"id": 1})
+        release.set()
+        self.assertEqual(list(lines), [{"id": 0}])
+
+    def test_lines_are_yielded_before_task_finishes(self):
+        release = threading.Event()
+        runner = DeviceBatchRunner(max_workers=1)
+
+        def task():
+            yield {"id": 0}
+            release.wait(5)
+            yield {"id": 1}
+
+        lines = runner.run([task])
+
+        self.assertEqual(next(lines), {"id": 0})
+        release.set()
+        self.assertEqual(list(lines), [{"id": 1}])
+
+
+class DeviceConnectorBatchAPITests(SimpleTestCase):
+    """Tests for the batch endpoint of device connector."""
+
+    def setUp(self):
+        for target in ("device_connector.DEVICE_BATCHES", "device_connector.CONNECTION_STATUSES"):
+            patcher = patch(target, DeviceBatchRunner(max_workers=4) if "BATCHES" in target else Mock())
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = device_connector.app.test_client()
+        self.headers = {"Token": device_connector.TOKEN}
+
+    def _lines(self, response):
+        return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    @patch("device_connector.DeviceSessionFactory.perform_method")
+    def test_items_results_and_errors(self, perform_method):
+        def perform(method, **params):
+            if method == "get_vlans":
+                raise DeviceLoginError("Неверный Логин/Пароль", ip="192.0.2.11")
+            if method == "unknown":
+                raise MethodError
+            return ["eth1"]
+
+        perform_method.side_effect = perform
+        items = [
+            batch_item(0),
+            batch_item(1, ip="192.0.2.11", method="get_vlans"),
+            batch_item(2, method="unknown"),
+            batch_item(3, ip="300.0.0.1"),
+        ]
+
+        response = self.client.post("/batch", headers=self.headers, json={"items": items})
+
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        lines = self._lines(response)
+        self.assertEqual(lines[-1], {"done": True})
+        self.assertCountEqual(
+            lines[:-1],
+            [
+                {"id": 0, "data": ["eth1"]},
+                {"id": 1, "type": "DeviceLoginError", "message": "Неверный Логин/Пароль"},
+                {"id": 2, "error": "no attr"},
+                {"id": 3, "error": "invalid ip"},
+            ],
+        )
+
+    @patch("device_connector.DeviceSessionFactory.perform_method")
+    def test_items_are_serialized_like_single_calls(self, perform_method):
+        perform_method.return_value = [("Gi1/0/1", "up", "uplink", VlanSet("1-4094"))]
+
+        response = self.client.post("/batch", headers=self.headers, json={"items": [batch_item(0)]})
+
+        self.assertEqual(
+            self._lines(response)[0], {"id": 0, "data": [["Gi1/0/1", "up", "uplink", ["1-4094"]]]}
+        )
+
+    def test_invalid_and_oversized_batch(self):
+        invalid = self.client.post("/batch", headers=self.headers, json={"items": "all"})
+        with patch("device_connector.DEVICE_CONNECTOR_MAX_BATCH_SIZE", 1):
+            oversized = self.client.post(
+                "/batch", headers=self.headers, json={"items": [batch_item(0), batch_item(1)]}
+            )
+        unauthorized = self.client.post("/batch", json={"items": []})
+
+        self.assertEqual(invalid.status_code, 400)
+        self.assertEqual(oversized.status_code, 413)
+        self.assertEqual(unauthorized.status_code, 401)
+
+    @patch("device_connector.requests.post")
+    @patch("device_connector.DeviceSessionFactory.perform_method", return_value=["local"])
+    def test_foreign_items_are_forwarded_to_owner(self, perform_method, post):
+        router = ShardRouter(SHARDS, self_address=SHARDS[0])
+        ips = [f"10.0.{i}.1" for i in range(40)]
+        local_ip = next(ip for ip in ips if router.is_local(ip))
+        remote_ip = next(ip for ip in ips if not router.is_local(ip))
+        post.return_value = MagicMock()
+        post.return_value.__enter__.return_value.iter_lines.return_value = [
+            b'{"id": 1, "data": ["remote"]}',
+            b'{"done": true}',
+        ]
+
+        with patch("device_connector.SHARD_ROUTER", router):
+            response = self.client.post(
+                "/batch",
+                headers=self.headers,
+                json={"items": [batch_item(0, local_ip), batch_item(1, remote_ip)]},
+            )
+            lines = self._lines(response)
+
+        self.assertCountEqual(lines[:-1], [{"id": 0, "data": ["local"]}, {"id": 1, "data": ["remote"]}])
+        self.assertEqual(post.call_args.args, (f"{SHARDS[1]}/batch",))
+        self.assertEqual([item["ip"] for item in post.call_args.kwargs["json"]["items"]], [remote_ip])
+        self.assertIn(device_connector.FORWARDED_HEADER, post.call_args.kwargs["headers"])
+        perform_method.assert_called_once()
+
+    @patch("device_connector.requests.post")
+    @patch("device_connector.DeviceSessionFactory.perform_method", return_value=["local"])
+    def test_unanswered_forwarded_items_are_performed_locally(self, perform_method, post):
+        def owner_lines():
+            yield b'{"id": 0, "data": ["remote"]}'
+            raise requests.exceptions.ChunkedEncodingError("connection broken")
+
+        post.return_value = MagicMock()
+        post.return_value.__enter__.return_value.iter_lines.return_value = owner_lines()
+
+        lines = device_connector.forward_batch_items(SHARDS[1], [batch_item(0), batch_item(1)])
+
+        self.assertEqual(next(lines), {"id": 0, "data": ["remote"]})
+        perform_method.assert_not_called()
+        self.assertEqual(list(lines), [{"id": 1, "data": ["local"]}])
+
+
+class RemoteBatchTests(SimpleTestCase):
+    """Tests for sending device calls in batches from the client side."""
+
+    def setUp(self):
+        self.controller = PoolController()
+        self.session = Mock()
+        patcher = patch.object(self.controller, "_get_session", return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _device(ip: str, address: str = "http://connector") -> RemoteDevice:
+        device = RemoteDevice(
+            ip=ip,
+            auth_obj=SimpleAuthObject(login="user", password="password"),
+            cmd_protocol="ssh",
+            port_scan_protocol="ssh",
+            snmp_community="public",
+            make_session_global=True,
+        )
+        device._remote_connector_address = address
+        return device
+
+    def _response(self, lines: list[bytes]):
+        response = MagicMock(status_code=200)
+        response.__enter__.return_value = response
+        response.iter_lines.return_value = lines
+        return response
+
+    def test_calls_are_grouped_by_connector_and_split(self):
+        calls = [RemoteCall(self._device(f"192.0.2.{i}"), "get_interfaces") for i in range(3)]
+        calls.append(RemoteCall(self._device("192.0.2.100", "http://connector-1"), "get_vlans"))
+
+        def post(url, json, **kwargs):
+            return self._response(
+                [f'{{"id": {item["id"]}, "data": "{item["ip"]}"}}'.encode() for item in json["items"]]
+            )
+
+        self.session.post.side_effect = post
+
+        results = {
+            call.device.ip: result for call, result in self.controller.perform_batch(calls, batch_size=2)
+        }
+
+        self.assertEqual(results, {call.device.ip: call.device.ip for call in calls})
+        urls = sorted(call.args[0] for call in self.session.post.call_args_list)
+        self.assertEqual(
+            urls, ["http://connector-1/batch", "http://connector/batch", "http://connector/batch"]
+        )
+        payload = self.session.post.call_args_list[0].kwargs["json"]["items"][0]
+        self.assertEqual(payload["auth"]["login"], "user")
+        self.assertEqual(payload["connection"]["cmd_protocol"], "ssh")
+
+    @patch.object(RemoteDevice, "_delete_pool")
+    def test_errors_are_returned_as_exceptions(self, delete_pool):
+        calls = [
+            RemoteCall(self._device("192.0.2.1"), "get_mac", {"port": "eth1"}),
+            RemoteCall(self._device("192.0.2.2"), "unknown"),
+            RemoteCall(self._device("192.0.2.3"), "get_vlans"),
+        ]
+        self.session.post.return_value = self._response(
+            [
+                b'{"id": 0, "type": "DeviceLoginError", "message": "error"}',
+                b'{"id": 1, "error": "no attr"}',
+            ]
+        )
+
+        results = {call.device.ip: result for call, result in self.controller.perform_batch(calls)}
+
+        self.assertIsInstance(results["192.0.2.1"], DeviceLoginError)
+        self.assertIsInstance(results["192.0.2.2"], InvalidMethod)
+        # Результат не получен - соединение с device connector прервалось.
+        self.assertIsInstance(results["192.0.2.3"], requests.exceptions.ConnectionError)
+        delete_pool.assert_called_once_with()
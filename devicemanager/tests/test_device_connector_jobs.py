@@ -0,0 +1,162 @@
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from django.test import SimpleTestCase
+
+import device_connector
+from devicemanager.dc import SimpleAuthObject
+from devicemanager.device_connector.jobs import DeviceJobManager
+from devicemanager.exceptions import DeviceLoginError
+from devicemanager.remote.connector import RemoteDevice
+
+CONNECTOR_PAYLOAD = {
+    "connection": {"cmd_protocol": "ssh", "port_scan_protocol": "ssh", "snmp_community": "public"},
+    "auth": {"login": "user", "password": "password", "secret": ""},
+    "params": {},
+}
+
+
+class DeviceJobManagerTests(SimpleTestCase):
+    """Tests for background execution of device methods."""
+
+    def test_slow_jobs_do_not_block_submit(self):
+        """Submitting returns at once even when all workers are busy."""
+
+        release = threading.Event()
+        manager = DeviceJobManager(max_workers=2)
+
+        started = time.monotonic()
+        jobs = [manager.submit("192.0.2.10", "get_mac", release.wait) for _ in range(10)]
+        submit_duration = time.monotonic() - started
+        release.set()
+
+        self.assertLess(submit_duration, 1)
+        self.assertTrue(all(manager.wait(job, timeout=5) for job in jobs))
+        self.assertEqual(len(manager), 0)
+
+    def test_result_and_error(self):
+        manager = DeviceJobManager(max_workers=1)
+        error = DeviceLoginError("Неверный Логин/Пароль", ip="192.0.2.10")
+
+        def fail():
+            raise error
+
+        done_job = manager.submit("192.0.2.10", "get_interfaces", lambda: ["eth1"])
+        failed_job = manager.submit("192.0.2.10", "get_interfaces", fail)
+
+        self.assertTrue(manager.wait(done_job, timeout=5))
+        self.assertTrue(manager.wait(failed_job, timeout=5))
+        self.assertEqual((done_job.status, done_job.result), ("done", ["eth1"]))
+        self.assertEqual((failed_job.status, failed_job.error), ("failed", error))
+
+    def test_job_belongs_to_device(self):
+        manager = DeviceJobManager(max_workers=1)
+        job = manager.submit("192.0.2.10", "get_vlans", lambda: [])
+
+        self.assertIs(manager.get("192.0.2.10", job.id), job)
+        self.assertIsNone(manager.get("192.0.2.11", job.id))
+
+    def test_not_fetched_results_expire(self):
+        """An unclaimed result is dropped together with its downloaded file."""
+
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        file = Path(temp_dir.name) / "config.txt"
+        file.write_text("config")
+        manager = DeviceJobManager(max_workers=1, result_ttl=0)
+
+        job = manager.submit("192.0.2.10", "get_current_configuration", lambda: file)
+        job.done.wait(5)
+        time.sleep(0.01)
+
+        self.assertIsNone(manager.get("192.0.2.10", job.id))
+        self.assertFalse(file.exists())
+
+
+class DeviceConnectorJobsAPITests(SimpleTestCase):
+    """Tests for the job endpoints of device connector."""
+
+    def setUp(self):
+        jobs_patcher = patch("device_connector.DEVICE_JOBS", DeviceJobManager(max_workers=2))
+        jobs_patcher.start()
+        self.addCleanup(jobs_patcher.stop)
+        statuses_patcher = patch("device_connector.CONNECTION_STATUSES")
+        statuses_patcher.start()
+        self.addCleanup(statuses_patcher.stop)
+        self.client = device_connector.app.test_client()
+        self.headers = {"Token": device_connector.TOKEN}
+
+    def _submit(self, method="get_interfaces"):
+        response = self.client.post(
+            f"/jobs/192.0.2.10/{method}", headers=self.headers, json=CONNECTOR_PAYLOAD
+        )
+        job_id = response.json["job"]
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.headers["Location"], f"/jobs/192.0.2.10/{job_id}")
+        return job_id
+
+    @patch("device_connector.DeviceSessionFactory.perform_method")
+    def test_result_is_fetched_by_long_poll(self, perform_method):
+        release = threading.Event()
+        perform_method.side_effect = lambda method, **params: release.wait(5) and ["eth1"]
+
+        job_id = self._submit()
+        pending = self.client.get(f"/jobs/192.0.2.10/{job_id}?wait=0.05", headers=self.headers)
+        release.set()
+        done = self.client.get(f"/jobs/192.0.2.10/{job_id}?wait=5", headers=self.headers)
+        repeated = self.client.get(f"/jobs/192.0.2.10/{job_id}", headers=self.headers)
+
+        self.assertEqual(pending.status_code, 202)
+        self.assertEqual(pending.json["status"], "running")
+        self.assertEqual(done.status_code, 200)
+        self.assertEqual(done.json, {"data": ["eth1"]})
+        self.assertEqual(repeated.status_code, 404)
+
+    @patch("device_connector.DeviceSessionFactory.perform_method")
+    def test_failed_job_returns_device_error(self, perform_method):
+        perform_method.side_effect = DeviceLoginError("Неверный Логин/Пароль", ip="192.0.2.10")
+
+        job_id = self._submit()
+        response = self.client.get(f"/jobs/192.0.2.10/{job_id}?wait=5", headers=self.headers)
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json["type"], "DeviceLoginError")
+        device_connector.CONNECTION_STATUSES.record_error.assert_called_once()
+
+    def test_jobs_require_token(self):
+        response = self.client.post("/jobs/192.0.2.10/get_interfaces", json=CONNECTOR_PAYLOAD)
+
+        self.assertEqual(response.status_code, 401)
+
+
+class RemoteDeviceJobsTests(SimpleTestCase):
+    """Tests for calling device methods through connector jobs."""
+
+    def test_remote_call_polls_job_result(self):
+        device = RemoteDevice(
+            ip="192.0.2.10",
+            auth_obj=SimpleAuthObject(login="user", password="password"),
+            cmd_protocol="ssh",
+            port_scan_protocol="ssh",
+            snmp_community="public",
+            make_session_global=True,
+        )
+        device._remote_connector_address = "http://connector"
+        device._use_jobs = True
+        device._session = Mock()
+        device._session.post.return_value = Mock(status_code=202, json=Mock(return_value={"job": "abc"}))
+        result = Mock(status_code=200, headers={"Content-Type": "application/json"})
+        result.json.return_value = {"data": [{"vlan": 10}]}
+        device._session.get.side_effect = [Mock(status_code=202), result]
+
+        self.assertEqual(device.get_vlans(), [{"vlan": 10}])
+
+        self.assertEqual(
+            device._session.post.call_args.kwargs["url"], "http://connector/jobs/192.0.2.10/get_vlans"
+        )
+        poll_url = device._session.get.call_args.kwargs["url"]
+        self.assertTrue(poll_url.startswith("http://connector/jobs/192.0.2.10/abc?wait="))
+        self.assertEqual(device._session.get.call_count, 2)
@@ -0,0 +1,123 @@
+from unittest.mock import Mock, patch
+
+import requests
+from django.test import SimpleTestCase
+
+import device_connector
+from devicemanager.device_connector.sharding import ConsistentHashRing, ShardRouter
+from devicemanager.remote.connector import PoolController, RemoteDevice
+
+SHARDS = ["http://connector-0:8000", "http://connector-1:8000", "http://connector-2:8000"]
+IPS = [f"10.{i // 256}.{i % 256}.1" for i in range(3000)]
+
+
+class ConsistentHashRingTests(SimpleTestCase):
+    """Tests for distributing devices between device connector shards."""
+
+    def test_owner_does_not_depend_on_shards_order(self):
+        """Every process with the same shard list picks the same owner."""
+
+        ring = ConsistentHashRing(SHARDS)
+        reversed_ring = ConsistentHashRing(reversed(SHARDS))
+
+        self.assertEqual([ring.get(ip) for ip in IPS], [reversed_ring.get(ip) for ip in IPS])
+
+    def test_devices_are_balanced(self):
+        """Each shard owns a comparable part of the devices."""
+
+        ring = ConsistentHashRing(SHARDS)
+        owners = [ring.get(ip) for ip in IPS]
+
+        for shard in SHARDS:
+            self.assertGreater(owners.count(shard), len(IPS) / len(SHARDS) * 0.7)
+
+    def test_new_shard_moves_only_its_part(self):
+        """Adding a shard moves roughly 1/N of the devices, all of them to the new shard."""
+
+        ring = ConsistentHashRing(SHARDS)
+        new_ring = ConsistentHashRing([*SHARDS, "http://connector-3:8000"])
+        moved = [ip for ip in IPS if ring.get(ip) != new_ring.get(ip)]
+
+        self.assertLess(len(moved), len(IPS) * 0.4)
+        self.assertEqual({new_ring.get(ip) for ip in moved}, {"http://connector-3:8000"})
+
+    def test_empty_ring(self):
+        with self.assertRaises(LookupError):
+            ConsistentHashRing([]).get("10.0.0.1")
+
+
+class DeviceConnectorForwardingTests(SimpleTestCase):
+    """Tests for forwarding requests to the shard that owns the device pool."""
+
+    def setUp(self):
+        self.router = ShardRouter(SHARDS, self_address=SHARDS[0])
+        router_patcher = patch("device_connector.SHARD_ROUTER", self.router)
+        router_patcher.start()
+        self.addCleanup(router_patcher.stop)
+        self.client = device_connector.app.test_client()
+        self.headers = {"Token": device_connector.TOKEN}
+        self.remote_ip = next(ip for ip in IPS if not self.router.is_local(ip))
+        self.local_ip = next(ip for ip in IPS if self.router.is_local(ip))
+
+    @patch("device_connector.requests.request")
+    def test_request_is_forwarded_to_owner(self, request):
+        request.return_value = Mock(status_code=200, headers={"Content-Type": "application/json"})
+        request.return_value.iter_content.return_value = [b'{"connections": ', b"[]}"]
+
+        response = self.client.get(f"/pool/{self.remote_ip}", headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {"connections": []})
+        method, url = request.call_args.args
+        self.assertEqual(method, "GET")
+        self.assertEqual(url, f"{self.router.address(self.remote_ip)}/pool/{self.remote_ip}")
+        headers = request.call_args.kwargs["headers"]
+        self.assertEqual(headers["Token"], device_connector.TOKEN)
+        self.assertEqual(headers[device_connector.FORWARDED_HEADER], SHARDS[0])
+
+    @patch("device_connector.DEVICE_SESSIONS.get_pool_connections", return_value=[])
+    @patch("device_connector.requests.request")
+    def test_local_and_forwarded_requests_are_handled_here(self, request, get_pool_connections):
+        """Own devices and already forwarded requests never leave the process."""
+
+        self.client.get(f"/pool/{self.local_ip}", headers=self.headers)
+        self.client.get(
+            f"/pool/{self.remote_ip}",
+            headers={**self.headers, device_connector.FORWARDED_HEADER: SHARDS[1]},
+        )
+
+        request.assert_not_called()
+        self.assertEqual(get_pool_connections.call_count, 2)
+
+    @patch("device_connector.DEVICE_SESSIONS.get_pool_connections", return_value=[])
+    @patch("device_connector.requests.request", side_effect=requests.exceptions.ConnectionError)
+    def test_unavailable_owner_falls_back_to_local_pool(self, request, get_pool_connections):
+        response = self.client.get(f"/pool/{self.remote_ip}", headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        request.assert_called_once()
+        get_pool_connections.assert_called_once()
+
+
+class RemoteDeviceShardingTests(SimpleTestCase):
+    """Tests for choosing the shard on the client side."""
+
+    def test_client_uses_owner_shard(self):
+        router = ShardRouter(SHARDS)
+        with patch("devicemanager.remote.connector.SHARD_ROUTER", router):
+            for ip in IPS[:20]:
+                device = RemoteDevice(
+                    ip=ip,
+                    cmd_protocol="ssh",
+                    port_scan_protocol="ssh",
+                    snmp_community="public",
+                    make_session_global=True,
+                    auth_obj=Mock(login="user", password="password", secret=""),
+                )
+                self.assertEqual(device._remote_connector_address, router.address(ip))
+                self.assertEqual(PoolController()._address(ip), router.address(ip))
+
+    @patch.dict("os.environ", {"DEVICE_CONNECTOR_ADDRESS": "http://device-connector:8000"})
+    def test_client_without_shards_uses_single_address(self):
+        with patch("devicemanager.remote.connector.SHARD_ROUTER", ShardRouter([])):
+            self.assertEqual(PoolController()._address("10.0.0.1"), "http://device-connector:8000")
@@ -144,3 +144,31 @@ class TestInterfacesClass(SimpleTestCase):
         ]
         # Сравниваем, что интерфейсы созданные на основе списков и на смешанной основе дают одинаковые данные.
         self.assertEqual(str(Interfaces(interfaces_mixed)), str(Interfaces(interfaces_list)))
+
+    def test_filters_are_views(self):
+        interface = Interface("eth5", "up", "description5")
+        intf = Interfaces(
+            [
+                ["1(C)", "down", ""],
+                ["1(F)", "up", "abon fiber"],
+                ["2", "Admin Down", "asw2 uplink"],
+                ["3", "dormant", ""],
+                interface,
+            ]
+        )
+
+        physical = intf.physical()
+        # Выбран активный комбо-порт, описание взято с (F).
+        self.assertEqual([i.name for i in physical], ["1(F)", "2", "3", "eth5"])
+        self.assertEqual(physical[0].desc, "abon fiber")
+        self.assertIs(physical["eth5"], interface)
+
+        non_system = physical.non_system()
+        self.assertEqual(physical.non_system(only_count=True), 3)
+        self.assertEqual([i.name for i in non_system.up()], ["1(F)", "eth5"])
+        self.assertEqual(non_system.down(only_count=True), 1)
+        self.assertEqual(non_system.free(only_count=True), 1)
+        self.assertEqual(physical.admin_down(only_count=True), 0)
+        self.assertEqual(non_system.up().with_description(only_count=True), 2)
+        self.assertTrue(intf[2].is_admin_down)
+        self.assertTrue(intf[3].is_down)
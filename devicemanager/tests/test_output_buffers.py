@@ -0,0 +1,73 @@
+from django.test import SimpleTestCase
+
+from devicemanager.session_spawner import BeforeHistory
+from devicemanager.vendors.base.helpers import OutputAccumulator, remove_ansi_escape_codes
+
+
+class OutputAccumulatorTests(SimpleTestCase):
+    """Tests for collecting command output page by page."""
+
+    def test_escape_sequences_are_removed_from_each_page(self):
+        pages = [b"line 1\x1b[42D\n", b"\x1b[1mline 2"]
+        output = OutputAccumulator()
+        for page in pages:
+            output.add(page)
+
+        self.assertEqual(output.getvalue(), "line 1\nline 2")
+        self.assertEqual(output.getvalue(), "".join(map(remove_ansi_escape_codes, pages)))
+
+    def test_backspaces_at_page_start_keep_previous_line(self):
+        # Страница после `--More--` начинается со стирания приглашения.
+        pages = [b"Gi0/2 down\n", b"\x08" * 9 + b" " * 9 + b"\x08" * 9 + b"Gi0/3 up"]
+        output = OutputAccumulator()
+        for page in pages:
+            output.add(page)
+            output.end_line()
+
+        self.assertEqual(output.getvalue().splitlines(), ["Gi0/2 down", "        Gi0/3 up"])
+        self.assertEqual(output.getvalue(), "".join(map(remove_ansi_escape_codes, pages)) + "\n")
+
+    def test_multibyte_char_split_between_pages(self):
+        data = "порт 1".encode()
+        output = OutputAccumulator()
+        output.add(data[:1])
+        output.add(data[1:])
+
+        self.assertEqual(output.getvalue(), "порт 1")
+
+    def test_end_line(self):
+        output = OutputAccumulator()
+        output.add(b"page 1")
+        output.end_line()
+        output.add(b"page 2\n")
+        output.end_line()
+
+        self.assertEqual(output.getvalue(), "page 1\npage 2\n")
+
+    def test_output_is_truncated(self):
+        output = OutputAccumulator(max_size=10)
+        with self.assertLogs("devicemanager.vendors.base.helpers", "WARNING") as logs:
+            for _ in range(5):
+                output.add("abcd")
+
+        self.assertEqual(output.getvalue(), "abcdabcdab")
+        self.assertTrue(output.truncated)
+        self.assertEqual(len(logs.output), 1)
+
+
+class BeforeHistoryTests(SimpleTestCase):
+    """Tests for the bounded session output history."""
+
+    def test_history_keeps_last_output(self):
+        history = BeforeHistory(limit=10)
+        for chunk in (b"first", b"\x1b[1msecond", b"third"):
+            history.append(chunk)
+
+        self.assertLessEqual(len(history), 10)
+        self.assertEqual(history.getvalue(), "\nthird")
+
+    def test_large_chunk_keeps_tail(self):
+        history = BeforeHistory(limit=4)
+        history.append(b"0123456789")
+
+        self.assertEqual(history.getvalue(), "\n6789")
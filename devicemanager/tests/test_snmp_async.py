@@ -0,0 +1,56 @@
+import asyncio
+
+from django.test import SimpleTestCase
+
+from devicemanager.benchmarks.snmp_engine import FakeSnmpAgent
+from devicemanager.snmp_async import AsyncSnmpPoller
+from devicemanager.snmp_engine import SnmpTimeoutError
+
+
+class AsyncSnmpPollerTests(SimpleTestCase):
+    """Тесты асинхронного SNMP опроса на локальных агентах."""
+
+    def test_get_system_identity_from_many_agents(self):
+        """Запросы к нескольким устройствам выполняются через один poller."""
+
+        async def poll(agents):
+            async with AsyncSnmpPoller(timeout=1) as poller:
+                return await asyncio.gather(
+                    *(
+                        poller.get_system_identity(agent.host, "public", port=agent.port)
+                        for agent in agents
+                        for _ in range(20)
+                    )
+                )
+
+        with FakeSnmpAgent.with_interfaces(1) as first, FakeSnmpAgent.with_interfaces(1) as second:
+            results = asyncio.run(poll([first, second]))
+
+        self.assertEqual(len(results), 40)
+        self.assertTrue(all(identity["sys_name"] == "fake" for identity in results))
+        self.assertEqual(first.requests_count + second.requests_count, 40)
+
+    def test_find_identity_prefers_communities_order(self):
+        """Из подошедших communities выбирается первое по порядку."""
+
+        async def find(agent):
+            async with AsyncSnmpPoller(timeout=0.3, retries=0) as poller:
+                return await poller.find_identity(agent.host, ["private", "public", "other"], port=agent.port)
+
+        with FakeSnmpAgent.with_interfaces(1) as agent:
+            community, identity, attempts = asyncio.run(find(agent))
+
+        self.assertEqual(community, "public")
+        self.assertEqual(identity["sys_descr"], "Fake switch")
+        self.assertEqual([attempt.community for attempt in attempts], ["private", "public"])
+        self.assertEqual([attempt.success for attempt in attempts], [False, True])
+
+    def test_get_timeout(self):
+        """Без ответа запрос завершается SnmpTimeoutError после повторов."""
+
+        async def get(agent):
+            async with AsyncSnmpPoller(timeout=0.1, retries=1) as poller:
+                return await poller.get(agent.host, "wrong", ["1.3.6.1.2.1.1.5.0"], port=agent.port)
+
+        with FakeSnmpAgent.with_interfaces(1) as agent, self.assertRaises(SnmpTimeoutError):
+            asyncio.run(get(agent))
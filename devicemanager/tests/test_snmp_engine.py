@@ -0,0 +1,145 @@
+from unittest.mock import Mock, patch
+
+from django.test import SimpleTestCase
+
+from devicemanager import snmp
+from devicemanager.benchmarks.snmp_engine import FakeSnmpAgent
+from devicemanager.snmp_engine import (
+    END_OF_MIB_VIEW,
+    PDU_GET_BULK_REQUEST,
+    PDU_RESPONSE,
+    SnmpProtocolError,
+    SnmpTimeoutError,
+    SnmpV2cClient,
+    decode_message,
+    encode_message,
+    parse_oid,
+)
+
+
+class SnmpCodecTests(SimpleTestCase):
+    """Тесты кодирования BER сообщений SNMPv2c."""
+
+    def test_message_round_trip(self):
+        """Закодированное сообщение декодируется в исходные значения."""
+
+        var_binds = [
+            (parse_oid("1.3.6.1.2.1.2.2.1.1.4294967295"), -5),
+            (parse_oid("1.3.6.1.2.1.31.1.1.1.18.1"), b"uplink"),
+            (parse_oid("1.3.6.1.2.1.1.2.0"), "1.3.6.1.4.1.2011.2.23.95"),
+            (parse_oid("1.3.6.1.2.1.2.2.1.8.1"), 2**31 - 1),
+            (parse_oid("1.3.6.1.2.1.2.2.1.8.2"), END_OF_MIB_VIEW),
+            (parse_oid("1.3.6.1.2.1.2.2.1.8.3"), None),
+        ]
+
+        data = encode_message("public", PDU_RESPONSE, 12345, var_binds)
+        message = decode_message(data)
+
+        self.assertEqual(message.version, 1)
+        self.assertEqual(message.community, b"public")
+        self.assertEqual(message.pdu.pdu_type, PDU_RESPONSE)
+        self.assertEqual(message.pdu.request_id, 12345)
+        self.assertEqual(message.pdu.var_binds, var_binds)
+
+    def test_getbulk_fields(self):
+        """В GETBULK non-repeaters и max-repetitions кодируются на месте error-status/error-index."""
+
+        data = encode_message("public", PDU_GET_BULK_REQUEST, 1, [], error_status=0, error_index=25)
+        pdu = decode_message(data).pdu
+
+        self.assertEqual(pdu.pdu_type, PDU_GET_BULK_REQUEST)
+        self.assertEqual(pdu.error_index, 25)
+
+    def test_truncated_message(self):
+        """Обрезанное сообщение вызывает SnmpProtocolError."""
+
+        data = encode_message("public", PDU_RESPONSE, 1, [(parse_oid("1.3.6.1.2.1.1.5.0"), b"sw")])
+        with self.assertRaises(SnmpProtocolError):
+            decode_message(data[:-3])
+
+
+class SnmpV2cClientTests(SimpleTestCase):
+    """Тесты встроенного SNMP клиента на локальном агенте."""
+
+    def test_bulk_walk_all_columns(self):
+        """Все колонки обходятся полностью, индексы строк без префикса колонки."""
+
+        with FakeSnmpAgent.with_interfaces(60) as agent:
+            client = SnmpV2cClient(agent.host, "public", port=agent.port, max_repetitions=10)
+            result = client.bulk_walk(snmp.IF_MIB_COLUMNS)
+
+        self.assertEqual(len(result["IF-MIB::ifIndex"]), 60)
+        self.assertEqual(result["IF-MIB::ifName"]["7"], b"Gi0/0/7")
+        self.assertEqual(result["IF-MIB::ifAlias"]["60"], b"client-60")
+        # 6 колонок по 60 строк и по 10 повторений: 7 запросов на колонку (последний выходит за колонку).
+        self.assertEqual(agent.requests_count, 6 * 7)
+
+    def test_timeout(self):
+        """Неверное community: агент молчит, клиент завершает работу по таймауту."""
+
+        with FakeSnmpAgent.with_interfaces(1) as agent:
+            client = SnmpV2cClient(agent.host, "private", port=agent.port, timeout=0.2, retries=1)
+            with self.assertRaises(SnmpTimeoutError):
+                client.bulk_walk(snmp.IF_MIB_COLUMNS)
+
+
+class SnmpGetInterfacesTests(SimpleTestCase):
+    """Тесты сбора интерфейсов по SNMP."""
+
+    def test_native_get_interfaces(self):
+        """Встроенный клиент возвращает интерфейсы в формате InterfaceListType."""
+
+        with FakeSnmpAgent.with_interfaces(10) as agent, patch.object(snmp, "SNMP_ENGINE", "native"):
+            interfaces = snmp.get_interfaces(agent.host, "public", agent.port)
+
+        self.assertEqual(len(interfaces), 10)
+        self.assertEqual(interfaces[0], ("Gi0/0/1", "up", "client-1"))
+        self.assertEqual(interfaces[2], ("Gi0/0/3", "down", "client-3"))
+        self.assertEqual(interfaces[9], ("Gi0/0/10", "admin down", "client-10"))
+
+    def test_native_get_system_identity(self):
+        """SNMP identity получается одним GET запросом."""
+
+        with FakeSnmpAgent.with_interfaces(1) as agent, patch.object(snmp, "SNMP_ENGINE", "native"):
+            identity = snmp.get_system_identity(agent.host, "public", agent.port)
+
+        self.assertEqual(agent.requests_count, 1)
+        self.assertEqual(
+            identity,
+            {"sys_descr": "Fake switch", "sys_name": "fake", "sys_object_id": "1.3.6.1.4.1.2011.2.23.95"},
+        )
+
+    @patch("devicemanager.snmp.subprocess.run")
+    @patch("devicemanager.snmp.SnmpV2cClient.bulk_walk")
+    def test_fallback_to_subprocess(self, mock_bulk_walk, mock_run):
+        """При ошибке разбора ответа используется snmpbulkwalk."""
+
+        mock_bulk_walk.side_effect = SnmpProtocolError("bad packet")
+        outputs = {
+            "IF-MIB::ifIndex": "IF-MIB::ifIndex.1 1\n",
+            "IF-MIB::ifName": "IF-MIB::ifName.1 Gi0/1\n",
+            "IF-MIB::ifAdminStatus": "IF-MIB::ifAdminStatus.1 up\n",
+            "IF-MIB::ifOperStatus": "IF-MIB::ifOperStatus.1 up\n",
+            "IF-MIB::ifAlias": "IF-MIB::ifAlias.1 uplink\n",
+            "IF-MIB::ifDescr": "IF-MIB::ifDescr.1 GigabitEthernet0/1\n",
+        }
+        mock_run.side_effect = lambda command, **kwargs: Mock(stdout=outputs[command[-1]])
+
+        with patch.object(snmp, "SNMP_ENGINE", "native"):
+            interfaces = snmp.get_interfaces("192.0.2.10", "public")
+
+        self.assertEqual(interfaces, [("Gi0/1", "up", "uplink")])
+        self.assertEqual(mock_run.call_count, 6)
+
+    @patch("devicemanager.snmp.subprocess.run")
+    @patch("devicemanager.snmp.SnmpV2cClient.bulk_walk")
+    def test_timeout_does_not_fallback(self, mock_bulk_walk, mock_run):
+        """Недоступное оборудование не опрашивается повторно через snmpbulkwalk."""
+
+        mock_bulk_walk.side_effect = SnmpTimeoutError("timeout")
+
+        with patch.object(snmp, "SNMP_ENGINE", "native"):
+            interfaces = snmp.get_interfaces("192.0.2.10", "public")
+
+        self.assertEqual(interfaces, [])
+        mock_run.assert_not_called()
@@ -0,0 +1,122 @@
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from django.test import SimpleTestCase
+
+from devicemanager.dc import DeviceRemoteConnector, SimpleAuthObject, SSHSpawn
+from devicemanager.device_connector.ssh_algorithms import SSHAlgorithmOptions, SSHAlgorithmsStore
+from devicemanager.exceptions import DeviceLoginError
+
+
+class SSHAlgorithmsStoreTests(SimpleTestCase):
+    """Tests for the persistent per-device SSH algorithm record."""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name) / "ssh" / "algorithms.json"
+
+    def test_record_survives_new_store_instance(self):
+        """A record written by one process is read by another store on the same file."""
+
+        options = SSHAlgorithmOptions(kex="diffie-hellman-group1-sha1", cipher="aes128-cbc")
+        SSHAlgorithmsStore(self.path).remember("192.0.2.10", 22, options)
+
+        self.assertEqual(SSHAlgorithmsStore(self.path).get("192.0.2.10", 22), options)
+        self.assertIsNone(SSHAlgorithmsStore(self.path).get("192.0.2.10", 2222))
+
+    def test_default_options_are_not_stored(self):
+        """A device working with OpenSSH defaults drops its old record."""
+
+        store = SSHAlgorithmsStore(self.path)
+        store.remember("192.0.2.10", 22, SSHAlgorithmOptions(mac="hmac-sha1"))
+        store.remember("192.0.2.10", 22, SSHAlgorithmOptions())
+
+        self.assertIsNone(SSHAlgorithmsStore(self.path).get("192.0.2.10", 22))
+
+    def test_corrupted_file_is_ignored(self):
+        """A broken file does not break connections."""
+
+        self.path.parent.mkdir(parents=True)
+        self.path.write_text("{broken")
+
+        self.assertIsNone(SSHAlgorithmsStore(self.path).get("192.0.2.10", 22))
+
+
+class SSHAlgorithmsReuseTests(SimpleTestCase):
+    """Tests for reusing negotiated algorithms by the OpenSSH connector."""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.store = SSHAlgorithmsStore(Path(temp_dir.name) / "algorithms.json")
+        store_patcher = patch("devicemanager.dc.SSH_ALGORITHMS_STORE", self.store)
+        store_patcher.start()
+        self.addCleanup(store_patcher.stop)
+        SSHSpawn.clear_local_algorithms()
+        self.addCleanup(SSHSpawn.clear_local_algorithms)
+
+    @staticmethod
+    def _connector() -> DeviceRemoteConnector:
+        return DeviceRemoteConnector(
+            ip="192.0.2.10",
+            protocol="ssh",
+            snmp_community="public",
+            auth_obj=SimpleAuthObject(login="user", password="password"),
+        )
+
+    @patch("devicemanager.dc.subprocess.run")
+    def test_local_algorithms_are_queried_once(self, run):
+        """`ssh -Q` runs once per algorithm type while the ssh binary is unchanged."""
+
+        run.return_value = Mock(stdout="aes128-cbc\naes256-ctr\n", returncode=0)
+
+        for _ in range(3):
+            SSHSpawn(ip="192.0.2.10", login="user").get_ciphers("Their offer: aes128-cbc")
+
+        run.assert_called_once()
+
+        with patch.object(SSHSpawn, "_get_ssh_binary", return_value=("/usr/bin/ssh", 1)):
+            SSHSpawn(ip="192.0.2.10", login="user").get_ciphers("Their offer: aes128-cbc")
+
+        self.assertEqual(run.call_count, 2)
+
+    @patch("devicemanager.dc.subprocess.run")
+    @patch("devicemanager.dc.SessionSpawner")
+    def test_reconnect_uses_remembered_algorithms(self, session_spawner, run):
+        """After one negotiation the next connection starts with the working spawn string."""
+
+        run.return_value = Mock(stdout="diffie-hellman-group1-sha1\n", returncode=0)
+        failed_session = Mock()
+        failed_session.expect.side_effect = [0, 0]
+        failed_session.before = b"Their offer: diffie-hellman-group1-sha1\r\n"
+        connected_session = Mock()
+        connected_session.expect.return_value = 5
+        session_spawner.side_effect = [failed_session, connected_session, connected_session]
+
+        self._connector()._connect_by_ssh()
+        self._connector()._connect_by_ssh()
+
+        commands = [call.args[0] for call in session_spawner.call_args_list]
+        self.assertNotIn("KexAlgorithms", commands[0])
+        self.assertIn("-oKexAlgorithms=+diffie-hellman-group1-sha1", commands[1])
+        self.assertEqual(commands[2], commands[1])
+        self.assertEqual(
+            self.store.get("192.0.2.10", 22), SSHAlgorithmOptions(kex="diffie-hellman-group1-sha1")
+        )
+
+    @patch("devicemanager.dc.SessionSpawner")
+    def test_login_failure_invalidates_record(self, session_spawner):
+        """A login failure drops the stored algorithms of the device."""
+
+        self.store.remember("192.0.2.10", 22, SSHAlgorithmOptions(cipher="aes128-cbc"))
+        session = Mock()
+        session.expect.return_value = 8
+        session_spawner.return_value = session
+
+        with self.assertRaises(DeviceLoginError):
+            self._connector()._connect_by_ssh()
+
+        self.assertIn("-c aes128-cbc", session_spawner.call_args.args[0])
+        self.assertIsNone(self.store.get("192.0.2.10", 22))
@@ -0,0 +1,124 @@
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import paramiko
+from django.test import SimpleTestCase
+
+from devicemanager import dc
+from devicemanager.benchmarks.ssh_transport import FakeSSHServer
+from devicemanager.dc import DeviceRemoteConnector, SimpleAuthObject
+from devicemanager.device_connector.ssh_algorithms import SSHAlgorithmsStore
+from devicemanager.device_connector.ssh_host_keys import SSHKnownHostsStore
+from devicemanager.exceptions import DeviceLoginError
+from devicemanager.ssh_transport import SSH_ALGORITHMS_CACHE, SSHChannelSpawner
+
+
+class InProcessSSHTransportTests(SimpleTestCase):
+    """Тесты подключения встроенным SSH клиентом."""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.known_hosts_path = Path(temp_dir.name) / "known_hosts"
+        store_patcher = patch(
+            "devicemanager.ssh_transport.SSHKnownHostsStore",
+            lambda: SSHKnownHostsStore(self.known_hosts_path),
+        )
+        store_patcher.start()
+        self.addCleanup(store_patcher.stop)
+        algorithms_store_patcher = patch.object(
+            dc, "SSH_ALGORITHMS_STORE", SSHAlgorithmsStore(Path(temp_dir.name) / "algorithms.json")
+        )
+        algorithms_store_patcher.start()
+        self.addCleanup(algorithms_store_patcher.stop)
+        transport_patcher = patch.object(dc, "SSH_TRANSPORT", "paramiko")
+        transport_patcher.start()
+        self.addCleanup(transport_patcher.stop)
+
+    @staticmethod
+    def _connector(server: FakeSSHServer, password: str = "password") -> DeviceRemoteConnector:
+        SSH_ALGORITHMS_CACHE.invalidate(server.host, server.port)
+        return DeviceRemoteConnector(
+            ip=server.host,
+            protocol="ssh",
+            snmp_community="public",
+            auth_obj=SimpleAuthObject(login="admin", password=password),
+            ssh_port=server.port,
+        )
+
+    @patch("devicemanager.dc.SSHSpawn.get_session")
+    def test_session_without_ssh_process(self, get_session):
+        """Сессия работает через expect/send без запуска процесса `ssh`."""
+
+        with FakeSSHServer(commands={"show version": "Version 1.0"}) as server:
+            session = self._connector(server)._connect_by_ssh()
+            try:
+                session.sendline("show version")
+                session.expect(r"fake#")
+                output = session.before.decode()
+            finally:
+                session.close()
+
+        get_session.assert_not_called()
+        self.assertIsInstance(session, SSHChannelSpawner)
+        self.assertIsNone(session.pid)
+        self.assertIn("Version 1.0", output)
+        self.assertFalse(session.isalive())
+
+    def test_negotiated_algorithms_are_cached(self):
+        """Согласованные алгоритмы запоминаются для устройства, ключ сохраняется в known_hosts."""
+
+        with FakeSSHServer() as server:
+            self._connector(server)._connect_by_ssh().close()
+            algorithms = SSH_ALGORITHMS_CACHE.get(server.host, server.port)
+
+        self.assertIsNotNone(algorithms)
+        self.assertTrue(algorithms.kex)
+        self.assertEqual(algorithms.host_key, "ecdsa-sha2-nistp256")
+        self.assertTrue(algorithms.cipher)
+        self.assertTrue(algorithms.mac)
+        self.assertIn("ecdsa-sha2-nistp256", self.known_hosts_path.read_text())
+
+    def test_wrong_password(self):
+        """Неверный пароль при SSH аутентификации - ошибка логина, алгоритмы устройства забываются."""
+
+        with FakeSSHServer() as server:
+            self._connector(server)._connect_by_ssh().close()
+            with self.assertRaises(DeviceLoginError):
+                DeviceRemoteConnector(
+                    ip=server.host,
+                    protocol="ssh",
+                    snmp_community="public",
+                    auth_obj=SimpleAuthObject(login="admin", password="wrong"),
+                    ssh_port=server.port,
+                )._connect_by_ssh()
+
+            self.assertIsNone(SSH_ALGORITHMS_CACHE.get(server.host, server.port))
+
+    @patch("devicemanager.dc.DeviceRemoteConnector._connect_by_openssh")
+    def test_changed_host_key_uses_openssh(self, connect_by_openssh):
+        """При смене ключа устройства подключение выполняется через OpenSSH."""
+
+        connect_by_openssh.return_value = openssh_session = Mock()
+        with FakeSSHServer() as server:
+            old_key = paramiko.ECDSAKey.generate()
+            self.known_hosts_path.write_text(
+                f"[{server.host}]:{server.port} {old_key.get_name()} {old_key.get_base64()}\n"
+            )
+            session = self._connector(server)._connect_by_ssh()
+
+        self.assertIs(session, openssh_session)
+
+    @patch("devicemanager.dc.DeviceRemoteConnector._connect_by_openssh")
+    def test_unsupported_device_skips_in_process_transport(self, connect_by_openssh):
+        """Для устройства, которое paramiko не поддерживает, сразу используется OpenSSH."""
+
+        with FakeSSHServer() as server:
+            connector = self._connector(server)
+            SSH_ALGORITHMS_CACHE.mark_unsupported(server.host, server.port)
+            connector._connect_by_ssh()
+            connections_count = server.connections_count
+
+        connect_by_openssh.assert_called_once()
+        self.assertEqual(connections_count, 0)
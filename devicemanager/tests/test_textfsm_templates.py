@@ -0,0 +1,105 @@
+import os
+import pathlib
+import tempfile
+
+import textfsm
+from django.test import SimpleTestCase
+
+from ..textfsm_templates import TEMPLATES_FOLDER, TextFSMTemplates, textfsm_templates
+from ..vendors.base.helpers import parse_by_template
+
+CISCO_ARP_OUTPUT = """
+Internet  10.100.10.100             27   0000.aaaa.0000  ARPA   Vlan25
+Internet  10.100.10.101             12   0000.aaaa.0001  ARPA   Vlan26
+"""
+
+FILLDOWN_TEMPLATE = """Value Filldown VID (\\d+)
+Value List PORTS (\\d+)
+
+Start
+  ^VLAN ${VID}
+  ^\\s+port ${PORTS}
+  ^end -> Record
+
+EOF
+"""
+
+
+class TestTextFSMTemplates(SimpleTestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.folder = pathlib.Path(temp_dir.name)
+        (self.folder / "vlans").mkdir()
+        self.write_template("vlans/ports.template", FILLDOWN_TEMPLATE)
+
+    def write_template(self, name: str, content: str) -> None:
+        path = self.folder / name
+        path.write_text(content, encoding="utf-8")
+        # Время изменения файла должно отличаться и на файловых системах с грубым временем.
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_all_templates_compiled_once(self):
+        templates = TextFSMTemplates(self.folder)
+
+        self.assertEqual(templates.load_all(), 1)
+        compiled = templates._templates["vlans/ports.template"].fsm
+        templates.parse("vlans/ports.template", "VLAN 10\n port 1\nend\n")
+
+        self.assertIs(templates._templates["vlans/ports.template"].fsm, compiled)
+        self.assertIsInstance(templates.get("vlans/ports.template"), textfsm.TextFSM)
+
+    def test_clones_do_not_share_parse_state(self):
+        templates = TextFSMTemplates(self.folder)
+        first = templates.get("vlans/ports.template")
+        second = templates.get("vlans/ports.template")
+
+        first.ParseText("VLAN 10\n port 1\n port 2\nend\n", eof=False)
+        second.ParseText("VLAN 20\n port 3\nend\n", eof=False)
+        first.ParseText(" port 4\nend\n", eof=False)
+
+        self.assertEqual(first._result, [["10", ["1", "2"]], ["10", ["4"]]])
+        self.assertEqual(second._result, [["20", ["3"]]])
+        self.assertEqual(templates.parse("vlans/ports.template", " port 5\nend\n"), [["", ["5"]]])
+
+    def test_changed_template_is_reloaded(self):
+        templates = TextFSMTemplates(self.folder, check_interval=0)
+        self.assertEqual(templates.parse("vlans/ports.template", "VLAN 10\nend\n"), [["10", []]])
+
+        self.write_template("vlans/ports.template", FILLDOWN_TEMPLATE.replace("^VLAN", "^vlan"))
+
+        self.assertEqual(templates.parse("vlans/ports.template", "VLAN 10\nend\n"), [])
+        self.assertEqual(templates.parse("vlans/ports.template", "vlan 10\nend\n"), [["10", []]])
+
+    def test_template_is_not_checked_within_interval(self):
+        templates = TextFSMTemplates(self.folder, check_interval=3600)
+        templates.load_all()
+
+        self.write_template("vlans/ports.template", FILLDOWN_TEMPLATE.replace("^VLAN", "^vlan"))
+
+        self.assertEqual(templates.parse("vlans/ports.template", "VLAN 10\nend\n"), [["10", []]])
+
+    def test_new_and_invalid_templates(self):
+        templates = TextFSMTemplates(self.folder, check_interval=0)
+        self.write_template("broken.template", "Value VID (\\d+)\n\nStart\n  ^${VID}${NAME}\n")
+
+        with self.assertLogs("devicemanager.textfsm_templates", "WARNING"):
+            self.assertEqual(templates.load_all(), 1)
+
+        self.write_template("vlans/names.template", "Value NAME (\\S+)\n\nStart\n  ^name ${NAME} -> Record\n")
+        self.assertEqual(templates.parse("vlans/names.template", "name core\n"), [["core"]])
+        with self.assertRaises(textfsm.TextFSMTemplateError):
+            templates.get("broken.template")
+        with self.assertRaises(FileNotFoundError):
+            templates.get("unknown.template")
+
+    def test_project_templates(self):
+        result = parse_by_template("arp_format/cisco.template", CISCO_ARP_OUTPUT)
+
+        self.assertEqual(
+            result, [["10.100.10.100", "0000.aaaa.0000", "25"], ["10.100.10.101", "0000.aaaa.0001", "26"]]
+        )
+        self.assertEqual(textfsm_templates.folder, TEMPLATES_FOLDER)
+        with open(TEMPLATES_FOLDER / "arp_format" / "cisco.template", encoding="utf-8") as template_file:
+            self.assertEqual(textfsm.TextFSM(template_file).ParseText(CISCO_ARP_OUTPUT), result)
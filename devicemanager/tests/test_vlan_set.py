@@ -0,0 +1,59 @@
+import orjson
+from django.test import SimpleTestCase
+
+from devicemanager.device import Interfaces
+from devicemanager.device.interfaces import Interface
+from devicemanager.vendors.base.helpers import range_to_numbers
+from devicemanager.vlans import VlanSet
+
+
+class TestVlanSet(SimpleTestCase):
+    def test_parse(self):
+        vlans = VlanSet([1, "10-12", "20 to 21", "30,31;40", "4094", 5000, -1])
+
+        self.assertEqual(list(vlans), [1, 10, 11, 12, 20, 21, 30, 31, 40, 4094])
+        self.assertEqual(len(vlans), 10)
+        self.assertEqual(VlanSet("1-4094").ranges(), [(1, 4094)])
+        self.assertEqual(VlanSet("1 to 4096").ranges(), [(1, 4095)])
+        self.assertFalse(VlanSet())
+
+    def test_set_operations(self):
+        trunk = VlanSet("1-4094")
+        access = VlanSet([10, 20])
+
+        self.assertIn(4094, trunk)
+        self.assertNotIn(4095, trunk)
+        self.assertNotIn("10", access)
+        self.assertEqual(trunk & access, [10, 20])
+        self.assertEqual(access | [30], [10, 20, 30])
+        self.assertEqual(trunk - VlanSet("2-4094"), [1])
+        self.assertEqual({10, 40} & access, VlanSet([10]))
+        self.assertTrue(access.issubset(trunk))
+        self.assertTrue(trunk.issuperset([1, 2]))
+        self.assertTrue(access.isdisjoint([11, 4094]))
+
+    def test_serialization(self):
+        vlans = VlanSet([1, 2, 3, 10, *range(100, 4095)])
+
+        self.assertEqual(vlans.compact(), ["1-3", 10, "100-4094"])
+        self.assertEqual(str(vlans), "1-3, 10, 100-4094")
+        self.assertEqual(VlanSet(vlans.compact()), vlans)
+        self.assertEqual(VlanSet.from_bytes(vlans.to_bytes()), vlans)
+        self.assertEqual(len(vlans.to_bytes()), 512)
+        # Прежний разбор диапазонов читает сохраненные данные так же.
+        self.assertEqual(sum((range_to_numbers(str(vlan)) for vlan in vlans.compact()), []), list(vlans))
+
+    def test_interfaces_store_vlan_set(self):
+        interfaces = Interfaces(
+            [
+                {"name": "1", "status": "up", "description": "", "vlans": ["1-4094"]},
+                {"name": "2", "status": "up", "description": "", "vlans": [10, "20 to 22"]},
+                Interface(name="3", vlan=[30]),  # type: ignore[arg-type]
+            ]
+        )
+
+        self.assertIsInstance(interfaces["3"].vlan, VlanSet)
+        self.assertEqual(interfaces.unique_vlans, list(range(1, 4095)))
+        self.assertEqual([i.name for i in interfaces.with_vlans([21])], ["1", "2"])
+        self.assertEqual(interfaces.json()[1]["vlans"], [10, 20, 21, 22])
+        self.assertEqual(orjson.loads(orjson.dumps(interfaces["1"].vlan.compact())), ["1-4094"])
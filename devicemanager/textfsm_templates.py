@@ -0,0 +1,160 @@
+"""
+# Скомпилированные шаблоны TextFSM.
+
+Разбор шаблона TextFSM (чтение файла, построение и компиляция регулярных выражений) занимает
+больше времени, чем разбор небольшого вывода оборудования. Поэтому `TextFSMTemplates` при первом
+обращении один раз на процесс компилирует все шаблоны из папки `devicemanager/templates`,
+а для каждого разбора выдает копию парсера: общие правила состояний и регулярные выражения
+и собственные значения и результат.
+
+Если файл шаблона изменился, шаблон компилируется заново при следующем обращении, но не чаще
+одной проверки файла в `TEXTFSM_TEMPLATES_CHECK_INTERVAL` секунд:
+
+    >>> textfsm_templates.parse("arp_format/cisco.template", output)
+    [['10.100.10.100', '0000.aaaa.0000', '25']]
+"""
+
+import logging
+import os
+import pathlib
+import threading
+import time
+from dataclasses import dataclass
+
+import textfsm
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_FOLDER = pathlib.Path(__file__).parent / "templates"
+TEMPLATE_SUFFIX = ".template"
+
+TEXTFSM_TEMPLATES_CHECK_INTERVAL = float(os.getenv("TEXTFSM_TEMPLATES_CHECK_INTERVAL", "5"))
+
+
+@dataclass(slots=True)
+class _CompiledTemplate:
+    fsm: textfsm.TextFSM
+    # Время изменения и размер файла, из которого скомпилирован шаблон.
+    version: tuple[int, int]
+    checked_at: float
+
+
+def _file_version(path: pathlib.Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _shallow_copy[T](obj: T) -> T:
+    clone = object.__new__(type(obj))
+    # Атрибуты присваиваются по одному, а не через `__dict__.update`: так у копии не создается
+    # отдельный словарь атрибутов, и обращение к ним при разборе не медленнее, чем у исходного объекта.
+    for name, value in vars(obj).items():
+        setattr(clone, name, value)
+    return clone
+
+
+def clone_parser(fsm: textfsm.TextFSM) -> textfsm.TextFSM:
+    """
+    ## Копия скомпилированного парсера для одного разбора.
+
+    Правила состояний с регулярными выражениями общие, а значения шаблона вместе с их опциями,
+    которые хранят промежуточные данные разбора, и результат - свои.
+    """
+    parser = _shallow_copy(fsm)
+    parser.values = []
+    for value in fsm.values:
+        parser_value = _shallow_copy(value)
+        parser_value.fsm = parser
+        parser_value.options = []
+        for option in value.options:
+            parser_option = _shallow_copy(option)
+            parser_option.value = parser_value
+            parser_value.options.append(parser_option)
+        parser.values.append(parser_value)
+    # Очищает значения, их опции и результат.
+    parser.Reset()
+    return parser
+
+
+class TextFSMTemplates:
+    """
+    Шаблоны TextFSM папки, скомпилированные один раз на процесс.
+
+    Шаблоны идентифицируются путем относительно папки: `"interfaces/cisco.template"`.
+    """
+
+    def __init__(
+        self,
+        folder: pathlib.Path = TEMPLATES_FOLDER,
+        check_interval: float = TEXTFSM_TEMPLATES_CHECK_INTERVAL,
+    ):
+        self.folder = pathlib.Path(folder)
+        self.check_interval = check_interval
+        self._templates: dict[str, _CompiledTemplate] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _compile(self, name: str) -> _CompiledTemplate:
+        path = self.folder / name
+        version = _file_version(path)
+        with open(path, encoding="utf-8") as template_file:
+            fsm = textfsm.TextFSM(template_file)
+        return _CompiledTemplate(fsm=fsm, version=version, checked_at=time.monotonic())
+
+    def load_all(self) -> int:
+        """
+        ## Компилирует все шаблоны папки заново.
+
+        Шаблоны с ошибками пропускаются, ошибка будет вызвана при обращении к такому шаблону.
+        :return: Кол-во скомпилированных шаблонов.
+        """
+        compiled: dict[str, _CompiledTemplate] = {}
+        for path in sorted(self.folder.rglob(f"*{TEMPLATE_SUFFIX}")):
+            name = path.relative_to(self.folder).as_posix()
+            try:
+                compiled[name] = self._compile(name)
+            except textfsm.TextFSMTemplateError as exc:
+                logger.warning("Шаблон TextFSM %s содержит ошибку: %s", name, exc)
+        with self._lock:
+            self._templates = compiled
+            self._loaded = True
+        return len(compiled)
+
+    def _get_compiled(self, name: str) -> _CompiledTemplate:
+        if not self._loaded:
+            self.load_all()
+
+        template = self._templates.get(name)
+        now = time.monotonic()
+        if template is not None and now - template.checked_at < self.check_interval:
+            return template
+
+        with self._lock:
+            template = self._templates.get(name)
+            if template is not None and now - template.checked_at < self.check_interval:
+                return template
+            if template is None or _file_version(self.folder / name) != template.version:
+                # Новый или измененный шаблон.
+                template = self._compile(name)
+                self._templates[name] = template
+            else:
+                template.checked_at = now
+            return template
+
+    def get(self, name: str) -> textfsm.TextFSM:
+        """
+        ## Парсер шаблона для одного разбора.
+
+        :param name: Путь шаблона относительно папки: `"vlans_templates/d-link.template"`.
+        :raises FileNotFoundError: Если файла шаблона нет.
+        :raises textfsm.TextFSMTemplateError: Если шаблон содержит ошибку.
+        """
+        return clone_parser(self._get_compiled(name).fsm)
+
+    def parse(self, name: str, text: str) -> list:
+        """Разбирает текст шаблоном и возвращает список записей."""
+        return self.get(name).ParseText(text)
+
+
+# Шаблоны `devicemanager/templates` текущего процесса.
+textfsm_templates = TextFSMTemplates()
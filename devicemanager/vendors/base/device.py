@@ -1,7 +1,9 @@
+import inspect
 import io
 import re
 import string
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 from functools import wraps
 from pathlib import Path
 from threading import RLock
@@ -12,7 +14,7 @@ import pexpect
 from devicemanager.device_connector.types import RemoteCommand
 
 from ...session_spawner import SessionSpawner
-from .helpers import remove_ansi_escape_codes
+from .helpers import OutputAccumulator, remove_ansi_escape_codes
 from .types import (
     ArpInfoResult,
     CableDiagResult,
@@ -375,8 +377,19 @@ class BaseDevice(AbstractDevice, ABC):
         Необходимо декорировать каждый метод, в котором происходит отправка команд на
         оборудование, чтобы не было наложения команд, так как удаленная сессия для одного
         оборудования общая.
+
+        Для генераторов блокировка удерживается, пока генератор не будет исчерпан или закрыт.
         """
 
+        if inspect.isgeneratorfunction(func):
+
+            @wraps(func)
+            def generator_wrapper(self, *args, **kwargs):
+                with BaseDevice._get_session_lock(self):
+                    yield from func(self, *args, **kwargs)
+
+            return generator_wrapper
+
         @wraps(func)
         def wrapper(self, *args, **kwargs):
             with BaseDevice._get_session_lock(self):
@@ -414,6 +427,77 @@ class BaseDevice(AbstractDevice, ABC):
         :return: Строка с результатом команды.
         """
 
+        output = OutputAccumulator()
+        for page, continued in self._read_command_pages(
+            command,
+            before_catch=before_catch,
+            expect_command=expect_command,
+            num_of_expect=num_of_expect,
+            space_prompt=space_prompt,
+            prompt=prompt,
+            pages_limit=pages_limit,
+            command_linesep=command_linesep,
+            timeout=timeout,
+        ):
+            output.add(page)
+            if continued:
+                output.end_line()
+        return output.getvalue()
+
+    def iter_command(
+        self,
+        command: str,
+        before_catch: str | None = None,
+        expect_command=True,
+        num_of_expect=10,
+        space_prompt=None,
+        prompt=None,
+        pages_limit=None,
+        command_linesep="\n",
+        timeout: int = 20,
+    ) -> Iterator[str]:
+        """
+        ## Отправляет команду на оборудование и отдает её вывод по страницам.
+
+        Параметры те же, что и у `send_command`. Каждая страница очищается от ANSI
+        последовательностей и отдается сразу после прочтения, следующая страница
+        запрашивается у оборудования до того, как вызывающий код обработает текущую.
+        """
+
+        for raw_page, continued in self._read_command_pages(
+            command,
+            before_catch=before_catch,
+            expect_command=expect_command,
+            num_of_expect=num_of_expect,
+            space_prompt=space_prompt,
+            prompt=prompt,
+            pages_limit=pages_limit,
+            command_linesep=command_linesep,
+            timeout=timeout,
+        ):
+            page = remove_ansi_escape_codes(raw_page)
+            if continued and page and page[-1] != "\n":
+                page += "\n"
+            yield page
+
+    def _read_command_pages(
+        self,
+        command: str,
+        before_catch: str | None,
+        expect_command: bool,
+        num_of_expect: int,
+        space_prompt: str | None,
+        prompt: str | None,
+        pages_limit: int | None,
+        command_linesep: str,
+        timeout: int,
+    ) -> Iterator[tuple[bytes | str, bool]]:
+        """
+        Отправляет команду и отдает необработанные страницы вывода (`session.before`).
+
+        Второй элемент - признак того, что за страницей последует продолжение вывода.
+        """
+
         if space_prompt is None:
             space_prompt = self.space_prompt
         if prompt is None:
@@ -422,7 +506,6 @@ class BaseDevice(AbstractDevice, ABC):
         # Убираем предыдущий вывод до промпта, если он был.
         self.session.expect([self.prompt, pexpect.EOF, pexpect.TIMEOUT], timeout=0)
 
-        output = ""
         self.session.send(command + command_linesep)  # Отправляем команду
 
         if expect_command:
@@ -444,16 +527,16 @@ class BaseDevice(AbstractDevice, ABC):
                     timeout=timeout,
                 )
 
-                output += remove_ansi_escape_codes(self.session.before)
-
                 if match == 0:
+                    yield self.session.before or "", False
                     break
                 if match == 1:
+                    page = self.session.before or ""
                     # Отправляем символ пробела, для дальнейшего вывода
                     self.session.send(" ")
-                    if output and output[-1] != "\n":
-                        output += "\n"
+                    yield page, True
                 else:
+                    yield self.session.before or "", False
                     print(f'{self.ip} - timeout во время выполнения команды "{command}"')
                     break
 
@@ -464,9 +547,7 @@ class BaseDevice(AbstractDevice, ABC):
         else:  # Если вывод команды выдается полностью, то пропускаем цикл
             # with contextlib.suppress(pexpect.TIMEOUT):
             self.session.expect(prompt, timeout=timeout)
-            # Убираем управляющие последовательности ANSI
-            output += remove_ansi_escape_codes(self.session.before)
-        return output
+            yield self.session.before or "", False
 
     @lock_session
     def execute_command(self, cmd: str) -> str:
@@ -485,14 +566,14 @@ class BaseDevice(AbstractDevice, ABC):
         for line in commands:
             if line["conditions"]:
                 self.session.sendline(line["command"])
-                output = ""
+                output = OutputAccumulator()
                 for condition in line["conditions"]:
                     ex_match = self.session.expect([self.prompt, condition["expect"]], timeout=20)
                     if ex_match == 1:
                         self.session.sendline(condition["command"])
-                    output += remove_ansi_escape_codes(self.session.before)
+                    output.add(self.session.before)
 
-                cmd_outputs.append(output)
+                cmd_outputs.append(output.getvalue())
                 self.session.expect([self.prompt, pexpect.EOF, pexpect.TIMEOUT], timeout=0.2)
 
             else:
@@ -502,6 +583,42 @@ class BaseDevice(AbstractDevice, ABC):
         self.session.expect([self.prompt, pexpect.EOF, pexpect.TIMEOUT], timeout=0.2)
         return cmd_outputs
 
+    @lock_session
+    def execute_commands_stream(self, commands: list[RemoteCommand]) -> Iterator[str]:
+        """
+        Отправляет список команд на оборудование и отдает их вывод по частям.
+
+        Вывод команд разделяется пустой строкой, как при объединении результата `execute_commands_list`.
+        Сессия оборудования занята, пока генератор не будет исчерпан или закрыт.
+
+        :param commands: Список команд, которые необходимо выполнить на оборудовании.
+        """
+
+        self.session.expect([self.prompt, pexpect.EOF, pexpect.TIMEOUT], timeout=0.1)
+        for index, line in enumerate(commands):
+            if index:
+                yield "\n\n"
+
+            if line["conditions"]:
+                self.session.sendline(line["command"])
+                for condition in line["conditions"]:
+                    ex_match = self.session.expect([self.prompt, condition["expect"]], timeout=20)
+                    if ex_match == 1:
+                        self.session.sendline(condition["command"])
+                    yield remove_ansi_escape_codes(self.session.before)
+
+                self.session.expect([self.prompt, pexpect.EOF, pexpect.TIMEOUT], timeout=0.2)
+
+            else:
+                if type(self).send_command is BaseDevice.send_command:
+                    yield from self.iter_command(line["command"].strip(), expect_command=False)
+                else:
+                    # Оборудование со своей реализацией `send_command` отдает вывод команды целиком.
+                    yield self.send_command(line["command"].strip(), expect_command=False)
+                self.session.expect([self.prompt, pexpect.EOF, pexpect.TIMEOUT], timeout=0.1)
+
+        self.session.expect([self.prompt, pexpect.EOF, pexpect.TIMEOUT], timeout=0.2)
+
     @lock_session
     def get_mac_table(self) -> MACTableType:
         return []
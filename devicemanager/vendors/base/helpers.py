@@ -1,10 +1,16 @@
+import logging
+import os
 import re
 import string
 from typing import Any
 
-import textfsm
+from devicemanager.textfsm_templates import textfsm_templates
+from devicemanager.vendors.base.types import CableDiagResult
 
-from devicemanager.vendors.base.types import TEMPLATE_FOLDER, CableDiagResult
+logger = logging.getLogger(__name__)
+
+# Максимальный размер вывода одной команды (в символах), остальное отбрасывается.
+MAX_COMMAND_OUTPUT_SIZE = int(os.getenv("DEVICE_MAX_COMMAND_OUTPUT_SIZE", str(32 * 1024 * 1024)))
 
 
 def create_mac_regexp(*patterns: str) -> str:
@@ -71,6 +77,69 @@ def remove_ansi_escape_codes(string_: bytes | str | None) -> str:
     return ""
 
 
+class OutputAccumulator:
+    """
+    Накопитель вывода команды.
+
+    Части вывода (`session.before`) хранятся списком без копирования уже прочитанного.
+    ANSI последовательности удаляются из каждой части при добавлении, как и в `iter_command`,
+    а байты декодируются один раз в `getvalue`. Вывод больше `max_size` обрезается.
+    """
+
+    __slots__ = ("_chunks", "_size", "_last", "_ansi_escape", "_ansi_escape_bytes", "max_size", "truncated")
+
+    def __init__(self, max_size: int = MAX_COMMAND_OUTPUT_SIZE, ansi_escape: re.Pattern[str] | None = None):
+        self._chunks: list[bytes | str] = []
+        self._ansi_escape = ansi_escape or ANSI_ESCAPE
+        # Части вывода очищаются до декодирования, чтобы многобайтовый символ на границе частей не терялся.
+        self._ansi_escape_bytes = re.compile(self._ansi_escape.pattern.encode())
+        self._size = 0
+        self._last: bytes | str = ""
+        self.max_size = max_size
+        self.truncated = False
+
+    def add(self, chunk: bytes | str | None) -> None:
+        if not chunk:
+            return
+        if isinstance(chunk, bytes):
+            chunk = self._ansi_escape_bytes.sub(b"", chunk)
+        else:
+            chunk = self._ansi_escape.sub("", str(chunk))
+        if not chunk:
+            return
+        if self._size + len(chunk) > self.max_size:
+            chunk = chunk[: self.max_size - self._size]
+            if not self.truncated:
+                self.truncated = True
+                logger.warning("Вывод команды превысил %s символов и был обрезан", self.max_size)
+            if not chunk:
+                return
+        self._chunks.append(chunk)
+        self._size += len(chunk)
+        self._last = chunk
+
+    def end_line(self) -> None:
+        """Завершить строку перед следующей страницей вывода, если она не завершена."""
+
+        if isinstance(self._last, bytes):
+            if self._last and not self._last.endswith(b"\n"):
+                self.add(b"\n")
+        elif self._last and not self._last.endswith("\n"):
+            self.add("\n")
+
+    def __len__(self) -> int:
+        return self._size
+
+    def getvalue(self) -> str:
+        if all(isinstance(chunk, bytes) for chunk in self._chunks):
+            # Многобайтовый символ может оказаться на границе двух частей, поэтому декодируем все сразу.
+            return b"".join(self._chunks).decode("utf-8", errors="ignore")  # type: ignore[arg-type]
+        return "".join(
+            chunk.decode("utf-8", errors="ignore") if isinstance(chunk, bytes) else chunk
+            for chunk in self._chunks
+        )
+
+
 def normalize_cable_diag_status(status: Any) -> str:
     """Converts vendor-specific cable diagnostic status to a common representation."""
     status_text = str(status or "").strip()
@@ -240,8 +309,8 @@ def interface_normal_view(interface) -> str:
 
 def parse_by_template(template_name: str, text: str) -> list:
     """
-    Принимает имя шаблона и текст в качестве входных данных, открывает файл шаблона,
-    использует библиотеку TextFSM для анализа текста и возвращает проанализированный вывод.
+    Принимает имя шаблона и текст в качестве входных данных, берет скомпилированный шаблон
+    из `textfsm_templates`, анализирует им текст и возвращает проанализированный вывод.
 
     :param template_name: Параметр `template_name` представляет собой строку, представляющую имя файла шаблона.
      Этот файл содержит структуру шаблона, которая будет использоваться для разбора параметра text.
@@ -249,12 +318,7 @@ def parse_by_template(template_name: str, text: str) -> list:
      проанализировать, используя указанный шаблон
     :return: Возвращает список.
     """
-
-    with open(f"{TEMPLATE_FOLDER}/{template_name}", encoding="utf-8") as template_file:
-        # Используем библиотеку TextFSM для анализа.
-        int_des_ = textfsm.TextFSM(template_file)
-        # Разбираем вывод команды.
-        return int_des_.ParseText(text)
+    return textfsm_templates.parse(template_name, text)
 
 
 def normalize_number_suffix(s_number: str) -> int:
@@ -1,6 +1,8 @@
 import pathlib
 from typing import Any, AnyStr, Literal, NamedTuple, NotRequired, Protocol, TypedDict
 
+from devicemanager.vlans import VlanSet
+
 # Папка с шаблонами регулярных выражений для парсинга вывода оборудования
 TEMPLATE_FOLDER = pathlib.Path(__file__).parent.parent.parent / "templates"
 
@@ -12,7 +14,8 @@ PORTS = list[str]
 STATUS = str
 DESCRIPTION = str
 VID = int
-VLAN_LIST = list
+# Список VID и диапазонов VLAN (`[10, "20-30"]`) или `VlanSet`
+VLAN_LIST = list | VlanSet
 MACListType = list[tuple[VID, MAC]]
 
 InterfaceType = Literal["up", "down", "admin down", "notPresent", "dormant"]
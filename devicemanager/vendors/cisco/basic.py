@@ -3,8 +3,6 @@ import re
 import time
 from time import sleep
 
-import textfsm
-
 from ..base.device import (
     AbstractCableTestDevice,
     AbstractConfigDevice,
@@ -16,7 +14,6 @@ from ..base.helpers import create_mac_regexp, normalize_cable_diag_result, parse
 from ..base.types import (
     COOPER_TYPES,
     FIBER_TYPES,
-    TEMPLATE_FOLDER,
     ArpInfoResult,
     DeviceAuthDict,
     InterfaceListType,
@@ -477,12 +474,7 @@ class Cisco(BaseDevice, AbstractConfigDevice, AbstractSearchDevice, AbstractCabl
     def _search_in_arp(self, address: str) -> list[ArpInfoResult]:
         match = self.send_command(f"show arp | include {address}", expect_command=False)
         # Форматируем вывод
-        with open(
-            f"{TEMPLATE_FOLDER}/arp_format/{self.vendor.lower()}.template",
-            encoding="utf-8",
-        ) as template_file:
-            template = textfsm.TextFSM(template_file)
-        result = template.ParseText(match)
+        result = parse_by_template(f"arp_format/{self.vendor.lower()}.template", match)
         return [ArpInfoResult(*r) for r in result]
 
     @BaseDevice.lock_session
@@ -6,7 +6,6 @@ from time import sleep
 from typing import Any, Literal
 
 import pexpect
-import textfsm
 
 from ecstasy_project.settings_utils import env_bool
 
@@ -14,16 +13,15 @@ from .. import DeviceException
 from .base.device import AbstractCableTestDevice, AbstractConfigDevice, BaseDevice
 from .base.factory import AbstractDeviceFactory
 from .base.helpers import (
+    OutputAccumulator,
     create_mac_regexp,
     normalize_cable_diag_result,
     parse_by_template,
     range_to_numbers,
-    remove_ansi_escape_codes,
 )
 from .base.types import (
     COOPER_TYPES,
     FIBER_TYPES,
-    TEMPLATE_FOLDER,
     CableDiagResult,
     DeviceAuthDict,
     InterfaceListType,
@@ -249,7 +247,7 @@ class Dlink(BaseDevice, AbstractConfigDevice, AbstractCableTestDevice):
         # Убираем предыдущий вывод до промпта, если он был.
         self.session.expect([self.prompt, pexpect.EOF, pexpect.TIMEOUT], timeout=0)
 
-        output = ""
+        output = OutputAccumulator()
         self.session.send(command + "\n")  # Отправляем команду
 
         while True:
@@ -262,7 +260,7 @@ class Dlink(BaseDevice, AbstractConfigDevice, AbstractCableTestDevice):
                 timeout=timeout,
             )
 
-            output += remove_ansi_escape_codes(self.session.before)
+            output.add(self.session.before)
 
             if match == 0:
                 break
@@ -270,13 +268,11 @@ class Dlink(BaseDevice, AbstractConfigDevice, AbstractCableTestDevice):
                 # Отправляем символ пробела, для дальнейшего вывода
                 self.session.send(" p" + " " * pages)
                 self.session.send("q")
-
-                if output and output[-1] != "\n":
-                    output += "\n"
+                output.end_line()
             else:
                 break
 
-        return output
+        return output.getvalue()
 
     @BaseDevice.lock_session
     def get_interfaces(self) -> InterfaceListType:
@@ -385,9 +381,7 @@ class Dlink(BaseDevice, AbstractConfigDevice, AbstractCableTestDevice):
         with no_clipaging(self):
             output = self.send_command("show vlan")
 
-        with open(f"{TEMPLATE_FOLDER}/vlans_templates/d-link.template", encoding="utf-8") as template_file:
-            vlan_templ = textfsm.TextFSM(template_file)
-            result_vlan = vlan_templ.ParseText(output)
+        result_vlan = parse_by_template("vlans_templates/d-link.template", output)
         # сортируем и выбираем уникальные номера портов из списка интерфейсов
         port_num = {int(re.findall(r"\d+", p[0])[0]) for p in interfaces}
 
@@ -399,7 +393,7 @@ class Dlink(BaseDevice, AbstractConfigDevice, AbstractCableTestDevice):
             for port in range_to_numbers(vlan[2]):
                 # Добавляем вланы на порты
                 ports_vlan[str(port)].append(vlan[0])
-        interfaces_vlan = []  # итоговый список (интерфейсы и вланы)
+        interfaces_vlan: InterfaceVLANListType = []  # итоговый список (интерфейсы и вланы)
         for line in interfaces:
             interfaces_vlan.append(
                 (
@@ -161,7 +161,7 @@ class EltexMES(BaseDevice, AbstractConfigDevice):
         :return: ```[ ('name', 'status', 'desc', [vid:int, vid:int, ... vid:int] ), ... ]```
         """
 
-        result = []
+        result: InterfaceVLANListType = []
         interfaces = self.get_interfaces()
 
         interfaces_config = self._get_interfaces_config()
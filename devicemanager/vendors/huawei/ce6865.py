@@ -3,8 +3,9 @@ import re
 from time import sleep
 from typing import Literal
 
+from ...vlans import VlanSet
 from ..base.device import AbstractConfigDevice, BaseDevice
-from ..base.helpers import create_mac_regexp, parse_by_template, range_to_numbers
+from ..base.helpers import create_mac_regexp, parse_by_template
 from ..base.types import (
     InterfaceListType,
     InterfaceType,
@@ -122,14 +123,14 @@ class HuaweiCE6865(BaseDevice, AbstractConfigDevice):
 
         Выбираем строчки, в которых указаны VLAN, кроме тех, которые начинаются с `undo`
 
-        :return: ```[ ('name', 'status', 'desc', ['{vid}', '{vid},{vid},...{vid}', ...] ), ... ]```
+        :return: ```[ ('name', 'status', 'desc', VlanSet('{vid}, {vid}-{vid}, ...') ), ... ]```
         """
         interfaces = self.get_interfaces()
 
         output = self.send_command("display current-configuration interface")
         result = parse_by_template("vlans_templates/huawei-ce6865.template", output)
 
-        interfaces_vlans = {line[0]: range_to_numbers(line[1]) for line in result}
+        interfaces_vlans = {line[0]: VlanSet(line[1]) for line in result}
 
         result = []
         for interface, status, description in interfaces:
@@ -138,7 +139,7 @@ class HuaweiCE6865(BaseDevice, AbstractConfigDevice):
                     interface,
                     status,
                     description,
-                    interfaces_vlans.get(interface, []),
+                    interfaces_vlans.get(interface, VlanSet()),
                 )
             )
 
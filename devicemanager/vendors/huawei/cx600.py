@@ -2,12 +2,9 @@ import io
 import re
 from typing import Literal
 
-import textfsm
-
 from ..base.device import AbstractUserSessionsDevice, BaseDevice
-from ..base.helpers import create_mac_regexp
+from ..base.helpers import create_mac_regexp, parse_by_template
 from ..base.types import (
-    TEMPLATE_FOLDER,
     ArpInfoResult,
     DeviceAuthDict,
     InterfaceListType,
@@ -103,12 +100,7 @@ class HuaweiCX600(BaseDevice, AbstractUserSessionsDevice):
         )
 
         # Форматируем вывод
-        with open(
-            f"{TEMPLATE_FOLDER}/arp_format/{self.vendor.lower()}-{self.model.lower()}.template",
-            encoding="utf-8",
-        ) as template_file:
-            template = textfsm.TextFSM(template_file)
-        result = template.ParseText(match)
+        result = parse_by_template(f"arp_format/{self.vendor.lower()}-{self.model.lower()}.template", match)
 
         return [ArpInfoResult(*r) for r in result] if result else []
 
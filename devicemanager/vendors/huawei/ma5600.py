@@ -8,7 +8,7 @@ from jinja2 import Environment, FileSystemLoader
 from devicemanager import snmp
 
 from ..base.device import AbstractDSLProfileDevice, BaseDevice
-from ..base.helpers import create_mac_regexp
+from ..base.helpers import OutputAccumulator, create_mac_regexp
 from ..base.types import (
     DeviceAuthDict,
     InterfaceListType,
@@ -19,6 +19,9 @@ from ..base.types import (
     SplittedPortType,
 )
 
+# Управляющие последовательности ANSI
+ANSI_ESCAPE = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+
 
 class HuaweiMA5600T(BaseDevice, AbstractDSLProfileDevice):
     """
@@ -136,6 +139,8 @@ class HuaweiMA5600T(BaseDevice, AbstractDSLProfileDevice):
             prompt = self.prompt
 
         output = ""
+        # Страницы вывода, управляющие последовательности ANSI убираются из каждой страницы.
+        pages = OutputAccumulator(ansi_escape=ANSI_ESCAPE)
         self.session.send(command + command_linesep)  # Отправляем команду
 
         if expect_command:
@@ -157,18 +162,14 @@ class HuaweiMA5600T(BaseDevice, AbstractDSLProfileDevice):
                     timeout=timeout,
                 )
 
-                # Управляющие последовательности ANSI
-                ansi_escape = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
-
-                # Убираем их
-                output += ansi_escape.sub("", (self.session.before or b"").decode(errors="ignore"))
+                pages.add(self.session.before)
 
                 if match == 0:
                     break
                 if match == 1:
                     # Отправляем символ пробела, для дальнейшего вывода
                     self.session.send(" ")
-                    output += "\n"
+                    pages.add(b"\n")
                 elif match == 3:
                     # { <cr>|ontid<U><0,255> }:
                     self.session.send("\n")
@@ -180,6 +181,8 @@ class HuaweiMA5600T(BaseDevice, AbstractDSLProfileDevice):
                 if pages_limit:
                     pages_limit -= 1
 
+            output = pages.getvalue()
+
         else:  # Если вывод команды выдается полностью, то пропускаем цикл
             with contextlib.suppress(pexpect.TIMEOUT):
                 self.session.expect(prompt, timeout=timeout)
@@ -7,6 +7,7 @@ from typing import Literal
 
 import pexpect
 
+from ...vlans import VlanSet
 from ..base.device import AbstractCableTestDevice, AbstractConfigDevice, BaseDevice
 from ..base.helpers import (
     create_mac_regexp,
@@ -287,88 +288,30 @@ class Huawei(BaseDevice, AbstractConfigDevice, AbstractCableTestDevice):
             interface_config_info = interfaces_config_dict.get(interface_normal_view(intf), "")
 
             # Use the extract_vlans method to parse VLANs for the interface is work for S2326 tested
-            vlans = self._extract_vlans(interface_config_info)
-
-            # Check if there are any VLANs before appending
-            if vlans:  # This ensures you don't append empty VLAN lists
-                result.append((intf, status, desc, vlans))
-            else:
-                result.append((intf, status, desc, []))  # Or append an empty list if no VLANs found
+            result.append((intf, status, desc, self._extract_vlans(interface_config_info)))
 
         return result
 
-    def _extract_vlans(self, interface_output: str) -> list:
+    def _extract_vlans(self, interface_output: str) -> VlanSet:
         """
         Extract VLANs from the interface configuration.
 
         :param interface_output: Output of the command `display current-configuration interface {port}`
-        :return: A sorted list of extracted VLANs
+        :return: Set of extracted VLANs, VLAN ranges are not expanded
         """
         # Remove lines with "undo" to avoid conflicts
         cleaned_output = re.sub(r"^ undo .+", "", interface_output, flags=re.MULTILINE)
 
         if access_vlan := re.search(r"port default vlan (\d+)", cleaned_output):
-            return [access_vlan.group(1)]
+            return VlanSet(access_vlan.group(1))
 
-        # Extract tagged VLANs if present
+        # Tagged and trunk VLANs are written as ranges: "10 to 14 3456"
         tagged_vlans = re.findall(r"port hybrid tagged vlan ([\d\s,to]+)", cleaned_output)
-        # If a single string is returned, convert it to a list of one element
-        if isinstance(tagged_vlans, str):
-            tagged_vlans = [tagged_vlans]
-        tagged_vlans = self._expand_vlan_ranges(tagged_vlans)
-
-        # Extract trunk VLANs if present
         trunk_vlans = re.findall(r"port trunk allow-pass vlan ([\d\s,to]+)", cleaned_output)
-        if isinstance(trunk_vlans, str):
-            trunk_vlans = [trunk_vlans]
-        trunk_vlans = self._expand_vlan_ranges(trunk_vlans)
-
-        # Extract untagged VLANs if present
         untagged_vlans = re.findall(r"port hybrid untagged vlan ([\d\s]+)", cleaned_output)
-        untagged_vlans = [int(vlan) for vlan in " ".join(untagged_vlans).split()]
-
-        # Extract PVID VLAN if present
         pvid_vlan = re.findall(r"port hybrid pvid vlan (\d+)", cleaned_output)
-        pvid_vlan = [int(vlan) for vlan in pvid_vlan]
-
-        # Combine all VLANs and remove duplicates
-        all_vlans = set(tagged_vlans + untagged_vlans + trunk_vlans + pvid_vlan)
-        return sorted(all_vlans)
 
-    @staticmethod
-    def _expand_vlan_ranges(vlan_ranges: list) -> list:
-        """
-        Expand VLAN ranges into individual VLANs.
-
-        :param vlan_ranges: List of VLAN ranges as strings, e.g., ["10 to 14", "3456"]
-        :return: List of individual VLANs
-        """
-        vlans: list = []
-        # print(f"Raw vlan_ranges: {vlan_ranges}")  # Debug print to check input
-
-        for part in vlan_ranges:
-            # print(f"Processing: {part}")  # Debug print to see what's being processed
-            part = part.strip(",")  # Remove trailing commas or delimiters
-            parts = part.split()  # Split by spaces for individual VLANs and ranges
-
-            # Process each part in the string
-            for i, subpart in enumerate(parts):
-                if "to" in subpart:  # Handle VLAN ranges
-                    if i > 0 and i + 1 < len(parts):
-                        try:
-                            start = int(parts[i - 1])  # Get the start of the range
-                            end = int(parts[i + 1])  # Get the end of the range
-                            vlans.extend(
-                                range(start, end + 1)
-                            )  # Add all VLANs between start and end inclusive
-                        except ValueError:
-                            pass
-                            # print(f"Invalid range: {parts[i - 1]} to {parts[i + 1]}. Skipping.")  # Log invalid range
-
-                elif subpart.isdigit():  # Handle single VLAN numbers
-                    vlans.append(int(subpart))
-
-        return vlans
+        return VlanSet(tagged_vlans + trunk_vlans + untagged_vlans + pvid_vlan)
 
     @staticmethod
     def normalize_interface_name(intf: str) -> str:
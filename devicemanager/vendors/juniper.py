@@ -6,14 +6,12 @@ from re import findall, sub
 from typing import Literal
 
 import pexpect
-import textfsm
 
 from .. import UnknownDeviceError
 from .base.device import AbstractConfigDevice, BaseDevice
 from .base.factory import AbstractDeviceFactory
-from .base.helpers import create_mac_regexp
+from .base.helpers import create_mac_regexp, parse_by_template
 from .base.types import (
-    TEMPLATE_FOLDER,
     ArpInfoResult,
     DeviceAuthDict,
     InterfaceListType,
@@ -98,12 +96,7 @@ class Juniper(BaseDevice, AbstractConfigDevice):
         match = self.send_command(f"show arp | match {address}", expect_command=False)
 
         # Форматируем вывод
-        with open(
-            f"{TEMPLATE_FOLDER}/arp_format/{self.vendor.lower()}-{self.model.lower()}.template",
-            encoding="utf-8",
-        ) as template_file:
-            template = textfsm.TextFSM(template_file)
-        result = template.ParseText(match)
+        result = parse_by_template(f"arp_format/{self.vendor.lower()}-{self.model.lower()}.template", match)
         if result:
             # Нашли в таблице ARP
             return [ArpInfoResult(*r) for r in result]
@@ -178,7 +178,7 @@ class MikroTik(BaseDevice, AbstractConfigDevice, AbstractPOEDevice):
 
     @BaseDevice.lock_session
     def get_vlans(self) -> InterfaceVLANListType:
-        interfaces_with_vlans = []
+        interfaces_with_vlans: InterfaceVLANListType = []
 
         interfaces: InterfaceListType = self.get_interfaces()
         for line in interfaces:
@@ -135,7 +135,7 @@ class ZTE(BaseDevice, AbstractCableTestDevice, AbstractConfigDevice, AbstractSea
             for port in ports:
                 port_vlans.setdefault(port, []).append(vid)
 
-        interfaces_vlan = []  # итоговый список (интерфейсы и вланы)
+        interfaces_vlan: InterfaceVLANListType = []  # итоговый список (интерфейсы и вланы)
 
         for name, status, desc in interfaces:
             interfaces_vlan.append((name, status, desc, port_vlans.get(name, [])))
@@ -0,0 +1,166 @@
+"""
+# Множество VLAN порта.
+
+`VlanSet` хранит VLAN 0-4095 битами целого числа, поэтому транк `1-4094` занимает 512 байт
+вместо списка из 4094 чисел, а объединение, пересечение и проверка вхождения выполняются
+побитовыми операциями.
+
+Для сохранения в JSON множество сворачивается в диапазоны:
+
+    >>> VlanSet([1, 2, 3, 10, "100-4094"]).compact()
+    ['1-3', 10, '100-4094']
+
+Этот формат разбирается и прежней функцией `range_to_numbers`, поэтому сохраненные данные
+читаются и без `VlanSet`.
+"""
+
+import re
+from collections.abc import Iterable, Iterator
+
+MAX_VLAN = 4095
+
+# Одиночный VLAN или диапазон: `10`, `10-20`, `10 to 20`.
+_VLAN_RANGE_REGEXP = re.compile(r"(\d+)(?:\s*(?:-|to)\s*(\d+))?")
+
+
+def _range_bits(start: int, end: int) -> int:
+    start, end = max(start, 0), min(end, MAX_VLAN)
+    if start > end:
+        return 0
+    return ((1 << (end - start + 1)) - 1) << start
+
+
+class VlanSet:
+    """
+    Неизменяемое множество VLAN.
+
+    Принимает числа, строки с диапазонами и другие `VlanSet`:
+
+        >>> VlanSet([10, "20-22", "30 to 31"])
+        VlanSet('10, 20-22, 30-31')
+
+        >>> 21 in VlanSet("20-22")
+        True
+    """
+
+    __slots__ = ("_bits",)
+
+    def __init__(self, vlans: "VlanSet | Iterable[int | str] | str | None" = None) -> None:
+        if isinstance(vlans, VlanSet):
+            self._bits: int = vlans._bits
+            return
+
+        if isinstance(vlans, str):
+            vlans = [vlans]
+        bits = 0
+        for vlan in vlans or ():
+            if isinstance(vlan, int):
+                if 0 <= vlan <= MAX_VLAN:
+                    bits |= 1 << vlan
+            elif isinstance(vlan, str):
+                for match in _VLAN_RANGE_REGEXP.finditer(vlan):
+                    start = int(match.group(1))
+                    end = int(match.group(2) or start)
+                    bits |= _range_bits(min(start, end), max(start, end))
+        self._bits = bits
+
+    @classmethod
+    def from_bits(cls, bits: int) -> "VlanSet":
+        """Множество из числа, в котором N-й бит означает VLAN N."""
+        vlan_set = cls()
+        vlan_set._bits = bits & _range_bits(0, MAX_VLAN)
+        return vlan_set
+
+    @classmethod
+    def from_bytes(cls, bitmap: bytes | memoryview | None) -> "VlanSet":
+        """Множество из битовой карты little-endian, см. `to_bytes()`."""
+        return cls.from_bits(int.from_bytes(bytes(bitmap or b""), "little"))
+
+    @classmethod
+    def from_ranges(cls, ranges: Iterable[tuple[int, int]]) -> "VlanSet":
+        bits = 0
+        for start, end in ranges:
+            bits |= _range_bits(start, end)
+        return cls.from_bits(bits)
+
+    @property
+    def bits(self) -> int:
+        return self._bits
+
+    def to_bytes(self) -> bytes:
+        """Битовая карта little-endian, обрезанная по старшему VLAN."""
+        return self._bits.to_bytes((self._bits.bit_length() + 7) // 8, "little")
+
+    def ranges(self) -> list[tuple[int, int]]:
+        """Непрерывные диапазоны VLAN по возрастанию: `[(from, to), ...]`."""
+        bits = self._bits
+        ranges = []
+        while bits:
+            start = (bits & -bits).bit_length() - 1
+            shifted = bits >> start
+            length = (shifted ^ (shifted + 1)).bit_length() - 1
+            ranges.append((start, start + length - 1))
+            bits &= ~(((1 << length) - 1) << start)
+        return ranges
+
+    def compact(self) -> list[int | str]:
+        """Представление для JSON: одиночные VLAN числами, диапазоны строками `from-to`."""
+        return [start if start == end else f"{start}-{end}" for start, end in self.ranges()]
+
+    def isdisjoint(self, other: "VlanSet | Iterable[int | str]") -> bool:
+        return not self._bits & VlanSet(other)._bits
+
+    def issubset(self, other: "VlanSet | Iterable[int | str]") -> bool:
+        return not self._bits & ~VlanSet(other)._bits
+
+    def issuperset(self, other: "VlanSet | Iterable[int | str]") -> bool:
+        return VlanSet(other).issubset(self)
+
+    def __contains__(self, vlan: object) -> bool:
+        return isinstance(vlan, int) and 0 <= vlan <= MAX_VLAN and bool(self._bits >> vlan & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        for start, end in self.ranges():
+            yield from range(start, end + 1)
+
+    def __len__(self) -> int:
+        return self._bits.bit_count()
+
+    def __bool__(self) -> bool:
+        return bool(self._bits)
+
+    def __or__(self, other: "VlanSet | Iterable[int | str]") -> "VlanSet":
+        return VlanSet.from_bits(self._bits | VlanSet(other)._bits)
+
+    def __and__(self, other: "VlanSet | Iterable[int | str]") -> "VlanSet":
+        return VlanSet.from_bits(self._bits & VlanSet(other)._bits)
+
+    def __sub__(self, other: "VlanSet | Iterable[int | str]") -> "VlanSet":
+        return VlanSet.from_bits(self._bits & ~VlanSet(other)._bits)
+
+    def __xor__(self, other: "VlanSet | Iterable[int | str]") -> "VlanSet":
+        return VlanSet.from_bits(self._bits ^ VlanSet(other)._bits)
+
+    __ror__ = __or__
+    __rand__ = __and__
+    __rxor__ = __xor__
+
+    def __rsub__(self, other: Iterable[int | str]) -> "VlanSet":
+        return VlanSet(other) - self
+
+    def __eq__(self, other: object) -> bool:
+        # Сравнение со списками оставлено для кода и данных, где VLAN порта - список чисел.
+        if isinstance(other, VlanSet):
+            return self._bits == other._bits
+        if isinstance(other, (list, tuple, set, frozenset)):
+            return self._bits == VlanSet(other)._bits
+        return NotImplemented
+
+    # Как и `set`, сравнивается по содержимому со списками, поэтому не хешируется.
+    __hash__ = None  # type: ignore[assignment]
+
+    def __str__(self) -> str:
+        return ", ".join(map(str, self.compact()))
+
+    def __repr__(self) -> str:
+        return f"VlanSet('{self}')"